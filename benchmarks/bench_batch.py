@@ -0,0 +1,94 @@
+# benchmarks/bench_batch.py
+# Commands/second for the batch mode on a synthetic day of desk transactions.
+# Usage: python -m benchmarks.bench_batch [--books 100000] [--commands 200000]
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+from collections import Counter, defaultdict
+
+from benchmarks.synthetic import library_files_in, write_catalog
+from library_system.batch import run_batch, run_commands
+from library_system.library import Library
+
+# Share of each command in the generated workload
+MIX = (
+    ("find_book", 0.40),
+    ("find_member", 0.10),
+    ("borrow_book", 0.20),
+    ("return_book", 0.20),
+    ("search_books", 0.05),
+    ("get_stats", 0.05),
+)
+
+
+def make_commands(library, count, seed):
+    """Builds a replayable command list; returns target books the member actually holds."""
+    rng = random.Random(seed)
+    isbns = list(library.books)
+    member_ids = list(library.members)
+    words = [book.title.split()[0] for book in (library.books[rng.choice(isbns)] for _ in range(500))]
+    ops, weights = zip(*MIX)
+    loans = []  # (isbn, member_id) pairs borrowed earlier in the batch
+    commands = []
+    for op in rng.choices(ops, weights, k=count):
+        if op == "find_book":
+            commands.append({"op": op, "isbn": rng.choice(isbns)})
+        elif op == "find_member":
+            commands.append({"op": op, "member_id": rng.choice(member_ids)})
+        elif op == "borrow_book":
+            isbn, member_id = rng.choice(isbns), rng.choice(member_ids)
+            loans.append((isbn, member_id))
+            commands.append({"op": op, "isbn": isbn, "member_id": member_id})
+        elif op == "return_book" and loans:
+            isbn, member_id = loans.pop(rng.randrange(len(loans)))
+            commands.append({"op": op, "isbn": isbn, "member_id": member_id})
+        elif op == "search_books":
+            commands.append({"op": op, "query": rng.choice(words)})
+        else:
+            commands.append({"op": "get_stats"})
+    return commands
+
+
+def load_library():
+    sys.stdout = open(os.devnull, "w")
+    try:
+        return Library()
+    finally:
+        sys.stdout.close()
+        sys.stdout = sys.__stdout__
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch mode throughput benchmark")
+    parser.add_argument("--books", type=int, default=100_000)
+    parser.add_argument("--commands", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp, library_files_in(tmp):
+        write_catalog(Library.BOOKS_FILE, Library.MEMBERS_FILE, args.books, seed=args.seed)
+        commands = make_commands(load_library(), args.commands, args.seed)
+
+        # Every pass starts from the same freshly loaded catalog
+        with open(os.devnull, "w") as devnull:
+            for timing in (False, True):
+                summary = run_batch(load_library(), commands, devnull, timing=timing)
+                print(f"timing={'on ' if timing else 'off'}  {summary['commands']:,} commands in "
+                      f"{summary['seconds']:.2f}s = {summary['commands'] / summary['seconds']:,.0f} commands/s")
+
+        # Per-command breakdown from the recorded timings
+        totals = defaultdict(float)
+        counts = Counter()
+        for outcome in run_commands(load_library(), commands):
+            totals[outcome['op']] += outcome['elapsed_us']
+            counts[outcome['op']] += 1
+        for op, _ in MIX:
+            if counts[op]:
+                mean = totals[op] / counts[op]
+                print(f"  {op:<18} {counts[op]:>8,} x {mean:7.2f} us  = {1e6 / mean:>10,.0f} /s")
+
+if __name__ == "__main__":
+    main()
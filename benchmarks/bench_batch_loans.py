@@ -0,0 +1,92 @@
+# benchmarks/bench_batch_loans.py
+# Loans/second for a desk checking out and returning stacks of books: one
+# borrow_book/return_book call per book versus one borrow_books/return_books call per
+# stack. Runs on the in-memory Library and, with --sqlite, the SQLite storage too.
+# Usage: python -m benchmarks.bench_batch_loans [--books 100000] [--stacks 20000] [--stack 5]
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import library_files_in, write_catalog
+from library_system.book import Book
+from library_system.library import Library
+from library_system.member import Member
+from library_system.sqlite_store import SQLiteStore, migrate_from_json
+
+
+def load_library(storage):
+    sys.stdout = open(os.devnull, "w")
+    try:
+        return Library(storage=storage)
+    finally:
+        sys.stdout.close()
+        sys.stdout = sys.__stdout__
+
+
+def make_stacks(library, count, size, seed):
+    """`count` (member_id, [isbn, ...]) stacks of available books for members with no loans."""
+    rng = random.Random(seed)
+    isbns = [isbn for isbn, book in library.books.items() if book.available]
+    member_ids = [mid for mid, member in library.members.items() if not member.borrowed_books]
+    rng.shuffle(isbns)
+    return [(rng.choice(member_ids), isbns[n * size:(n + 1) * size]) for n in range(min(count, len(isbns) // size))]
+
+
+def one_by_one(library, stacks):
+    for member_id, isbns in stacks:
+        for isbn in isbns:
+            library.borrow_book(isbn, member_id)
+        for isbn in isbns:
+            library.return_book(isbn, member_id)
+
+
+def batched(library, stacks):
+    for member_id, isbns in stacks:
+        library.borrow_books(member_id, isbns)
+        library.return_books(member_id, isbns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batched checkout/return throughput")
+    parser.add_argument("--books", type=int, default=100_000)
+    parser.add_argument("--stacks", type=int, default=20_000)
+    parser.add_argument("--stack", type=int, default=5, help="books per stack")
+    parser.add_argument("--sqlite", action="store_true", help="also run on the SQLite storage")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp, library_files_in(tmp):
+        write_catalog(Library.BOOKS_FILE, Library.MEMBERS_FILE, args.books, member_count=args.books, seed=args.seed)
+
+        source = load_library("objects")
+        stacks = make_stacks(source, args.stacks, args.stack, args.seed)
+        if args.sqlite:
+            store = SQLiteStore(Library.DATABASE_FILE, Book.from_dict, Member.from_dict)
+            migrate_from_json(source, store)
+            store.close()
+        del source
+
+        # Every stack is returned again, so each run starts from the same catalog
+        print(f"{args.books:,} books, {args.stacks:,} stacks of {args.stack}")
+        print(f"{'storage':>8} {'mode':>12} {'loans/s':>10} {'journal records':>16}")
+        for storage in ("objects", "sqlite") if args.sqlite else ("objects",):
+            for name, run in (("one by one", one_by_one), ("batched", batched)):
+                library = load_library(storage)
+                start = time.perf_counter()
+                run(library, stacks)
+                records = len(library.journal.pending)
+                with open(os.devnull, "w") as sys.stdout:
+                    library.save_data()
+                sys.stdout = sys.__stdout__
+                elapsed = time.perf_counter() - start
+                loans = sum(len(isbns) for _, isbns in stacks)
+                print(f"{storage:>8} {name:>12} {2 * loans / elapsed:>10,.0f} {records:>16,}")
+                library.close()
+
+
+if __name__ == "__main__":
+    main()
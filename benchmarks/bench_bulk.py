@@ -0,0 +1,65 @@
+# benchmarks/bench_bulk.py
+# Rows/second for bulk import and export of CSV and JSONL catalogs.
+# Usage: python -m benchmarks.bench_bulk [--rows 1000000]
+
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+
+from benchmarks.synthetic import iter_book_records, library_files_in
+from library_system.bulk import export_catalog, import_catalog
+from library_system.library import Library
+
+
+def write_input(path, rows, seed):
+    """Writes a synthetic catalog; 1 row in 1000 is invalid and 1 in 1000 is a duplicate."""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        if path.endswith('.csv'):
+            writer = csv.writer(f)
+            writer.writerow(["title", "author", "isbn", "publication_year"])
+            write = writer.writerow
+        else:
+            keys = ("title", "author", "isbn", "publication_year")
+            def write(row):
+                f.write(json.dumps(dict(zip(keys, row))) + '\n')
+        for number, (isbn, title, author, year) in enumerate(iter_book_records(rows, seed)):
+            if number % 1000 == 999:
+                title = ""
+            elif number % 1000 == 998:
+                isbn = f"978{number - 1:010d}"
+            write((title, author, isbn, year))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import/export throughput benchmark")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'format':>6} {'step':>8} {'rows':>10} {'seconds':>8} {'rows/s':>10}")
+    for extension in ("csv", "jsonl"):
+        with tempfile.TemporaryDirectory() as tmp, library_files_in(tmp):
+            source = os.path.join(tmp, f"catalog.{extension}")
+            write_input(source, args.rows, args.seed)
+
+            sys.stdout = open(os.devnull, "w")
+            library = Library()
+            sys.stdout = sys.__stdout__
+            library._journaling = False  # Measure the pipeline, not journal staging
+            summary = import_catalog(library, source, os.path.join(tmp, f"rejects.{extension}"),
+                                     args.chunk_size)
+            print(f"{extension:>6} {'import':>8} {summary['rows']:>10,} {summary['seconds']:>8.2f}"
+                  f" {summary['rows'] / summary['seconds']:>10,.0f}"
+                  f"   ({summary['rejected']:,} rejected)")
+
+            summary = export_catalog(library, os.path.join(tmp, f"export.{extension}"), args.chunk_size)
+            print(f"{extension:>6} {'export':>8} {summary['rows']:>10,} {summary['seconds']:>8.2f}"
+                  f" {summary['rows'] / summary['seconds']:>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# benchmarks/bench_concurrency.py
+# Borrow/return throughput against thread count, comparing the striped locks with a
+# single global lock. Each thread serves its own desk (disjoint books and members).
+# With the GIL the striped numbers show lock overhead/contention rather than CPU
+# parallelism; on a free-threaded interpreter they scale with cores.
+# Usage: python -m benchmarks.bench_concurrency [--threads 1,2,4,8] [--ops 50000]
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.synthetic import library_files_in
+from library_system.library import Library
+from library_system.book import Book
+from library_system.member import Member
+from library_system.transactions import LockStripes
+
+
+def make_library(desks, books_per_desk):
+    library = Library()
+    for desk in range(desks):
+        library.register_member(Member(f"Desk {desk}", f"M{desk:04d}"))
+        for n in range(books_per_desk):
+            library.add_book(Book(f"Book {desk}-{n}", "Author", f"B{desk:04d}-{n:03d}", 2000))
+    library.journal.pending = []  # Setup is not part of the measurement
+    return library
+
+
+def run(library, threads, ops_per_thread, books_per_desk):
+    def desk(number):
+        member_id = f"M{number:04d}"
+        isbns = [f"B{number:04d}-{n:03d}" for n in range(books_per_desk)]
+        for op in range(ops_per_thread // 2):
+            isbn = isbns[op % len(isbns)]
+            library.borrow_book(isbn, member_id)
+            library.return_book(isbn, member_id)
+
+    workers = [threading.Thread(target=desk, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    library.journal.pending = []
+    return threads * ops_per_thread / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent transaction throughput benchmark")
+    parser.add_argument("--threads", default="1,2,4,8")
+    parser.add_argument("--ops", type=int, default=50000, help="operations per thread")
+    args = parser.parse_args()
+    counts = [int(n) for n in args.threads.split(",")]
+    books_per_desk = 5
+
+    with tempfile.TemporaryDirectory() as tmp, library_files_in(tmp):
+        sys.stdout = open(os.devnull, "w")  # Silence the "Loaded ..." messages
+        library = make_library(max(counts), books_per_desk)
+        sys.stdout = sys.__stdout__
+
+        print(f"{'threads':>8} {'striped ops/s':>15} {'global lock ops/s':>18}")
+        for threads in counts:
+            library.locks = LockStripes()
+            striped = run(library, threads, args.ops, books_per_desk)
+            library.locks = LockStripes(count=1)  # Every transaction contends on one lock
+            single = run(library, threads, args.ops, books_per_desk)
+            print(f"{threads:>8} {striped:>15,.0f} {single:>18,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# benchmarks/bench_fines.py
+# Fine/aging report: the vectorized NumPy pass and the plain-Python fallback against
+# a loop over every book calling Book.days_overdue(). Also times the NumPy pass alone
+# on --loans synthetic loans, to show how it scales past the catalog's loan count.
+# Usage: python -m benchmarks.bench_fines [--books 1000000] [--loans 5000000]
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from array import array
+from datetime import date
+
+from benchmarks.synthetic import library_files_in, write_catalog
+from library_system import fines
+from library_system.fines import FinePolicy, extract_loans
+from library_system.library import Library
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def naive_total(library, policy):
+    """The per-book loop the report replaces."""
+    return sum(policy.fine(book.days_overdue()) for book in library.books.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fine report benchmark")
+    parser.add_argument("--books", type=int, default=1_000_000)
+    parser.add_argument("--loans", type=int, default=5_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp, library_files_in(tmp):
+        write_catalog(Library.BOOKS_FILE, Library.MEMBERS_FILE, args.books, seed=args.seed, realistic=True)
+        sys.stdout = open(os.devnull, "w")
+        library = Library()
+        sys.stdout = sys.__stdout__
+
+    policy, today = FinePolicy(), date.today().toordinal()
+    seconds, loans = timed(lambda: extract_loans(library))
+    print(f"{len(loans[1]):,} active loans over {args.books:,} books")
+    print(f"  extract loans           {seconds * 1000:9.1f} ms")
+    if fines.np is not None:
+        seconds, report = timed(lambda: fines._report_arrays(policy, today, *loans))
+        print(f"  numpy report            {seconds * 1000:9.1f} ms  total ${report['total_fines']:,.2f}")
+    seconds, report = timed(lambda: fines._report_loop(policy, today, *loans))
+    print(f"  python report           {seconds * 1000:9.1f} ms  total ${report['total_fines']:,.2f}")
+    seconds, total = timed(lambda: naive_total(library, policy))
+    print(f"  days_overdue() loop     {seconds * 1000:9.1f} ms  total ${total:,.2f}")
+
+    if fines.np is None:
+        print("NumPy is not installed; skipping the synthetic loan run.")
+        return
+    rng = random.Random(args.seed)
+    member_count = max(1, args.loans // 3)
+    member_ids = [f"M{n:08d}" for n in range(member_count)]
+    codes = array('i', (rng.randrange(member_count) for _ in range(args.loans)))
+    due_days = array('i', (today + rng.randint(-400, 14) for _ in range(args.loans)))
+    seconds, report = timed(lambda: fines._report_arrays(policy, today, member_ids, codes, due_days))
+    print(f"{args.loans:,} synthetic loans, {member_count:,} members")
+    print(f"  numpy report            {seconds * 1000:9.1f} ms  {report['overdue']:,} overdue")
+
+
+if __name__ == "__main__":
+    main()
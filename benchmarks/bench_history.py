@@ -0,0 +1,139 @@
+# benchmarks/bench_history.py
+# Loan history at scale: writes --loans historical loans (a borrow and a return row
+# each) straight into the column files, then times folding the whole log into the
+# rollups (what every query would cost without them), saving and reopening from the
+# checkpoint, the rollup queries, and recording new loans on top.
+# Needs NumPy to generate 100M loans in reasonable time; without it use fewer --loans.
+# Usage: python -m benchmarks.bench_history [--loans 100000000] [--books 1000000]
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from array import array
+from datetime import date
+
+from library_system import history
+from library_system.history import COLUMNS, KEYS_FILE, LoanHistory, BORROW, RETURN
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+CHUNK = 1_000_000  # Loans generated at a time
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def write_keys(directory, books, authors, members):
+    """Dictionary for book codes 0..books-1 (author code = book % authors) and member codes."""
+    with open(os.path.join(directory, KEYS_FILE), 'w') as f:
+        for code in range(authors):
+            f.write(json.dumps(['author', f"Author {code}"]) + '\n')
+        for code in range(books):
+            f.write(json.dumps(['book', f"978{code:010d}", code % authors]) + '\n')
+        for code in range(members):
+            f.write(json.dumps(['member', f"M{code:08d}"]) + '\n')
+
+
+def loan_chunks(loans, books, members, first_day, days, seed):
+    """Yields (events, books, members, days) arrays for up to CHUNK loans: each loan is a
+    borrow row and a return row 1-30 days later. Popular books and members are skewed."""
+    rng = np.random.default_rng(seed) if np is not None else random.Random(seed)
+    for start in range(0, loans, CHUNK):
+        count = min(CHUNK, loans - start)
+        if np is not None:
+            book = (books * rng.random(count) ** 3).astype(np.uint32)
+            member = (members * rng.random(count) ** 2).astype(np.uint32)
+            borrowed = first_day + (days * (start + np.arange(count)) // loans).astype(np.int32)
+            returned = borrowed + rng.integers(1, 31, count, dtype=np.int32)
+            yield (np.repeat(np.array([BORROW, RETURN], np.uint8)[None, :], count, 0).ravel(),
+                   np.repeat(book, 2), np.repeat(member, 2), np.column_stack((borrowed, returned)).ravel())
+        else:
+            columns = [array(typecode) for _, typecode in COLUMNS]
+            for n in range(start, start + count):
+                book, member = int(books * rng.random() ** 3), int(members * rng.random() ** 2)
+                borrowed = first_day + days * n // loans
+                for event, day in ((BORROW, borrowed), (RETURN, borrowed + rng.randint(1, 30))):
+                    for column, value in zip(columns, (event, book, member, day)):
+                        column.append(value)
+            yield columns
+
+
+def write_log(directory, args):
+    os.makedirs(directory)
+    write_keys(directory, args.books, args.authors, args.members)
+    first_day = date.today().toordinal() - args.days
+    files = [open(os.path.join(directory, name), 'wb') for name, _ in COLUMNS]
+    try:
+        for chunk in loan_chunks(args.loans, args.books, args.members, first_day, args.days, args.seed):
+            for f, column in zip(files, chunk):
+                f.write(column.tobytes())
+    finally:
+        for f in files:
+            f.close()
+
+
+def per_call_us(function, calls=100):
+    start = time.perf_counter()
+    for _ in range(calls):
+        function()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Loan history benchmark")
+    parser.add_argument("--loans", type=int, default=100_000_000)
+    parser.add_argument("--books", type=int, default=1_000_000)
+    parser.add_argument("--authors", type=int, default=50_000)
+    parser.add_argument("--members", type=int, default=200_000)
+    parser.add_argument("--days", type=int, default=5 * 365, help="days the history spans")
+    parser.add_argument("--record", type=int, default=100_000, help="new loans recorded on top")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = os.path.join(tmp, "history")
+        written, _ = timed(lambda: write_log(directory, args))
+        print(f"{args.loans:,} loans ({2 * args.loans:,} rows, "
+              f"{sum(os.path.getsize(os.path.join(directory, name)) for name, _ in COLUMNS) / 2**30:.2f} GiB) "
+              f"generated in {written:.1f} s")
+
+        folded, log = timed(lambda: LoanHistory(directory))
+        print(f"Open with no checkpoint (fold every row{'' if history.np else ', no NumPy'}): {folded:.1f} s")
+        saved, _ = timed(log.checkpoint)
+        print(f"Write checkpoint: {saved:.2f} s")
+
+        reopened, log = timed(lambda: LoanHistory(directory))
+        print(f"Open from checkpoint: {reopened:.2f} s")
+        today = date.today().toordinal()
+        for name, function in (("top 100 books", lambda: log.top_books(100)),
+                               ("top 100 authors", lambda: log.top_authors(100)),
+                               ("top 100 members", lambda: log.top_members(100)),
+                               ("daily, last 365 days", lambda: log.daily(today - 364, today))):
+            print(f"  {name:<22} {per_call_us(function):>9.1f} us")
+
+        rng = random.Random(args.seed)
+        def record():
+            for _ in range(args.record):
+                book, member = int(args.books * rng.random() ** 3), int(args.members * rng.random() ** 2)
+                isbn, member_id = f"978{book:010d}", f"M{member:08d}"
+                log.record(BORROW, isbn, f"Author {book % args.authors}", member_id)
+                log.record(RETURN, isbn, f"Author {book % args.authors}", member_id)
+        recorded, _ = timed(record)
+        print(f"Record {args.record:,} loans: {2 * args.record / recorded:,.0f} events/s")
+        saved, _ = timed(log.checkpoint)
+        print(f"Flush + checkpoint: {saved:.2f} s")
+        reopened, log = timed(lambda: LoanHistory(directory))
+        print(f"Reopen: {reopened:.2f} s, top book {log.top_books(1)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# benchmarks/bench_holds.py
+# Hold queues under load: checks out --books books, queues --holds holds on them
+# (popular titles get most of them), then times placing holds, returns that hand the
+# book to the next member, a bulk expiry pass over every lapsed hold (each passing
+# its book on), and saving + reloading the queues. The queues alone are then timed
+# against a naive version (list queues, a scan over every set-aside book) on one more
+# expiry round.
+# Usage: python -m benchmarks.bench_holds [--books 20000] [--members 200000] [--holds 500000]
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from benchmarks.synthetic import library_files_in
+from library_system.book import Book
+from library_system.holds import HoldQueues
+from library_system.library import Library
+from library_system.member import Member
+
+
+def quiet(function, *args):
+    sys.stdout = open(os.devnull, "w")
+    try:
+        return function(*args)
+    finally:
+        sys.stdout.close()
+        sys.stdout = sys.__stdout__
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def percentiles_us(times):
+    times = sorted(times)
+    return times[len(times) // 2] * 1e6, times[int(len(times) * 0.99)] * 1e6
+
+
+def naive_expiry(queues, ready, today, until):
+    """List queues, and a scan over every set-aside book for lapsed holds."""
+    expired = [isbn for isbn, (_, due) in ready.items() if due < today]
+    for isbn in expired:
+        del ready[isbn]
+        if queues.get(isbn):
+            ready[isbn] = (queues[isbn].pop(0), until)
+    return len(expired)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hold queue benchmark")
+    parser.add_argument("--books", type=int, default=20_000)
+    parser.add_argument("--members", type=int, default=200_000)
+    parser.add_argument("--holds", type=int, default=500_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp, library_files_in(tmp):
+        library = quiet(Library)
+        isbns = [f"978{n:010d}" for n in range(args.books)]
+        member_ids = [f"M{n:08d}" for n in range(args.members)]
+        for n, isbn in enumerate(isbns):
+            library.add_book(Book(f"Title {n}", f"Author {n % 1000}", isbn, 2000))
+        for member_id in member_ids:
+            library.register_member(Member(f"Member {member_id}", member_id))
+        for isbn, member_id in zip(isbns, member_ids):
+            library.borrow_book(isbn, member_id)
+
+        # Popular titles collect long queues; each (book, member) pair holds at most once
+        wanted = []
+        for _ in range(args.holds):
+            wanted.append((isbns[int(args.books * rng.random() ** 3)], rng.choice(member_ids)))
+        elapsed, results = timed(lambda: [library.place_hold(isbn, member_id)[0] for isbn, member_id in wanted])
+        holds = len(library.holds)
+        longest = max(library.holds.waiting.values())
+        print(f"{holds:,} holds on {len(library.holds.queues):,} of {args.books:,} books "
+              f"(longest queue {longest:,}); placed at {len(wanted) / elapsed:,.0f} holds/s")
+
+        # Cancel a tenth so the queues have skipped entries in them
+        cancels = rng.sample([pair for pair, placed in zip(wanted, results) if placed], holds // 10)
+        elapsed, _ = timed(lambda: [library.cancel_hold(isbn, member_id) for isbn, member_id in cancels])
+        print(f"Cancelled {len(cancels):,} holds at {len(cancels) / elapsed:,.0f} cancels/s")
+
+        times = []
+        for isbn, member_id in zip(isbns, member_ids):
+            start = time.perf_counter()
+            library.return_book(isbn, member_id)
+            times.append(time.perf_counter() - start)
+        p50, p99 = percentiles_us(times)
+        print(f"return_book + hand to next in queue: p50 {p50:.1f} us  p99 {p99:.1f} us; "
+              f"{len(library.holds.ready):,} books set aside")
+
+        later = date.today() + timedelta(days=Library.HOLD_DAYS + 1)
+        elapsed, expired = timed(lambda: library.expire_holds(later))
+        print(f"Library.expire_holds: {expired:,} lapsed holds released and passed on in {elapsed * 1000:.0f} ms "
+              f"({elapsed / max(expired, 1) * 1e6:.1f} us each)")
+
+        elapsed, _ = timed(library.holds.flush)
+        size = os.path.getsize(Library.HOLDS_FILE + "l")
+        print(f"Journal flush: {elapsed:.2f} s ({size / 2**20:.1f} MiB)")
+        elapsed, reloaded = timed(lambda: HoldQueues(Library.HOLDS_FILE))
+        print(f"Reload by replaying the journal: {elapsed:.2f} s, matches: {reloaded.ready == library.holds.ready}")
+        elapsed, _ = timed(library.holds.compact)
+        print(f"Compact: {elapsed:.2f} s ({os.path.getsize(Library.HOLDS_FILE) / 2**20:.1f} MiB)")
+        elapsed, reloaded = timed(lambda: HoldQueues(Library.HOLDS_FILE))
+        print(f"Reload from the snapshot: {elapsed:.2f} s, matches: {reloaded.ready == library.holds.ready}")
+
+        # The queues alone, against the naive version holding the same state
+        today = later.toordinal() + Library.HOLD_DAYS + 1
+        ready = dict(reloaded.ready)
+        queues = {isbn: [member_id for _, member_id in queue] for isbn, queue in reloaded.queues.items()}
+        reloaded._journaling = False
+
+        def expire_and_promote():
+            expired = reloaded.expire(today)
+            for isbn in expired:
+                reloaded.promote(isbn, today + Library.HOLD_DAYS)
+            return len(expired)
+
+        for name, function in (("Heap + deques", expire_and_promote),
+                               ("Naive (list queues, scan for lapsed)",
+                                lambda: naive_expiry(queues, ready, today, today + Library.HOLD_DAYS))):
+            elapsed, expired = timed(function)
+            idle, _ = timed(function)
+            print(f"{name + ':':<38} {expired:,} expired and passed on in {elapsed * 1000:>6.1f} ms; "
+                  f"pass with nothing lapsed {idle * 1e6:>8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# benchmarks/bench_member_search.py
+# Builds a MemberDirectory over --members synthetic members (Zipf-distributed first
+# names and surnames) and reports lookup latency for exact names, names with a typo,
+# surnames alone and type-ahead prefixes, with the caches cold and warm, against
+# a plain substring scan over every name.
+# Usage: python -m benchmarks.bench_member_search [--members 5000000] [--queries 2000]
+
+import argparse
+import os
+import random
+import statistics
+import time
+
+from benchmarks.synthetic import iter_member_names
+from library_system.directory import MemberDirectory
+
+
+def rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def typo(rng, word):
+    """The word with one random edit: a swap, a deletion, an insertion or a substitution."""
+    i = rng.randrange(1, len(word) - 1)
+    letter = rng.choice("aeiourstln")
+    return rng.choice([word[:i] + word[i + 1] + word[i] + word[i + 2:], word[:i] + word[i + 1:],
+                       word[:i] + letter + word[i:], word[:i] + letter + word[i + 1:]])
+
+
+def time_queries(directory, queries, limit):
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        directory.search(query, limit)
+        latencies.append((time.perf_counter() - start) * 1e6)
+    return latencies
+
+
+def report(label, latencies):
+    latencies.sort()
+    p50 = statistics.median(latencies)
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"{label:<40} p50 {p50:9.1f} us   p99 {p99:9.1f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Member name lookup benchmark")
+    parser.add_argument("--members", type=int, default=5_000_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=10, help="matches returned per query")
+    parser.add_argument("--scans", type=int, default=5, help="queries timed with the substring scan")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    names = []
+    directory = MemberDirectory()
+    before = rss_mb()
+    build = 0.0
+    for member_id, name in iter_member_names(args.members, args.seed):
+        names.append(name)
+        start = time.perf_counter()
+        directory.add(member_id, name)
+        build += time.perf_counter() - start
+    postings = sum(len(array) for array in directory.postings.values())
+    print(f"Indexed {len(directory):,} members in {build:.1f} s ({build / len(directory) * 1e6:.1f} us each); "
+          f"{len(directory.postings):,} distinct tokens, {postings:,} postings; "
+          f"names + index {rss_mb() - before:,.0f} MiB")
+
+    rng = random.Random(args.seed + 1)
+    sample = [rng.choice(names).split() for _ in range(args.queries)]
+    workloads = [
+        ("Exact full name", [" ".join(words) for words in sample]),
+        ("Full name, one typo in surname", [" ".join(words[:-1] + [typo(rng, words[-1])]) for words in sample]),
+        ("Surname only", [words[-1] for words in sample]),
+        ("First name + surname prefix", [f"{words[0]} {words[-1][:4]}" for words in sample]),
+        ("Surname with a typo", [typo(rng, words[-1]) for words in sample]),
+    ]
+    for label, queries in workloads:
+        directory.cache.clear()
+        directory.term_cache.clear()
+        report(label + ", cold", time_queries(directory, queries, args.limit))
+        report(label + ", cached", time_queries(directory, queries[:directory.cache_size], args.limit))
+
+    hits = 0
+    for words, query in zip(sample, workloads[1][1]):
+        found = [names[int(member_id[1:])] for member_id in directory.search(query, args.limit)]
+        hits += " ".join(words) in found
+    print(f"Typo queries with the intended name in the top {args.limit}: {hits / len(sample):.1%}")
+
+    latencies = []
+    for words in sample[:args.scans]:
+        needle = words[-1].lower()
+        start = time.perf_counter()
+        [number for number, name in enumerate(names) if needle in name.lower()]
+        latencies.append((time.perf_counter() - start) * 1e6)
+    print(f"{'Substring scan over every name':<40} mean {statistics.mean(latencies) / 1000:9.1f} ms "
+          f"(exact text only, no typos)")
+
+
+if __name__ == "__main__":
+    main()
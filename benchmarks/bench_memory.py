@@ -0,0 +1,74 @@
+# benchmarks/bench_memory.py
+# Compares the memory held by books/members in each Library storage backend.
+# Usage: python -m benchmarks.bench_memory [--books 1000000]
+
+import argparse
+import gc
+import random
+import tracemalloc
+from datetime import date, timedelta
+
+from benchmarks.synthetic import iter_book_records
+from library_system.book import Book
+from library_system.member import Member
+from library_system.compact import ColumnarBookStore, CompactBook, CompactMember
+
+BACKENDS = {
+    "objects": (Book, Member, dict),
+    "slots": (CompactBook, CompactMember, dict),
+    "columnar": (CompactBook, CompactMember, ColumnarBookStore),
+}
+
+
+def build(backend, book_count, member_count, seed):
+    """Builds the collections for one backend; 10% of books are on loan."""
+    book_class, member_class, container = BACKENDS[backend]
+    rng = random.Random(seed)
+    due = (date.today() + timedelta(days=14)).isoformat()
+    books = container()
+    members = {}
+    for number in range(member_count):
+        member_id = f"M{number:08d}"
+        members[member_id] = member_class(f"Member {number}", member_id)
+
+    member_ids = list(members)
+    for isbn, title, author, year in iter_book_records(book_count, seed):
+        book = book_class(title, author, isbn, year)
+        if rng.random() < 0.1:
+            member = members[rng.choice(member_ids)]
+            if member.can_borrow():
+                book.available = False
+                book.borrowed_by = member.member_id
+                book.due_date = due
+                member.borrow_book(isbn)
+        books[isbn] = book
+    return books, members
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Storage backend memory benchmark")
+    parser.add_argument("--books", type=int, default=1_000_000)
+    parser.add_argument("--members", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    member_count = args.members or max(1, args.books // 10)
+
+    baseline = None
+    print(f"{args.books:,} books, {member_count:,} members")
+    for backend in BACKENDS:
+        gc.collect()
+        tracemalloc.start()
+        data = build(backend, args.books, member_count, args.seed)
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del data
+
+        megabytes = current / 1024 / 1024
+        baseline = baseline or megabytes
+        print(f"{backend:<10} {megabytes:10.1f} MB   {current / args.books:8.0f} B/book"
+              f"   ({megabytes / baseline:.0%} of objects)")
+
+
+if __name__ == "__main__":
+    main()
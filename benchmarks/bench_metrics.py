@@ -0,0 +1,68 @@
+# benchmarks/bench_metrics.py
+# Overhead of the metrics instrumentation on a find/borrow/return/stats workload.
+# Off and on rounds alternate on the same library; the best round of each is reported.
+# Usage: python -m benchmarks.bench_metrics [--books 100000] [--ops 100000] [--rounds 5]
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import library_files_in, write_catalog
+from library_system.library import Library
+from library_system.metrics import METRICS
+
+
+def workload(library, isbns, member_ids, ops, seed):
+    """Per cycle: 2 find_book, borrow, return and get_stats on a member with room to borrow."""
+    rng = random.Random(seed)
+    cycles = [(rng.choice(isbns), member_ids[n % len(member_ids)]) for n in range(ops // 5)]
+    library.journal.pending = []
+    start = time.perf_counter()
+    for isbn, member_id in cycles:
+        library.find_book(isbn)
+        library.find_book(isbn)
+        library.borrow_book(isbn, member_id)
+        library.return_book(isbn, member_id)
+        library.get_stats()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Metrics instrumentation overhead benchmark")
+    parser.add_argument("--books", type=int, default=100_000)
+    parser.add_argument("--ops", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp, library_files_in(tmp):
+        # Twice the default members, so about half of them have no loans to start with
+        write_catalog(Library.BOOKS_FILE, Library.MEMBERS_FILE, args.books, member_count=max(2, args.books // 5))
+        sys.stdout = open(os.devnull, "w")
+        library = Library()
+        sys.stdout = sys.__stdout__
+
+        # Only books that are on the shelf, so every borrow/return does the full work
+        isbns = [isbn for isbn, book in library.books.items() if book.available]
+        member_ids = [mid for mid, member in library.members.items() if not member.borrowed_books]
+        best = {False: float("inf"), True: float("inf")}
+        for round_number in range(args.rounds):
+            for enabled in (False, True):
+                METRICS.enable() if enabled else METRICS.disable()
+                best[enabled] = min(best[enabled], workload(library, isbns, member_ids, args.ops, round_number))
+        METRICS.disable()
+
+    for enabled in (False, True):
+        print(f"metrics {'on ' if enabled else 'off'}: {args.ops / best[enabled]:>10,.0f} ops/s")
+    wrapped_calls = args.ops // 5 * 3  # borrow, return and get_stats are wrapped (and sampled); find_book is not
+    print(f"overhead: {(best[True] / best[False] - 1) * 100:+.1f}% "
+          f"= {(best[True] - best[False]) / wrapped_calls * 1e6:.2f} us per wrapped call")
+    for op, summary in METRICS.snapshot()["operations"].items():
+        print(f"  {op:<12} {summary['calls']:>9,} calls ({summary['timed']:,} timed)"
+              f"  p50 {summary['p50_us']:7.2f} us  p99 {summary['p99_us']:7.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# benchmarks/bench_overdue.py
+# Compares the maintained due-date index against the old full scans for
+# get_overdue_books and get_stats. Exits non-zero if the index is slower.
+# Usage: python -m benchmarks.bench_overdue [--books 1000000]
+
+import argparse
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import library_files_in, write_catalog
+from library_system.library import Library
+
+
+def scan_overdue(library):
+    """The previous implementation: check every book, parsing its due date."""
+    return [book for book in library.books.values() if book.is_overdue()]
+
+
+def scan_stats(library):
+    available = sum(1 for book in library.books.values() if book.available)
+    return {
+        "Total Books": len(library.books),
+        "Available Books": available,
+        "Total Members": len(library.members),
+        "Books Borrowed": len(library.books) - available,
+        "Overdue Books": len(scan_overdue(library)),
+    }
+
+
+def best_of(repeats, func, *args):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Overdue index regression benchmark")
+    parser.add_argument("--books", type=int, default=1_000_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp, library_files_in(tmp):
+        loans = write_catalog(Library.BOOKS_FILE, Library.MEMBERS_FILE, args.books)
+        library = Library()
+    print(f"{args.books:,} books, {loans:,} loans, {library.loans.overdue_count():,} overdue")
+
+    if scan_stats(library) != library.get_stats():
+        sys.exit("get_stats disagrees with a full scan")
+    if {b.isbn for b in scan_overdue(library)} != {b.isbn for b in library.get_overdue_books()}:
+        sys.exit("get_overdue_books disagrees with a full scan")
+
+    failed = False
+    for label, indexed, scanned in (("get_overdue_books", library.get_overdue_books, scan_overdue),
+                                    ("get_stats", library.get_stats, scan_stats)):
+        indexed_ms = best_of(args.repeats, indexed)
+        scanned_ms = best_of(args.repeats, scanned, library)
+        print(f"{label:<18} index {indexed_ms:10.3f} ms   scan {scanned_ms:10.3f} ms"
+              f"   ({scanned_ms / max(indexed_ms, 1e-6):,.0f}x)")
+        failed = failed or indexed_ms > scanned_ms
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# benchmarks/bench_recommend.py
+# "Also borrowed" index at scale: writes --loans historical loans over --books books
+# into a loan history, then times a full rebuild (in this process and on a pool),
+# the index's memory, top-10 lookups (cold and cached) against counting one book on
+# demand from the log, counting new borrows, and checkpoint + reopen.
+# Needs NumPy to generate 10M loans in reasonable time; without it use fewer --loans.
+# Usage: python -m benchmarks.bench_recommend [--loans 10000000] [--books 1000000]
+
+import argparse
+import os
+import random
+import resource
+import tempfile
+import time
+
+from benchmarks.bench_history import timed, write_log
+from library_system import recommend
+from library_system.history import LoanHistory, BORROW
+from library_system.recommend import CoBorrowIndex
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def index_bytes(index):
+    return sum(len(values) * values.itemsize
+               for values in (index.indptr, index.neighbours, index.counts, index.recent))
+
+
+def peak_rss_mb():
+    usage = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return usage / 1024
+
+
+def latencies_us(function, args_list):
+    times = []
+    for args in args_list:
+        start = time.perf_counter()
+        function(*args)
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return times[len(times) // 2] * 1e6, times[int(len(times) * 0.99)] * 1e6
+
+
+def on_demand(directory, rows, book):
+    """Counts the books borrowed by everyone who borrowed `book`, straight from the log."""
+    events, books, members = (np.memmap(os.path.join(directory, name), dtype=dtype, mode='r', shape=(rows,))
+                              for name, dtype in (('event', np.uint8), ('book', np.uint32), ('member', np.uint32)))
+    borrowed = events == BORROW
+    readers = np.unique(members[borrowed & (books == book)])
+    counts = np.bincount(books[borrowed & np.isin(members, readers)])
+    counts[book] = 0
+    return np.argsort(-counts, kind='stable')[:10]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="'Also borrowed' index benchmark")
+    parser.add_argument("--loans", type=int, default=10_000_000)
+    parser.add_argument("--books", type=int, default=1_000_000)
+    parser.add_argument("--authors", type=int, default=50_000)
+    parser.add_argument("--members", type=int, default=200_000)
+    parser.add_argument("--days", type=int, default=5 * 365, help="days the history spans")
+    parser.add_argument("--lookups", type=int, default=20_000)
+    parser.add_argument("--record", type=int, default=100_000, help="new borrows counted on top")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = os.path.join(tmp, "history")
+        written, _ = timed(lambda: write_log(directory, args))
+        history = LoanHistory(directory)
+        print(f"{args.loans:,} loans over {args.books:,} books and {args.members:,} members "
+              f"generated in {written:.1f} s; {os.cpu_count()} CPUs, window {recommend.PAIR_WINDOW}, "
+              f"{recommend.NEIGHBOURS} neighbours kept per book")
+
+        elapsed, index = timed(lambda: CoBorrowIndex(history))
+        print(f"Open with no saved index (rebuild in this process): {elapsed:.1f} s")
+        elapsed, _ = timed(lambda: index.rebuild(args.workers))
+        print(f"Rebuild on a pool of {args.workers} + save: {elapsed:.1f} s")
+        print(f"Index: {len(index.neighbours):,} entries, {index_bytes(index) / 2**20:.0f} MiB on disk and in "
+              f"memory; peak RSS {peak_rss_mb():,.0f} MiB")
+
+        rng = random.Random(args.seed)
+        isbns = [f"978{int(args.books * rng.random() ** 3):010d}" for _ in range(args.lookups)]
+        index.cache.clear()
+        p50, p99 = latencies_us(index.top, [(isbn,) for isbn in isbns])
+        print(f"top 10, cold cache:   p50 {p50:>8.1f} us  p99 {p99:>8.1f} us")
+        hot = [(isbn,) for isbn in isbns[:recommend.CACHE_SIZE // 2]]
+        latencies_us(index.top, hot)  # Loads them into the cache
+        p50, p99 = latencies_us(index.top, hot)
+        print(f"top 10, warm cache:   p50 {p50:>8.1f} us  p99 {p99:>8.1f} us")
+        if np is not None:
+            sample = [(history.book_codes[isbn],) for isbn in isbns[:20]]
+            p50, _ = latencies_us(lambda book: on_demand(directory, history.rows, book), sample)
+            print(f"top 10 on demand from the log: p50 {p50 / 1000:>8.1f} ms")
+
+        def record():
+            for _ in range(args.record):
+                book, member = int(args.books * rng.random() ** 3), int(args.members * rng.random() ** 2)
+                isbn, member_id = f"978{book:010d}", f"M{member:08d}"
+                history.record(BORROW, isbn, f"Author {book % args.authors}", member_id)
+                index.record(isbn, member_id)
+        elapsed, _ = timed(record)
+        print(f"Count {args.record:,} new borrows: {args.record / elapsed:,.0f} borrows/s "
+              f"(history and index), {len(index.added):,} rows changed")
+        elapsed, _ = timed(index.checkpoint)
+        print(f"Checkpoint (fold changes into the base + save): {elapsed:.2f} s")
+        elapsed, reopened = timed(lambda: CoBorrowIndex(history))
+        print(f"Reopen: {elapsed:.2f} s, matches: {reopened.top(isbns[0]) == index.top(isbns[0])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# benchmarks/bench_reporting.py
+# Borrow/return latency while the heavy reports (overdue listing, per-member fines)
+# run over and over: with no reports, with reports in a thread on the live library,
+# and with forked reports. Each phase runs for --seconds.
+# Usage: python -m benchmarks.bench_reporting [--books 1000000] [--seconds 10]
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.synthetic import library_files_in, write_catalog
+from library_system.library import Library
+
+REPORTS = ('overdue', 'members')
+
+
+def report_loop(library, background, stop, counts):
+    while not stop.is_set():
+        for name in REPORTS:
+            for _ in library.start_report(name, background=background):
+                pass
+            counts[name] = counts.get(name, 0) + 1
+
+
+def run_phase(library, pairs, mode, seconds):
+    """Borrow/return pairs for `seconds` while reports run per `mode`; returns latency stats."""
+    stop, counts = threading.Event(), {}
+    reporter = None
+    if mode != "none":
+        reporter = threading.Thread(target=report_loop, args=(library, mode == "forked", stop, counts))
+        reporter.start()
+        time.sleep(0.1)
+    latencies = []
+    clock = time.perf_counter
+    deadline = clock() + seconds
+    n = 0
+    while clock() < deadline:
+        isbn, member_id = pairs[n % len(pairs)]
+        n += 1
+        start = clock()
+        library.borrow_book(isbn, member_id)
+        library.return_book(isbn, member_id)
+        latencies.append(clock() - start)
+    stop.set()
+    if reporter is not None:
+        reporter.join()
+    latencies.sort()
+    return {"ops/s": 2 * len(latencies) / seconds,
+            "p50 us": latencies[len(latencies) // 2] * 1e6,
+            "p99 us": latencies[int(len(latencies) * 0.99)] * 1e6,
+            "max ms": latencies[-1] * 1e3,
+            "reports": sum(counts.values())}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transaction latency under concurrent reporting")
+    parser.add_argument("--books", type=int, default=1_000_000)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp, library_files_in(tmp):
+        write_catalog(Library.BOOKS_FILE, Library.MEMBERS_FILE, args.books, seed=args.seed, realistic=True)
+        sys.stdout = open(os.devnull, "w")
+        library = Library()
+        sys.stdout.close()
+        sys.stdout = sys.__stdout__
+
+        rng = random.Random(args.seed)
+        isbns = rng.sample([isbn for isbn, book in library.books.items() if book.available], 1000)
+        member_ids = rng.sample([mid for mid, member in library.members.items() if not member.borrowed_books], 1000)
+        pairs = list(zip(isbns, member_ids))
+        rows = {mode: run_phase(library, pairs, mode, args.seconds) for mode in ("none", "in place", "forked")}
+
+    print(f"{args.books:,} books, {len(library.loans):,} loans, {os.cpu_count()} CPUs, "
+          f"{args.seconds:g} s per phase")
+    print(f"{'reports':>9} {'ops/s':>9} {'p50 us':>8} {'p99 us':>9} {'max ms':>8} {'reports run':>12}")
+    for mode, row in rows.items():
+        print(f"{mode:>9} {row['ops/s']:>9,.0f} {row['p50 us']:>8.1f} {row['p99 us']:>9.1f} "
+              f"{row['max ms']:>8.1f} {row['reports']:>12}")
+
+
+if __name__ == "__main__":
+    main()
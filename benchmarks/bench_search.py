@@ -0,0 +1,58 @@
+# benchmarks/bench_search.py
+# Builds a BookSearchIndex over a synthetic catalog and reports query latency.
+# Usage: python -m benchmarks.bench_search [--books 1000000] [--queries 2000]
+
+import argparse
+import random
+import statistics
+import time
+
+from benchmarks.synthetic import iter_book_records, make_vocabulary
+from library_system.search import BookSearchIndex
+
+
+def time_queries(index, queries, **kwargs):
+    """Returns per-query latencies in microseconds."""
+    latencies = []
+    for query, year in queries:
+        start = time.perf_counter()
+        index.search(query, year=year, **kwargs)
+        latencies.append((time.perf_counter() - start) * 1e6)
+    return latencies
+
+
+def report(label, latencies):
+    latencies.sort()
+    p50 = statistics.median(latencies)
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"{label:<28} p50 {p50:9.1f} us   p99 {p99:9.1f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search index latency benchmark")
+    parser.add_argument("--books", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    index = BookSearchIndex()
+    start = time.perf_counter()
+    for isbn, title, author, year in iter_book_records(args.books, args.seed):
+        index.add(isbn, title, author, year)
+    print(f"Indexed {args.books:,} books in {time.perf_counter() - start:.1f} s")
+
+    rng = random.Random(args.seed + 1)
+    vocabulary = make_vocabulary(20000, args.seed)
+    two_words = [(f"{rng.choice(vocabulary)} {rng.choice(vocabulary)}", None)
+                 for _ in range(args.queries)]
+    type_ahead = [(f"{rng.choice(vocabulary)} {rng.choice(vocabulary)[:4]}", None)
+                  for _ in range(args.queries)]
+    with_year = [(rng.choice(vocabulary), rng.randint(1900, 2024)) for _ in range(args.queries)]
+
+    report("two exact terms", time_queries(index, two_words, prefix=False))
+    report("term + type-ahead prefix", time_queries(index, type_ahead))
+    report("term + year filter", time_queries(index, with_year, prefix=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# benchmarks/bench_service.py
+# Load generator for the JSON-lines service: many desks, each pipelining requests over
+# its own connection. Reports requests/second and p50/p99 latency per request.
+# The server runs in a separate process so the client does not compete for its GIL.
+# Usage: python -m benchmarks.bench_service [--books 100000] [--connections 32] [--depth 16]
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import library_files_in, write_catalog
+from library_system.library import Library
+from library_system.server import LibraryServer
+
+
+def run_server(tmp, ready):
+    sys.stdout = open(os.devnull, "w")
+    with library_files_in(tmp):
+        library = Library()
+
+        async def serve():
+            server = LibraryServer(library, port=0, save_interval=1.0)
+            await server.start()
+            ready.put((server.port, list(library.books)[:20000], list(library.members)))
+            await server.serve_forever()
+
+        asyncio.run(serve())
+
+
+def make_request(rng, isbns, member_ids):
+    roll = rng.random()
+    if roll < 0.5:
+        return {"op": "find_book", "isbn": rng.choice(isbns)}
+    if roll < 0.7:
+        return {"op": "borrow_book", "isbn": rng.choice(isbns), "member_id": rng.choice(member_ids)}
+    if roll < 0.9:
+        return {"op": "return_book", "isbn": rng.choice(isbns), "member_id": rng.choice(member_ids)}
+    if roll < 0.97:
+        return {"op": "get_stats"}
+    return {"op": "search_books", "query": "the"}
+
+
+async def desk(port, requests, depth, isbns, member_ids, seed, latencies):
+    """One connection keeping `depth` requests in flight until `requests` are answered."""
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    sent_at = []  # Send times of in-flight requests, answered in FIFO order
+    sent = answered = 0
+
+    def send(count):
+        nonlocal sent
+        now = time.perf_counter()
+        writer.write(b"".join(json.dumps(make_request(rng, isbns, member_ids)).encode() + b"\n"
+                              for _ in range(count)))
+        sent_at.extend([now] * count)
+        sent += count
+
+    send(min(depth, requests))
+    while answered < requests:
+        await writer.drain()
+        await reader.readline()
+        latencies.append(time.perf_counter() - sent_at[answered])
+        answered += 1
+        if sent < requests:
+            send(1)
+    writer.close()
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Library service load generator")
+    parser.add_argument("--books", type=int, default=100_000)
+    parser.add_argument("--connections", type=int, default=32)
+    parser.add_argument("--depth", type=int, default=16, help="pipelined requests per connection")
+    parser.add_argument("--requests", type=int, default=200_000, help="total requests")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        write_catalog(os.path.join(tmp, "books.json"), os.path.join(tmp, "members.json"),
+                      args.books, seed=args.seed)
+        ready = multiprocessing.Queue()
+        server = multiprocessing.Process(target=run_server, args=(tmp, ready), daemon=True)
+        server.start()
+        port, isbns, member_ids = ready.get()
+
+        async def load():
+            latencies = []
+            per_desk = args.requests // args.connections
+            start = time.perf_counter()
+            await asyncio.gather(*(desk(port, per_desk, args.depth, isbns, member_ids,
+                                        args.seed + n, latencies)
+                                   for n in range(args.connections)))
+            return latencies, time.perf_counter() - start
+
+        try:
+            latencies, elapsed = asyncio.run(load())
+        finally:
+            server.terminate()
+            server.join()
+
+    latencies.sort()
+    print(f"{args.connections} connections x depth {args.depth}: {len(latencies):,} requests "
+          f"in {elapsed:.2f}s = {len(latencies) / elapsed:,.0f} requests/s")
+    print(f"latency p50 {percentile(latencies, 0.50) * 1000:.2f} ms   "
+          f"p99 {percentile(latencies, 0.99) * 1000:.2f} ms   "
+          f"max {latencies[-1] * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# benchmarks/bench_sharding.py
+# Borrow/return throughput of a ShardedLibrary against shard count, next to one
+# in-process Library. Each configuration runs `--clients` client processes per shard,
+# each with its own router, on disjoint members so transactions do not conflict.
+# Also times the fanned-out get_stats and get_overdue_books.
+# Usage: python -m benchmarks.bench_sharding [--books 100000] [--shards 1,2,4] [--ops 20000]
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import library_files_in, write_catalog
+from library_system.library import Library
+from library_system.sharding import ShardedLibrary
+
+
+def quiet(factory):
+    sys.stdout = open(os.devnull, "w")
+    try:
+        return factory()
+    finally:
+        sys.stdout.close()
+        sys.stdout = sys.__stdout__
+
+
+def borrow_and_return(library, pairs):
+    failed = 0
+    for isbn, member_id in pairs:
+        failed += not library.borrow_book(isbn, member_id)[0]
+        failed += not library.return_book(isbn, member_id)[0]
+    return failed
+
+
+def client(addresses, pairs, start, results):
+    router = ShardedLibrary.connect(addresses)
+    start.wait()
+    results.put(borrow_and_return(router, pairs))
+    router.close()
+
+
+def workload(isbns, member_ids, ops, clients, seed):
+    """Per client: ops/2 (ISBN, member) pairs; clients use disjoint members and ISBNs."""
+    rng = random.Random(seed)
+    isbns = rng.sample(isbns, len(isbns))
+    return [[(isbns[(c + n * clients) % len(isbns)], member_ids[(c + n * clients) % len(member_ids)])
+             for n in range(ops // 2 // clients)] for c in range(clients)]
+
+
+def per_call_ms(function, calls=20):
+    start = time.perf_counter()
+    for _ in range(calls):
+        function()
+    return (time.perf_counter() - start) / calls * 1000
+
+
+def run_sharded(shards, directory, isbns, member_ids, args):
+    library = quiet(lambda: ShardedLibrary(shards, directory=directory))
+    clients = shards * args.clients
+    start, results = multiprocessing.Event(), multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=client, args=(library.addresses, pairs, start, results))
+                 for pairs in workload(isbns, member_ids, args.ops, clients, args.seed)]
+    for process in processes:
+        process.start()
+    time.sleep(0.5)  # Let every client connect
+    began = time.perf_counter()
+    start.set()
+    failed = sum(results.get() for _ in processes)
+    elapsed = time.perf_counter() - began
+    for process in processes:
+        process.join()
+    row = {"ops/s": clients * (args.ops // 2 // clients) * 2 / elapsed, "failed": failed,
+           "stats ms": per_call_ms(library.get_stats), "overdue ms": per_call_ms(library.get_overdue_books, 5)}
+    library.close()
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sharded library throughput benchmark")
+    parser.add_argument("--books", type=int, default=100_000)
+    parser.add_argument("--shards", default="1,2,4")
+    parser.add_argument("--clients", type=int, default=2, help="client processes per shard")
+    parser.add_argument("--ops", type=int, default=20000, help="borrow+return operations per configuration")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp, library_files_in(tmp):
+        # Twice the default members, so about half of them have no loans to start with
+        write_catalog(Library.BOOKS_FILE, Library.MEMBERS_FILE, args.books,
+                      member_count=max(2, args.books // 5), seed=args.seed)
+
+        library = quiet(Library)
+        isbns = [isbn for isbn, book in library.books.items() if book.available]
+        member_ids = [mid for mid, member in library.members.items() if not member.borrowed_books]
+        pairs = workload(isbns, member_ids, args.ops, 1, args.seed)[0]
+        start = time.perf_counter()
+        failed = borrow_and_return(library, pairs)
+        rows = {"library": {"ops/s": len(pairs) * 2 / (time.perf_counter() - start), "failed": failed,
+                            "stats ms": per_call_ms(library.get_stats),
+                            "overdue ms": per_call_ms(library.get_overdue_books, 5)}}
+        del library
+
+        for shards in map(int, args.shards.split(",")):
+            rows[f"{shards} shards"] = run_sharded(shards, os.path.join(tmp, f"shards{shards}"),
+                                                   isbns, member_ids, args)
+
+    print(f"{args.books:,} books, {os.cpu_count()} CPUs, {args.clients} clients per shard")
+    print(f"{'':>10} {'ops/s':>10} {'failed':>7} {'stats ms':>9} {'overdue ms':>11}")
+    for name, row in rows.items():
+        print(f"{name:>10} {row['ops/s']:>10,.0f} {row['failed']:>7} {row['stats ms']:>9.2f} "
+              f"{row['overdue ms']:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# benchmarks/bench_snapshot.py
+# Cold start and lookup latency of storage='mapped' against the JSON snapshot.
+# The binary snapshot is streamed straight from the synthetic records, so a 10M-book
+# catalog never has to exist as objects. Every open runs in a fresh interpreter.
+# Usage: python -m benchmarks.bench_snapshot [--sizes 1000000,10000000] [--json-max 1000000]
+
+import argparse
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from benchmarks.synthetic import iter_book_records, library_files_in, write_catalog
+from library_system.book import Book
+from library_system.library import Library
+from library_system.member import Member
+from library_system.snapshot import write_snapshot
+
+
+class Streamed:
+    """Just enough of a mapping for write_snapshot: values() yields fresh objects."""
+
+    def __init__(self, factory):
+        self.factory = factory
+
+    def values(self):
+        return self.factory()
+
+
+def streamed_books(count, loan_every=10, seed=0):
+    today = date.today()
+    for number, (isbn, title, author, year) in enumerate(iter_book_records(count, seed)):
+        book = Book(title, author, isbn, year)
+        if number % loan_every == 0:
+            book.available = False
+            book.borrowed_by = f"M{number // loan_every % max(1, count // 10):08d}"
+            book.due_date = (today + timedelta(days=number % 60 - 30)).isoformat()
+        yield book
+
+
+def streamed_members(count):
+    for number in range(count):
+        yield Member(f"Member {number}", f"M{number:08d}")
+
+
+def measure(directory, storage, count):
+    """Child process: open, then time lookups; prints one line of numbers."""
+    with library_files_in(directory):
+        sys.stdout = open(os.devnull, "w")  # Silence the "Loaded ..." message
+        start = time.perf_counter()
+        library = Library(storage=storage)
+        opened = time.perf_counter() - start
+
+        rng = random.Random(1)
+        isbns = [f"978{rng.randrange(count):010d}" for _ in range(1001)]
+        start = time.perf_counter()
+        library.find_book(isbns[0])
+        first = time.perf_counter() - start
+        timings = []
+        for isbn in isbns[1:]:
+            start = time.perf_counter()
+            library.find_book(isbn)
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+
+        start = time.perf_counter()
+        library.get_stats()
+        stats = time.perf_counter() - start
+
+        compacted = 0.0
+        if storage == "mapped":
+            for isbn in isbns[:1000]:
+                book = library.find_book(isbn)
+                book.title = book.title + " (2nd ed.)"
+            start = time.perf_counter()
+            library.compact()
+            compacted = time.perf_counter() - start
+        library.close()
+        sys.stdout = sys.__stdout__
+
+        peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # kilobytes on Linux
+        print(f"{opened:.6f} {first:.6f} {timings[len(timings) // 2]:.6f} {stats:.6f} "
+              f"{compacted:.6f} {peak_kb / 1024:.1f}")
+
+
+def run_child(directory, storage, count):
+    output = subprocess.run([sys.executable, "-m", "benchmarks.bench_snapshot", "--child",
+                             directory, storage, str(count)],
+                            capture_output=True, text=True, check=True).stdout
+    return [float(value) for value in output.split()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Binary snapshot startup benchmark")
+    parser.add_argument("--sizes", default="1000000,10000000")
+    parser.add_argument("--json-max", type=int, default=1_000_000,
+                        help="largest size also measured with the JSON snapshot")
+    parser.add_argument("--child", nargs=3, metavar=("DIR", "STORAGE", "COUNT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        measure(args.child[0], args.child[1], int(args.child[2]))
+        return
+
+    print(f"{'books':>12} {'storage':>8} {'write s':>8} {'open ms':>9} {'first us':>9} {'p50 us':>7} "
+          f"{'stats ms':>9} {'compact s':>10} {'peak MB':>8}")
+    for count in map(int, args.sizes.split(",")):
+        with tempfile.TemporaryDirectory() as tmp, library_files_in(tmp):
+            start = time.perf_counter()
+            write_snapshot(Library.SNAPSHOT_FILE, Streamed(lambda: streamed_books(count)),
+                           Streamed(lambda: streamed_members(max(1, count // 10))))
+            written = time.perf_counter() - start
+            rows = [("mapped", written, run_child(tmp, "mapped", count))]
+            if count <= args.json_max:
+                start = time.perf_counter()
+                write_catalog(Library.BOOKS_FILE, Library.MEMBERS_FILE, count)
+                rows.append(("objects", time.perf_counter() - start, run_child(tmp, "objects", count)))
+
+            for storage, written, (opened, first, p50, stats, compacted, peak) in rows:
+                print(f"{count:>12,} {storage:>8} {written:>8.1f} {opened * 1000:>9.2f} {first * 1e6:>9.1f} "
+                      f"{p50 * 1e6:>7.1f} {stats * 1000:>9.2f} "
+                      f"{compacted if storage == 'mapped' else float('nan'):>10.2f} {peak:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# benchmarks/bench_sqlite.py
+# Compares the JSON (objects) and SQLite storage backends on the same catalog:
+# startup, find_book (uniform and hot-set), get_overdue_books, get_stats, and
+# borrow/return followed by save_data.
+# Usage: python -m benchmarks.bench_sqlite [--books 1000000] [--ops 20000]
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import library_files_in, write_catalog
+from library_system.book import Book
+from library_system.library import Library
+from library_system.member import Member
+from library_system.sqlite_store import SQLiteStore, migrate_from_json
+
+
+def quiet(factory):
+    sys.stdout = open(os.devnull, "w")
+    try:
+        return factory()
+    finally:
+        sys.stdout.close()
+        sys.stdout = sys.__stdout__
+
+
+def per_op_us(function, args_list):
+    start = time.perf_counter()
+    for args in args_list:
+        function(*args)
+    return (time.perf_counter() - start) / len(args_list) * 1e6
+
+
+def measure(storage, args, isbns, member_ids):
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+    library = quiet(lambda: Library(storage=storage))
+    results = {"startup s": time.perf_counter() - start}
+
+    uniform = [(rng.choice(isbns),) for _ in range(args.ops)]
+    hot_set = isbns[:1000]
+    hot = [(rng.choice(hot_set),) for _ in range(args.ops)]
+    results["find_book us"] = per_op_us(library.find_book, uniform)
+    results["find hot us"] = per_op_us(library.find_book, hot)
+    results["overdue ms"] = per_op_us(library.get_overdue_books, [()] * 10) / 1000
+    results["stats us"] = per_op_us(library.get_stats, [()] * 100)
+
+    # Members have room for MAX_BOOKS loans; borrow then return the same pairs
+    pairs = [(rng.choice(isbns), member_ids[n % len(member_ids)]) for n in range(args.ops // 2)]
+    start = time.perf_counter()
+    for isbn, member_id in pairs:
+        library.borrow_book(isbn, member_id)
+        library.return_book(isbn, member_id)
+    quiet(library.save_data)
+    results["borrow+return us"] = (time.perf_counter() - start) / len(pairs) / 2 * 1e6
+    library.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON vs SQLite storage benchmark")
+    parser.add_argument("--books", type=int, default=1_000_000)
+    parser.add_argument("--ops", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp, library_files_in(tmp):
+        write_catalog(Library.BOOKS_FILE, Library.MEMBERS_FILE, args.books, seed=args.seed)
+
+        source = quiet(Library)
+        isbns, member_ids = list(source.books), list(source.members)
+        start = time.perf_counter()
+        store = SQLiteStore(Library.DATABASE_FILE, Book.from_dict, Member.from_dict)
+        migrate_from_json(source, store)
+        store.close()
+        print(f"migrated {args.books:,} books in {time.perf_counter() - start:.2f}s")
+        del source
+
+        rows = {storage: measure(storage, args, isbns, member_ids) for storage in ("objects", "sqlite")}
+
+    print(f"{'':>18} {'json':>10} {'sqlite':>10}")
+    for metric in rows["objects"]:
+        print(f"{metric:>18} {rows['objects'][metric]:>10.2f} {rows['sqlite'][metric]:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# benchmarks/bench_startup.py
+# Reports Library() startup time and peak RSS for each load mode.
+# Every measurement runs in a fresh interpreter so peak RSS is not shared.
+# Usage: python -m benchmarks.bench_startup [--sizes 100000,1000000,10000000]
+
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from unittest import mock
+
+from benchmarks.synthetic import library_files_in, write_catalog
+
+MODES = ("full", "stream", "lazy")
+
+
+def measure(books_path, members_path, mode):
+    """Child process: construct a Library and print seconds and peak RSS in MB."""
+    from library_system.library import Library
+
+    with library_files_in(os.path.dirname(books_path)), \
+            mock.patch.multiple(Library, BOOKS_FILE=books_path, MEMBERS_FILE=members_path):
+        sys.stdout = open(os.devnull, "w")  # Silence the "Loaded ..." message
+        start = time.perf_counter()
+        Library(load_mode=mode)
+        elapsed = time.perf_counter() - start
+        sys.stdout = sys.__stdout__
+
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # kilobytes on Linux
+    print(f"{elapsed:.3f} {peak_kb / 1024:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Library startup benchmark")
+    parser.add_argument("--sizes", default="100000,1000000,10000000")
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--child", nargs=3, metavar=("BOOKS", "MEMBERS", "MODE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        measure(*args.child)
+        return
+
+    print(f"{'books':>12} {'mode':>8} {'startup s':>10} {'peak RSS MB':>12}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        with tempfile.TemporaryDirectory() as tmp:
+            books_path = os.path.join(tmp, "books.json")
+            members_path = os.path.join(tmp, "members.json")
+            write_catalog(books_path, members_path, size)
+            for mode in args.modes.split(","):
+                result = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.bench_startup",
+                     "--child", books_path, members_path, mode],
+                    capture_output=True, text=True, check=True)
+                seconds, rss = result.stdout.split()
+                print(f"{size:>12,} {mode:>8} {float(seconds):>10.2f} {float(rss):>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
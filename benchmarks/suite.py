@@ -0,0 +1,220 @@
+# benchmarks/suite.py
+# Reproducible performance suite: generates a deterministic catalog with realistic loan
+# and overdue distributions at each scale, measures the core Library operations in a
+# fresh interpreter per scale, writes machine-readable results and compares them with a
+# stored baseline. Exits with status 1 when any metric regresses past the tolerance.
+# Usage:
+#   python -m benchmarks.suite [--scales small,medium] [--output results.json]
+#   python -m benchmarks.suite --scales large --repeat 1 --update-baseline
+# Scales: small=10k, medium=100k, large=1M, xlarge=10M books (or any integer).
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import library_files_in, write_catalog
+
+SCALES = {"small": 10_000, "medium": 100_000, "large": 1_000_000, "xlarge": 10_000_000}
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_TOLERANCE = 0.30  # Allowed slowdown (fraction) before a metric counts as regressed
+ROUNDS = 5  # In-process repetitions of each timed step; the fastest counts
+
+# Metric name -> True when higher is better
+METRICS = {
+    "startup_s": False,
+    "peak_rss_mb": False,
+    "get_stats_us": False,
+    "get_overdue_books_ms": False,
+    "borrow_return_ops_s": True,
+    "save_data_ms": False,
+    "compact_s": False,
+}
+
+
+def best_time(function, calls, rounds=ROUNDS):
+    """Fastest per-call time of `function` over `rounds` rounds of `calls` calls."""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(calls):
+            function()
+        best = min(best, (time.perf_counter() - start) / calls)
+    return best
+
+
+def measure(book_count, seed, transactions):
+    """Child process: generate the catalog, run every measurement, print one JSON object."""
+    from library_system.library import Library
+
+    with tempfile.TemporaryDirectory() as tmp, library_files_in(tmp):
+        loans = write_catalog(Library.BOOKS_FILE, Library.MEMBERS_FILE, book_count,
+                              seed=seed, realistic=True)
+        sys.stdout = open(os.devnull, "w")  # Library prints load/save messages
+
+        start = time.perf_counter()
+        library = Library()
+        results = {"startup_s": time.perf_counter() - start}
+        results["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+        results["get_stats_us"] = best_time(library.get_stats, calls=5000) * 1e6
+        results["get_overdue_books_ms"] = best_time(library.get_overdue_books, calls=20) * 1000
+        overdue = library.get_overdue_books()
+
+        # Borrow then return shelf books by members without loans, so each op succeeds
+        rng = random.Random(seed)
+        shelf = [isbn for isbn, book in library.books.items() if book.available]
+        members = [mid for mid, member in library.members.items() if not member.borrowed_books]
+        pairs = iter([(rng.choice(shelf), members[n % len(members)])
+                      for n in range(transactions // 2 + ROUNDS * 100)])
+
+        def borrow_and_return(count):
+            for isbn, member_id in itertools.islice(pairs, count):
+                library.borrow_book(isbn, member_id)
+                library.return_book(isbn, member_id)
+
+        batch = max(1, transactions // 2 // ROUNDS)
+        results["borrow_return_ops_s"] = 2 * batch / best_time(lambda: borrow_and_return(batch), calls=1)
+
+        # save_data appends the journal (here: one batch of transactions per save);
+        # compact writes the full snapshot
+        library.COMPACT_THRESHOLD = float("inf")
+        saves = []
+        for _ in range(ROUNDS):
+            borrow_and_return(100)
+            start = time.perf_counter()
+            library.save_data()
+            saves.append(time.perf_counter() - start)
+        results["save_data_ms"] = min(saves) * 1000
+        results["compact_s"] = best_time(library.compact, calls=1, rounds=2)
+        sys.stdout = sys.__stdout__
+
+    results["loans"] = loans
+    results["overdue"] = len(overdue)
+    print(json.dumps(results))
+
+
+def merge_best(best, result):
+    """Keeps the better value of each metric from `result` in `best`."""
+    for metric, value in result.items():
+        if metric not in best:
+            best[metric] = value
+        elif metric in METRICS:
+            best[metric] = max(best[metric], value) if METRICS[metric] else min(best[metric], value)
+    return best
+
+
+def run_scale(book_count, seed, transactions, repeat, best=None):
+    """Best value of each metric over `repeat` fresh child processes."""
+    best = {} if best is None else best
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-m", "benchmarks.suite", "--child", str(book_count), str(seed), str(transactions)],
+            capture_output=True, text=True, check=True)
+        merge_best(best, json.loads(result.stdout))
+    return best
+
+
+def environment():
+    return {"python": platform.python_version(), "implementation": platform.python_implementation(),
+            "machine": platform.machine(), "system": platform.system(), "cpus": os.cpu_count()}
+
+
+def compare(results, baseline, tolerance):
+    """Returns [(scale, metric, baseline, current, change, regressed)] for shared metrics."""
+    rows = []
+    for scale, metrics in results.items():
+        previous = baseline.get(scale)
+        if not previous:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            if metric not in previous or metric not in metrics or not previous[metric]:
+                continue
+            change = metrics[metric] / previous[metric] - 1
+            slowdown = -change if higher_is_better else change
+            rows.append((scale, metric, previous[metric], metrics[metric], change, slowdown > tolerance))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Library performance benchmark suite")
+    parser.add_argument("--scales", default="small,medium",
+                        help="comma-separated names (small, medium, large, xlarge) or book counts")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--transactions", type=int, default=20000, help="borrow+return operations")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per scale; the best of each metric counts")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--confirm", type=int, default=2,
+                        help="extra rounds of runs for scales that look regressed before failing")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="merge these results into the baseline instead of comparing")
+    parser.add_argument("--child", nargs=3, type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        measure(*args.child)
+        return 0
+
+    results = {}
+    for scale in args.scales.split(","):
+        book_count = SCALES[scale] if scale in SCALES else int(scale)
+        results[str(book_count)] = run_scale(book_count, args.seed, args.transactions, args.repeat)
+        print(f"{book_count:>10,} books: " + "  ".join(
+            f"{metric} {results[str(book_count)][metric]:,.2f}" for metric in METRICS))
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    rows = [] if args.update_baseline else compare(results, baseline.get("results", {}), args.tolerance)
+    # A slow moment on a shared machine looks like a regression; a real one survives re-runs
+    for attempt in range(args.confirm):
+        suspects = sorted({row[0] for row in rows if row[-1]}, key=int)
+        if not suspects:
+            break
+        print(f"Re-running {', '.join(suspects)} books to confirm possible regressions...")
+        for scale in suspects:
+            run_scale(int(scale), args.seed, args.transactions, args.repeat, best=results[scale])
+        rows = compare(results, baseline.get("results", {}), args.tolerance)
+
+    report = {"environment": environment(), "seed": args.seed, "transactions": args.transactions,
+              "repeat": args.repeat, "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.update_baseline:
+        baseline.setdefault("results", {}).update(results)
+        baseline.update((key, value) for key, value in report.items() if key != "results")
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+    if not rows:
+        print("No baseline for these scales; nothing to compare.")
+        return 0
+
+    print(f"\n{'books':>10} {'metric':<22} {'baseline':>12} {'current':>12} {'change':>8}")
+    for scale, metric, previous, current, change, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{int(scale):>10,} {metric:<22} {previous:>12,.2f} {current:>12,.2f} {change:>+8.1%}{flag}")
+    regressions = sum(row[-1] for row in rows)
+    if regressions:
+        print(f"\n{regressions} metric(s) regressed by more than {args.tolerance:.0%}.", file=sys.stderr)
+        return 1
+    print(f"\nAll metrics within {args.tolerance:.0%} of the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
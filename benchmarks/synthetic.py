@@ -0,0 +1,161 @@
+# benchmarks/synthetic.py
+# Deterministic synthetic catalog data shared by the benchmark scripts.
+
+import json
+import os
+import random
+from datetime import date, timedelta
+from unittest import mock
+
+SYLLABLES = ["an", "bel", "cor", "dra", "el", "fin", "gor", "hal", "is", "jun",
+             "ka", "lor", "mer", "nor", "ol", "pra", "quin", "ros", "sal", "tor",
+             "ul", "vin", "wes", "xan", "yor", "zel"]
+
+FIRST_NAMES = ["Ada", "Alan", "Barbara", "Claude", "Donald", "Edsger", "Frances",
+               "Grace", "Guido", "Hedy", "John", "Katherine", "Linus", "Margaret",
+               "Niklaus", "Radia", "Ken", "Dennis", "Tim", "Vint"]
+
+
+def make_vocabulary(size, seed=0):
+    """Returns `size` distinct pseudo-words built from syllables."""
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def iter_book_records(count, seed=0, vocabulary_size=20000, author_count=5000):
+    """Yields `count` (isbn, title, author, year) tuples, identical for the same seed."""
+    rng = random.Random(seed)
+    vocabulary = make_vocabulary(vocabulary_size, seed)
+    surnames = make_vocabulary(author_count, seed + 1)
+    for number in range(count):
+        title = " ".join(rng.choice(vocabulary) for _ in range(rng.randint(2, 5))).title()
+        author = f"{rng.choice(FIRST_NAMES)} {rng.choice(surnames).title()}"
+        yield f"978{number:010d}", title, author, rng.randint(1900, 2024)
+
+
+NAME_ONSETS = ["b", "br", "c", "ch", "d", "dr", "f", "g", "gr", "h", "j", "k", "kl", "l", "m", "n",
+               "p", "pr", "r", "s", "sh", "st", "t", "th", "tr", "v", "w", "y", "z"]
+NAME_VOWELS = ["a", "e", "i", "o", "u", "ai", "ea", "ie", "ou", "y"]
+NAME_CODAS = ["", "", "", "n", "r", "l", "s", "m", "th", "ck", "nd", "rt", "ld", "ng", "sk", "tt"]
+
+
+def make_names(size, seed=0):
+    """Returns `size` distinct capitalized names of two or three onset-vowel-coda syllables."""
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < size:
+        names.add("".join(rng.choice(NAME_ONSETS) + rng.choice(NAME_VOWELS) + rng.choice(NAME_CODAS)
+                          for _ in range(rng.choice((2, 2, 3)))).title())
+    names = sorted(names)
+    rng.shuffle(names)  # So the common names (picked from the front) are not alphabetical
+    return names
+
+
+def iter_member_names(count, seed=0, first_name_count=3000, surname_count=150_000):
+    """
+    Yields `count` (member_id, name) pairs, identical for the same seed. Names are
+    drawn on a Zipf-like curve, so a few first names and surnames are very common;
+    one in five members has a middle name.
+    """
+    rng = random.Random(seed)
+    first_names = make_names(first_name_count, seed + 3)
+    surnames = make_names(surname_count, seed + 4)
+
+    def pick(names):
+        return names[min(len(names) - 1, int(len(names) ** rng.random()) - 1)]
+
+    for number in range(count):
+        name = pick(first_names)
+        if rng.random() < 0.2:
+            name += " " + pick(first_names)
+        yield f"M{number:08d}", f"{name} {pick(surnames)}"
+
+
+def pick_borrower(rng, member_count, realistic):
+    """Member number for the next loan: uniform, or Zipf-like so a few members borrow most."""
+    if not realistic:
+        return None
+    # Log-uniform over 1..member_count, i.e. a 1/x (Zipf) curve: member 0 borrows the most
+    return min(member_count - 1, int(member_count ** rng.random()) - 1)
+
+
+def pick_due_date(rng, today, overdue_ratio, realistic):
+    """Due date of a loan: most future dates within the loan period, some past due."""
+    if rng.random() < overdue_ratio:
+        if realistic:
+            # Most overdue loans are a few days late, with a long tail of lost books
+            return today - timedelta(days=min(365, 1 + int(rng.expovariate(1 / 10))))
+        return today - timedelta(days=rng.randint(1, 120))
+    return today + timedelta(days=rng.randint(1, 14))
+
+
+def write_catalog(books_path, members_path, book_count, member_count=None, loan_ratio=0.1,
+                  overdue_ratio=0.2, seed=0, today=None, realistic=False):
+    """
+    Writes books/members JSON files in the Library snapshot format.
+    `loan_ratio` of the books are on loan and `overdue_ratio` of those loans are past due.
+    By default loans are spread round-robin over the members and overdue loans are
+    1-120 days late. With `realistic`, recent books are borrowed more, borrowers follow
+    a Zipf-like curve, and lateness is exponential (mean 10 days, capped at a year).
+    Nobody exceeds Member.MAX_BOOKS either way. Returns the number of loans written.
+    """
+    rng = random.Random(seed + 2)
+    today = today or date.today()
+    member_count = member_count or max(1, book_count // 10)
+    loans = {}  # Key: member_id, Value: list of ISBNs
+    next_member = 0
+
+    with open(books_path, 'w') as f:
+        f.write('{')
+        for number, (isbn, title, author, year) in enumerate(iter_book_records(book_count, seed)):
+            record = {'title': title, 'author': author, 'isbn': isbn, 'publication_year': year,
+                      'available': True, 'borrowed_by': None, 'due_date': None}
+            chance = loan_ratio * (0.5 + (year - 1900) / 124) if realistic else loan_ratio
+            borrower = pick_borrower(rng, member_count, realistic)
+            if rng.random() < chance:
+                member_id = None
+                if borrower is not None and len(loans.get(f"M{borrower:08d}", ())) < 5:
+                    member_id = f"M{borrower:08d}"
+                else:
+                    # Round-robin, skipping members already at the limit
+                    for _ in range(member_count):
+                        candidate = f"M{next_member:08d}"
+                        next_member = (next_member + 1) % member_count
+                        if len(loans.get(candidate, ())) < 5:
+                            member_id = candidate
+                            break
+                if member_id is not None:
+                    due = pick_due_date(rng, today, overdue_ratio, realistic)
+                    record.update(available=False, borrowed_by=member_id, due_date=due.isoformat())
+                    loans.setdefault(member_id, []).append(isbn)
+            if number:
+                f.write(',')
+            f.write(json.dumps(isbn) + ':' + json.dumps(record))
+        f.write('}')
+
+    with open(members_path, 'w') as f:
+        f.write('{')
+        for number in range(member_count):
+            member_id = f"M{number:08d}"
+            record = {'name': f"{rng.choice(FIRST_NAMES)} {member_id}", 'member_id': member_id,
+                      'borrowed_books': loans.get(member_id, [])}
+            if number:
+                f.write(',')
+            f.write(json.dumps(member_id) + ':' + json.dumps(record))
+        f.write('}')
+
+    return sum(len(isbns) for isbns in loans.values())
+
+
+def library_files_in(directory):
+    """
+    Context manager pointing every Library data file (Library.DATA_FILES) into
+    `directory`, so a benchmark never touches the real data directory; the
+    class attributes are restored on exit.
+    """
+    from library_system.library import Library
+    return mock.patch.multiple(Library, **{name: os.path.join(directory, filename)
+                                           for name, filename in Library.DATA_FILES.items()})
@@ -0,0 +1,254 @@
+# library_system/batch.py
+
+import contextlib
+import json
+import sys
+import time
+from .library import Library
+from .metrics import METRICS
+
+OUTPUT_BLOCK = 10000  # Result lines buffered before each write
+
+_encoder = json.JSONEncoder(separators=(',', ':'))
+
+
+# --- Command Handlers ---
+# Each handler takes (library, command) and returns (ok, result), where result is
+# JSON-serializable. They go through the same Library methods as the console menu.
+
+def _book_info(book):
+    return book.to_dict() if book is not None else None
+
+
+def _add_book(library, command):
+    book = library.book_class(command['title'], command['author'], command['isbn'],
+                              command.get('publication_year'))
+    return library.add_book(book)
+
+
+def _register_member(library, command):
+    return library.register_member(library.member_class(command['name'], command['member_id']))
+
+
+def _borrow_book(library, command):
+    return library.borrow_book(command['isbn'], command['member_id'])
+
+
+def _return_book(library, command):
+    return library.return_book(command['isbn'], command['member_id'])
+
+
+def _borrow_books(library, command):
+    return library.borrow_books(command['member_id'], command['isbns'])
+
+
+def _return_books(library, command):
+    return library.return_books(command['member_id'], command['isbns'])
+
+
+def _borrow_batch(library, command):
+    return library.borrow_batch([(isbn, member_id) for isbn, member_id in command['loans']])
+
+
+def _return_batch(library, command):
+    return library.return_batch([(isbn, member_id) for isbn, member_id in command['loans']])
+
+
+def _place_hold(library, command):
+    return library.place_hold(command['isbn'], command['member_id'])
+
+
+def _cancel_hold(library, command):
+    return library.cancel_hold(command['isbn'], command['member_id'])
+
+
+def _expire_holds(library, command):
+    return True, library.expire_holds()
+
+
+def _find_book(library, command):
+    book = library.find_book(command['isbn'])
+    return book is not None, _book_info(book)
+
+
+def _find_member(library, command):
+    member = library.find_member(command['member_id'])
+    return member is not None, member.to_dict() if member is not None else None
+
+
+def _search_members(library, command):
+    members = library.search_members(command['name'], command.get('limit', 10))
+    return True, [member.to_dict() for member in members]
+
+
+def _search_books(library, command):
+    total, books = library.search_books(command.get('query', ''), year=command.get('year'),
+                                        page=command.get('page', 1),
+                                        page_size=command.get('page_size', 10))
+    return True, {'total': total, 'books': [_book_info(book) for book in books]}
+
+
+def _get_stats(library, command):
+    return True, library.get_stats()
+
+
+def _get_overdue_books(library, command):
+    return True, [{'isbn': book.isbn, 'title': book.title, 'borrowed_by': book.borrowed_by,
+                   'due_date': book.due_date} for book in library.get_overdue_books()]
+
+
+def _get_fine_report(library, command):
+    return True, library.get_fine_report()
+
+
+def _get_top_books(library, command):
+    return True, library.get_top_books(command.get('n', 100))
+
+
+def _get_also_borrowed(library, command):
+    return True, library.get_also_borrowed(command['isbn'], command.get('n', 10))
+
+
+def _get_daily_circulation(library, command):
+    return True, library.get_daily_circulation(command.get('days', 365))
+
+
+def _run_report(library, command):
+    return True, list(library.start_report(command['report'], *command.get('args', ())))
+
+
+def _get_metrics(library, command):
+    return True, METRICS.snapshot()
+
+
+def _save_data(library, command):
+    library.save_data()
+    return True, "Data saved successfully."
+
+
+COMMANDS = {
+    'add_book': _add_book,
+    'register_member': _register_member,
+    'borrow_book': _borrow_book,
+    'return_book': _return_book,
+    'borrow_books': _borrow_books,
+    'return_books': _return_books,
+    'borrow_batch': _borrow_batch,
+    'return_batch': _return_batch,
+    'place_hold': _place_hold,
+    'cancel_hold': _cancel_hold,
+    'expire_holds': _expire_holds,
+    'find_book': _find_book,
+    'find_member': _find_member,
+    'search_books': _search_books,
+    'search_members': _search_members,
+    'get_stats': _get_stats,
+    'get_overdue_books': _get_overdue_books,
+    'get_fine_report': _get_fine_report,
+    'get_top_books': _get_top_books,
+    'get_daily_circulation': _get_daily_circulation,
+    'get_also_borrowed': _get_also_borrowed,
+    'run_report': _run_report,
+    'get_metrics': _get_metrics,
+    'save_data': _save_data,
+}
+
+
+class MissingField(KeyError):
+    """A command lacks a field its handler reads (unlike a KeyError from inside the library)."""
+
+
+class _Fields(dict):
+    """A command's fields; looking up an absent one raises MissingField."""
+
+    def __missing__(self, name):
+        raise MissingField(name)
+
+
+def execute(library, command):
+    """Runs one command dict (e.g. {"op": "borrow_book", "isbn": ..., "member_id": ...})."""
+    op = command.get('op') if isinstance(command, dict) else None
+    handler = COMMANDS.get(op) if isinstance(op, str) else None  # An unhashable op is unknown too
+    if handler is None:
+        return False, f"Unknown command: {command!r}"
+    try:
+        return handler(library, _Fields(command))
+    except MissingField as e:
+        return False, f"Missing field {e} for '{op}'"
+    except (KeyError, TypeError, ValueError) as e:
+        return False, f"Invalid command: {e!r}"
+
+
+def run_commands(library, commands, timing=True):
+    """Yields one result dict per command: op, ok, result and (optionally) elapsed_us."""
+    clock = time.perf_counter_ns
+    for command in commands:
+        start = clock() if timing else 0
+        ok, result = execute(library, command)
+        outcome = {'op': command.get('op') if isinstance(command, dict) else None,
+                   'ok': ok, 'result': result}
+        if timing:
+            outcome['elapsed_us'] = (clock() - start) / 1000
+        yield outcome
+
+
+def iter_command_file(path):
+    """Yields command dicts from a JSONL file; malformed lines yield their raw text."""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    yield line.strip()
+
+
+def run_batch(library, commands, output, timing=True):
+    """
+    Runs commands against one Library and writes one JSON result per line to the
+    `output` file object, in blocks. Returns a summary dict.
+    """
+    summary = {'commands': 0, 'ok': 0, 'failed': 0}
+    block = []
+    start = time.perf_counter()
+    for outcome in run_commands(library, commands, timing):
+        summary['commands'] += 1
+        summary['ok' if outcome['ok'] else 'failed'] += 1
+        block.append(_encoder.encode(outcome) + '\n')
+        if len(block) >= OUTPUT_BLOCK:
+            output.writelines(block)
+            block = []
+    output.writelines(block)
+    summary['seconds'] = time.perf_counter() - start
+    return summary
+
+
+def batch_main(commands_path, output_path='-', timing=True, load_mode='full', shards=0, storage='objects'):
+    """
+    Entry point for `run.py --batch`. Results go to `output_path` (stdout for '-');
+    anything the library prints is diverted to stderr so it cannot mix with results.
+    Failed commands are reported in their result lines, not through the exit status.
+    Changes are saved after the last command. With `shards`, the commands run
+    against a ShardedLibrary of that many processes.
+    """
+    output = sys.stdout if output_path == '-' else open(output_path, 'w', encoding='utf-8')
+    library = None
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            if shards:
+                from .sharding import ShardedLibrary
+                library = ShardedLibrary(shards, load_mode=load_mode, storage=storage)
+            else:
+                library = Library(load_mode=load_mode, storage=storage)
+            summary = run_batch(library, iter_command_file(commands_path), output, timing)
+            library.save_data()
+    finally:
+        if shards and library is not None:
+            library.close()
+        if output is not sys.stdout:
+            output.close()
+        else:
+            output.flush()
+    print(f"Processed {summary['commands']} commands ({summary['failed']} failed) "
+          f"in {summary['seconds']:.3f}s.", file=sys.stderr)
+    return 0
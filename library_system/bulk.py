@@ -0,0 +1,160 @@
+# library_system/bulk.py
+
+import csv
+import json
+import os
+import time
+from .streaming import LazyRecordMap
+from .sqlite_store import SQLiteBookMap
+from .snapshot import MappedBookMap
+
+DEFAULT_CHUNK_SIZE = 10000
+IMPORT_FIELDS = ('title', 'author', 'isbn', 'publication_year')
+EXPORT_FIELDS = ('title', 'author', 'isbn', 'publication_year', 'available', 'borrowed_by', 'due_date')
+
+
+def detect_format(path):
+    """Returns 'csv' or 'jsonl' based on the file extension."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        return 'csv'
+    if extension in ('.jsonl', '.ndjson'):
+        return 'jsonl'
+    raise ValueError(f"Unsupported file type '{extension}'. Use .csv or .jsonl.")
+
+
+# --- Reading ---
+
+def iter_rows(path):
+    """Yields (line_number, row) for every record. Unparseable JSONL lines yield row=None."""
+    if detect_format(path) == 'csv':
+        with open(path, newline='', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+    else:
+        with open(path, encoding='utf-8') as f:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    row = None
+                yield line_number, row if isinstance(row, dict) else None
+
+
+def iter_chunks(rows, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Groups an iterable into lists of at most `chunk_size` items."""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def validate_row(row):
+    """Returns (record, None) for a valid catalog row or (None, reason) for a bad one."""
+    if row is None:
+        return None, "Malformed record"
+    record = {}
+    for field in ('title', 'author', 'isbn'):
+        value = row.get(field)
+        value = str(value).strip() if value is not None else ''
+        if not value:
+            return None, f"Missing {field}"
+        record[field] = value
+
+    year = row.get('publication_year')
+    if year is None or str(year).strip() == '':
+        record['publication_year'] = None
+    else:
+        try:
+            record['publication_year'] = int(str(year).strip())
+        except ValueError:
+            return None, f"Invalid publication_year '{year}'"
+    return record, None
+
+
+# --- Writing ---
+
+class RowWriter:
+    """Streams dict rows to a CSV or JSONL file (chosen by extension)."""
+
+    def __init__(self, path, fields):
+        self.format = detect_format(path)
+        self.fields = fields
+        self.file = open(path, 'w', newline='', encoding='utf-8')
+        if self.format == 'csv':
+            self.writer = csv.DictWriter(self.file, fieldnames=fields, extrasaction='ignore')
+            self.writer.writeheader()
+
+    def write(self, rows):
+        if self.format == 'csv':
+            self.writer.writerows(rows)
+        else:
+            self.file.writelines(json.dumps({f: row.get(f) for f in self.fields}) + '\n' for row in rows)
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# --- Pipelines ---
+
+def import_catalog(library, path, rejects_path=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Streams a CSV/JSONL catalog into the library chunk by chunk.
+    Rejected rows (invalid, or duplicate ISBNs) go to `rejects_path` with the reason.
+    Returns a summary dict with row counts and elapsed seconds.
+    """
+    start = time.perf_counter()
+    summary = {'rows': 0, 'added': 0, 'rejected': 0}
+    rejects = None
+    if rejects_path:
+        rejects = RowWriter(rejects_path, ('line',) + IMPORT_FIELDS + ('error',))
+    try:
+        for chunk in iter_chunks(iter_rows(path), chunk_size):
+            added, rejected = library.add_books_bulk(row for _, row in chunk)
+            summary['rows'] += len(chunk)
+            summary['added'] += added
+            summary['rejected'] += len(rejected)
+            if rejects and rejected:
+                rejects.write(dict(chunk[index][1] or {}, line=chunk[index][0], error=reason)
+                              for index, reason in rejected)
+    finally:
+        if rejects:
+            rejects.close()
+    summary['seconds'] = time.perf_counter() - start
+    return summary
+
+
+def iter_book_dicts(library):
+    """Yields every book as a dict. Lazily loaded, database and mapped books are read without being cached."""
+    if isinstance(library.books, LazyRecordMap):
+        for _, text in library.books.iter_serialized(lambda book: json.dumps(book.to_dict())):
+            yield json.loads(text)
+    elif isinstance(library.books, (SQLiteBookMap, MappedBookMap)):
+        yield from library.books.iter_records()
+    else:
+        for book in library.books.values():
+            yield book.to_dict()
+
+
+def export_catalog(library, path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Streams the whole catalog to a CSV/JSONL file. Returns a summary dict."""
+    start = time.perf_counter()
+    rows = 0
+    with RowWriter(path, EXPORT_FIELDS) as writer:
+        for chunk in iter_chunks(iter_book_dicts(library), chunk_size):
+            writer.write(chunk)
+            rows += len(chunk)
+    return {'rows': rows, 'seconds': time.perf_counter() - start}
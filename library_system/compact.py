@@ -0,0 +1,345 @@
+# library_system/compact.py
+
+import sys
+import threading
+from array import array
+from collections.abc import MutableMapping
+from datetime import date, timedelta
+from .member import Member
+
+LOAN_PERIOD_DAYS = 14
+NO_YEAR = -2 ** 31  # Sentinel for a missing publication year in the 'i' year column
+
+
+def _intern(value):
+    """Interns repeated strings (authors, member IDs) so each distinct value is stored once."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _to_ordinal(due_date):
+    return date.fromisoformat(due_date).toordinal() if due_date else None
+
+
+def _from_ordinal(ordinal):
+    return date.fromordinal(ordinal).isoformat() if ordinal else None
+
+
+class _BookBehaviour:
+    """
+    The Book methods, written against the attributes every compact representation
+    provides (title, author, isbn, publication_year, available, borrowed_by, due_ordinal).
+    """
+
+    __slots__ = ()
+
+    @property
+    def due_date(self):
+        return _from_ordinal(self.due_ordinal)
+
+    @due_date.setter
+    def due_date(self, value):
+        self.due_ordinal = _to_ordinal(value)
+
+    def check_out(self, member_id, loan_period=LOAN_PERIOD_DAYS):
+        """Marks the book as borrowed by `member_id`, due `loan_period` days from today."""
+        if not self.available:
+            return False, f"Book '{self.title}' is already checked out."
+        self.available = False
+        self.borrowed_by = member_id
+        self.due_ordinal = (date.today() + timedelta(days=loan_period)).toordinal()
+        return True, f"Book '{self.title}' checked out. Due: {self.due_date}"
+
+    def return_book(self):
+        """Marks the book as available again."""
+        if self.available:
+            return False, f"Book '{self.title}' is already available."
+        was_overdue = self.is_overdue()
+        self.available = True
+        self.borrowed_by = None
+        self.due_ordinal = None
+        message = f"Book '{self.title}' returned successfully"
+        if was_overdue:
+            message += " (was overdue)"
+        return True, message
+
+    def is_overdue(self):
+        """True if the book is on loan and its due date is before today."""
+        return (not self.available and self.due_ordinal is not None
+                and self.due_ordinal < date.today().toordinal())
+
+    def days_overdue(self):
+        if not self.is_overdue():
+            return 0
+        return date.today().toordinal() - self.due_ordinal
+
+    def to_dict(self):
+        return {
+            'title': self.title,
+            'author': self.author,
+            'isbn': self.isbn,
+            'publication_year': self.publication_year,
+            'available': self.available,
+            'borrowed_by': self.borrowed_by,
+            'due_date': self.due_date,
+        }
+
+    def __str__(self):
+        return f"'{self.title}' by {self.author} (ISBN: {self.isbn})"
+
+
+class CompactBook(_BookBehaviour):
+    """Slotted Book with interned author/borrower strings and the due date as an ordinal."""
+
+    __slots__ = ('title', '_author', 'isbn', 'publication_year', 'available',
+                 '_borrowed_by', 'due_ordinal')
+
+    def __init__(self, title, author, isbn, publication_year=None):
+        self.title = title
+        self.author = author
+        self.isbn = isbn
+        self.publication_year = publication_year
+        self.available = True
+        self.borrowed_by = None
+        self.due_ordinal = None
+
+    @property
+    def author(self):
+        return self._author
+
+    @author.setter
+    def author(self, value):
+        self._author = _intern(value)
+
+    @property
+    def borrowed_by(self):
+        return self._borrowed_by
+
+    @borrowed_by.setter
+    def borrowed_by(self, value):
+        self._borrowed_by = _intern(value)
+
+    @classmethod
+    def from_dict(cls, data):
+        book = cls(data['title'], data['author'], data['isbn'], data.get('publication_year'))
+        book.available = data.get('available', True)
+        book.borrowed_by = data.get('borrowed_by')
+        book.due_date = data.get('due_date')
+        return book
+
+
+class CompactMember:
+    """Slotted Member whose borrowed ISBNs are kept in a tuple instead of a list."""
+
+    __slots__ = ('name', 'member_id', '_borrowed_books')
+
+    MAX_BOOKS = Member.MAX_BOOKS
+
+    def __init__(self, name, member_id):
+        self.name = name
+        self.member_id = member_id
+        self._borrowed_books = ()
+
+    @property
+    def borrowed_books(self):
+        return self._borrowed_books
+
+    @borrowed_books.setter
+    def borrowed_books(self, isbns):
+        self._borrowed_books = tuple(_intern(isbn) for isbn in isbns)
+
+    def can_borrow(self):
+        """Checks if the member is eligible to borrow another book."""
+        return len(self._borrowed_books) < self.MAX_BOOKS
+
+    def borrow_book(self, isbn):
+        """Adds a book (by ISBN) to the member's borrowed books."""
+        if not self.can_borrow():
+            return False, f"Maximum book limit ({self.MAX_BOOKS}) reached."
+        self._borrowed_books += (_intern(isbn),)
+        return True, f"Book (ISBN: {isbn}) successfully borrowed."
+
+    def return_book(self, isbn):
+        """Removes a book (by ISBN) from the member's borrowed books."""
+        if isbn in self._borrowed_books:
+            books = list(self._borrowed_books)
+            books.remove(isbn)
+            self._borrowed_books = tuple(books)
+            return True, f"Book (ISBN: {isbn}) successfully returned."
+        return False, f"Error: Member {self.member_id} did not borrow book with ISBN: {isbn}."
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'member_id': self.member_id,
+            'borrowed_books': list(self._borrowed_books),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        member = cls(name=data['name'], member_id=data['member_id'])
+        member.borrowed_books = data.get('borrowed_books', [])
+        return member
+
+    def __str__(self):
+        return f"Member ID: {self.member_id}, Name: {self.name}, Books Borrowed: {len(self._borrowed_books)}"
+
+
+# --- Columnar Store ---
+
+class BookView(_BookBehaviour):
+    """Lightweight Book-compatible view of one row of a ColumnarBookStore."""
+
+    __slots__ = ('_store', '_row')
+
+    def __init__(self, store, row):
+        self._store = store
+        self._row = row
+
+    def __eq__(self, other):
+        return (isinstance(other, BookView)
+                and other._store is self._store and other._row == self._row)
+
+    def __hash__(self):
+        return hash((id(self._store), self._row))
+
+    @property
+    def isbn(self):
+        return self._store.isbns[self._row]
+
+    @property
+    def title(self):
+        return self._store.titles[self._row]
+
+    @title.setter
+    def title(self, value):
+        self._store.titles[self._row] = value
+
+    @property
+    def author(self):
+        return self._store.author_names[self._store.author_codes[self._row]]
+
+    @author.setter
+    def author(self, value):
+        self._store.author_codes[self._row] = self._store.author_code(value)
+
+    @property
+    def publication_year(self):
+        year = self._store.years[self._row]
+        return None if year == NO_YEAR else year
+
+    @publication_year.setter
+    def publication_year(self, value):
+        self._store.years[self._row] = NO_YEAR if value is None else int(value)
+
+    @property
+    def available(self):
+        return bool(self._store.available[self._row])
+
+    @available.setter
+    def available(self, value):
+        self._store.available[self._row] = 1 if value else 0
+
+    @property
+    def borrowed_by(self):
+        return self._store.borrowers[self._row]
+
+    @borrowed_by.setter
+    def borrowed_by(self, value):
+        self._store.borrowers[self._row] = _intern(value)
+
+    @property
+    def due_ordinal(self):
+        return self._store.due[self._row] or None
+
+    @due_ordinal.setter
+    def due_ordinal(self, value):
+        self._store.due[self._row] = value or 0
+
+
+class ColumnarBookStore(MutableMapping):
+    """
+    Books stored column by column in typed arrays, keyed by ISBN like the plain dict.
+    Authors are dictionary-encoded, years and due-date ordinals live in machine-integer
+    arrays, and lookups return BookView objects that read and write the columns in place.
+    Storing a book copies its fields: the object stored is not kept, so change the
+    BookView returned by a lookup instead.
+    """
+
+    def __init__(self):
+        self.rows = {}                 # Key: ISBN, Value: row number
+        self.isbns = []
+        self.titles = []
+        self.author_codes = array('I')
+        self.author_names = []         # Code -> author name
+        self._author_lookup = {}       # Author name -> code
+        self.years = array('i')
+        self.available = bytearray()
+        self.borrowers = []            # Interned member IDs (None when available)
+        self.due = array('i')          # Due-date ordinal, 0 when not on loan
+        self._free_rows = []           # Rows released by deletions, reused by inserts
+        self._lock = threading.Lock()  # Row and author-code allocation; concurrent adds must not share a row
+
+    def author_code(self, name):
+        code = self._author_lookup.get(name)
+        if code is None:
+            with self._lock:
+                code = self._author_lookup.get(name)
+                if code is None:
+                    code = self._author_lookup[name] = len(self.author_names)
+                    self.author_names.append(name)
+        return code
+
+    def __getitem__(self, isbn):
+        return BookView(self, self.rows[isbn])
+
+    def __setitem__(self, isbn, book):
+        """Copies any Book-like object into the columns; later changes to it are not seen."""
+        row = self.rows.get(isbn)
+        if row is None:
+            with self._lock:
+                row = self.rows.get(isbn)
+                if row is None:
+                    row = self._allocate_row(isbn)
+
+        view = BookView(self, row)
+        view.title = book.title
+        view.author = book.author
+        view.publication_year = getattr(book, 'publication_year', None)
+        view.available = book.available
+        view.borrowed_by = book.borrowed_by
+        view.due_date = book.due_date
+
+    def _allocate_row(self, isbn):
+        """Reuses a free row or appends one to every column; the caller must hold the lock."""
+        if self._free_rows:
+            row = self._free_rows.pop()
+        else:
+            row = len(self.isbns)
+            self.isbns.append(None)
+            self.titles.append(None)
+            self.author_codes.append(0)
+            self.years.append(NO_YEAR)
+            self.available.append(1)
+            self.borrowers.append(None)
+            self.due.append(0)
+        self.isbns[row] = isbn
+        self.rows[isbn] = row  # Published last, once every column has the row
+        return row
+
+    def __delitem__(self, isbn):
+        with self._lock:
+            row = self.rows.pop(isbn)
+            self.isbns[row] = None
+            self.titles[row] = None
+            self.borrowers[row] = None
+            self.due[row] = 0
+            self._free_rows.append(row)
+
+    def __contains__(self, isbn):
+        return isbn in self.rows
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
@@ -0,0 +1,253 @@
+# library_system/directory.py
+
+import heapq
+import re
+import threading
+import unicodedata
+from array import array
+from collections import Counter, OrderedDict
+from .search import PrefixTrie
+
+NAME_PATTERN = re.compile(r"[^\W_]+")
+
+# Score of a name token against a query term. A member's score is the sum over the
+# query terms of their best-matching token, and every term must match something.
+EXACT_SCORE = 4          # Same token; a typo of distance d scores EXACT_SCORE - d
+PREFIX_SCORE = 2         # The last query term starts the token (type-ahead)
+MAX_PREFIX_EXPANSIONS = 50
+MAX_FUZZY_CANDIDATES = 30  # Tokens sharing the most trigrams with a term that get an edit distance
+CACHE_SIZE = 4096        # Recent queries kept with their ranked results
+TERM_CACHE_SIZE = 4096   # Recent query terms kept with the tokens they match
+
+
+def normalize(name):
+    """Splits a name into lowercase tokens with accents removed ('José' -> ['jose'])."""
+    if not name:
+        return []
+    name = str(name)
+    if not name.isascii():
+        name = ''.join(char for char in unicodedata.normalize('NFKD', name) if not unicodedata.combining(char))
+    return NAME_PATTERN.findall(name.casefold())
+
+
+def trigrams(token):
+    """The token's trigrams, padded so short tokens and word edges have some too."""
+    padded = f"${token}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def max_edits(term):
+    """Typos tolerated in a query term: none for 1-2 letters, one up to 5, then two."""
+    return 0 if len(term) <= 2 else 1 if len(term) <= 5 else 2
+
+
+def edit_distance(a, b, limit):
+    """
+    Optimal string alignment distance (insertions, deletions, substitutions and
+    swaps of neighbouring letters), or limit + 1 once it must exceed `limit`. Only
+    the band of cells within `limit` of the diagonal is computed.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if a == b:
+        return 0
+    over = limit + 1
+    before, previous = None, [j if j <= limit else over for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        current = [over] * (len(b) + 1)
+        if i <= limit:
+            current[0] = i
+        low, high = max(1, i - limit), min(len(b), i + limit)
+        best = current[low - 1]
+        for j in range(low, high + 1):
+            cost = a[i - 1] != b[j - 1]
+            value = previous[j - 1] + cost
+            if previous[j] + 1 < value:
+                value = previous[j] + 1
+            if current[j - 1] + 1 < value:
+                value = current[j - 1] + 1
+            if cost and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1] \
+                    and before[j - 2] + 1 < value:
+                value = before[j - 2] + 1
+            current[j] = value if value < over else over
+            if value < best:
+                best = value
+        if best >= over:
+            return over
+        before, previous = previous, current
+    return previous[-1]
+
+
+class MemberDirectory:
+    """
+    Finds members by name, tolerating typos. Names are split into normalized tokens
+    and each distinct token keeps an array of the members that have it, while each
+    member keeps the IDs of its own tokens. Query terms are matched against the token
+    vocabulary (far smaller than the membership) through a trigram index, split by
+    token length so only tokens within reach of a term are counted, and confirmed by
+    edit distance. Members get numbers in the order they are added, which also
+    breaks ties between equal scores.
+    """
+
+    def __init__(self, cache_size=CACHE_SIZE, term_cache_size=TERM_CACHE_SIZE):
+        self.member_ids = []          # Index: member number, Value: member_id
+        self.postings = {}            # Key: token, Value: array of member numbers, ascending
+        self.token_ids = {}           # Key: token, Value: token ID
+        self.name_tokens = array('I')  # Token IDs of every member's name, member after member
+        self.name_starts = array('I')  # Index: member number, Value: where its tokens start in name_tokens
+        self.grams = {}               # Key: (trigram, token length), Value: list of tokens with it
+        self.vocabulary = PrefixTrie()
+        self.cache_size = cache_size
+        self.cache = OrderedDict()  # Key: (terms, limit), Value: ranked results; least recent first
+        self.term_cache_size = term_cache_size
+        self.term_cache = OrderedDict()  # Key: (term, prefix), Value: _expand result; only new tokens change it
+        self._lock = threading.Lock()  # Serializes writers; queries only read
+
+    def __len__(self):
+        return len(self.member_ids)
+
+    def add(self, member_id, name):
+        """Indexes one member. Called from Library.register_member and on load."""
+        tokens = set(normalize(name))
+        with self._lock:
+            number = len(self.member_ids)
+            self.name_starts.append(len(self.name_tokens))
+            for token in tokens:
+                postings = self.postings.get(token)
+                if postings is None:
+                    postings = self.postings[token] = array('I')
+                    self.token_ids[token] = len(self.token_ids)
+                    self.term_cache.clear()
+                    self.vocabulary.insert(token)
+                    for gram in trigrams(token):
+                        self.grams.setdefault((gram, len(token)), []).append(token)
+                postings.append(number)
+                self.name_tokens.append(self.token_ids[token])
+            self.member_ids.append(member_id)  # Last, so readers never see a member without tokens
+            if self.cache:
+                self.cache.clear()  # Any cached result might now be missing this member
+
+    # --- Query Methods ---
+
+    def search(self, query, limit=10):
+        """Member IDs of the `limit` best matches for `query`, best first."""
+        return [member_id for _, member_id in self.ranked(query, limit)]
+
+    def ranked(self, query, limit=10):
+        """
+        Returns [(-score, member_id), ...] for the `limit` best matches, best first.
+        Every query term must match one of the member's name tokens exactly, with a
+        few typos, or (the last term) as a prefix.
+        """
+        terms = tuple(dict.fromkeys(normalize(query)))
+        if not terms or limit < 1:
+            return []
+        key = (terms, limit)
+        with self._lock:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.cache.move_to_end(key)
+                return cached
+
+        # Exact matches first: if they fill the list at the best possible score, nothing can outrank them
+        ranked = self._top([{term: EXACT_SCORE} if term in self.postings else {} for term in terms], limit)
+        if len(ranked) < limit or ranked[-1][0] != -EXACT_SCORE * len(terms):
+            ranked = self._top([self._expand(term, prefix=position == len(terms) - 1)
+                                for position, term in enumerate(terms)], limit)
+
+        with self._lock:
+            self.cache[key] = ranked
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return ranked
+
+    def _expand(self, term, prefix):
+        """Vocabulary tokens matching one query term: {token: score}."""
+        key = (term, prefix)
+        with self._lock:
+            matches = self.term_cache.get(key)
+            if matches is not None:
+                self.term_cache.move_to_end(key)
+                return matches
+        matches = self._match_term(term, prefix)
+        with self._lock:
+            self.term_cache[key] = matches
+            while len(self.term_cache) > self.term_cache_size:
+                self.term_cache.popitem(last=False)
+        return matches
+
+    def _match_term(self, term, prefix):
+        matches = {}
+        if prefix:
+            for token in self.vocabulary.complete(term, MAX_PREFIX_EXPANSIONS):
+                matches[token] = PREFIX_SCORE
+        limit = max_edits(term)
+        if limit:
+            grams = trigrams(term)
+            # Each edit spoils at most four of the term's trigrams (a swap touches four)
+            needed = max(1, len(grams) - 4 * limit)
+            shared = Counter()
+            for length in range(len(term) - limit, len(term) + limit + 1):
+                for gram in grams:
+                    shared.update(self.grams.get((gram, length), ()))
+            candidates = [(count, token) for token, count in shared.items() if count >= needed]
+            for _, token in heapq.nlargest(MAX_FUZZY_CANDIDATES, candidates):
+                distance = edit_distance(term, token, limit)
+                if distance <= limit:
+                    matches[token] = max(matches.get(token, 0), EXACT_SCORE - distance)
+        if term in self.postings:
+            matches[term] = EXACT_SCORE
+        return matches
+
+    def _top(self, matches, limit):
+        """
+        Ranks the members matching every term, given each term's {token: score}. The
+        term matching the fewest members drives: its members are walked from its best
+        score down, in member order, and scored on the other terms through their own
+        name tokens. The walk stops once the `limit` best so far cannot be beaten.
+        """
+        if not all(matches):
+            return []
+        sizes = [sum(len(self.postings[token]) for token in match) for match in matches]
+        driver = sizes.index(min(sizes))
+        others = [{self.token_ids[token]: score for token, score in match.items()}
+                  for position, match in enumerate(matches) if position != driver]
+        best_others = sum(max(scores.values()) for scores in others)
+        name_tokens, name_starts, count = self.name_tokens, self.name_starts, len(self.member_ids)
+
+        top = []  # Min-heap of (score, -number): the worst of the best `limit` on top
+        levels = sorted(set(matches[driver].values()), reverse=True)
+        for level in levels:
+            ceiling = level + best_others  # Best score a member found at this level can reach
+            if len(top) == limit and top[0][0] > ceiling:
+                break
+            driving = {self.token_ids[token] for token, score in matches[driver].items() if score > level}
+            previous = None
+            for number in heapq.merge(*(self.postings[token] for token, score in matches[driver].items()
+                                        if score == level)):
+                if number == previous or number >= count:
+                    continue
+                previous = number
+                if len(top) == limit and top[0] >= (ceiling, -number):
+                    break  # Later members here score no more and come after it
+                tokens = name_tokens[name_starts[number]:name_starts[number + 1] if number + 1 < count
+                                     else len(name_tokens)]
+                if driving and not driving.isdisjoint(tokens):
+                    continue  # Ranked at its better level
+                total = level
+                for scores in others:
+                    best = 0
+                    for token in tokens:
+                        score = scores.get(token, 0)
+                        if score > best:
+                            best = score
+                    if not best:
+                        break
+                    total += best
+                else:
+                    if len(top) < limit:
+                        heapq.heappush(top, (total, -number))
+                    elif (total, -number) > top[0]:
+                        heapq.heapreplace(top, (total, -number))
+        top.sort(reverse=True)
+        return [(-score, self.member_ids[-number]) for score, number in top]
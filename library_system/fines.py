@@ -0,0 +1,154 @@
+# library_system/fines.py
+
+from array import array
+from datetime import date
+
+try:
+    import numpy as np
+except ImportError:  # The report falls back to plain Python loops
+    np = None
+
+# Aging buckets by days overdue: (label, first day, last day or None for open-ended)
+AGING_BUCKETS = (('1-7', 1, 7), ('8-30', 8, 30), ('31-90', 31, 90), ('90+', 91, None))
+
+# Borrower and due date of every active loan; julianday() - 1721424.5 is the date ordinal
+LOAN_BORROWERS_SQL = ("SELECT b.borrowed_by, CAST(julianday(l.due_date) - 1721424.5 AS INTEGER) "
+                      "FROM loans l JOIN books b ON b.isbn = l.isbn ORDER BY b.borrowed_by")
+
+
+class FinePolicy:
+    """
+    How much an overdue loan owes: `daily_rate` for every day past the due date
+    after the first `grace_days`, capped at `max_fine` (None for no cap).
+    """
+
+    def __init__(self, daily_rate=0.50, grace_days=0, max_fine=None):
+        if daily_rate < 0 or grace_days < 0 or (max_fine is not None and max_fine < 0):
+            raise ValueError("Fine policy values cannot be negative.")
+        self.daily_rate = daily_rate
+        self.grace_days = grace_days
+        self.max_fine = max_fine
+
+    def fine(self, days_overdue):
+        """Fine for one loan that is `days_overdue` days late."""
+        fine = max(days_overdue - self.grace_days, 0) * self.daily_rate
+        return fine if self.max_fine is None else min(fine, self.max_fine)
+
+    def fines(self, days_overdue):
+        """Fines for a NumPy array of days overdue, in one pass."""
+        fines = np.clip(days_overdue - self.grace_days, 0, None) * self.daily_rate
+        return fines if self.max_fine is None else np.minimum(fines, self.max_fine)
+
+
+def extract_loans(library):
+    """
+    Active loans as (member_ids, codes, due_days): each loan's borrower is
+    member_ids[code] and its due date is the ordinal due_days[n]. Taken under all
+    transaction locks, so the arrays describe one consistent moment.
+    """
+    member_ids, codes, due_days = [], array('i'), array('i')
+    with library.locks.hold_all():
+        if library.store is not None:
+            for member_id, day in library.store.execute(LOAN_BORROWERS_SQL):
+                if not member_ids or member_ids[-1] != member_id:
+                    member_ids.append(member_id)
+                codes.append(len(member_ids) - 1)
+                due_days.append(day)
+            return member_ids, codes, due_days
+        # Book side: each loan's borrower is on the book, wherever the member is kept
+        books, member_codes = library.books, {}
+        for isbn, day in library.loans.items():
+            member_id = books[isbn].borrowed_by
+            code = member_codes.get(member_id)
+            if code is None:
+                code = member_codes[member_id] = len(member_ids)
+                member_ids.append(member_id)
+            codes.append(code)
+            due_days.append(day)
+    return member_ids, codes, due_days
+
+
+def fine_report(library, policy=None, today=None):
+    """
+    Outstanding fines over all active loans: totals, aging buckets (days overdue)
+    and the amount owed per member (members who owe nothing are left out).
+    Vectorized with NumPy when it is installed.
+    """
+    policy = policy or FinePolicy()
+    today = (today or date.today()).toordinal()
+    member_ids, codes, due_days = extract_loans(library)
+    compute = _report_arrays if np is not None else _report_loop
+    return compute(policy, today, member_ids, codes, due_days)
+
+
+def merge_fine_reports(reports):
+    """Combines fine reports over disjoint sets of loans (e.g. one per shard)."""
+    merged = {'loans': 0, 'overdue': 0, 'total_fines': 0.0,
+              'aging': {label: {'loans': 0, 'fines': 0.0} for label, _, _ in AGING_BUCKETS},
+              'member_fines': {}}
+    member_fines = merged['member_fines']
+    for report in reports:
+        merged['loans'] += report['loans']
+        merged['overdue'] += report['overdue']
+        merged['total_fines'] = round(merged['total_fines'] + report['total_fines'], 2)
+        for label, bucket in report['aging'].items():
+            total = merged['aging'][label]
+            total['loans'] += bucket['loans']
+            total['fines'] = round(total['fines'] + bucket['fines'], 2)
+        for member_id, fine in report['member_fines'].items():
+            member_fines[member_id] = round(member_fines.get(member_id, 0) + fine, 2)
+    return merged
+
+
+def _report_arrays(policy, today, member_ids, codes, due_days):
+    codes = np.frombuffer(codes, dtype=np.int32)
+    days_overdue = today - np.frombuffer(due_days, dtype=np.int32)
+    fines = policy.fines(days_overdue)
+
+    # Bucket 0 holds loans that are not overdue; 1.. follow AGING_BUCKETS
+    edges = [first for _, first, _ in AGING_BUCKETS]
+    buckets = np.searchsorted(edges, days_overdue, side='right')
+    loan_counts = np.bincount(buckets, minlength=len(edges) + 1)
+    bucket_fines = np.bincount(buckets, weights=fines, minlength=len(edges) + 1)
+
+    member_totals = np.bincount(codes, weights=fines, minlength=len(member_ids))
+    owing = np.flatnonzero(member_totals)
+    member_fines = dict(zip(map(member_ids.__getitem__, owing.tolist()),
+                            np.round(member_totals[owing], 2).tolist()))
+    return _report(
+        len(codes), int(loan_counts[1:].sum()), float(fines.sum()),
+        [(int(loan_counts[n]), float(bucket_fines[n])) for n in range(1, len(edges) + 1)],
+        member_fines)
+
+
+def _report_loop(policy, today, member_ids, codes, due_days):
+    buckets = [[0, 0.0] for _ in AGING_BUCKETS]
+    member_totals = [0.0] * len(member_ids)
+    overdue = 0
+    total = 0.0
+    for code, due_day in zip(codes, due_days):
+        days_overdue = today - due_day
+        if days_overdue <= 0:
+            continue
+        fine = policy.fine(days_overdue)
+        overdue += 1
+        total += fine
+        member_totals[code] += fine
+        for bucket, (_, first, last) in zip(buckets, AGING_BUCKETS):
+            if last is None or days_overdue <= last:
+                bucket[0] += 1
+                bucket[1] += fine
+                break
+    member_fines = {member_ids[code]: round(fine, 2) for code, fine in enumerate(member_totals) if fine}
+    return _report(len(codes), overdue, total, buckets, member_fines)
+
+
+def _report(loans, overdue, total, buckets, member_fines):
+    return {
+        'loans': loans,
+        'overdue': overdue,
+        'total_fines': round(total, 2),
+        'aging': {label: {'loans': count, 'fines': round(fines, 2)}
+                  for (label, _, _), (count, fines) in zip(AGING_BUCKETS, buckets)},
+        'member_fines': member_fines,
+    }
@@ -0,0 +1,524 @@
+# library_system/history.py
+
+import itertools
+import json
+import os
+import struct
+import threading
+import weakref
+from array import array
+from datetime import date
+
+try:
+    import numpy as np
+except ImportError:  # Folding the log falls back to plain Python counting
+    np = None
+
+BORROW, RETURN = 0, 1
+
+# One file per column; row n of the log is element n of every column
+COLUMNS = (('event', 'B'), ('book', 'I'), ('member', 'I'), ('day', 'i'))
+KEYS_FILE = 'keys.jsonl'       # Code dictionary, one ["book", isbn, author code], ["author", name] or ["member", id] per line
+ROLLUPS_FILE = 'rollups.bin'   # Checkpoint of the rollups and how many rows they cover
+# magic, rows covered, book/author/member codes, first day (-1 if none), days tracked
+ROLLUPS_HEADER = struct.Struct('<8sQQQQqQ')
+ROLLUPS_MAGIC = b'LIBHIST1'
+CHUNK_ROWS = 1 << 20           # Rows read at a time when folding the log into the rollups
+
+_quote = json.encoder.encode_basestring_ascii  # As json.dumps writes a string
+
+
+class RankedCounter:
+    """
+    Counts per code, kept in order of count (highest first) as they change. Counts only
+    go up by one at a time, so an increment swaps the code with the first code of its
+    count block and moves that block's boundary: O(1), and the top n is order[:n].
+    """
+
+    def __init__(self):
+        self.counts = array('Q')    # Key: code, Value: count
+        self.order = array('I')     # Codes, highest count first (ties in code order until they change)
+        self.position = array('I')  # Key: code, Value: index in order
+        self.starts = {}            # Key: count, Value: index in order of the first code with that count
+
+    def __len__(self):
+        return len(self.counts)
+
+    def grow(self, size):
+        """Adds codes up to `size` with a count of 0 (they go at the end of the order)."""
+        old = len(self.counts)
+        if size <= old:
+            return
+        self.counts.frombytes(bytes(8 * (size - old)))
+        self.order.extend(range(old, size))
+        self.position.extend(range(old, size))
+        self.starts.setdefault(0, old)
+
+    def add(self):
+        """Adds one code with a count of 0 and returns it."""
+        code = len(self.counts)
+        self.grow(code + 1)
+        return code
+
+    def increment(self, code):
+        count, index = self.counts[code], self.position[code]
+        first = self.starts[count]
+        other = self.order[first]
+        self.order[first], self.order[index] = code, other
+        self.position[code], self.position[other] = first, index
+        if first + 1 < len(self.order) and self.counts[self.order[first + 1]] == count:
+            self.starts[count] = first + 1
+        else:
+            del self.starts[count]
+        self.starts.setdefault(count + 1, first)  # A higher block, if any, ends right here
+        self.counts[code] = count + 1
+
+    def update(self, deltas):
+        """Adds deltas[code] to every count, then re-sorts once (for folding many rows)."""
+        if np is not None and len(self.counts):
+            counts = np.frombuffer(self.counts, dtype=np.uint64)
+            counts[:len(deltas)] += np.asarray(deltas, dtype=np.uint64)
+            order = np.argsort(-counts.astype(np.int64), kind='stable').astype(np.uint32)
+            position = np.empty_like(order)
+            position[order] = np.arange(len(order), dtype=np.uint32)
+            self.order, self.position = array('I', order.tobytes()), array('I', position.tobytes())
+            ordered = counts[order]
+            firsts = np.flatnonzero(np.diff(ordered, prepend=ordered[:1] + 1) != 0)
+            self.starts = dict(zip(ordered[firsts].tolist(), firsts.tolist()))
+            return
+        for code, delta in enumerate(deltas):
+            self.counts[code] += delta
+        self.order = array('I', sorted(range(len(self.counts)), key=self.counts.__getitem__, reverse=True))
+        self.position = array('I', bytes(4 * len(self.order)))
+        self.starts = {}
+        for index, code in enumerate(self.order):
+            self.position[code] = index
+            self.starts.setdefault(self.counts[code], index)
+
+    def top(self, n):
+        """[(code, count), ...] for the n highest non-zero counts."""
+        result = []
+        for code in self.order[:n]:
+            count = self.counts[code]
+            if not count:
+                break
+            result.append((code, count))
+        return result
+
+    def write(self, f):
+        for values in (self.counts, self.order, self.position):
+            values.tofile(f)
+        starts = array('Q', (value for item in sorted(self.starts.items()) for value in item))
+        f.write(struct.pack('<Q', len(starts)))
+        starts.tofile(f)
+
+    def read(self, f, size):
+        for values in (self.counts, self.order, self.position):
+            values.fromfile(f, size)
+        starts = array('Q')
+        starts.fromfile(f, struct.unpack('<Q', f.read(8))[0])
+        self.starts = dict(zip(starts[::2], starts[1::2]))
+
+
+class DailyCounts:
+    """Borrows and returns per calendar day, in arrays indexed from the first day seen."""
+
+    def __init__(self):
+        self.first_day = None             # Ordinal of index 0
+        self.counts = (array('Q'), array('Q'))  # Indexed by event, then by day - first_day
+
+    def cover(self, first, last):
+        """Extends the arrays so that days `first`..`last` have a slot."""
+        if self.first_day is None:
+            self.first_day = first
+        if first < self.first_day:
+            for counts in self.counts:
+                counts[0:0] = array('Q', bytes(8 * (self.first_day - first)))
+            self.first_day = first
+        size = last - self.first_day + 1
+        for counts in self.counts:
+            if len(counts) < size:
+                counts.frombytes(bytes(8 * (size - len(counts))))
+
+    def add(self, event, day, count=1):
+        counts = self.counts[event]
+        index = -1 if self.first_day is None else day - self.first_day
+        if not 0 <= index < len(counts):
+            self.cover(day, day)
+            index = day - self.first_day
+        counts[index] += count
+
+    def between(self, first, last):
+        """[(ordinal, borrows, returns), ...] for every day from `first` to `last`."""
+        result = []
+        borrows, returns = self.counts
+        for day in range(first, last + 1):
+            index = day - self.first_day if self.first_day is not None else -1
+            if 0 <= index < len(borrows):
+                result.append((day, borrows[index], returns[index]))
+            else:
+                result.append((day, 0, 0))
+        return result
+
+
+def _close_files(files):
+    for fd in files.values():
+        os.close(fd)
+    files.clear()
+
+
+class LoanHistory:
+    """
+    Append-only log of every borrow and return, stored column by column in `directory`
+    with ISBNs, authors and member IDs replaced by integer codes, plus rollups (loans
+    per book, per author and per member, borrows and returns per day). Recording only
+    stages a row; the rows recorded since are counted into the rollups by the next
+    query or checkpoint, in one pass. Queries otherwise only read the rollups, so they
+    cost O(result + rows since the last query) however long the history is.
+
+    Like the transaction journal, new rows are staged in memory until flush().
+    checkpoint() forces them to stable storage and saves the rollups, so opening only
+    folds in the rows written after the last checkpoint instead of re-reading the
+    whole log.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.book_codes, self.author_codes, self.member_codes = {}, {}, {}
+        self.isbns, self.authors, self.member_ids = [], [], []   # Key: code, Value: key
+        self.book_authors = array('I')  # Key: book code, Value: author code
+        self.books, self.by_author, self.members = RankedCounter(), RankedCounter(), RankedCounter()
+        self.days = DailyCounts()
+        self.pending = {name: array(typecode) for name, typecode in COLUMNS}
+        self.pending_keys = []  # Encoded dictionary lines for codes assigned since the last flush
+        self.files = {}         # Key: file name, Value: descriptor kept open for appending
+        self.unsynced = set()   # Files appended to by flush(sync=False) since the last fsync
+        weakref.finalize(self, _close_files, self.files)
+        self.rows = 0           # Rows on disk
+        self.counted = 0        # Rows (on disk, then staged) counted into the rollups
+        self._lock = threading.Lock()  # Guards the codes, rollups and staged rows
+        self._load()
+
+    def __len__(self):
+        return self.rows + len(self.pending['event'])
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    # --- Recording ---
+
+    def record(self, event, isbn, author, member_id, day=None):
+        """Stages one BORROW or RETURN event (on `day`, an ordinal, default today) and counts it."""
+        day = date.today().toordinal() if day is None else day
+        with self._lock:
+            self._stage(event, self._book_code(isbn, author), self._member_code(member_id), day)
+
+    def record_many(self, event, entries, day=None):
+        """Stages one event per (isbn, author, member_id) in `entries`, under one lock acquisition."""
+        day = date.today().toordinal() if day is None else day
+        with self._lock:
+            for isbn, author, member_id in entries:
+                self._stage(event, self._book_code(isbn, author), self._member_code(member_id), day)
+
+    def _stage(self, event, book, member, day):
+        pending = self.pending
+        pending['event'].append(event)
+        pending['book'].append(book)
+        pending['member'].append(member)
+        pending['day'].append(day)
+
+    def _book_code(self, isbn, author):
+        code = self.book_codes.get(isbn)
+        if code is None:
+            author_code = self._code(author or '', self.author_codes, self.authors, self.by_author, 'author')
+            code = self.books.add()
+            self.book_codes[isbn] = code
+            self.isbns.append(isbn)
+            self.book_authors.append(author_code)
+            self.pending_keys.append(f'["book",{_quote(isbn)},{author_code}]')
+        return code
+
+    def _member_code(self, member_id):
+        code = self.member_codes.get(member_id)
+        if code is None:
+            code = self._code(member_id, self.member_codes, self.member_ids, self.members, 'member')
+        return code
+
+    def _code(self, key, codes, keys, counter, kind):
+        code = codes.get(key)
+        if code is None:
+            code = codes[key] = counter.add()
+            keys.append(key)
+            self.pending_keys.append(f'["{kind}",{_quote(key)}]')
+        return code
+
+    def _count(self, event, book, member, day):
+        if event == BORROW:
+            self.books.increment(book)
+            self.by_author.increment(self.book_authors[book])
+            self.members.increment(member)
+        self.days.add(event, day)
+
+    # --- Persistence ---
+
+    def staged(self):
+        """True if rows or dictionary lines are waiting for the next flush."""
+        return bool(self.pending['event'] or self.pending_keys)
+
+    def flush(self, sync=True):
+        """
+        Appends the staged rows (dictionary first, so every code on disk resolves).
+        With `sync` they are fsynced as well; without it they are handed to the OS,
+        which keeps them through a crash of this process but not of the machine, and
+        the next checkpoint() forces them to disk. Returns the number of rows written.
+        """
+        with self._lock:
+            count = len(self.pending['event'])
+            if count or self.pending_keys:
+                os.makedirs(self.directory, exist_ok=True)
+            if self.pending_keys:
+                self._append(KEYS_FILE, ('\n'.join(self.pending_keys) + '\n').encode('utf-8'))
+                self.pending_keys = []
+            if count:
+                for name, typecode in COLUMNS:
+                    self._append(name, self.pending[name].tobytes())
+                    self.pending[name] = array(typecode)
+                self.rows += count
+            if sync:
+                for name in sorted(self.unsynced, key=lambda name: name != KEYS_FILE):
+                    os.fsync(self.files[name])
+                self.unsynced.clear()
+        return count
+
+    def _append(self, name, data):
+        """Writes `data` at the end of file `name`, through a descriptor kept open for the next flush."""
+        fd = self.files.get(name)
+        if fd is None:
+            fd = self.files[name] = os.open(self._path(name), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+        self.unsynced.add(name)
+
+    def close(self):
+        """Fsyncs anything flushed without it and closes the files kept open for appending."""
+        with self._lock:
+            for name in self.unsynced:
+                os.fsync(self.files[name])
+            self.unsynced.clear()
+            _close_files(self.files)
+
+    def checkpoint(self):
+        """Flushes and fsyncs, then saves the rollups so the next open starts from here."""
+        self.flush()
+        with self._lock:
+            if not self.rows:
+                return
+            self._catch_up()
+            tmp_path = self._path(ROLLUPS_FILE + '.tmp')
+            with open(tmp_path, 'wb') as f:
+                first_day = self.days.first_day
+                f.write(ROLLUPS_HEADER.pack(ROLLUPS_MAGIC, self.rows, len(self.books), len(self.by_author),
+                                            len(self.members), -1 if first_day is None else first_day,
+                                            len(self.days.counts[0])))
+                for counter in (self.books, self.by_author, self.members):
+                    counter.write(f)
+                for counts in self.days.counts:
+                    counts.tofile(f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self._path(ROLLUPS_FILE))
+
+    def _load(self):
+        """Reads the dictionary and the checkpoint, then folds in the rows logged after it."""
+        if not os.path.isdir(self.directory):
+            return
+        self._read_keys()
+        # Columns are appended one after another, so a crash can leave some longer; cut them back
+        sizes = [os.path.getsize(self._path(name)) // array(typecode).itemsize
+                 if os.path.exists(self._path(name)) else 0 for name, typecode in COLUMNS]
+        self.rows = min(sizes)
+        for (name, typecode), size in zip(COLUMNS, sizes):
+            if size > self.rows:
+                with open(self._path(name), 'r+b') as f:
+                    f.truncate(self.rows * array(typecode).itemsize)
+
+        covered = self._read_rollups()
+        for counter, keys in ((self.books, self.isbns), (self.by_author, self.authors),
+                              (self.members, self.member_ids)):
+            counter.grow(len(keys))
+        self._fold(self._read_chunks(covered), self.rows - covered)
+        self.counted = self.rows
+
+    def _read_keys(self):
+        """
+        Loads the code dictionary. Lines are decoded in one pass as a JSON array; a torn
+        final line is cut off, and anything else that fails to parse is read line by line
+        up to the first bad one.
+        """
+        path = self._path(KEYS_FILE)
+        if not os.path.exists(path):
+            return
+        with open(path, 'rb+') as f:
+            data = f.read()
+            end = data.rfind(b'\n') + 1
+            try:
+                entries = json.loads(b'[' + data[:end - 1].replace(b'\n', b',') + b']') if end else []
+            except ValueError:
+                entries, end = [], 0
+                for line in data.splitlines(keepends=True):
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        break
+                    end += len(line)
+            f.truncate(end)
+
+        books = [entry for entry in entries if entry[0] == 'book']
+        self.isbns = [entry[1] for entry in books]
+        self.book_authors = array('I', [entry[2] for entry in books])
+        self.authors = [entry[1] for entry in entries if entry[0] == 'author']
+        self.member_ids = [entry[1] for entry in entries if entry[0] == 'member']
+        for codes, keys in ((self.book_codes, self.isbns), (self.author_codes, self.authors),
+                            (self.member_codes, self.member_ids)):
+            codes.update(zip(keys, range(len(keys))))
+
+    def _read_rollups(self):
+        """Loads the checkpoint if it matches the log; returns the number of rows it covers."""
+        path = self._path(ROLLUPS_FILE)
+        if not os.path.exists(path):
+            return 0
+        with open(path, 'rb') as f:
+            magic, rows, books, authors, members, first_day, days = ROLLUPS_HEADER.unpack(
+                f.read(ROLLUPS_HEADER.size))
+            if (magic != ROLLUPS_MAGIC or rows > self.rows or books > len(self.isbns)
+                    or authors > len(self.authors) or members > len(self.member_ids)):
+                return 0  # From another log, or the log was cut back; fold everything instead
+            for counter, size in ((self.books, books), (self.by_author, authors), (self.members, members)):
+                counter.read(f, size)
+            for counts in self.days.counts:
+                counts.fromfile(f, days)
+            self.days.first_day = None if first_day < 0 else first_day
+        return rows
+
+    def _catch_up(self):
+        """Counts the rows recorded since the last query into the rollups. Called with the lock held."""
+        total = len(self)
+        if self.counted == total:
+            return
+        chunks = self._read_chunks(self.counted) if self.counted < self.rows else iter(())
+        staged = [self.pending[name][max(self.counted - self.rows, 0):] for name, _ in COLUMNS]
+        self._fold(itertools.chain(chunks, [staged]), total - self.counted)
+        self.counted = total
+
+    def _fold(self, chunks, rows):
+        """
+        Counts `rows` rows, given as (events, books, members, days) chunks, into the
+        rollups. Fewer rows than books are counted row by row; more are tallied per
+        code in chunks and each counter is re-sorted once at the end.
+        """
+        if rows < len(self.books):
+            for events, books, members, days in chunks:
+                for event, book, member, day in zip(events, books, members, days):
+                    self._count(event, book, member, day)
+            return
+
+        if np is not None:
+            deltas = [np.zeros(len(counter), dtype=np.uint64)
+                      for counter in (self.books, self.by_author, self.members)]
+            book_authors = np.frombuffer(self.book_authors, dtype=np.uint32)
+            for events, books, members, days in chunks:
+                if not len(events):
+                    continue
+                events, books, members, days = (np.frombuffer(column, dtype=dtype) for column, dtype in
+                                                zip((events, books, members, days),
+                                                    (np.uint8, np.uint32, np.uint32, np.int32)))
+                borrowed = events == BORROW
+                for delta, codes in zip(deltas, (books[borrowed], book_authors[books[borrowed]],
+                                                 members[borrowed])):
+                    delta += np.bincount(codes, minlength=len(delta)).astype(np.uint64)
+                for event in (BORROW, RETURN):
+                    event_days = days[events == event]
+                    if len(event_days):
+                        first = int(event_days.min())
+                        self._add_days(event, first, np.bincount(event_days - first).tolist())
+        else:
+            deltas = [array('Q', bytes(8 * len(counter))) for counter in (self.books, self.by_author, self.members)]
+            book_deltas, author_deltas, member_deltas = deltas
+            day_counts = ({}, {})
+            for events, books, members, days in chunks:
+                for event, book, member, day in zip(events, books, members, days):
+                    if event == BORROW:
+                        book_deltas[book] += 1
+                        author_deltas[self.book_authors[book]] += 1
+                        member_deltas[member] += 1
+                    counts = day_counts[event]
+                    counts[day] = counts.get(day, 0) + 1
+            for event, counts in enumerate(day_counts):
+                for day, count in counts.items():
+                    self.days.add(event, day, count)
+        for counter, delta in zip((self.books, self.by_author, self.members), deltas):
+            counter.update(delta)
+
+    def _add_days(self, event, first, counts):
+        self.days.cover(first, first + len(counts) - 1)
+        totals, offset = self.days.counts[event], first - self.days.first_day
+        for index, count in enumerate(counts):
+            totals[offset + index] += count
+
+    def _read_chunks(self, start, stop=None):
+        """
+        Yields (events, books, members, days) arrays of up to CHUNK_ROWS rows from row
+        `start` up to `stop` (default: every row on disk).
+        """
+        stop = self.rows if stop is None else stop
+        files = [open(self._path(name), 'rb') for name, _ in COLUMNS]
+        try:
+            for f, (_, typecode) in zip(files, COLUMNS):
+                f.seek(start * array(typecode).itemsize)
+            row = start
+            while row < stop:
+                count = min(CHUNK_ROWS, stop - row)
+                chunk = []
+                for f, (_, typecode) in zip(files, COLUMNS):
+                    column = array(typecode)
+                    column.fromfile(f, count)
+                    chunk.append(column)
+                yield chunk
+                row += count
+        finally:
+            for f in files:
+                f.close()
+
+    # --- Queries ---
+
+    def top_books(self, n=100):
+        """[(ISBN, loans), ...] for the n most borrowed books."""
+        with self._lock:
+            self._catch_up()
+            return [(self.isbns[code], count) for code, count in self.books.top(n)]
+
+    def top_authors(self, n=100):
+        """[(author, loans), ...] for the n most borrowed authors."""
+        with self._lock:
+            self._catch_up()
+            return [(self.authors[code], count) for code, count in self.by_author.top(n)]
+
+    def top_members(self, n=100):
+        """[(member_id, loans), ...] for the n most active borrowers."""
+        with self._lock:
+            self._catch_up()
+            return [(self.member_ids[code], count) for code, count in self.members.top(n)]
+
+    def loans_of(self, isbn):
+        """How many times a book has been borrowed."""
+        with self._lock:
+            self._catch_up()
+            code = self.book_codes.get(isbn)
+            return 0 if code is None else self.books.counts[code]
+
+    def daily(self, first, last):
+        """[(ordinal, borrows, returns), ...] for each day from `first` to `last` (ordinals)."""
+        with self._lock:
+            self._catch_up()
+            return self.days.between(first, last)
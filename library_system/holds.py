@@ -0,0 +1,213 @@
+# library_system/holds.py
+
+import heapq
+import json
+import os
+import threading
+from collections import deque
+from .journal import TransactionJournal
+
+
+class HoldQueues:
+    """
+    Holds on checked-out books. Each ISBN has a first-come-first-served deque of
+    waiting members; when the book comes back it is set aside ("ready") for the
+    first member still waiting, until a pickup date. One heap orders every ready
+    hold by that date, so expired holds are popped off the top in bulk without
+    looking at any queue.
+
+    A cancelled hold stays in its deque and is skipped when it reaches the front.
+    Each hold gets a ticket number, so a member who cancels and queues again is not
+    served from their old place. Changes are journaled to `path` + 'l' (staged
+    until flush(), like the transaction journal) and compact() writes the `path`
+    snapshot.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.queues = {}    # Key: ISBN, Value: deque of (ticket, member_id), oldest first
+        self.tickets = {}   # Key: (ISBN, member_id), Value: ticket of the live waiting hold
+        self.waiting = {}   # Key: ISBN, Value: number of live waiting holds
+        self.ready = {}     # Key: ISBN, Value: (member_id, pickup-by date ordinal)
+        self.expiries = []  # Heap of (pickup-by ordinal, ISBN, member_id); entries no longer in ready are skipped
+        self.next_ticket = 0
+        self.journal = TransactionJournal(path + 'l')
+        self._journaling = True  # Disabled while replaying the journal itself
+        self._lock = threading.Lock()
+        self._load()
+
+    def __len__(self):
+        return len(self.tickets) + len(self.ready)
+
+    # --- Queries ---
+
+    def holder(self, isbn, today):
+        """The member a book is set aside for on `today` (an ordinal), or None."""
+        ready = self.ready.get(isbn)
+        return ready[0] if ready is not None and ready[1] >= today else None
+
+    def has_hold(self, isbn, member_id):
+        """True if the member is waiting for the book or it is set aside for them."""
+        ready = self.ready.get(isbn)
+        return (isbn, member_id) in self.tickets or (ready is not None and ready[0] == member_id)
+
+    def queue_length(self, isbn):
+        return self.waiting.get(isbn, 0)
+
+    def staged(self, today):
+        """True if journal records are waiting for the next flush, or a hold set aside lapsed before `today`."""
+        return bool(self.journal.pending) or bool(self.expiries and self.expiries[0][0] < today)
+
+    def involves(self, isbn):
+        """True if anyone is waiting for the book or it is set aside; a dict lookup, so cheap for every loan."""
+        return isbn in self.queues or isbn in self.ready
+
+    # --- Changes ---
+
+    def place(self, isbn, member_id):
+        """Queues a hold; returns the member's position in the queue."""
+        with self._lock:
+            ticket = self.next_ticket
+            self.next_ticket += 1
+            self.queues.setdefault(isbn, deque()).append((ticket, member_id))
+            self.tickets[(isbn, member_id)] = ticket
+            self.waiting[isbn] = self.waiting.get(isbn, 0) + 1
+            self._record('place', isbn=isbn, member_id=member_id)
+            return self.waiting[isbn]
+
+    def cancel(self, isbn, member_id):
+        """Drops the member's hold. Returns 'waiting' or 'ready' for the kind it was, or None."""
+        with self._lock:
+            if self._drop_waiting(isbn, member_id):
+                state = 'waiting'
+            elif self.ready.get(isbn, (None,))[0] == member_id:
+                del self.ready[isbn]
+                state = 'ready'
+            else:
+                return None
+            self._record('cancel', isbn=isbn, member_id=member_id)
+            return state
+
+    def fulfil(self, isbn, member_id):
+        """Clears the member's hold on a book they have just borrowed; True if they had one."""
+        with self._lock:
+            if self.ready.get(isbn, (None,))[0] == member_id:
+                del self.ready[isbn]
+            elif not self._drop_waiting(isbn, member_id):
+                return False
+            self._record('fulfil', isbn=isbn, member_id=member_id)
+            return True
+
+    def promote(self, isbn, until, eligible=None):
+        """
+        Sets the book aside until `until` (an ordinal) for the first live hold in its
+        queue whose member passes `eligible(member_id)` (default: anyone): O(1) pops
+        from the deque plus an O(log n) heap push. Members passed over keep their
+        place. Returns the member's ID, or None if nobody eligible is waiting.
+        """
+        with self._lock:
+            queue = self.queues.get(isbn)
+            passed = []  # Live holds passed over, oldest first
+            while queue:
+                ticket, member_id = queue.popleft()
+                if self.tickets.get((isbn, member_id)) != ticket:
+                    continue  # Cancelled or fulfilled
+                if eligible is not None and not eligible(member_id):
+                    passed.append((ticket, member_id))
+                    continue
+                queue.extendleft(reversed(passed))
+                self._drop_waiting(isbn, member_id)
+                self.ready[isbn] = (member_id, until)
+                heapq.heappush(self.expiries, (until, isbn, member_id))
+                self._record('ready', isbn=isbn, member_id=member_id, until=until)
+                return member_id
+            if passed:
+                queue.extend(passed)
+            else:
+                self.queues.pop(isbn, None)
+            return None
+
+    def expire(self, today):
+        """Releases every ready hold whose pickup date is before `today`; returns their ISBNs."""
+        expired = []
+        with self._lock:
+            while self.expiries and self.expiries[0][0] < today:
+                until, isbn, member_id = heapq.heappop(self.expiries)
+                if self.ready.get(isbn) == (member_id, until):
+                    del self.ready[isbn]
+                    self._record('expire', isbn=isbn, member_id=member_id)
+                    expired.append(isbn)
+        return expired
+
+    def _drop_waiting(self, isbn, member_id):
+        """Forgets a waiting hold (its deque entry is skipped later); True if there was one."""
+        if self.tickets.pop((isbn, member_id), None) is None:
+            return False
+        self.waiting[isbn] -= 1
+        if not self.waiting[isbn]:
+            del self.waiting[isbn]
+            del self.queues[isbn]  # Only skipped entries are left
+        return True
+
+    def _record(self, op, **fields):
+        if self._journaling:
+            self.journal.record(op, **fields)
+
+    # --- Persistence ---
+
+    def flush(self):
+        return self.journal.flush()
+
+    def compact(self):
+        """Writes the live holds to the snapshot file and empties the journal."""
+        with self._lock:
+            if not len(self) and not os.path.exists(self.path):
+                self.journal.reset()
+                return
+            queues = {isbn: [[ticket, member_id] for ticket, member_id in queue
+                             if self.tickets.get((isbn, member_id)) == ticket]
+                      for isbn, queue in self.queues.items()}
+            data = {'next_ticket': self.next_ticket,
+                    'queues': {isbn: queue for isbn, queue in queues.items() if queue},
+                    'ready': [[isbn, member_id, until] for isbn, (member_id, until) in self.ready.items()]}
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, separators=(',', ':'))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            self.journal.reset()
+
+    def _load(self):
+        """Reads the snapshot, then replays the journal on top."""
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.next_ticket = data['next_ticket']
+            for isbn, queue in data['queues'].items():
+                self.queues[isbn] = deque((ticket, member_id) for ticket, member_id in queue)
+                self.tickets.update(((isbn, member_id), ticket) for ticket, member_id in queue)
+                self.waiting[isbn] = len(queue)
+            self.ready = {isbn: (member_id, until) for isbn, member_id, until in data['ready']}
+            self.expiries = [(until, isbn, member_id) for isbn, (member_id, until) in self.ready.items()]
+            heapq.heapify(self.expiries)
+
+        self._journaling = False
+        try:
+            for record in self.journal.read():
+                op, isbn, member_id = record['op'], record['isbn'], record['member_id']
+                if op == 'place':
+                    self.place(isbn, member_id)
+                elif op == 'cancel':
+                    self.cancel(isbn, member_id)
+                elif op == 'fulfil':
+                    self.fulfil(isbn, member_id)
+                elif op == 'ready':
+                    # The member it was set aside for; anyone passed over stays queued
+                    self.promote(isbn, record['until'], lambda candidate: candidate == member_id)
+                elif op == 'expire':
+                    if self.ready.get(isbn, (None,))[0] == member_id:
+                        del self.ready[isbn]  # Its heap entry is skipped when popped
+        finally:
+            self._journaling = True
@@ -0,0 +1,77 @@
+# library_system/journal.py
+
+import json
+import os
+import threading
+
+_encoder = json.JSONEncoder(separators=(',', ':'))
+
+class TransactionJournal:
+    """
+    Append-only log of library transactions stored as one compact JSON record per line.
+    Records are staged in memory and appended to disk in one write by flush(), so saving
+    costs O(changes) instead of rewriting the whole collection.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.pending = []   # Serialized records not yet written to disk
+        self.size = 0       # Number of records currently on disk
+        self._lock = threading.Lock()  # Guards pending/size against concurrent transactions
+
+    def record(self, op, **fields):
+        """Stages one transaction record. Fields are serialized immediately so that
+        later changes to the objects involved cannot alter what gets written."""
+        fields['op'] = op
+        line = _encoder.encode(fields)
+        with self._lock:
+            self.pending.append(line)
+
+    def read(self):
+        """
+        Returns the list of records on disk, in order.
+        A torn final line (from a crash mid-append) is discarded and truncated away,
+        so the next append starts on a clean line boundary.
+        """
+        records = []
+        if not os.path.exists(self.path):
+            self.size = 0
+            return records
+
+        good_offset = 0
+        with open(self.path, 'rb+') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    break
+                good_offset += len(line)
+            f.truncate(good_offset)
+
+        self.size = len(records)
+        return records
+
+    def flush(self):
+        """Appends all staged records to disk and forces them to stable storage."""
+        with self._lock:
+            pending, self.pending = self.pending, []
+            if not pending:
+                return 0
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'a') as f:
+                f.write('\n'.join(pending) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            self.size += len(pending)
+        return len(pending)
+
+    def reset(self):
+        """Empties the journal after its contents have been folded into a snapshot."""
+        with self._lock:
+            self.pending = []
+            self.size = 0
+            if os.path.exists(self.path):
+                with open(self.path, 'w') as f:
+                    os.fsync(f.fileno())
@@ -2,20 +2,98 @@
 
 import json
 import os
+from datetime import date, timedelta
 from .book import Book # Assuming book.py is in the same package
 from .member import Member
+from .search import BookSearchIndex
+from .directory import MemberDirectory
+from .journal import TransactionJournal
+from .overdue import DueDateIndex
+from .streaming import LazyRecordMap, iter_json_object
+from .compact import ColumnarBookStore, CompactBook, CompactMember
+from .transactions import LockStripes, book_key, member_key
+from .bulk import validate_row
+from .sqlite_store import SQLiteStore
+from .fines import FinePolicy, fine_report
+from .snapshot import MappedSnapshot, MappedBookMap, MappedMemberMap, MappedLoanIndex, write_snapshot
+from .history import LoanHistory, BORROW, RETURN
+from .recommend import CoBorrowIndex
+from .holds import HoldQueues
+from .reporting import REPORTS, CAN_FORK, start_report
 
 class Library:
     """Manages the collection of books and members, and handles all transactions."""
 
     BOOKS_FILE = 'data/books.json'
     MEMBERS_FILE = 'data/members.json'
+    JOURNAL_FILE = 'data/journal.jsonl'
+    DATABASE_FILE = 'data/library.db'
+    SNAPSHOT_FILE = 'data/library.snap'  # Binary snapshot of storage='mapped'; its journal adds '.jsonl'
+    HISTORY_DIRECTORY = 'data/history'  # Columnar log of every borrow and return, for any storage
+    HOLDS_FILE = 'data/holds.json'  # Hold queues, for any storage; their journal adds 'l'
+    # Every file or directory above with its name inside a data directory; point them
+    # all into another directory to run a separate library (shards, benchmarks)
+    DATA_FILES = {'BOOKS_FILE': 'books.json', 'MEMBERS_FILE': 'members.json', 'JOURNAL_FILE': 'journal.jsonl',
+                  'DATABASE_FILE': 'library.db', 'SNAPSHOT_FILE': 'library.snap',
+                  'HISTORY_DIRECTORY': 'history', 'HOLDS_FILE': 'holds.json'}
+    HOLD_DAYS = 3  # Days a returned book is kept for the member first in its hold queue
+    COMPACT_THRESHOLD = 1000  # Journal records on disk before save_data writes a full snapshot
+    # 'full' decodes each JSON file at once, 'stream' parses it record by record,
+    # and 'lazy' streams as well but only builds a Book when it is first accessed.
+    LOAD_MODES = ('full', 'stream', 'lazy')
+    # 'objects' keeps regular Book/Member instances, 'slots' uses the compact slotted
+    # classes, and 'columnar' stores books in typed arrays behind BookView objects.
+    # All three share the JSON snapshot files.
+    SNAPSHOT_BACKENDS = ('objects', 'slots', 'columnar')
+    # 'sqlite' keeps everything in DATABASE_FILE and reads rows on demand (load_mode
+    # does not apply; use migrate.py to move the JSON files into a database).
+    # 'mapped' memory-maps the binary SNAPSHOT_FILE and decodes records on lookup, so
+    # opening takes milliseconds at any size (load_mode does not apply either).
+    STORAGE_BACKENDS = SNAPSHOT_BACKENDS + ('sqlite', 'mapped')
+    FINE_POLICY = FinePolicy()  # $0.50 per day overdue; replace (or set per instance) to change fines
 
-    def __init__(self):
+    def __init__(self, load_mode='full', storage='objects'):
         """Initializes the library with empty collections and loads data."""
+        if load_mode not in self.LOAD_MODES:
+            raise ValueError(f"Unknown load mode '{load_mode}'. Expected one of {self.LOAD_MODES}.")
+        if storage not in self.STORAGE_BACKENDS:
+            raise ValueError(f"Unknown storage '{storage}'. Expected one of {self.STORAGE_BACKENDS}.")
+        if load_mode == 'lazy' and storage == 'columnar':
+            raise ValueError("Lazy loading cannot be combined with columnar storage.")
+        self.load_mode = load_mode
+        self.storage = storage
+        self.book_class = Book if storage in ('objects', 'sqlite', 'mapped') else CompactBook
+        self.member_class = Member if storage in ('objects', 'sqlite', 'mapped') else CompactMember
         # Dictionaries map unique IDs (ISBN, member_id) to objects
-        self.books = {}    # Key: ISBN, Value: Book object
+        self.books = ColumnarBookStore() if storage == 'columnar' else {}  # Key: ISBN, Value: Book object
         self.members = {}  # Key: member_id, Value: Member object
+        self.search_index = BookSearchIndex()
+        self.member_directory = MemberDirectory()  # Name lookups
+        self.loans = DueDateIndex()  # Active loans ordered by due date
+        self.store = None
+        if storage == 'sqlite':
+            # Tables stand in for the dicts, the loan index and the journal
+            self.store = SQLiteStore(self._get_file_path(self.DATABASE_FILE),
+                                     self.book_class.from_dict, self.member_class.from_dict)
+            self.books, self.members, self.loans = self.store.books, self.store.members, self.store.loans
+            self.search_index = None  # Built on the first search
+            self.member_directory = None  # Built on the first member search
+            self.journal = self.store
+        elif storage == 'mapped':
+            # Records stay in the mapped file until they change (see snapshot.py)
+            snapshot = MappedSnapshot(self._get_file_path(self.SNAPSHOT_FILE))
+            self.books, self.members = MappedBookMap(snapshot), MappedMemberMap(snapshot)
+            self.loans = MappedLoanIndex(self.books)
+            self.search_index = None  # Built on the first search
+            self.member_directory = None  # Built on the first member search
+            self.journal = TransactionJournal(self._get_file_path(self.SNAPSHOT_FILE + '.jsonl'))
+        else:
+            self.journal = TransactionJournal(self._get_file_path(self.JOURNAL_FILE))
+        self.history = LoanHistory(self._get_file_path(self.HISTORY_DIRECTORY))
+        self.recommendations = CoBorrowIndex(self.history)  # "Also borrowed", counted from the history
+        self.holds = HoldQueues(self._get_file_path(self.HOLDS_FILE))  # Journals its own changes
+        self._journaling = True  # Disabled while replaying the journal itself
+        self.locks = LockStripes()  # Per-ISBN / per-member locks for concurrent transactions
         self.load_data()
         
     # --- Data Persistence Methods ---
@@ -27,73 +105,415 @@ class Library:
         return os.path.join(base_dir, filename)
 
     def load_data(self):
-        """Loads books and members from JSON files."""
+        """Loads the last snapshot from the JSON files, then replays the journal on top."""
+        if self.store is not None:
+            print(f"\nOpened {len(self.books)} books and {len(self.members)} members in the database.")
+            return
+        if self.storage == 'mapped':
+            replayed = self._replay_journal()
+            print(f"\nMapped {len(self.books)} books and {len(self.members)} members from the snapshot.")
+            if replayed:
+                print(f"Replayed {replayed} journal entries.")
+            return
+
+        # Finish a snapshot whose files were all written but not all renamed into place
+        self._finish_snapshot(self._snapshot_marker_path())
+
         # Load Books
         books_path = self._get_file_path(self.BOOKS_FILE)
         if os.path.exists(books_path):
-            with open(books_path, 'r') as f:
-                data = json.load(f)
-                for isbn, book_data in data.items():
-                    self.books[isbn] = Book.from_dict(book_data)
+            if self.load_mode == 'full':
+                with open(books_path, 'r') as f:
+                    data = json.load(f)
+                    for isbn, book_data in data.items():
+                        book = self.book_class.from_dict(book_data)
+                        self.books[isbn] = book
+                        self._index_book(book)
+            elif self.load_mode == 'stream':
+                for isbn, book_data, _, _ in iter_json_object(books_path):
+                    book = self.book_class.from_dict(book_data)
+                    self.books[isbn] = book
+                    self._index_book(book)
+            else:
+                # Index straight from the record; the Book is built on first access
+                self.books = LazyRecordMap(books_path, self.book_class.from_dict)
+                for isbn, book_data, start, end in iter_json_object(books_path):
+                    self.books.add_offset(isbn, start, end)
+                    self._index_record(isbn, book_data)
         
         # Load Members
         members_path = self._get_file_path(self.MEMBERS_FILE)
         if os.path.exists(members_path):
-            with open(members_path, 'r') as f:
-                data = json.load(f)
-                for member_id, member_data in data.items():
-                    self.members[member_id] = Member.from_dict(member_data)
+            if self.load_mode == 'full':
+                with open(members_path, 'r') as f:
+                    data = json.load(f)
+                    for member_id, member_data in data.items():
+                        self.members[member_id] = self.member_class.from_dict(member_data)
+                        self.member_directory.add(member_id, member_data['name'])
+            else:
+                for member_id, member_data, _, _ in iter_json_object(members_path):
+                    self.members[member_id] = self.member_class.from_dict(member_data)
+                    self.member_directory.add(member_id, member_data['name'])
+
+        # Replay transactions recorded since the snapshot
+        replayed = self._replay_journal()
         
         print(f"\nLoaded {len(self.books)} books and {len(self.members)} members from file.")
+        if replayed:
+            print(f"Replayed {replayed} journal entries.")
+
+    def _replay_journal(self):
+        """
+        Re-applies journaled transactions through the normal methods.
+        Replay is idempotent (duplicate adds and no-op borrows/returns are rejected by the
+        usual checks), so a crash between writing a snapshot and truncating the journal
+        is harmless. Both snapshot files always come from the same compaction (see
+        _compact), so a borrow is never half in the snapshot.
+        """
+        records = self.journal.read()
+        self._journaling = False
+        try:
+            for record in records:
+                self._replay(record)
+        finally:
+            self._journaling = True
+        return len(records)
+
+    def _replay(self, record):
+        """Re-applies one journal record."""
+        op = record['op']
+        if op == 'add_book':
+            self.add_book(self.book_class.from_dict(record['book']))
+        elif op == 'add_books':
+            for book_data in record['books']:
+                self.add_book(self.book_class.from_dict(book_data))
+        elif op == 'register_member':
+            self.register_member(self.member_class.from_dict(record['member']))
+        elif op == 'borrow_book':
+            success, _ = self.borrow_book(record['isbn'], record['member_id'])
+            if success:
+                # Keep the original due date rather than one computed from today
+                self.books[record['isbn']].due_date = record['due_date']
+                self.loans.add(record['isbn'], record['due_date'])
+        elif op == 'return_book':
+            self.return_book(record['isbn'], record['member_id'])
+        elif op == 'borrow_books':
+            success, _ = self.borrow_batch([(isbn, member_id) for isbn, member_id, _ in record['loans']])
+            if success:
+                for isbn, _, due_date in record['loans']:
+                    self.books[isbn].due_date = due_date
+                    self.loans.add(isbn, due_date)
+        elif op == 'return_books':
+            self.return_batch(record['loans'])
+
+    def _record(self, op, **fields):
+        """Stages a journal record for a successful transaction."""
+        if self._journaling:
+            self.journal.record(op, **fields)
+
+    def _record_loan(self, event, book, member_id):
+        """Adds a borrow or return to the loan history (replayed ones are in it already)."""
+        if self._journaling:
+            self.history.record(event, book.isbn, book.author, member_id)
+            if event == BORROW:
+                self.recommendations.record(book.isbn, member_id)
+
+    def _record_loans(self, event, pairs):
+        """Adds a batch of (Book, member_id) borrows or returns to the loan history."""
+        if self._journaling:
+            self.history.record_many(event, [(book.isbn, book.author, member_id) for book, member_id in pairs])
+            if event == BORROW:
+                self.recommendations.record_many([(book.isbn, member_id) for book, member_id in pairs])
+
+    def has_unsaved_changes(self):
+        """True if save_data has work to do: staged journal, history or hold records, or a lapsed hold."""
+        return bool(self.journal.pending) or self.history.staged() or self.holds.staged(date.today().toordinal())
 
     def save_data(self):
-        """Saves books and members data to JSON files."""
+        """
+        Persists changes since the last save. Normally this only appends the staged
+        journal records; once the journal grows past COMPACT_THRESHOLD a full snapshot
+        is written instead. Loan history rows are written first, so every journaled
+        loan is also in the history; they are fsynced at the next compaction rather
+        than on every save. Lapsed holds are released first, passing their books on.
+        """
+        self.expire_holds()
+        self.history.flush(sync=False)
+        if self.journal.size + len(self.journal.pending) >= self.COMPACT_THRESHOLD:
+            self.compact()
+        else:
+            self.journal.flush()
+            self.holds.flush()
+            
+        print("\nData saved successfully.")
+
+    def compact(self):
+        """Writes books and members to the JSON snapshot files and empties the journal."""
+        # Wait for in-flight transactions so the snapshot is consistent
+        with self.locks.hold_all():
+            self.history.checkpoint()
+            self.recommendations.checkpoint()
+            self._compact()
+            self.holds.compact()
+
+    def close(self):
+        """Releases open files: the history log, the database connection, or a lazy load's snapshot handle."""
+        self.history.close()
+        if self.store is not None:
+            self.store.close()
+        elif self.storage == 'mapped':
+            self.books.snapshot.close()
+        elif isinstance(self.books, LazyRecordMap):
+            self.books.close()
+
+    def _compact(self):
+        if self.store is not None:
+            # The tables are the snapshot; fold the write-ahead log into the database file
+            self.store.checkpoint()
+            return
+        if self.storage == 'mapped':
+            self._compact_mapped()
+            return
+
         # Ensure data directory exists
         data_dir = os.path.dirname(self._get_file_path(self.BOOKS_FILE))
         os.makedirs(data_dir, exist_ok=True)
 
-        # Save Books
-        books_data = {isbn: book.to_dict() for isbn, book in self.books.items()}
-        with open(self._get_file_path(self.BOOKS_FILE), 'w') as f:
-            json.dump(books_data, f, indent=4)
+        # Both files are written next to the current ones first, then swapped in
+        # together (see _commit_snapshot), so a crash never pairs new books with old members
+        books_path = self._get_file_path(self.BOOKS_FILE)
+        members_path = self._get_file_path(self.MEMBERS_FILE)
+
+        # Save Books (records never materialized by a lazy load are copied as-is)
+        if isinstance(self.books, LazyRecordMap):
+            books_data = self.books.iter_serialized(self._serialize)
+        else:
+            books_data = ((isbn, self._serialize(book)) for isbn, book in self.books.items())
+        self._write_snapshot_file(books_path + '.new', books_data)
             
         # Save Members
-        members_data = {mid: member.to_dict() for mid, member in self.members.items()}
-        with open(self._get_file_path(self.MEMBERS_FILE), 'w') as f:
-            json.dump(members_data, f, indent=4)
-            
-        print("\nData saved successfully.")
+        members_data = ((mid, self._serialize(member)) for mid, member in self.members.items())
+        self._write_snapshot_file(members_path + '.new', members_data)
+
+        self._commit_snapshot(self._snapshot_marker_path(), [books_path, members_path])
+
+        # Everything in the journal is now part of the snapshot
+        self.journal.reset()
+
+    def _compact_mapped(self):
+        """Writes a new binary snapshot (copying unchanged records) and maps it in place of the old one."""
+        path = self._get_file_path(self.SNAPSHOT_FILE)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_snapshot(path, self.books, self.members)
+        previous = self.books.snapshot
+        snapshot = MappedSnapshot(path)
+        self.books.remap(snapshot)
+        self.members.remap(snapshot)
+        self.loans.remap()
+        previous.close()
+        self.journal.reset()
+
+    def _snapshot_marker_path(self):
+        """Lists the snapshot files being swapped in while a compaction commits."""
+        return self._get_file_path(self.BOOKS_FILE) + '.commit'
+
+    @classmethod
+    def _commit_snapshot(cls, marker_path, paths):
+        """
+        Swaps each fully written `path + '.new'` in for `path` as one step. The marker
+        listing them is written (atomically) first; once it exists the new snapshot
+        counts as committed, and _finish_snapshot completes the renames, now or after
+        a crash. Without the marker the old files are still the snapshot.
+        """
+        tmp_path = marker_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(paths, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, marker_path)
+        cls._finish_snapshot(marker_path)
+
+    @staticmethod
+    def _finish_snapshot(marker_path):
+        """Renames the committed files still waiting under the marker, then removes it."""
+        if not os.path.exists(marker_path):
+            return
+        with open(marker_path, encoding='utf-8') as f:
+            paths = json.load(f)
+        for path in paths:
+            if os.path.exists(path + '.new'):
+                os.replace(path + '.new', path)
+        os.remove(marker_path)
+
+    @staticmethod
+    def _serialize(obj):
+        """Compact JSON text for a Book or Member."""
+        return json.dumps(obj.to_dict(), separators=(',', ':'))
+
+    @staticmethod
+    def _write_snapshot_file(path, records):
+        """
+        Streams (key, JSON text) pairs as one JSON object into a temporary file and
+        atomically renames it over `path`, so a crash mid-write leaves the previous
+        snapshot intact.
+        """
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write('{')
+            separator = ''
+            for key, text in records:
+                f.write(f"{separator}{json.dumps(key)}:{text}")
+                separator = ','
+            f.write('}')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
         
     # --- Book Management Methods ---
 
     def add_book(self, book):
-        """Adds a new Book object to the library collection."""
-        if book.isbn in self.books:
-            return False, "Error: Book with this ISBN already exists."
-        self.books[book.isbn] = book
+        """
+        Adds a new Book object to the library collection. Columnar storage copies it
+        into its columns, so change the book through find_book() afterwards.
+        """
+        with self.locks.hold([book_key(book.isbn)]):
+            if book.isbn in self.books:
+                return False, "Error: Book with this ISBN already exists."
+            self.books[book.isbn] = book
+            self._index_book(book)
+            self._record('add_book', book=book.to_dict())
         return True, f"Book '{book.title}' added successfully."
 
+    def add_books_bulk(self, rows):
+        """
+        Validates and adds a batch of catalog rows (dicts with title, author, isbn and an
+        optional publication_year) under one lock acquisition and one journal record.
+        ISBNs duplicated within the batch or already in the catalog are rejected.
+        Returns (added_count, [(row_index, reason), ...]).
+        """
+        valid = {}     # Key: ISBN, Value: validated record (first occurrence wins)
+        rejected = []
+        for index, row in enumerate(rows):
+            record, reason = validate_row(row)
+            if record is None:
+                rejected.append((index, reason))
+            elif record['isbn'] in valid:
+                rejected.append((index, "Duplicate ISBN in file"))
+            else:
+                record['index'] = index
+                valid[record['isbn']] = record
+
+        with self.locks.hold_all():
+            existing = {isbn for isbn in valid if isbn in self.books}
+            added = []
+            for isbn, record in valid.items():
+                if isbn in existing:
+                    continue
+                book = self.book_class(record['title'], record['author'], isbn,
+                                       record['publication_year'])
+                self.books[isbn] = book
+                self._index_book(book)
+                added.append(book.to_dict())
+            if added:
+                self._record('add_books', books=added)
+
+        rejected.extend((valid[isbn]['index'], "Book with this ISBN already exists") for isbn in existing)
+        rejected.sort()
+        return len(added), rejected
+
     def find_book(self, isbn):
         """Returns a Book object given its ISBN, or None."""
         return self.books.get(isbn)
 
+    def _index_book(self, book):
+        """Adds a book to the search indexes and, if it is on loan, to the due-date index."""
+        if self.search_index is not None:
+            self.search_index.add(book.isbn, book.title, book.author,
+                                  getattr(book, 'publication_year', None))
+        if not book.available and book.due_date:
+            self.loans.add(book.isbn, book.due_date)
+
+    def _index_record(self, isbn, data):
+        """Same as _index_book, but from a decoded JSON record (used by lazy loading)."""
+        self.search_index.add(isbn, data.get('title'), data.get('author'),
+                              data.get('publication_year'))
+        if not data.get('available', True) and data.get('due_date'):
+            self.loans.add(isbn, data['due_date'])
+
+    def search_books(self, query='', year=None, page=1, page_size=10):
+        """
+        Searches titles and authors (last word matches as a prefix), optionally
+        filtered by publication year. Returns (total_matches, list of Book objects).
+        """
+        if self.search_index is None:
+            self._build_search_index()
+        total, isbns = self.search_index.search(query, year=year, page=page, page_size=page_size)
+        books = [self.books[isbn] for isbn in isbns if isbn in self.books]
+        return total, books
+
+    def _build_search_index(self):
+        """Indexes the whole database catalog (SQLite storage builds its index on demand)."""
+        with self.locks.hold_all():
+            if self.search_index is None:
+                index = BookSearchIndex()
+                for record in self.books.iter_records():
+                    index.add(record['isbn'], record['title'], record['author'], record['publication_year'])
+                self.search_index = index
+
     # --- Member Management Methods ---
     
     def register_member(self, member):
         """Registers a new Member object."""
-        if member.member_id in self.members:
-            return False, "Error: Member ID already registered."
-        self.members[member.member_id] = member
+        with self.locks.hold([member_key(member.member_id)]):
+            if member.member_id in self.members:
+                return False, "Error: Member ID already registered."
+            self.members[member.member_id] = member
+            if self.member_directory is not None:
+                self.member_directory.add(member.member_id, member.name)
+            self._record('register_member', member=member.to_dict())
         return True, f"Member '{member.name}' registered with ID {member.member_id}."
 
     def find_member(self, member_id):
         """Returns a Member object given its ID, or None."""
         return self.members.get(member_id)
 
+    def search_members(self, name, limit=10):
+        """
+        Members whose names best match `name`, best first, tolerating typos and
+        treating the last word as a prefix. Returns a list of Member objects.
+        """
+        if self.member_directory is None:
+            self._build_member_directory()
+        member_ids = self.member_directory.search(name, limit)
+        return [self.members[member_id] for member_id in member_ids if member_id in self.members]
+
+    def _build_member_directory(self):
+        """Indexes every member's name (database and mapped storage build it on demand)."""
+        with self.locks.hold_all():
+            if self.member_directory is None:
+                directory = MemberDirectory()
+                for record in self.members.iter_records():
+                    directory.add(record['member_id'], record['name'])
+                self.member_directory = directory
+
     # --- Core Transaction Methods ---
 
+    def transaction(self, isbns=(), member_ids=()):
+        """
+        Context manager that locks the given books and members for a multi-step operation.
+        Locks are striped and taken in a fixed order, so transactions on unrelated books
+        and members run in parallel and overlapping ones cannot deadlock.
+        """
+        keys = [book_key(isbn) for isbn in isbns] + [member_key(mid) for mid in member_ids]
+        return self.locks.hold(keys)
+
     def borrow_book(self, isbn, member_id):
         """Handles the book borrowing transaction."""
+        with self.transaction([isbn], [member_id]):
+            return self._borrow_book(isbn, member_id)
+
+    def _borrow_book(self, isbn, member_id):
+        """Borrow transaction body; the caller must hold the book and member locks."""
         book = self.find_book(isbn)
         member = self.find_member(member_id)
 
@@ -101,6 +521,8 @@ class Library:
             return False, "Book not found."
         if not member:
             return False, "Member not found."
+        if self._held_for_other(isbn, member_id):
+            return False, f"Book '{book.title}' is on hold for another member."
 
         # 1. Check if the book is available and update book state
         success_book, msg_book = book.check_out(member_id)
@@ -113,11 +535,20 @@ class Library:
             # If member failed, revert book state to avoid inconsistency
             book.return_book() 
             return False, msg_member
-            
+
+        self.loans.add(isbn, book.due_date)
+        self._record('borrow_book', isbn=isbn, member_id=member_id, due_date=book.due_date)
+        self._record_loan(BORROW, book, member_id)
+        self._fulfil_hold(isbn, member_id)
         return True, f"SUCCESS: Book '{book.title}' borrowed by {member.name}. Due: {book.due_date}"
 
     def return_book(self, isbn, member_id):
         """Handles the book return transaction."""
+        with self.transaction([isbn], [member_id]):
+            return self._return_book(isbn, member_id)
+
+    def _return_book(self, isbn, member_id):
+        """Return transaction body; the caller must hold the book and member locks."""
         book = self.find_book(isbn)
         member = self.find_member(member_id)
 
@@ -130,42 +561,297 @@ class Library:
         if book.borrowed_by != member_id or isbn not in member.borrowed_books:
             return False, "Error: Borrow records are inconsistent. Check book status."
 
+        # Days overdue must be read before the return clears the due date
+        days = book.days_overdue()
+
         # 1. Update book state and check for overdue
         success_book, msg_book = book.return_book()
 
         # 2. Update member state
         success_member, msg_member = member.return_book(isbn)
+        self.loans.remove(isbn)
         
-        # 3. Handle potential fine calculation (simplified for now)
-        fine_msg = ""
-        if "was overdue" in msg_book:
-            days = book.days_overdue()
-            # Simple fine calculation: $0.50 per day overdue
-            fine = days * 0.50
-            fine_msg = f" Note: Book was overdue by {days} days. Fine: ${fine:.2f}"
-            
-        return True, f"SUCCESS: Book returned. {msg_book}.{fine_msg}"
+        self._record('return_book', isbn=isbn, member_id=member_id)
+        self._record_loan(RETURN, book, member_id)
+
+        # 3. Fine under the library's fine policy, then the hold queue
+        return True, f"SUCCESS: Book returned. {msg_book}.{self._fine_message(days)}{self._promote_hold(book)}"
+
+    def borrow_books(self, member_id, isbns):
+        """Checks out a stack of books for one member, all or nothing (see borrow_batch)."""
+        return self.borrow_batch([(isbn, member_id) for isbn in isbns])
+
+    def return_books(self, member_id, isbns):
+        """Returns a stack of books for one member, all or nothing (see return_batch)."""
+        return self.return_batch([(isbn, member_id) for isbn in isbns])
+
+    def borrow_batch(self, loans):
+        """
+        Borrows a batch of (isbn, member_id) pairs, for one or several members, all or
+        nothing. The whole batch is validated first: every book and member exists, no
+        ISBN is listed twice, every book is available, and no member would go past
+        Member.MAX_BOOKS counting the batch. Nothing changes unless all of it passes,
+        and the batch takes its locks once and writes one journal record.
+        Returns (True, message) or (False, "<isbn>: <reason>") for the first problem.
+        """
+        loans = list(loans)
+        if not loans:
+            return False, "No books to borrow."
+        with self.transaction([isbn for isbn, _ in loans], [member_id for _, member_id in loans]):
+            error, pairs = self._check_batch(loans, borrowing=True)
+            if error:
+                return False, error
+            entries = []
+            for (book, member), (isbn, member_id) in zip(pairs, loans):
+                book.check_out(member_id)
+                member.borrow_book(isbn)
+                self.loans.add(isbn, book.due_date)
+                entries.append([isbn, member_id, book.due_date])
+            self._record('borrow_books', loans=entries)
+            self._record_loans(BORROW, [(book, member_id) for (book, _), (_, member_id) in zip(pairs, loans)])
+            for isbn, member_id in loans:
+                self._fulfil_hold(isbn, member_id)
+
+        members = {member.member_id: member for _, member in pairs}
+        who = next(iter(members.values())).name if len(members) == 1 else f"{len(members)} members"
+        due_dates = sorted({due_date for _, _, due_date in entries})
+        return True, f"SUCCESS: {len(loans)} books borrowed by {who}. Due: {', '.join(due_dates)}"
+
+    def return_batch(self, loans):
+        """
+        Returns a batch of (isbn, member_id) pairs, all or nothing: every book must be on
+        loan to the member it is listed with. Fines are added up over the batch.
+        Returns (True, message) or (False, "<isbn>: <reason>") for the first problem.
+        """
+        loans = list(loans)
+        if not loans:
+            return False, "No books to return."
+        with self.transaction([isbn for isbn, _ in loans], [member_id for _, member_id in loans]):
+            error, pairs = self._check_batch(loans, borrowing=False)
+            if error:
+                return False, error
+            overdue_days = []
+            for (book, member), (isbn, member_id) in zip(pairs, loans):
+                days = book.days_overdue()  # Before the return clears the due date
+                if days:
+                    overdue_days.append(days)
+                book.return_book()
+                member.return_book(isbn)
+                self.loans.remove(isbn)
+            self._record('return_books', loans=[[isbn, member_id] for isbn, member_id in loans])
+            self._record_loans(RETURN, [(book, member_id) for (book, _), (_, member_id) in zip(pairs, loans)])
+            held = sum(1 for book, _ in pairs if self._promote_hold(book))
+
+        message = f"SUCCESS: {len(loans)} books returned."
+        if overdue_days:
+            fines = sum(self.FINE_POLICY.fine(days) for days in overdue_days)
+            message += f" Note: {len(overdue_days)} were overdue. Fines: ${fines:.2f}"
+        if held:
+            message += f" {held} set aside for members with holds."
+        return True, message
+
+    def _check_batch(self, loans, borrowing):
+        """
+        Validates a batch without changing anything. Returns (None, [(Book, Member), ...])
+        or (error message, None).
+        """
+        pairs, seen, new_loans = [], set(), {}
+        for isbn, member_id in loans:
+            book = self.find_book(isbn)
+            member = self.find_member(member_id)
+            if not book:
+                return f"{isbn}: Book not found.", None
+            if not member:
+                return f"{isbn}: Member not found.", None
+            if isbn in seen:
+                return f"{isbn}: Listed more than once.", None
+            seen.add(isbn)
+            if borrowing:
+                if not book.available:
+                    return f"{isbn}: Book '{book.title}' is already checked out.", None
+                if self._held_for_other(isbn, member_id):
+                    return f"{isbn}: Book '{book.title}' is on hold for another member.", None
+                new_loans[member_id] = new_loans.get(member_id, 0) + 1
+                if len(member.borrowed_books) + new_loans[member_id] > member.MAX_BOOKS:
+                    return f"{isbn}: Maximum book limit ({member.MAX_BOOKS}) reached.", None
+            elif book.borrowed_by != member_id or isbn not in member.borrowed_books:
+                return f"{isbn}: Borrow records are inconsistent. Check book status.", None
+            pairs.append((book, member))
+        return None, pairs
+
+    # --- Hold Methods ---
+
+    def place_hold(self, isbn, member_id):
+        """Queues the member for a checked-out book; it is set aside for them when their turn comes."""
+        with self.transaction([isbn], [member_id]):
+            book = self.find_book(isbn)
+            member = self.find_member(member_id)
+            if not book:
+                return False, "Book not found."
+            if not member:
+                return False, "Member not found."
+            return self._place_hold(book, member_id, member.name)
+
+    def _place_hold(self, book, member_id, name):
+        """Hold body; the caller must hold the book's lock and have checked the member exists."""
+        if book.borrowed_by == member_id:
+            return False, f"Error: {name} already has '{book.title}'."
+        if book.available and self.holds.holder(book.isbn, date.today().toordinal()) is None:
+            return False, f"Book '{book.title}' is available. Borrow it instead."
+        if self.holds.has_hold(book.isbn, member_id):
+            return False, f"Error: {name} already has a hold on '{book.title}'."
+        position = self.holds.place(book.isbn, member_id)
+        return True, f"SUCCESS: {name} is number {position} in the hold queue for '{book.title}'."
+
+    def cancel_hold(self, isbn, member_id):
+        """Drops the member's hold; a book set aside for them goes to the next member in the queue."""
+        with self.transaction([isbn], [member_id]):
+            state = self.holds.cancel(isbn, member_id)
+            if state is None:
+                return False, "Error: No hold found for this member and book."
+            book = self.find_book(isbn)
+            message = "SUCCESS: Hold cancelled."
+            if state == 'ready' and book is not None and book.available:
+                message += self._promote_hold(book)
+            return True, message
+
+    def expire_holds(self, today=None):
+        """
+        Releases every set-aside book not picked up by its date (popped off the expiry
+        heap in one pass) and passes each on to the next member in its queue.
+        Returns how many holds expired.
+        """
+        if not self.holds.expiries:
+            return 0  # Nothing set aside, so every save skips the date and the lock
+        today = today or date.today()
+        expired = self.holds.expire(today.toordinal())
+        for isbn in expired:
+            with self.transaction([isbn]):
+                book = self.find_book(isbn)
+                if book is not None and book.available and self.holds.holder(isbn, today.toordinal()) is None:
+                    self._promote_hold(book, today)
+        return len(expired)
+
+    def get_hold_queue_length(self, isbn):
+        """Number of members waiting for a book (not counting one it is set aside for)."""
+        return self.holds.queue_length(isbn)
+
+    def _held_for_other(self, isbn, member_id):
+        """True if the book is set aside for a different member (replayed borrows are not checked)."""
+        if not self._journaling or isbn not in self.holds.ready:
+            return False
+        holder = self.holds.holder(isbn, date.today().toordinal())
+        return holder is not None and holder != member_id
+
+    def _fulfil_hold(self, isbn, member_id):
+        """Clears the borrower's hold on the book, if any (the holds journal replays its own)."""
+        if self._journaling and self.holds.involves(isbn):
+            self.holds.fulfil(isbn, member_id)
+
+    def _promote_hold(self, book, today=None):
+        """
+        Sets a just-returned book aside for the next member in its hold queue who can
+        borrow another book; members at the limit keep their place for its next return.
+        Returns a note for the return message, or "" if nobody eligible is waiting.
+        """
+        if not self._journaling or book.isbn not in self.holds.queues:
+            return ""  # Nobody waiting: no date or lock on the return path
+        until = (today or date.today()) + timedelta(days=self.HOLD_DAYS)
+        member_id = self.holds.promote(book.isbn, until.toordinal(), self._can_take_hold)
+        if member_id is None:
+            return ""
+        return f" On hold for member {member_id} until {until.isoformat()}."
+
+    def _can_take_hold(self, member_id):
+        """False for a member at the loan limit; one on another shard is checked when they borrow."""
+        member = self.find_member(member_id)
+        return member is None or member.can_borrow()
+
+    def _fine_message(self, days):
+        """Note appended to a return message when the book came back `days` days late."""
+        if not days:
+            return ""
+        return f" Note: Book was overdue by {days} days. Fine: ${self.FINE_POLICY.fine(days):.2f}"
         
     # --- Reporting Methods (Example) ---
     
     def get_overdue_books(self):
-        """Returns a list of all currently overdue Book objects."""
+        """Returns all currently overdue Book objects, oldest due date first."""
+        if self.store is not None:
+            return self.store.overdue_books()
         overdue_books = []
-        for book in self.books.values():
-            if book.is_overdue():
+        for isbn, _ in self.loans.overdue():
+            book = self.books.get(isbn)
+            if book is not None:
                 overdue_books.append(book)
         return overdue_books
         
+    def get_fine_report(self, today=None):
+        """Outstanding fines, overdue aging buckets and per-member totals over all active loans."""
+        return fine_report(self, self.FINE_POLICY, today)
+
+    def get_top_books(self, n=100):
+        """The n most borrowed books of all time: [{'isbn', 'title', 'author', 'loans'}, ...]."""
+        top = []
+        for isbn, loans in self.history.top_books(n):
+            book = self.books.get(isbn)
+            top.append({'isbn': isbn, 'title': book.title if book else None,
+                        'author': book.author if book else None, 'loans': loans})
+        return top
+
+    def get_top_authors(self, n=100):
+        """The n most borrowed authors: [{'author', 'loans'}, ...]."""
+        return [{'author': author, 'loans': loans} for author, loans in self.history.top_authors(n)]
+
+    def get_top_members(self, n=100):
+        """The n members with the most loans: [{'member_id', 'name', 'loans'}, ...]."""
+        top = []
+        for member_id, loans in self.history.top_members(n):
+            member = self.members.get(member_id)
+            top.append({'member_id': member_id, 'name': member.name if member else None, 'loans': loans})
+        return top
+
+    def get_also_borrowed(self, isbn, n=10):
+        """Books most often borrowed alongside `isbn`: [{'isbn', 'title', 'author', 'together'}, ...]."""
+        also = []
+        for other, together in self.recommendations.top(isbn, n):
+            book = self.books.get(other)
+            also.append({'isbn': other, 'title': book.title if book else None,
+                         'author': book.author if book else None, 'together': together})
+        return also
+
+    def rebuild_recommendations(self, workers=None):
+        """Recounts the "also borrowed" index from the whole loan history on `workers` processes."""
+        with self.locks.hold_all():
+            self.recommendations.rebuild(workers)
+
+    def get_daily_circulation(self, days=365, today=None):
+        """Borrows and returns for each of the last `days` days: [{'date', 'borrows', 'returns'}, ...]."""
+        last = (today or date.today()).toordinal()
+        return [{'date': date.fromordinal(day).isoformat(), 'borrows': borrows, 'returns': returns}
+                for day, borrows, returns in self.history.daily(last - days + 1, last)]
+
+    def start_report(self, name, *args, background=True):
+        """
+        Runs one of reporting.REPORTS and returns an iterable of its rows. By default
+        it runs on a forked point-in-time copy of the library, so borrows and returns
+        carry on while the rows stream back. SQLite storage (whose connection cannot
+        be shared with a child) and platforms without fork run it in place instead.
+        """
+        if name not in REPORTS:
+            raise ValueError(f"Unknown report '{name}'. Expected one of {tuple(REPORTS)}.")
+        if background and CAN_FORK and self.store is None:
+            return start_report(self, REPORTS[name], *args)
+        return REPORTS[name](self, *args)
+
     def get_stats(self):
-        """Returns basic library statistics."""
-        available = sum(1 for book in self.books.values() if book.available)
-        borrowed = len(self.books) - available
-        overdue = len(self.get_overdue_books())
+        """Returns basic library statistics from the live loan counters."""
+        borrowed = len(self.loans)
         
         return {
             "Total Books": len(self.books),
-            "Available Books": available,
+            "Available Books": len(self.books) - borrowed,
             "Total Members": len(self.members),
             "Books Borrowed": borrowed,
-            "Overdue Books": overdue
+            "Overdue Books": self.loans.overdue_count()
         }
@@ -3,6 +3,8 @@
 from .library import Library
 from .book import Book
 from .member import Member
+from .metrics import METRICS
+from .fines import AGING_BUCKETS
 # Note: You'd also need a separate utils.py for safe input handling,
 # but we'll use simple input() for this draft.
 
@@ -18,6 +20,7 @@ def display_menu():
     print("5. Search Books")
     print("6. View Library Statistics")
     print("7. View Overdue Books")
+    print("8. View Metrics")
     print("9. Save & Exit")
     print("0. Exit Without Saving")
     print("="*32)
@@ -51,45 +54,128 @@ def handle_register_member(library):
 
 def handle_borrow_book(library):
     print("\n--- Borrow Book ---")
-    isbn = input("Enter ISBN of the book to borrow: ")
+    isbns = input("Enter ISBN(s) of the book(s) to borrow, separated by commas: ")
     member_id = input("Enter Member ID: ")
     
-    success, message = library.borrow_book(isbn, member_id)
+    isbns = [isbn.strip() for isbn in isbns.split(',') if isbn.strip()]
+    if len(isbns) > 1:
+        # A stack is checked out all together or not at all
+        success, message = library.borrow_books(member_id, isbns)
+    else:
+        success, message = library.borrow_book(isbns[0] if isbns else '', member_id)
     print(message)
+    if not success and len(isbns) == 1 and ('checked out' in message or 'on hold' in message):
+        if input("Place a hold on it? (y/n): ").strip().lower() == 'y':
+            print(library.place_hold(isbns[0], member_id)[1])
+    if success and len(isbns) == 1:
+        also = library.get_also_borrowed(isbns[0], 3)
+        if also:
+            print("Members who borrowed this also borrowed:")
+            for entry in also:
+                print(f"  '{entry['title']}' by {entry['author']} (ISBN: {entry['isbn']})")
 
 def handle_return_book(library):
     print("\n--- Return Book ---")
-    isbn = input("Enter ISBN of the book to return: ")
+    isbns = input("Enter ISBN(s) of the book(s) to return, separated by commas: ")
     member_id = input("Enter Member ID: ")
     
-    success, message = library.return_book(isbn, member_id)
+    isbns = [isbn.strip() for isbn in isbns.split(',') if isbn.strip()]
+    if len(isbns) > 1:
+        success, message = library.return_books(member_id, isbns)
+    else:
+        success, message = library.return_book(isbns[0] if isbns else '', member_id)
     print(message)
 
+def handle_search_books(library):
+    print("\n--- Search Books ---")
+    query = input("Enter title/author keywords: ").strip()
+    year = input("Filter by publication year (leave blank for any): ").strip() or None
+
+    page = 1
+    page_size = 10
+    while True:
+        total, books = library.search_books(query, year=year, page=page, page_size=page_size)
+        if total == 0:
+            print("No matching books found.")
+            return
+
+        first = (page - 1) * page_size + 1
+        print(f"Showing {first}-{first + len(books) - 1} of {total} matches:")
+        for book in books:
+            status = "Available" if book.available else f"Due {book.due_date}"
+            print(f"* '{book.title}' by {book.author} (ISBN: {book.isbn}) - {status}")
+
+        if page * page_size >= total:
+            return
+        if input("Press 'n' for the next page, anything else to stop: ").strip().lower() != 'n':
+            return
+        page += 1
+
 def handle_view_stats(library):
     print("\n--- Library Statistics ---")
-    stats = library.get_stats()
-    print("-" * 25)
-    for key, value in stats.items():
-        print(f"- {key}: {value}")
-    print("-" * 25)
+    # Reports run on a snapshot of the library, so other transactions are not held up
+    for report in library.start_report('stats', 5):
+        print("-" * 25)
+        for key, value in report['stats'].items():
+            print(f"- {key}: {value}")
+        print("-" * 25)
+
+        if report['top_books']:
+            print("Most borrowed:")
+            for entry in report['top_books']:
+                print(f"  {entry['loans']:>5}  '{entry['title']}' by {entry['author']}")
 
 def handle_overdue_books(library):
     print("\n--- Overdue Books ---")
-    overdue_list = library.get_overdue_books()
-    if not overdue_list:
+    overdue = 0
+    total_fines = 0.0
+    aging = {label: 0 for label, _, _ in AGING_BUCKETS}
+    for row in library.start_report('overdue'):
+        overdue += 1
+        total_fines += row['fine']
+        for label, _, last in AGING_BUCKETS:
+            if last is None or row['days_overdue'] <= last:
+                aging[label] += 1
+                break
+        print(f"* '{row['title']}' by {row['author']}")
+        print(f"  Borrowed by: {row['member_name'] or 'Unknown'}")
+        print(f"  Due Date: {row['due_date']}, Overdue by: {row['days_overdue']} days.")
+    if not overdue:
         print("No books are currently overdue.")
         return
-        
-    for book in overdue_list:
-        member = library.find_member(book.borrowed_by)
-        days = book.days_overdue()
-        print(f"* '{book.title}' by {book.author}")
-        print(f"  Borrowed by: {member.name if member else 'Unknown'}")
-        print(f"  Due Date: {book.due_date}, Overdue by: {days} days.")
+    summary = ", ".join(f"{label} days: {count}" for label, count in aging.items())
+    print(f"Outstanding fines: ${total_fines:.2f} ({summary})")
     
-def main():
-    """Main function to run the application loop."""
-    library = Library()
+def handle_view_metrics(library):
+    print("\n--- Metrics ---")
+    if not METRICS.enabled:
+        if input("Metrics are off. Turn them on now? (y/n): ").strip().lower() == 'y':
+            METRICS.enable()
+            print("Metrics are on; operations from now on will be recorded.")
+        return
+
+    snapshot = METRICS.snapshot()
+    if not snapshot['operations']:
+        print("No operations recorded yet.")
+    for op, summary in snapshot['operations'].items():
+        line = f"- {op}: {summary['calls']} calls"
+        if summary['failed']:
+            line += f" ({summary['failed']} failed)"
+        if summary['timed']:  # Sampled operations may have calls but no timed one yet
+            line += (f", mean {summary['mean_us']:.1f} us, p50 {summary['p50_us']:.1f} us, "
+                     f"p99 {summary['p99_us']:.1f} us, max {summary['max_us']:.1f} us")
+        print(line)
+    io = snapshot['io']
+    print(f"- I/O: read {io['bytes_read']} bytes in {io['files_read']} files, "
+          f"wrote {io['bytes_written']} bytes in {io['files_written']} writes")
+
+def main(shards=0):
+    """Main function to run the application loop (over `shards` processes if given)."""
+    if shards:
+        from .sharding import ShardedLibrary
+        library = ShardedLibrary(shards)
+    else:
+        library = Library()
     
     while True:
         display_menu()
@@ -103,10 +189,14 @@ def main():
             handle_borrow_book(library)
         elif choice == '4':
             handle_return_book(library)
+        elif choice == '5':
+            handle_search_books(library)
         elif choice == '6':
             handle_view_stats(library)
         elif choice == '7':
             handle_overdue_books(library)
+        elif choice == '8':
+            handle_view_metrics(library)
         elif choice == '9':
             # Save and Exit
             library.save_data()
@@ -119,6 +209,9 @@ def main():
         else:
             print("Invalid choice. Please try again.")
 
+    if shards:
+        library.close()  # Stops the shard processes
+
 if __name__ == "__main__":
     # This is typically where you would call main() if running main.py directly
     # For a package structure, the run.py (or main entry point) calls this.
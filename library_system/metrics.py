@@ -0,0 +1,275 @@
+# library_system/metrics.py
+
+import functools
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from .library import Library
+from .journal import TransactionJournal
+
+SUB_BUCKET_BITS = 7  # 128 linear steps per power of two: recorded values are within 1/64
+PERCENTILES = (50, 90, 99, 99.9)
+FOLD_BATCH = 4096     # Samples buffered per histogram before they are bucketed
+
+# Library methods whose calls are counted and timed while metrics are on. The plain
+# dict lookups (find_book, find_member) are left out: they take less time than a
+# measurement, and borrow/return call them internally.
+TIMED_OPERATIONS = (
+    'load_data', 'save_data', 'compact', 'add_book', 'add_books_bulk', 'register_member',
+    'search_books', 'borrow_book', 'return_book', 'borrow_batch', 'return_batch',
+    'get_overdue_books', 'get_stats',
+)
+# Per-item operations cheap enough that timing every call would cost a large share of
+# the call itself (two clock reads and a wrapper frame, ~0.5 us here, against ~2 us
+# for get_stats). Every call is counted; one in SAMPLE_EVERY is timed.
+SAMPLED_OPERATIONS = frozenset(('add_book', 'register_member', 'borrow_book', 'return_book', 'get_stats'))
+SAMPLE_EVERY = 8
+
+
+class LatencyHistogram:
+    """
+    HDR-style histogram of nanosecond latencies. Values below 2**SUB_BUCKET_BITS are
+    counted exactly; larger ones fall into log-linear buckets whose width is 1/64 of
+    their magnitude or less, so percentiles keep ~1.5% precision from 1 ns to hours
+    in a few hundred sparse buckets.
+
+    record() only appends to a deque (atomic, so no lock on the hot path); samples are
+    folded into the buckets in batches, and before any read. Calls counted without
+    being timed (see SAMPLED_OPERATIONS) add to `untimed` only.
+    """
+
+    __slots__ = ('counts', 'count', 'untimed', 'failed', 'total', 'min', 'max',
+                 '_samples', '_untimed', '_failures', '_lock')
+
+    def __init__(self):
+        self._samples = deque()   # Latencies not yet folded into the buckets
+        self._untimed = deque()   # One entry per untimed call not yet counted
+        self._failures = deque()  # One entry per failed call not yet counted
+        self._lock = threading.Lock()  # Serializes folding
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+            self._untimed.clear()
+            self._failures.clear()
+            self.counts = {}  # Key: bucket index, Value: number of values in the bucket
+            self.count = 0    # Timed calls
+            self.untimed = 0
+            self.failed = 0   # Calls that returned (False, message)
+            self.total = 0
+            self.min = None
+            self.max = 0
+
+    @staticmethod
+    def bucket(value):
+        shift = value.bit_length() - SUB_BUCKET_BITS
+        if shift <= 0:
+            return value
+        return (shift << SUB_BUCKET_BITS) + (value >> shift)
+
+    @staticmethod
+    def bucket_upper_bound(index):
+        shift = index >> SUB_BUCKET_BITS
+        if shift == 0:
+            return index
+        mantissa = index & ((1 << SUB_BUCKET_BITS) - 1)
+        return ((mantissa + 1) << shift) - 1
+
+    def record(self, value, failed=False):
+        self._samples.append(value)
+        if failed:
+            self._failures.append(None)
+        if len(self._samples) >= FOLD_BATCH:
+            self.fold()
+
+    def fold(self):
+        """Moves pending samples into the buckets."""
+        with self._lock:
+            samples, counts, bucket = self._samples, self.counts, self.bucket
+            folded = []
+            while True:
+                try:
+                    folded.append(samples.popleft())
+                except IndexError:
+                    break
+            for value in folded:
+                index = bucket(value)
+                counts[index] = counts.get(index, 0) + 1
+            if folded:
+                self.count += len(folded)
+                self.total += sum(folded)
+                low, high = min(folded), max(folded)
+                self.min = low if self.min is None else min(self.min, low)
+                self.max = max(self.max, high)
+            while self._untimed:
+                self._untimed.pop()
+                self.untimed += 1
+            while self._failures:
+                self._failures.pop()
+                self.failed += 1
+
+    def percentile(self, percent):
+        """Smallest recorded bucket bound with at least `percent`% of values at or below it."""
+        self.fold()
+        with self._lock:
+            if not self.count:
+                return 0
+            threshold = self.count * percent / 100
+            seen = 0
+            for index in sorted(self.counts):
+                seen += self.counts[index]
+                if seen >= threshold:
+                    return min(self.bucket_upper_bound(index), self.max)
+            return self.max
+
+    def summary(self):
+        """Call counts and latencies (over the timed calls) in microseconds."""
+        self.fold()
+        result = {'calls': self.count + self.untimed, 'timed': self.count, 'failed': self.failed}
+        if self.count:
+            result['mean_us'] = round(self.total / self.count / 1000, 3)
+            result['min_us'] = round(self.min / 1000, 3)
+            for percent in PERCENTILES:
+                result[f'p{percent:g}_us'] = round(self.percentile(percent) / 1000, 3)
+            result['max_us'] = round(self.max / 1000, 3)
+        return result
+
+
+class Metrics:
+    """
+    Call counts, latency histograms and JSON I/O byte counters for Library operations.
+
+    Switching on wraps the Library (and journal) methods on their classes; switching
+    off puts the original functions back, so metrics cost nothing while disabled.
+    The wrappers are class-wide and therefore cover every Library instance.
+
+    Known limits: only methods defined on Library itself are wrapped, so methods a
+    subclass adds or overrides (e.g. ShardLibrary.check_out_book) are not timed, and
+    ShardedLibrary, which is not a Library, is not instrumented at all. While on, the wrapper adds
+    about 0.45 us per sampled call (0.7 us per timed one): a few percent on mixed
+    borrow/return/stats work (bench_metrics), but about 30% of a bare get_stats.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.histograms = {op: LatencyHistogram() for op in TIMED_OPERATIONS}
+        self.io = {}
+        self._patched = []  # (class, attribute name, original attribute)
+        self.reset()
+
+    def reset(self):
+        """Discards everything recorded so far."""
+        for histogram in self.histograms.values():
+            histogram.clear()
+        self.io = {'bytes_read': 0, 'bytes_written': 0, 'files_read': 0, 'files_written': 0}
+
+    def enable(self):
+        if self.enabled:
+            return
+        for op in TIMED_OPERATIONS:
+            self._patch(Library, op, self._timed(op))
+        self._patch(Library, 'load_data', self._counts_snapshot_read)
+        self._patch(Library, '_write_snapshot_file', self._counts_snapshot_write)
+        self._patch(TransactionJournal, 'flush', self._counts_journal_flush)
+        self._patch(TransactionJournal, 'read', self._counts_journal_read)
+        self.enabled = True
+
+    def disable(self):
+        while self._patched:
+            owner, name, original = self._patched.pop()
+            setattr(owner, name, original)
+        self.enabled = False
+
+    def snapshot(self):
+        """A JSON-serializable view of all metrics recorded so far."""
+        return {
+            'enabled': self.enabled,
+            'operations': {op: summary for op, summary in
+                           ((op, histogram.summary()) for op, histogram in self.histograms.items())
+                           if summary['calls']},
+            'io': dict(self.io),
+        }
+
+    # --- Wrappers ---
+
+    def _patch(self, owner, name, wrap):
+        original = owner.__dict__[name]
+        if isinstance(original, staticmethod):
+            setattr(owner, name, staticmethod(wrap(original.__func__)))
+        else:
+            setattr(owner, name, wrap(original))
+        self._patched.append((owner, name, original))
+
+    def _timed(self, op):
+        histogram = self.histograms[op]
+        clock = time.perf_counter_ns
+        every = SAMPLE_EVERY if op in SAMPLED_OPERATIONS else 1
+        ticks = itertools.count()  # next() is atomic, so threads never skip or repeat a tick
+
+        # histogram.record() inlined: this runs on every call of a hot operation
+        samples, untimed, failures = histogram._samples, histogram._untimed, histogram._failures
+
+        def wrap(func):
+            @functools.wraps(func)
+            def timed(*args, **kwargs):
+                if next(ticks) % every:
+                    result = func(*args, **kwargs)
+                    untimed.append(None)
+                else:
+                    start = clock()
+                    result = func(*args, **kwargs)
+                    samples.append(clock() - start)
+                    if len(samples) >= FOLD_BATCH:  # Folds untimed calls too
+                        histogram.fold()
+                if type(result) is tuple and result[0] is False:
+                    failures.append(None)
+                return result
+            return timed
+        return wrap
+
+    def _add_io(self, kind, size):
+        self.io[f'bytes_{kind}'] += size
+        self.io[f'files_{kind}'] += 1
+
+    def _counts_snapshot_read(self, func):
+        @functools.wraps(func)
+        def counted(library):
+            if library.store is None:
+                for filename in (library.BOOKS_FILE, library.MEMBERS_FILE):
+                    path = library._get_file_path(filename)
+                    if os.path.exists(path):
+                        self._add_io('read', os.path.getsize(path))
+            return func(library)
+        return counted
+
+    def _counts_snapshot_write(self, func):
+        @functools.wraps(func)
+        def counted(path, records):
+            result = func(path, records)
+            self._add_io('written', os.path.getsize(path))
+            return result
+        return counted
+
+    def _counts_journal_flush(self, func):
+        @functools.wraps(func)
+        def counted(journal):
+            before = os.path.getsize(journal.path) if os.path.exists(journal.path) else 0
+            result = func(journal)
+            if result:
+                self._add_io('written', os.path.getsize(journal.path) - before)
+            return result
+        return counted
+
+    def _counts_journal_read(self, func):
+        @functools.wraps(func)
+        def counted(journal):
+            if os.path.exists(journal.path):
+                self._add_io('read', os.path.getsize(journal.path))
+            return func(journal)
+        return counted
+
+
+METRICS = Metrics()
@@ -0,0 +1,96 @@
+# library_system/overdue.py
+
+import threading
+from bisect import bisect_left, insort
+from datetime import date
+
+
+def date_to_ordinal(due_date):
+    """Converts a 'YYYY-MM-DD' due date string to a proleptic Gregorian ordinal."""
+    return date.fromisoformat(due_date).toordinal()
+
+
+class DueDateIndex:
+    """
+    Active loans bucketed by due date (a calendar of ISBN sets plus a sorted list of
+    the days that have loans). A loan counts as overdue once its due date is before
+    today, so listing overdue books only touches the k overdue loans and the count
+    of overdue loans is cached per day.
+    """
+
+    def __init__(self):
+        self.buckets = {}   # Key: due-date ordinal, Value: set of ISBNs due that day
+        self.days = []      # Sorted ordinals that currently have a bucket
+        self.due = {}       # Key: ISBN, Value: due-date ordinal
+        self._count_day = None   # Day the cached overdue count was computed for
+        self._overdue_count = 0  # Loans due before _count_day
+        self._lock = threading.RLock()  # Shared by all transactions, held only briefly
+
+    def __len__(self):
+        return len(self.due)
+
+    def __contains__(self, isbn):
+        return isbn in self.due
+
+    def add(self, isbn, due_date):
+        """Records (or moves) a loan. `due_date` is a 'YYYY-MM-DD' string."""
+        day = date_to_ordinal(due_date)
+        with self._lock:
+            if isbn in self.due:
+                self.remove(isbn)
+            bucket = self.buckets.get(day)
+            if bucket is None:
+                bucket = self.buckets[day] = set()
+                insort(self.days, day)
+            bucket.add(isbn)
+            self.due[isbn] = day
+            if self._count_day is not None and day < self._count_day:
+                self._overdue_count += 1
+
+    def remove(self, isbn):
+        """Forgets a loan (no-op if the ISBN is not on loan)."""
+        with self._lock:
+            day = self.due.pop(isbn, None)
+            if day is None:
+                return
+            bucket = self.buckets[day]
+            bucket.discard(isbn)
+            if not bucket:
+                del self.buckets[day]
+                del self.days[bisect_left(self.days, day)]
+            if self._count_day is not None and day < self._count_day:
+                self._overdue_count -= 1
+
+    def items(self):
+        """(ISBN, due ordinal) for every active loan."""
+        with self._lock:
+            return list(self.due.items())
+
+    def overdue(self, today=None):
+        """Returns [(ISBN, due ordinal), ...] for loans due before `today`, oldest first."""
+        today = self._today(today)
+        with self._lock:
+            return [(isbn, day)
+                    for day in self.days[:bisect_left(self.days, today)]
+                    for isbn in self.buckets[day]]
+
+    def overdue_count(self, today=None):
+        """Number of overdue loans. Recounted at most once per day, then kept up to date."""
+        today = self._today(today)
+        with self._lock:
+            if today != self._count_day:
+                end = bisect_left(self.days, today)
+                self._overdue_count = sum(len(self.buckets[day]) for day in self.days[:end])
+                self._count_day = today
+            return self._overdue_count
+
+    def clear(self):
+        self.__init__()
+
+    @staticmethod
+    def _today(today):
+        if today is None:
+            return date.today().toordinal()
+        if isinstance(today, date):
+            return today.toordinal()
+        return today
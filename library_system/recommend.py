@@ -0,0 +1,351 @@
+# library_system/recommend.py
+
+import multiprocessing
+import os
+import shutil
+import struct
+import tempfile
+import threading
+from array import array
+from collections import OrderedDict
+from operator import itemgetter
+from .history import BORROW
+
+try:
+    import numpy as np
+except ImportError:  # Rebuilds replay the log row by row in this process instead
+    np = None
+
+PAIR_WINDOW = 8      # A borrow pairs with the member's previous 8 borrows
+NEIGHBOURS = 50      # Co-borrowed books kept per book when counts are folded into the base
+CACHE_SIZE = 10_000  # Ranked rows kept for repeat lookups
+REBUILD_PARTS = 8    # Partitions of the book codes counted separately (in parallel) by a rebuild
+INDEX_FILE = 'also_borrowed.bin'  # Saved next to the loan history it was counted from
+# magic, history rows covered, pair window, books, members, matrix entries
+INDEX_HEADER = struct.Struct('<8sQQQQQ')
+INDEX_MAGIC = b'LIBCOBR1'
+EMPTY = 0xFFFFFFFF   # Unused slot in a member's window
+
+
+class CoBorrowIndex:
+    """
+    "Patrons who borrowed this also borrowed" counts, as a sparse book x book matrix
+    over the loan history's book codes. Each borrow pairs with the member's previous
+    PAIR_WINDOW borrows of other books, and a pair counts for both books.
+
+    The matrix is a CSR base (each row ranked by count and cut to NEIGHBOURS books)
+    plus the counts added since, so a borrow costs O(PAIR_WINDOW). A lookup merges
+    the two for one book and caches the ranked row (LRU, CACHE_SIZE rows) until one
+    of its counts changes. checkpoint() folds the added counts into the base and
+    saves it; rebuild() recounts everything from the log.
+
+    Nothing is read until the first lookup (or load()): borrows recorded before then
+    are kept as codes and counted after the saved index and the log behind it.
+    """
+
+    def __init__(self, history):
+        self.history = history
+        self.indptr = array('Q', [0])  # Key: book code, Value: start of its row (rows end at the next entry)
+        self.neighbours = array('I')   # Book codes, each row highest count first
+        self.counts = array('I')
+        self.added = {}                # Key: book code, Value: {other book code: count} since the base
+        self.recent = array('I')       # PAIR_WINDOW book codes per member code, oldest first
+        self.rows = 0                  # History rows counted
+        self.cache = OrderedDict()     # Key: book code, Value: [(other book code, count), ...]
+        self.loaded = False             # Saved index and log counted (on the first lookup)
+        self.start_rows = history.rows  # Log rows to count on loading; later borrows are deferred
+        self.deferred = array('I')      # Book code, member code of each borrow recorded before loading
+        self._lock = threading.Lock()  # Guards the matrix, the windows, the deferred borrows and the cache
+
+    def _path(self):
+        return os.path.join(self.history.directory, INDEX_FILE)
+
+    # --- Counting ---
+
+    def record(self, isbn, member_id):
+        """Counts a borrow that has just been recorded in the history."""
+        with self._lock:
+            self._count(self.history.book_codes[isbn], self.history.member_codes[member_id])
+
+    def record_many(self, entries):
+        """Counts a batch of (isbn, member_id) borrows under one lock acquisition."""
+        with self._lock:
+            for isbn, member_id in entries:
+                self._count(self.history.book_codes[isbn], self.history.member_codes[member_id])
+
+    def _count(self, book, member):
+        if self.loaded:
+            self._add(book, member)
+        else:
+            self.deferred.extend((book, member))
+
+    def _add(self, book, member):
+        start = member * PAIR_WINDOW
+        if start >= len(self.recent):
+            self.recent.extend(array('I', [EMPTY]) * (start + PAIR_WINDOW - len(self.recent)))
+        window = self.recent[start:start + PAIR_WINDOW]
+        for other in window:
+            if other != EMPTY and other != book:
+                self._bump(book, other)
+                self._bump(other, book)
+        window.pop(0)
+        window.append(book)
+        self.recent[start:start + PAIR_WINDOW] = window
+
+    def _bump(self, book, other):
+        row = self.added.setdefault(book, {})
+        row[other] = row.get(other, 0) + 1
+        self.cache.pop(book, None)
+
+    # --- Lookups ---
+
+    def top(self, isbn, n=10):
+        """[(ISBN, count), ...] for the n books most often borrowed together with `isbn`."""
+        book = self.history.book_codes.get(isbn)
+        if book is None:
+            return []
+        with self._lock:
+            self._load()
+            ranked = self.cache.get(book)
+            if ranked is None:
+                ranked = self.cache[book] = self._rank(book)
+                if len(self.cache) > CACHE_SIZE:
+                    self.cache.popitem(last=False)
+            else:
+                self.cache.move_to_end(book)
+            return [(self.history.isbns[other], count) for other, count in ranked[:n]]
+
+    def _rank(self, book):
+        """The base row of `book` plus its added counts, highest count first (ties by code)."""
+        counts = {}
+        if book + 1 < len(self.indptr):
+            start, end = self.indptr[book], self.indptr[book + 1]
+            counts = dict(zip(self.neighbours[start:end], self.counts[start:end]))
+        for other, count in self.added.get(book, {}).items():
+            counts[other] = counts.get(other, 0) + count
+        ranked = sorted(counts.items())
+        ranked.sort(key=itemgetter(1), reverse=True)  # Stable, so equal counts stay in code order
+        return ranked
+
+    # --- Persistence ---
+
+    def checkpoint(self):
+        """
+        Folds the added counts into the base, keeping the top NEIGHBOURS of each changed
+        row (a count cut here starts again from zero), and saves the index. Call it with
+        transactions held off, as Library.compact does, so every history row it claims
+        to cover has been counted.
+        """
+        self.history.flush()
+        with self._lock:
+            if not self.loaded:
+                # Nothing counted to fold: the saved index stays, and the first lookup
+                # counts every row logged after it, the deferred borrows included
+                self.start_rows, self.deferred = self.history.rows, array('I')
+                return
+            if self.added:
+                self._replace_rows({book: self._rank(book)[:NEIGHBOURS] for book in self.added})
+                self.added = {}
+            self.rows = len(self.history)
+            if not self.rows:
+                return
+            tmp_path = self._path() + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(INDEX_HEADER.pack(INDEX_MAGIC, self.rows, PAIR_WINDOW, len(self.indptr) - 1,
+                                          len(self.recent) // PAIR_WINDOW, len(self.neighbours)))
+                for values in (self.indptr, self.neighbours, self.counts, self.recent):
+                    values.tofile(f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self._path())
+
+    def _replace_rows(self, rows):
+        """
+        Rewrites the base with `rows` ({book code: [(other, count), ...]}) in place of
+        those books' rows. The rows in between are copied a span at a time.
+        """
+        indptr, neighbours, counts = array('Q', [0]), array('I'), array('I')
+        old_books, copied = len(self.indptr) - 1, 0  # Old rows before `copied` are done
+
+        def copy_until(book):
+            end = min(book, old_books)
+            if copied < end:
+                first, last = self.indptr[copied], self.indptr[end]
+                shift = len(neighbours) - first
+                neighbours.extend(self.neighbours[first:last])
+                counts.extend(self.counts[first:last])
+                indptr.extend(offset + shift for offset in self.indptr[copied + 1:end + 1])
+            if len(indptr) <= book:  # Books the old base had no row for
+                indptr.extend([len(neighbours)] * (book + 1 - len(indptr)))
+
+        for book in sorted(rows):
+            copy_until(book)
+            if rows[book]:
+                row_neighbours, row_counts = zip(*rows[book])
+                neighbours.extend(row_neighbours)
+                counts.extend(row_counts)
+            indptr.append(len(neighbours))
+            copied = book + 1
+        copy_until(old_books)
+        self.indptr, self.neighbours, self.counts = indptr, neighbours, counts
+
+    def load(self):
+        """Reads the index now rather than on the first lookup."""
+        with self._lock:
+            self._load()
+
+    def _load(self):
+        """
+        Reads the saved index, then counts the log rows up to start_rows logged after
+        it (row by row if there are fewer of them than books, otherwise by rebuilding
+        in this process) and the borrows deferred since. Does nothing once loaded.
+        """
+        if self.loaded:
+            return
+        covered = self._read()
+        if self.start_rows - covered >= max(len(self.history.isbns), 1):
+            self._rebuild(1, self.start_rows)
+        elif covered < self.start_rows:
+            for events, books, members, _ in self.history._read_chunks(covered, self.start_rows):
+                for event, book, member in zip(events, books, members):
+                    if event == BORROW:
+                        self._add(book, member)
+        self.rows = self.start_rows
+        for book, member in zip(self.deferred[::2], self.deferred[1::2]):
+            self._add(book, member)
+        self.deferred, self.loaded = array('I'), True
+
+    def _read(self):
+        """Loads the saved index if it matches the history; returns the number of rows it covers."""
+        path = self._path()
+        if not os.path.exists(path):
+            return 0
+        with open(path, 'rb') as f:
+            magic, rows, window, books, members, entries = INDEX_HEADER.unpack(f.read(INDEX_HEADER.size))
+            if (magic != INDEX_MAGIC or window != PAIR_WINDOW or rows > self.start_rows
+                    or books > len(self.history.isbns) or members > len(self.history.member_ids)):
+                return 0  # Counted from another log or another window; count again
+            for values, size in ((self.indptr, books + 1), (self.neighbours, entries), (self.counts, entries),
+                                 (self.recent, members * PAIR_WINDOW)):
+                del values[:]
+                values.fromfile(f, size)
+        self.rows = rows
+        return rows
+
+    def rebuild(self, workers=None):
+        """
+        Recounts the matrix from the whole history log and saves it. With NumPy the
+        count is split into REBUILD_PARTS partitions of the books, run on a pool of
+        `workers` processes (default: one per CPU); without it the log is replayed row
+        by row. Rows are cut to NEIGHBOURS as in checkpoint().
+        Transactions must be held off meanwhile (Library.rebuild_recommendations does).
+        """
+        self.history.flush()
+        with self._lock:
+            # Every borrow is on disk now, the deferred ones included
+            self._rebuild(workers or os.cpu_count() or 1, self.history.rows)
+            self.deferred, self.loaded = array('I'), True
+        self.checkpoint()
+
+    def _rebuild(self, workers, rows):
+        """Recounts the matrix from the first `rows` log rows. Called with the lock held."""
+        self.added, self.recent = {}, array('I')
+        self.indptr, self.neighbours, self.counts = array('Q', [0]), array('I'), array('I')
+        self.cache.clear()
+        self.rows = rows
+        if not rows:
+            return
+        if np is None:
+            for events, books, members, _ in self.history._read_chunks(0, rows):
+                for event, book, member in zip(events, books, members):
+                    if event == BORROW:
+                        self._add(book, member)
+            if self.added:
+                self._replace_rows({book: self._rank(book)[:NEIGHBOURS] for book in self.added})
+                self.added = {}
+            return
+        indptr, neighbours, counts, recent = count_pairs(self.history.directory, rows, len(self.history.isbns),
+                                                         len(self.history.member_ids), workers)
+        self.indptr, self.neighbours = array('Q', indptr.tobytes()), array('I', neighbours.tobytes())
+        self.counts, self.recent = array('I', counts.tobytes()), array('I', recent.tobytes())
+
+
+# --- Parallel rebuild (NumPy) ---
+
+def count_pairs(directory, rows, books, members, workers=1):
+    """
+    Counts the pairs in the first `rows` rows of the history log in `directory`.
+    Returns the CSR base (indptr, neighbours, counts, each row cut to NEIGHBOURS) and
+    every member's window, as NumPy arrays.
+
+    The borrows are sorted by member once and saved to a scratch directory; then the
+    rows are split into REBUILD_PARTS partitions by book code, each counted by
+    _count_part (on a pool of `workers` processes when more than one) from the mapped
+    scratch files. Each part prunes its own rows, so only the kept entries come back.
+    """
+    scratch = tempfile.mkdtemp(prefix='rebuild-', dir=directory)
+    try:
+        borrows, borrowers = _member_borrows(directory, rows)
+        paths = (os.path.join(scratch, 'books.npy'), os.path.join(scratch, 'members.npy'))
+        for path, values in zip(paths, (borrows, borrowers)):
+            np.save(path, values)
+        tasks = [paths + (part, REBUILD_PARTS) for part in range(REBUILD_PARTS)]
+        pool = multiprocessing.Pool(workers) if workers > 1 else None
+        try:
+            parts = list(pool.imap_unordered(_count_part, tasks) if pool else map(_count_part, tasks))
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    row_books, others, counts = (np.concatenate([part[n] for part in parts]) for n in range(3))
+    order = np.argsort(row_books, kind='stable')  # Parts are ranked within each row already
+    indptr = np.searchsorted(row_books[order], np.arange(books + 1)).astype(np.uint64)
+
+    recent = np.full(members * PAIR_WINDOW, EMPTY, dtype=np.uint32)
+    ends = np.append(np.flatnonzero(borrowers[1:] != borrowers[:-1]) + 1, len(borrowers))
+    from_end = ends[np.searchsorted(ends, np.arange(len(borrowers)), side='right')] - 1 - np.arange(len(borrowers))
+    last = from_end < PAIR_WINDOW  # Each member's last PAIR_WINDOW borrows, oldest in the first slot
+    recent[borrowers[last].astype(np.int64) * PAIR_WINDOW + PAIR_WINDOW - 1 - from_end[last]] = borrows[last]
+    return indptr, others[order], counts[order], recent
+
+
+def _member_borrows(directory, rows):
+    """(book codes, member codes) of every borrow in the first `rows` log rows, by member, oldest first."""
+    events, books, members = (np.memmap(os.path.join(directory, name), dtype=dtype, mode='r', shape=(rows,))
+                              for name, dtype in (('event', np.uint8), ('book', np.uint32),
+                                                  ('member', np.uint32)))
+    borrowed = events == BORROW
+    books, members = books[borrowed], members[borrowed]
+    order = np.argsort(members, kind='stable')
+    return books[order], members[order]
+
+
+def _count_part(task):
+    """
+    Pool task: the rows of the books whose code % parts == part, as (row book codes,
+    other book codes, counts) sorted by row book, each row highest count first (ties
+    by code) and cut to NEIGHBOURS entries.
+    """
+    books_path, members_path, part, parts = task
+    # Plain views of the mapped files: the pages are shared between the workers
+    books, members = (np.asarray(np.load(path, mmap_mode='r')) for path in (books_path, members_path))
+    mine = books % parts == part
+    keys = []
+    for lag in range(1, PAIR_WINDOW + 1):
+        pairs = (members[lag:] == members[:-lag]) & (books[lag:] != books[:-lag])
+        later, earlier = books[lag:], books[:-lag]
+        for rows_mine, row, column in ((mine[lag:], later, earlier), (mine[:-lag], earlier, later)):
+            selected = pairs & rows_mine  # A pair counts for both books; keep the rows in this part
+            keys.append(row[selected].astype(np.uint64) << np.uint64(32) | column[selected])
+    keys, counts = np.unique(np.concatenate(keys), return_counts=True)
+    # Keys come sorted by (row, other); a stable sort on (row, highest count first) ranks each row
+    row_keys = keys >> np.uint64(32) << np.uint64(32)
+    order = np.argsort(row_keys | (np.uint64(EMPTY) - counts.astype(np.uint64)), kind='stable')
+    keys, counts = keys[order], counts[order]
+    row_books, others = (keys >> np.uint64(32)).astype(np.uint32), (keys & np.uint64(EMPTY)).astype(np.uint32)
+    firsts = np.flatnonzero(np.diff(row_books, prepend=EMPTY) != 0)  # Codes stay below EMPTY
+    rank = np.arange(len(row_books)) - np.repeat(firsts, np.diff(np.append(firsts, len(row_books))))
+    kept = rank < NEIGHBOURS
+    return row_books[kept], others[kept], counts[kept].astype(np.uint32)
@@ -0,0 +1,159 @@
+# library_system/reporting.py
+
+import multiprocessing
+import os
+import threading
+from collections import Counter
+from datetime import date
+from .transactions import LockStripes
+
+REPORT_CHUNK = 500  # Rows sent from the report process per message
+# Forked reports need os.fork (POSIX); elsewhere Library.start_report runs them in place
+CAN_FORK = hasattr(os, 'fork') and 'fork' in multiprocessing.get_all_start_methods()
+
+
+# --- Reports ---
+# Each report takes the library (plus optional arguments) and yields JSON-friendly
+# rows. They only use the public Library methods, so they run the same on a forked
+# copy, in place, or against a ShardedLibrary router.
+
+def stats_report(library, top=10):
+    """One row: the library statistics, the fine summary and the most borrowed books."""
+    fines = library.get_fine_report()
+    del fines['member_fines']  # The member report lists these
+    yield {'stats': library.get_stats(), 'fines': fines, 'top_books': library.get_top_books(top)}
+
+
+def overdue_report(library):
+    """One row per overdue loan, oldest first, with the borrower's name and the fine."""
+    today = date.today()
+    for book in library.get_overdue_books():
+        member = library.find_member(book.borrowed_by)
+        days = (today - date.fromisoformat(book.due_date)).days
+        yield {'isbn': book.isbn, 'title': book.title, 'author': book.author,
+               'member_id': book.borrowed_by, 'member_name': member.name if member else None,
+               'due_date': book.due_date, 'days_overdue': days,
+               'fine': round(library.FINE_POLICY.fine(days), 2)}
+
+
+def member_report(library):
+    """One row per member who owes fines, largest first, with their books on loan."""
+    member_fines = library.get_fine_report()['member_fines']
+    for member_id, fine in sorted(member_fines.items(), key=lambda item: (-item[1], item[0])):
+        member = library.find_member(member_id)
+        yield {'member_id': member_id, 'name': member.name if member else None,
+               'books': list(member.borrowed_books) if member else [], 'fines': fine}
+
+
+def circulation_report(library, years=3):
+    """Borrows and returns per month over the last `years` years, oldest month first."""
+    months = {}
+    for day in library.get_daily_circulation(days=years * 365):
+        totals = months.setdefault(day['date'][:7], Counter())
+        totals['borrows'] += day['borrows']
+        totals['returns'] += day['returns']
+    for month, totals in months.items():
+        yield {'month': month, 'borrows': totals['borrows'], 'returns': totals['returns']}
+
+
+REPORTS = {
+    'stats': stats_report,
+    'overdue': overdue_report,
+    'members': member_report,
+    'circulation': circulation_report,
+}
+
+
+# --- Forked execution ---
+
+class ForkedReport:
+    """
+    A report running in a forked process. Iterating yields its rows as they arrive;
+    an exception in the report is raised here as a RuntimeError.
+    """
+
+    def __init__(self, process, connection):
+        self.process = process
+        self.connection = connection
+
+    def __iter__(self):
+        try:
+            while True:
+                try:
+                    kind, payload = self.connection.recv()
+                except EOFError:
+                    raise RuntimeError("Report process exited without finishing.") from None
+                if kind == 'rows':
+                    yield from payload
+                elif kind == 'error':
+                    raise RuntimeError(payload)
+                else:
+                    break
+        finally:
+            self.close()
+
+    def close(self):
+        """Stops the report process (if still running) and releases the pipe."""
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join()
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+
+def start_report(library, report, *args):
+    """
+    Forks a copy of `library` and runs `report(library, *args)` in it, returning a
+    ForkedReport. The fork happens while every transaction stripe is held, so the copy
+    is one consistent moment; after that the pages are shared copy-on-write and the
+    report never holds a lock the parent's transactions need.
+    """
+    context = multiprocessing.get_context('fork')
+    reader, writer = context.Pipe(duplex=False)
+    process = context.Process(target=_run_report, args=(library, report, args, writer), daemon=True)
+    with library.locks.hold_all():
+        process.start()
+    writer.close()
+    return ForkedReport(process, reader)
+
+
+def _run_report(library, report, args, connection):
+    """Report process body: stream rows back in chunks, then ('done', None) or ('error', message)."""
+    _reset_locks(library)
+    try:
+        chunk = []
+        for row in report(library, *args):
+            chunk.append(row)
+            if len(chunk) >= REPORT_CHUNK:
+                connection.send(('rows', chunk))
+                chunk = []
+        if chunk:
+            connection.send(('rows', chunk))
+        connection.send(('done', None))
+    except Exception as error:
+        connection.send(('error', f"{type(error).__name__}: {error}"))
+    finally:
+        connection.close()
+
+
+def _reset_locks(library):
+    """
+    Gives the forked copy fresh locks. Only the forking thread exists in the child, so
+    a lock some other thread held at fork time (a journal flush, say) would never be
+    released.
+    """
+    library.locks = LockStripes(len(library.locks.locks))
+    for owner, name in ((library.loans, '_lock'), (library.journal, '_lock'), (library.history, '_lock'),
+                        (library.recommendations, '_lock'), (library.holds, '_lock'),
+                        (library.holds.journal, '_lock'), (library.search_index, '_lock'),
+                        (library.member_directory, '_lock'), (library.books, '_file_lock')):
+        lock = getattr(owner, name, None)
+        if lock is not None:
+            reentrant = isinstance(lock, type(threading.RLock()))
+            setattr(owner, name, threading.RLock() if reentrant else threading.Lock())
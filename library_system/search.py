@@ -0,0 +1,182 @@
+# library_system/search.py
+
+import heapq
+import re
+import threading
+
+TOKEN_PATTERN = re.compile(r"[0-9a-z]+")
+
+# Relevance weights: a query term found in the title counts more than one in the author.
+TITLE_WEIGHT = 2
+AUTHOR_WEIGHT = 1
+
+
+def tokenize(text):
+    """Splits text into lowercase alphanumeric tokens."""
+    if not text:
+        return []
+    return TOKEN_PATTERN.findall(str(text).lower())
+
+
+class PrefixTrie:
+    """Character trie over the indexed vocabulary, used to expand type-ahead prefixes."""
+
+    END = ''  # Key on nodes that complete a word; its value is the word
+
+    def __init__(self):
+        self.root = {}
+
+    def insert(self, word):
+        """Adds a word to the trie (no-op if it is already present)."""
+        node = self.root
+        for char in word:
+            node = node.setdefault(char, {})
+        node[self.END] = word
+
+    def complete(self, prefix, limit=None):
+        """Returns the indexed words starting with `prefix`, or the first `limit` of them (depth-first, prefix order)."""
+        node = self.root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return []
+
+        words = []
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            # Children are pushed in reverse so they are visited in insertion order;
+            # a node's own word is taken before any of them is popped
+            for char in reversed(current):
+                if char != self.END:
+                    stack.append(current[char])
+                else:
+                    words.append(current[char])
+                    if limit is not None and len(words) >= limit:
+                        return words
+        return words
+
+
+class BookSearchIndex:
+    """
+    Inverted indexes over the catalog so that searches never scan every book.
+    Titles and authors are tokenized into posting sets of ISBNs, the vocabulary
+    is kept in a prefix trie for type-ahead, and publication years are indexed exactly.
+    A type-ahead prefix matches every word under it in the trie, so totals are exact;
+    `max_prefix_expansions` caps that, at the cost of missing books.
+    """
+
+    def __init__(self, max_prefix_expansions=None):
+        self.max_prefix_expansions = max_prefix_expansions
+        self.title_index = {}   # Key: token, Value: set of ISBNs
+        self.author_index = {}  # Key: token, Value: set of ISBNs
+        self.year_index = {}    # Key: publication year, Value: set of ISBNs
+        self.vocabulary = PrefixTrie()
+        self._lock = threading.Lock()  # Serializes writers; queries only read
+
+    def __len__(self):
+        return sum(len(isbns) for isbns in self.year_index.values())
+
+    def add(self, isbn, title, author, year=None):
+        """Indexes a single book. Called incrementally from Library.add_book and on load."""
+        title_tokens = set(tokenize(title))
+        author_tokens = set(tokenize(author))
+        with self._lock:
+            for token in title_tokens:
+                postings = self.title_index.get(token)
+                if postings is None:
+                    postings = self.title_index[token] = set()
+                    self.vocabulary.insert(token)
+                postings.add(isbn)
+
+            for token in author_tokens:
+                postings = self.author_index.get(token)
+                if postings is None:
+                    postings = self.author_index[token] = set()
+                    self.vocabulary.insert(token)
+                postings.add(isbn)
+
+            self.year_index.setdefault(self._normalize_year(year), set()).add(isbn)
+
+    # --- Query Methods ---
+
+    def search(self, query='', year=None, page=1, page_size=10, prefix=True):
+        """
+        Returns (total_matches, isbns) for one page of ranked results.
+        Every query term must match the title or the author; when `prefix` is True
+        the last term is treated as a type-ahead prefix.
+        """
+        limit = page * page_size if page >= 1 and page_size >= 1 else 0
+        total, ranked = self.ranked(query, year, limit, prefix)
+        return total, [isbn for _, isbn in ranked[limit - page_size:limit]]
+
+    def ranked(self, query='', year=None, limit=10, prefix=True):
+        """
+        Returns (total_matches, [(-score, isbn), ...]) for the `limit` best matches,
+        best first. The (-score, isbn) keys order results from several indexes too.
+        """
+        terms = self._query_terms(query, prefix)
+        if not terms and year is None:
+            return 0, []
+
+        candidates = self._match(terms, year)
+        total = len(candidates)
+        if limit < 1 or total == 0:
+            return total, []
+
+        scores = self._score(candidates, terms)
+        return total, heapq.nsmallest(limit, ((-scores.get(isbn, 0), isbn) for isbn in candidates))
+
+    def _query_terms(self, query, prefix):
+        """Builds a list of (title_postings, author_postings) pairs, one per query term."""
+        tokens = tokenize(query)
+        terms = []
+        for position, token in enumerate(tokens):
+            is_last = position == len(tokens) - 1
+            if prefix and is_last:
+                words = self.vocabulary.complete(token, self.max_prefix_expansions)
+            else:
+                words = [token]
+            title_sets = [self.title_index[w] for w in words if w in self.title_index]
+            author_sets = [self.author_index[w] for w in words if w in self.author_index]
+            terms.append((title_sets, author_sets))
+        return terms
+
+    def _match(self, terms, year):
+        """Intersects the posting sets of every term (and the year), smallest first."""
+        groups = [title_sets + author_sets for title_sets, author_sets in terms]
+        if year is not None:
+            groups.append([self.year_index.get(self._normalize_year(year), set())])
+        if any(not group for group in groups):
+            return set()
+
+        groups.sort(key=lambda group: sum(len(postings) for postings in group))
+        candidates = set().union(*groups[0])
+        for group in groups[1:]:
+            if not candidates:
+                break
+            # set & set iterates over the smaller operand, so this stays
+            # proportional to the candidate count rather than the posting sizes
+            candidates = set().union(*(candidates & postings for postings in group))
+        return candidates
+
+    @staticmethod
+    def _score(candidates, terms):
+        """Relevance of each matching book: weighted count of terms found in title/author."""
+        scores = {}
+        for title_sets, author_sets in terms:
+            for weight, posting_sets in ((TITLE_WEIGHT, title_sets), (AUTHOR_WEIGHT, author_sets)):
+                hits = set().union(*(candidates & postings for postings in posting_sets))
+                for isbn in hits:
+                    scores[isbn] = scores.get(isbn, 0) + weight
+        return scores
+
+    @staticmethod
+    def _normalize_year(year):
+        """Years may arrive as ints or strings (e.g. from input()); index them as ints."""
+        if year is None or year == '':
+            return None
+        try:
+            return int(year)
+        except (TypeError, ValueError):
+            return year
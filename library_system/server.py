@@ -0,0 +1,153 @@
+# library_system/server.py
+
+import asyncio
+import json
+from .batch import execute
+from .library import Library
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_SAVE_INTERVAL = 5.0  # Seconds between journal flushes
+# Compaction rewrites the whole snapshot while holding every stripe, which stalls all
+# desks; a long-running service lets the journal grow much further between snapshots.
+COMPACT_THRESHOLD = 100000
+READ_SIZE = 64 * 1024
+MAX_LINE = 1024 * 1024       # Longest request line accepted
+
+# Commands a circulation desk may send; catalog and member maintenance stay on the console
+SERVICE_COMMANDS = frozenset((
+    'find_book', 'find_member', 'borrow_book', 'return_book',
+    'borrow_books', 'return_books', 'borrow_batch', 'return_batch', 'place_hold', 'cancel_hold',
+    'search_books', 'search_members', 'get_stats', 'get_overdue_books', 'get_fine_report',
+    'get_also_borrowed', 'get_metrics',
+))
+
+_encoder = json.JSONEncoder(separators=(',', ':'))
+
+
+class LibraryServer:
+    """
+    Line-delimited JSON over TCP in front of one shared Library.
+
+    Each request is one JSON object per line, e.g. {"id": 7, "op": "borrow_book",
+    "isbn": "B001", "member_id": "M001"}, and gets one response line
+    {"id": 7, "ok": true, "result": ...} in request order. Clients may pipeline: every
+    complete line already received is answered, and the answers go out in one write.
+    Changes are persisted by save_data on a timer rather than per request.
+    """
+
+    def __init__(self, library, host=DEFAULT_HOST, port=DEFAULT_PORT,
+                 save_interval=DEFAULT_SAVE_INTERVAL, compact_threshold=COMPACT_THRESHOLD):
+        self.library = library
+        self.library.COMPACT_THRESHOLD = compact_threshold
+        self.host = host
+        self.port = port
+        self.save_interval = save_interval
+        self.requests = 0
+        self._server = None
+        self._saver = None
+        self._saving = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]  # Resolves port 0
+        if self.save_interval:
+            self._saver = asyncio.create_task(self._autosave())
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def stop(self):
+        """Stops accepting clients and persists whatever is still staged."""
+        if self._saver:
+            self._saver.cancel()
+            self._saver = None
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._saving:
+            await asyncio.shield(self._saving)
+        await self.save()
+
+    # --- Persistence ---
+
+    async def save(self):
+        """
+        Runs save_data in a worker thread so the journal fsync does not stall the event
+        loop. Transactions stay safe meanwhile thanks to the library's stripe locks.
+        """
+        if self._saving is None and self.library.has_unsaved_changes():
+            self._saving = asyncio.get_running_loop().run_in_executor(None, self.library.save_data)
+            try:
+                await self._saving
+            finally:
+                self._saving = None
+
+    async def _autosave(self):
+        while True:
+            await asyncio.sleep(self.save_interval)
+            await self.save()
+
+    # --- Requests ---
+
+    def respond(self, line):
+        """Executes one request line and returns the serialized response line."""
+        try:
+            request = json.loads(line)
+        except ValueError:
+            request = None
+        if not isinstance(request, dict):
+            response = {'id': None, 'ok': False, 'result': "Malformed request"}
+        elif not isinstance(request.get('op'), str) or request['op'] not in SERVICE_COMMANDS:
+            response = {'id': request.get('id'), 'ok': False,
+                        'result': f"Unknown command: {request.get('op')!r}"}
+        else:
+            ok, result = execute(self.library, request)
+            response = {'id': request.get('id'), 'ok': ok, 'result': result}
+        self.requests += 1
+        return _encoder.encode(response) + '\n'
+
+    async def handle_client(self, reader, writer):
+        buffer = b''
+        try:
+            while True:
+                data = await reader.read(READ_SIZE)
+                if not data:
+                    break
+                buffer += data
+                *lines, buffer = buffer.split(b'\n')
+                if len(buffer) > MAX_LINE:
+                    writer.write(self.respond(b'').encode())
+                    break
+                responses = [self.respond(line) for line in lines if line.strip()]
+                if responses:
+                    writer.write(''.join(responses).encode())
+                    await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, save_interval=DEFAULT_SAVE_INTERVAL, load_mode='full'):
+    """Entry point for `run.py --serve`. Runs until interrupted, then saves."""
+    library = Library(load_mode=load_mode)
+    server = LibraryServer(library, host, port, save_interval)
+
+    async def run():
+        await server.start()
+        print(f"Serving the library on {server.host}:{server.port} "
+              f"(saving every {save_interval:g}s). Press Ctrl+C to stop.")
+        await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return 0
@@ -0,0 +1,802 @@
+# library_system/sharding.py
+
+import heapq
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import zlib
+from collections import Counter
+from multiprocessing.connection import Client, Listener
+from .library import Library
+from .history import BORROW, RETURN
+from .book import Book
+from .member import Member
+from .bulk import validate_row
+from .compact import CompactBook, CompactMember
+from .fines import merge_fine_reports
+from .reporting import REPORTS
+
+SHARD_DIRECTORY = 'data/shards'
+MANIFEST_FILE = 'shards.json'
+
+INCONSISTENT = "Error: Borrow records are inconsistent. Check book status."
+BOOK_BUSY = "Book '{}' is in the middle of another transaction. Try again."
+LOAN_BUSY = "The loan of ISBN {} is in the middle of another transaction. Try again."
+
+# Library methods a router may call on a shard as they are
+SHARD_METHODS = frozenset((
+    'add_book', 'add_books_bulk', 'register_member', 'find_book', 'find_member',
+    'get_overdue_books', 'get_stats', 'get_fine_report', 'get_top_books', 'get_daily_circulation',
+    'get_also_borrowed', 'get_hold_queue_length', 'hold_book', 'cancel_hold', 'expire_holds',
+    'save_data', 'compact',
+))
+# Halves of a cross-shard transaction, by the side that owns them
+BOOK_ACTIONS = ('check_out_book', 'check_in_book')
+MEMBER_ACTIONS = ('add_member_loan', 'remove_member_loan')
+
+
+def shard_of(key, count):
+    """Shard index for an ISBN or member ID. CRC32 is stable across processes, unlike hash()."""
+    return zlib.crc32(key.encode('utf-8')) % count
+
+
+def _data_path(filename):
+    """Same resolution as Library._get_file_path: relative to the project root."""
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base_dir, filename)
+
+
+class ShardLibrary(Library):
+    """
+    The Library one shard process runs. Books and members whose keys hash to the
+    shard live here, so a loan may have its book on one shard and its member on
+    another; the transaction halves below update one side each and are journaled
+    as their own records.
+    """
+
+    def check_out_book(self, isbn, member_id, due_date=None):
+        """Book half of a borrow. Returns (True, due date) or (False, message)."""
+        with self.transaction([isbn]):
+            book = self.find_book(isbn)
+            if not book:
+                return False, "Book not found."
+            if self._held_for_other(isbn, member_id):
+                return False, f"Book '{book.title}' is on hold for another member."
+            success, msg = book.check_out(member_id)
+            if not success:
+                return False, msg
+            if due_date:
+                book.due_date = due_date  # Replay keeps the original due date
+            self.loans.add(isbn, book.due_date)
+            self._record('check_out_book', isbn=isbn, member_id=member_id, due_date=book.due_date)
+            self._record_loan(BORROW, book, member_id)
+            self._fulfil_hold(isbn, member_id)
+            return True, book.due_date
+
+    def check_in_book(self, isbn, member_id):
+        """Book half of a return. Returns (True, the usual return message) or (False, message)."""
+        with self.transaction([isbn]):
+            book = self.find_book(isbn)
+            if not book:
+                return False, "Book not found."
+            if book.borrowed_by != member_id:
+                return False, INCONSISTENT
+            days = book.days_overdue()
+            _, msg_book = book.return_book()
+            self.loans.remove(isbn)
+            self._record('check_in_book', isbn=isbn, member_id=member_id)
+            self._record_loan(RETURN, book, member_id)
+            return True, f"SUCCESS: Book returned. {msg_book}.{self._fine_message(days)}{self._promote_hold(book)}"
+
+    def hold_book(self, isbn, member_id, name):
+        """Book side of a hold; `name` is None when the member's shard does not know them."""
+        with self.transaction([isbn]):
+            book = self.find_book(isbn)
+            if not book:
+                return False, "Book not found."
+            if name is None:
+                return False, "Member not found."
+            return self._place_hold(book, member_id, name)
+
+    def add_member_loan(self, member_id, isbn):
+        """Member half of a borrow. Returns (True, member name) or (False, message)."""
+        with self.transaction(member_ids=[member_id]):
+            member = self.find_member(member_id)
+            if not member:
+                return False, "Member not found."
+            success, msg = member.borrow_book(isbn)
+            if not success:
+                return False, msg
+            self._record('add_member_loan', member_id=member_id, isbn=isbn)
+            return True, member.name
+
+    def remove_member_loan(self, member_id, isbn):
+        """Member half of a return. Returns (True, member name) or (False, message)."""
+        with self.transaction(member_ids=[member_id]):
+            member = self.find_member(member_id)
+            if not member:
+                return False, "Member not found."
+            success, msg = member.return_book(isbn)
+            if not success:
+                return False, INCONSISTENT
+            self._record('remove_member_loan', member_id=member_id, isbn=isbn)
+            return True, member.name
+
+    def _replay(self, record):
+        op = record['op']
+        if op == 'check_out_book':
+            self.check_out_book(record['isbn'], record['member_id'], record['due_date'])
+        elif op == 'check_in_book':
+            self.check_in_book(record['isbn'], record['member_id'])
+        elif op == 'add_member_loan':
+            self.add_member_loan(record['member_id'], record['isbn'])
+        elif op == 'remove_member_loan':
+            self.remove_member_loan(record['member_id'], record['isbn'])
+        else:
+            super()._replay(record)
+
+
+class ShardWorker:
+    """
+    Serves one ShardLibrary and takes part in prepare/commit transactions. prepare()
+    validates a half and reserves what it touches (the book, or a loan slot of
+    the member) so conflicting transactions fail fast instead of waiting;
+    commit() then applies the half, which the reservation guarantees will succeed.
+    Prepared halves live only in memory: they are not journaled, and a restarted
+    shard has none. Requests are handled one at a time.
+    """
+
+    def __init__(self, library):
+        self.library = library
+        self.lock = threading.Lock()
+        self.prepared = {}       # Key: transaction ID, Value: (action, args, reservations)
+        self.reserved = set()    # ('book', ISBN) / ('loan', member_id, ISBN) held by prepared halves
+        self.pending_loans = Counter()  # Key: member_id, Value: prepared borrows not yet committed
+
+    def handle(self, op, args, open_transactions):
+        """Runs one request; `open_transactions` collects the caller's prepared IDs."""
+        with self.lock:
+            if op == 'call':
+                name, args = args
+                if name not in SHARD_METHODS:
+                    raise ValueError(f"Not a shard method: {name!r}")
+                return getattr(self.library, name)(*args)
+            if op == 'borrow_book':
+                return self.borrow_book(*args)
+            if op == 'return_book':
+                return self.return_book(*args)
+            if op == 'search':
+                return self.search(*args)
+            if op == 'search_members':
+                return self.search_members(*args)
+            if op == 'prepare':
+                result = self.prepare(*args)
+                if result[0]:
+                    open_transactions.add(args[0])
+                return result
+            if op in ('commit', 'abort'):
+                open_transactions.discard(args[0])
+                return getattr(self, op)(*args)
+            if op == 'prepare_many':
+                result = self.prepare_many(*args)
+                if result[0]:
+                    open_transactions.update(_part_ids(args[0], len(args[1])))
+                return result
+            if op in ('commit_many', 'abort_many'):
+                open_transactions.difference_update(_part_ids(*args))
+                return getattr(self, op)(*args)
+            raise ValueError(f"Unknown shard request: {op!r}")
+
+    # --- Transactions with both sides on this shard ---
+
+    def borrow_book(self, isbn, member_id):
+        book, member = self.library.find_book(isbn), self.library.find_member(member_id)
+        if book and ('book', isbn) in self.reserved:
+            return False, BOOK_BUSY.format(book.title)
+        pending = self.pending_loans[member_id]
+        if member and pending and len(member.borrowed_books) + pending >= member.MAX_BOOKS:
+            return False, f"Maximum book limit ({member.MAX_BOOKS}) reached."
+        return self.library.borrow_book(isbn, member_id)
+
+    def return_book(self, isbn, member_id):
+        book = self.library.find_book(isbn)
+        if book and ('book', isbn) in self.reserved:
+            return False, BOOK_BUSY.format(book.title)
+        return self.library.return_book(isbn, member_id)
+
+    # --- Prepare/commit participant ---
+
+    def prepare(self, transaction_id, action, key, other):
+        """Checks one half without applying it. Returns (True, info) with a reservation held, or (False, message)."""
+        library = self.library
+        if action in BOOK_ACTIONS:
+            book = library.find_book(key)
+            if not book:
+                return False, "Book not found."
+            reservations = [('book', key)]
+            if reservations[0] in self.reserved:
+                return False, BOOK_BUSY.format(book.title)
+            if action == 'check_out_book' and not book.available:
+                return False, f"Book '{book.title}' is already checked out."
+            if action == 'check_out_book' and library._held_for_other(key, other):
+                return False, f"Book '{book.title}' is on hold for another member."
+            if action == 'check_in_book' and book.borrowed_by != other:
+                return False, INCONSISTENT
+            info = book.title if action == 'check_out_book' else book.days_overdue()
+        elif action in MEMBER_ACTIONS:
+            member = library.find_member(key)
+            if not member:
+                return False, "Member not found."
+            reservations = [('loan', key, other)]
+            if reservations[0] in self.reserved:
+                return False, LOAN_BUSY.format(other)
+            if action == 'add_member_loan':
+                if len(member.borrowed_books) + self.pending_loans[key] >= member.MAX_BOOKS:
+                    return False, f"Maximum book limit ({member.MAX_BOOKS}) reached."
+                self.pending_loans[key] += 1
+            elif other not in member.borrowed_books:
+                return False, INCONSISTENT
+            info = member.name
+        else:
+            raise ValueError(f"Unknown transaction action: {action!r}")
+        self.reserved.update(reservations)
+        self.prepared[transaction_id] = (action, (key, other), reservations)
+        return True, info
+
+    def commit(self, transaction_id):
+        action, args, _ = self._release(transaction_id)
+        return getattr(self.library, action)(*args)
+
+    def abort(self, transaction_id):
+        if transaction_id in self.prepared:
+            self._release(transaction_id)
+        return True, None
+
+    def prepare_many(self, transaction_id, halves):
+        """
+        Prepares the halves of a batch as one unit, under the IDs from _part_ids. If one
+        fails, those already prepared are released and (False, (position, message)) is
+        returned; otherwise (True, [info, ...]).
+        """
+        infos = []
+        for part_id, half in zip(_part_ids(transaction_id, len(halves)), halves):
+            success, info = self.prepare(part_id, *half)
+            if not success:
+                self.abort_many(transaction_id, len(infos))
+                return False, (len(infos), info)
+            infos.append(info)
+        return True, infos
+
+    def commit_many(self, transaction_id, count):
+        return [self.commit(part_id) for part_id in _part_ids(transaction_id, count)]
+
+    def abort_many(self, transaction_id, count):
+        for part_id in _part_ids(transaction_id, count):
+            self.abort(part_id)
+        return True, None
+
+    def _release(self, transaction_id):
+        action, args, reservations = self.prepared.pop(transaction_id)
+        self.reserved.difference_update(reservations)
+        if action == 'add_member_loan':
+            self.pending_loans[args[0]] -= 1
+            if not self.pending_loans[args[0]]:
+                del self.pending_loans[args[0]]
+        return action, args, reservations
+
+    # --- Fan-out helpers ---
+
+    def search(self, query, year, limit):
+        """This shard's best `limit` matches as (total, [((-score, isbn), Book), ...])."""
+        total, ranked = self.library.search_index.ranked(query, year, limit)
+        books = self.library.books
+        return total, [(key, books[key[1]]) for key in ranked if key[1] in books]
+
+    def search_members(self, name, limit):
+        """This shard's best `limit` name matches as [((-score, member_id), Member), ...]."""
+        library = self.library
+        if library.member_directory is None:
+            library._build_member_directory()
+        members = library.members
+        return [(key, members[key[1]]) for key in library.member_directory.ranked(name, limit)
+                if key[1] in members]
+
+    # --- Serving ---
+
+    def serve(self, listener, stopped):
+        """Accepts routers until a 'stop' request; each connection gets a thread."""
+        while not stopped.is_set():
+            try:
+                connection = listener.accept()
+            except OSError:
+                break
+            threading.Thread(target=self.serve_connection, args=(connection, stopped), daemon=True).start()
+
+    def serve_connection(self, connection, stopped):
+        open_transactions = set()
+        try:
+            while True:
+                op, args = connection.recv()
+                if op == 'stop':
+                    connection.send((True, None))
+                    stopped.set()
+                    return
+                try:
+                    connection.send((True, self.handle(op, args, open_transactions)))
+                except Exception as error:
+                    connection.send((False, error))
+        except (EOFError, OSError):
+            pass
+        finally:
+            # A router that disconnects mid-transaction leaves nothing reserved
+            with self.lock:
+                for transaction_id in open_transactions:
+                    self.abort(transaction_id)
+            connection.close()
+
+
+def _part_ids(transaction_id, count):
+    """Transaction IDs of the halves of a batch, one per half a shard prepares."""
+    return [f'{transaction_id}/{n}' for n in range(count)]
+
+
+def _run_shard(index, directory, address, authkey, load_mode, storage, status):
+    """Shard process body: load this shard's files, listen on `address`, serve until stopped."""
+    sys.stdout = open(os.devnull, 'w')  # The router reports for all shards
+    try:
+        shard_dir = os.path.join(directory, str(index))
+        for name, filename in Library.DATA_FILES.items():
+            setattr(ShardLibrary, name, os.path.join(shard_dir, filename))
+        worker = ShardWorker(ShardLibrary(load_mode=load_mode, storage=storage))
+        listener = Listener(address, family='AF_UNIX', authkey=authkey)
+    except Exception as error:
+        status.send((False, error))
+        return
+    status.send((True, None))
+    status.close()
+
+    stopped = threading.Event()
+    threading.Thread(target=worker.serve, args=(listener, stopped), daemon=True).start()
+    stopped.wait()
+    listener.close()
+    worker.library.close()
+    if os.path.exists(address):
+        os.remove(address)
+
+
+def partition_snapshot(directory, shards):
+    """
+    Splits the regular snapshot (Library.BOOKS_FILE/MEMBERS_FILE plus the journal)
+    into per-shard snapshot files under `directory` and writes the manifest.
+    Returns the number of (books, members) copied.
+    """
+    source = Library()
+    books = [[] for _ in range(shards)]
+    members = [[] for _ in range(shards)]
+    for isbn, book in source.books.items():
+        books[shard_of(isbn, shards)].append((isbn, Library._serialize(book)))
+    for member_id, member in source.members.items():
+        members[shard_of(member_id, shards)].append((member_id, Library._serialize(member)))
+    for index in range(shards):
+        shard_dir = os.path.join(directory, str(index))
+        os.makedirs(shard_dir, exist_ok=True)
+        Library._write_snapshot_file(os.path.join(shard_dir, 'books.json'), books[index])
+        Library._write_snapshot_file(os.path.join(shard_dir, 'members.json'), members[index])
+    with open(os.path.join(directory, MANIFEST_FILE), 'w') as f:
+        json.dump({'shards': shards}, f)
+    source.close()
+    return len(source.books), len(source.members)
+
+
+class ShardedLibrary:
+    """
+    The Library API in front of `shards` worker processes. Books are partitioned by
+    ISBN hash and members by member-ID hash; each shard keeps its own snapshot and
+    journal under `directory`. A borrow or return whose book and member live on
+    different shards is prepared on both shards in parallel, then committed on
+    both or aborted, so Book.borrowed_by and Member.borrowed_books stay in step
+    while every process stays up. Reports fan out to all shards in parallel.
+
+    This is not durable two-phase commit. Neither the router nor the shards log
+    the decision, and nothing recovers on restart. If a process dies between the
+    two commits, one shard keeps its half and the other does not. A book can then
+    be out with no member holding it, or the reverse. Returning such a loan fails
+    with INCONSISTENT, and a person has to repair it.
+
+    On first start the regular snapshot (Library.BOOKS_FILE/MEMBERS_FILE) is split
+    into the shards. Use connect() to attach another router (e.g. in another
+    process) to running shards. SQLite storage is not supported per shard.
+    """
+
+    def __init__(self, shards=2, directory=SHARD_DIRECTORY, load_mode='full', storage='objects'):
+        if shards < 1:
+            raise ValueError("A sharded library needs at least one shard.")
+        if storage not in Library.SNAPSHOT_BACKENDS:
+            raise ValueError(f"Sharding supports the snapshot storages {Library.SNAPSHOT_BACKENDS}.")
+        directory = _data_path(directory)
+        os.makedirs(directory, exist_ok=True)
+        manifest = os.path.join(directory, MANIFEST_FILE)
+        if os.path.exists(manifest):
+            with open(manifest) as f:
+                existing = json.load(f)['shards']
+            if existing != shards:
+                raise ValueError(f"{directory} holds {existing} shards, not {shards}.")
+        else:
+            books, members = partition_snapshot(directory, shards)
+            print(f"\nPartitioned {books} books and {members} members into {shards} shards.")
+
+        authkey = multiprocessing.current_process().authkey
+        socket_dir = tempfile.mkdtemp(prefix='library-shards-')
+        addresses, self.processes = [], []
+        for index in range(shards):
+            address = os.path.join(socket_dir, f'{index}.sock')
+            status, child_status = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(
+                target=_run_shard, args=(index, directory, address, authkey, load_mode, storage, child_status),
+                name=f'library-shard-{index}', daemon=True)
+            process.start()
+            child_status.close()
+            addresses.append(address)
+            self.processes.append(process)
+            try:
+                started, error = status.recv()
+            except EOFError:
+                started, error = False, RuntimeError(f"Shard {index} exited during startup.")
+            if not started:
+                self.processes.pop()
+                self._stop_processes()
+                raise error
+        self._attach(addresses, storage)
+        self.socket_dir = socket_dir
+
+        stats = self.get_stats()
+        print(f"\nLoaded {stats['Total Books']} books and {stats['Total Members']} members "
+              f"from {shards} shards.")
+
+    @classmethod
+    def connect(cls, addresses, storage='objects'):
+        """A router for shards started by another ShardedLibrary (same authkey required)."""
+        router = cls.__new__(cls)
+        router.processes = []
+        router.socket_dir = None
+        router._attach(addresses, storage)
+        return router
+
+    def _attach(self, addresses, storage):
+        self.addresses = list(addresses)
+        self.shard_count = len(self.addresses)
+        authkey = multiprocessing.current_process().authkey
+        self.connections = [Client(address, family='AF_UNIX', authkey=authkey) for address in self.addresses]
+        self.locks = [threading.Lock() for _ in self.addresses]  # One request in flight per connection
+        self.book_class = Book if storage == 'objects' else CompactBook
+        self.member_class = Member if storage == 'objects' else CompactMember
+        self._transaction_ids = itertools.count()
+        self._router_id = f'{os.getpid()}-{id(self)}'
+
+    # --- Requests ---
+
+    def _request_all(self, requests):
+        """
+        Sends {shard: (op, args)} to every listed shard before waiting for any reply,
+        so the shards work in parallel. Returns {shard: result}.
+        """
+        shards = sorted(requests)
+        for shard in shards:
+            self.locks[shard].acquire()
+        try:
+            for shard in shards:
+                self.connections[shard].send(requests[shard])
+            replies = {shard: self.connections[shard].recv() for shard in shards}
+        finally:
+            for shard in shards:
+                self.locks[shard].release()
+        for ok, result in replies.values():
+            if not ok:
+                raise result
+        return {shard: result for shard, (_, result) in replies.items()}
+
+    def _request(self, shard, op, args):
+        return self._request_all({shard: (op, args)})[shard]
+
+    def _call(self, shard, name, *args):
+        return self._request(shard, 'call', (name, args))
+
+    def _call_all(self, name, *args):
+        """Calls a Library method on every shard in parallel; returns results in shard order."""
+        results = self._request_all({shard: ('call', (name, args)) for shard in range(self.shard_count)})
+        return [results[shard] for shard in range(self.shard_count)]
+
+    def _shard(self, key):
+        return shard_of(key, self.shard_count)
+
+    # --- Persistence ---
+
+    def save_data(self):
+        self._call_all('save_data')
+        print("\nData saved successfully.")
+
+    def compact(self):
+        self._call_all('compact')
+
+    def close(self):
+        """Disconnects; shards started by this router are stopped (unsaved changes are dropped)."""
+        if self.processes:
+            self._request_all({shard: ('stop', None) for shard in range(self.shard_count)})
+        for connection in self.connections:
+            connection.close()
+        self._stop_processes()
+
+    def _stop_processes(self):
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self.processes = []
+        if getattr(self, 'socket_dir', None) and os.path.isdir(self.socket_dir):
+            for name in os.listdir(self.socket_dir):
+                os.remove(os.path.join(self.socket_dir, name))
+            os.rmdir(self.socket_dir)
+
+    # --- Books and members ---
+
+    def add_book(self, book):
+        return self._call(self._shard(book.isbn), 'add_book', book)
+
+    def add_books_bulk(self, rows):
+        """Library.add_books_bulk, with each shard validating and adding its own rows in parallel."""
+        batches = {}   # Key: shard, Value: (rows, their indexes in `rows`)
+        seen = set()
+        rejected = []
+        for index, row in enumerate(rows):
+            record, reason = validate_row(row)
+            if record is None:
+                rejected.append((index, reason))
+            elif record['isbn'] in seen:
+                rejected.append((index, "Duplicate ISBN in file"))
+            else:
+                seen.add(record['isbn'])
+                shard_rows, indexes = batches.setdefault(self._shard(record['isbn']), ([], []))
+                shard_rows.append(row)
+                indexes.append(index)
+        results = self._request_all({shard: ('call', ('add_books_bulk', (shard_rows,)))
+                                     for shard, (shard_rows, _) in batches.items()})
+        added = 0
+        for shard, (count, shard_rejected) in results.items():
+            added += count
+            indexes = batches[shard][1]
+            rejected.extend((indexes[index], reason) for index, reason in shard_rejected)
+        rejected.sort()
+        return added, rejected
+
+    def find_book(self, isbn):
+        return self._call(self._shard(isbn), 'find_book', isbn)
+
+    def register_member(self, member):
+        return self._call(self._shard(member.member_id), 'register_member', member)
+
+    def find_member(self, member_id):
+        return self._call(self._shard(member_id), 'find_member', member_id)
+
+    def search_books(self, query='', year=None, page=1, page_size=10):
+        """Same results as Library.search_books: each shard ranks its matches, then they are merged."""
+        limit = page * page_size if page >= 1 and page_size >= 1 else 0
+        results = self._request_all({shard: ('search', (query, year, limit))
+                                     for shard in range(self.shard_count)})
+        total = sum(count for count, _ in results.values())
+        ranked = heapq.merge(*(matches for _, matches in results.values()), key=lambda match: match[0])
+        return total, [book for _, book in itertools.islice(ranked, limit - page_size, limit)]
+
+    def search_members(self, name, limit=10):
+        """
+        Like Library.search_members: each shard ranks its own members, then the best are
+        merged by score. Equal scores keep shard order rather than registration order.
+        """
+        results = self._request_all({shard: ('search_members', (name, limit)) for shard in range(self.shard_count)})
+        matches = itertools.chain(*(results[shard] for shard in range(self.shard_count)))
+        return [member for _, member in heapq.nsmallest(limit, matches, key=lambda match: match[0][0])]
+
+    # --- Core Transaction Methods ---
+
+    def borrow_book(self, isbn, member_id):
+        """Handles the book borrowing transaction, across shards if need be."""
+        book_shard, member_shard = self._shard(isbn), self._shard(member_id)
+        if book_shard == member_shard:
+            return self._request(book_shard, 'borrow_book', (isbn, member_id))
+        success, prepared = self._prepare(book_shard, ('check_out_book', isbn, member_id),
+                                          member_shard, ('add_member_loan', member_id, isbn))
+        if not success:
+            return False, prepared
+        transaction_id, title, name = prepared
+        committed = self._request_all({book_shard: ('commit', (transaction_id,)),
+                                       member_shard: ('commit', (transaction_id,))})
+        _, due_date = committed[book_shard]
+        return True, f"SUCCESS: Book '{title}' borrowed by {name}. Due: {due_date}"
+
+    def return_book(self, isbn, member_id):
+        """Handles the book return transaction, across shards if need be."""
+        book_shard, member_shard = self._shard(isbn), self._shard(member_id)
+        if book_shard == member_shard:
+            return self._request(book_shard, 'return_book', (isbn, member_id))
+        success, prepared = self._prepare(book_shard, ('check_in_book', isbn, member_id),
+                                          member_shard, ('remove_member_loan', member_id, isbn))
+        if not success:
+            return False, prepared
+        transaction_id, _, _ = prepared
+        committed = self._request_all({book_shard: ('commit', (transaction_id,)),
+                                       member_shard: ('commit', (transaction_id,))})
+        return committed[book_shard]
+
+    def borrow_books(self, member_id, isbns):
+        """Checks out a stack of books for one member, all or nothing (see borrow_batch)."""
+        return self.borrow_batch([(isbn, member_id) for isbn in isbns])
+
+    def return_books(self, member_id, isbns):
+        """Returns a stack of books for one member, all or nothing (see return_batch)."""
+        return self.return_batch([(isbn, member_id) for isbn in isbns])
+
+    def borrow_batch(self, loans):
+        """
+        Same contract as Library.borrow_batch. Every half of every loan is prepared in
+        one round to the shards involved and committed in a second, so a batch costs two
+        round trips however many books it holds.
+        """
+        loans = list(loans)
+        success, result = self._run_batch(loans, 'check_out_book', 'add_member_loan', "No books to borrow.")
+        if not success:
+            return False, result
+        names, committed = result
+        who = names[0] if len(set(names)) == 1 else f"{len(set(names))} members"
+        due_dates = sorted({due_date for _, due_date in committed})
+        return True, f"SUCCESS: {len(loans)} books borrowed by {who}. Due: {', '.join(due_dates)}"
+
+    def return_batch(self, loans):
+        """Same contract as Library.return_batch, in two rounds like borrow_batch."""
+        loans = list(loans)
+        success, result = self._run_batch(loans, 'check_in_book', 'remove_member_loan', "No books to return.")
+        if not success:
+            return False, result
+        overdue_days = [days for days in result[0] if days]
+        message = f"SUCCESS: {len(loans)} books returned."
+        if overdue_days:
+            fines = sum(Library.FINE_POLICY.fine(days) for days in overdue_days)
+            message += f" Note: {len(overdue_days)} were overdue. Fines: ${fines:.2f}"
+        return True, message
+
+    def _run_batch(self, loans, book_action, member_action, empty_message):
+        """
+        Prepares and commits both halves of every (isbn, member_id) loan. Returns
+        (True, ([prepare info of each loan's other half], [commit result of each book half]))
+        or (False, "<isbn>: <reason>") for the first failing loan, with nothing applied.
+        """
+        if not loans:
+            return False, empty_message
+        seen = set()
+        for isbn, _ in loans:
+            if isbn in seen:
+                return False, f"{isbn}: Listed more than once."
+            seen.add(isbn)
+
+        halves = {}  # Key: shard, Value: [(loan index, half), ...] in loan order
+        for index, (isbn, member_id) in enumerate(loans):
+            halves.setdefault(self._shard(isbn), []).append((index, (book_action, isbn, member_id)))
+            halves.setdefault(self._shard(member_id), []).append((index, (member_action, member_id, isbn)))
+        transaction_id = f'{self._router_id}-{next(self._transaction_ids)}'
+        replies = self._request_all({shard: ('prepare_many', (transaction_id, [half for _, half in entries]))
+                                     for shard, entries in halves.items()})
+
+        failures = []
+        for shard, (success, info) in replies.items():
+            if not success:
+                position, message = info
+                index, half = halves[shard][position]
+                failures.append((index, half[0] == member_action, message))
+        if failures:
+            aborts = {shard: ('abort_many', (transaction_id, len(halves[shard])))
+                      for shard, (success, _) in replies.items() if success}
+            if aborts:
+                self._request_all(aborts)
+            index, _, message = min(failures)
+            return False, f"{loans[index][0]}: {message}"
+
+        committed = self._request_all({shard: ('commit_many', (transaction_id, len(entries)))
+                                       for shard, entries in halves.items()})
+        infos, results = [None] * len(loans), [None] * len(loans)
+        for shard, entries in halves.items():
+            for (index, half), info, result in zip(entries, replies[shard][1], committed[shard]):
+                if half[0] == book_action:
+                    results[index] = result
+                    if book_action == 'check_in_book':
+                        infos[index] = info  # Days overdue
+                elif book_action == 'check_out_book':
+                    infos[index] = info  # Member name
+        return True, (infos, results)
+
+    def _prepare(self, book_shard, book_half, member_shard, member_half):
+        """
+        Phase one: both shards check and reserve their half in parallel. Returns
+        (True, (transaction ID, book title, member name)) when both agreed; otherwise
+        aborts the half that did and returns (False, message), choosing the message
+        Library would report first.
+        """
+        transaction_id = f'{self._router_id}-{next(self._transaction_ids)}'
+        replies = self._request_all({book_shard: ('prepare', (transaction_id,) + book_half),
+                                     member_shard: ('prepare', (transaction_id,) + member_half)})
+        (book_ok, book_info), (member_ok, member_info) = replies[book_shard], replies[member_shard]
+        if book_ok and member_ok:
+            return True, (transaction_id, book_info, member_info)
+        aborts = {shard: ('abort', (transaction_id,))
+                  for shard, (ok, _) in replies.items() if ok}
+        if aborts:
+            self._request_all(aborts)
+        if not book_ok and (book_info == "Book not found." or member_ok):
+            return False, book_info
+        return False, member_info
+
+    # --- Hold Methods (holds live on the book's shard) ---
+
+    def place_hold(self, isbn, member_id):
+        member = self.find_member(member_id)
+        return self._call(self._shard(isbn), 'hold_book', isbn, member_id, member.name if member else None)
+
+    def cancel_hold(self, isbn, member_id):
+        return self._call(self._shard(isbn), 'cancel_hold', isbn, member_id)
+
+    def expire_holds(self, today=None):
+        return sum(self._call_all('expire_holds', today))
+
+    def get_hold_queue_length(self, isbn):
+        return self._call(self._shard(isbn), 'get_hold_queue_length', isbn)
+
+    # --- Reporting Methods ---
+
+    def get_overdue_books(self):
+        """All overdue books from every shard, oldest due date first."""
+        return list(heapq.merge(*self._call_all('get_overdue_books'), key=lambda book: book.due_date))
+
+    def get_fine_report(self, today=None):
+        return merge_fine_reports(self._call_all('get_fine_report', today))
+
+    def get_top_books(self, n=100):
+        """The n most borrowed books. Each book's loans are all logged on its own shard."""
+        tops = self._call_all('get_top_books', n)
+        return heapq.nsmallest(n, itertools.chain(*tops), key=lambda entry: (-entry['loans'], entry['isbn']))
+
+    def get_also_borrowed(self, isbn, n=10):
+        """
+        Books borrowed alongside `isbn`. Each shard logs the loans of its own books, so
+        only books on the same shard as `isbn` pair up with it.
+        """
+        return self._call(self._shard(isbn), 'get_also_borrowed', isbn, n)
+
+    def get_daily_circulation(self, days=365, today=None):
+        """Borrows and returns per day, summed over the shards."""
+        merged = None
+        for circulation in self._call_all('get_daily_circulation', days, today):
+            if merged is None:
+                merged = circulation
+                continue
+            for total, entry in zip(merged, circulation):
+                total['borrows'] += entry['borrows']
+                total['returns'] += entry['returns']
+        return merged
+
+    def start_report(self, name, *args, background=True):
+        """
+        Runs one of reporting.REPORTS through the router. The shards answer its calls
+        between their own transactions, so nothing needs forking here.
+        """
+        if name not in REPORTS:
+            raise ValueError(f"Unknown report '{name}'. Expected one of {tuple(REPORTS)}.")
+        return REPORTS[name](self, *args)
+
+    def get_stats(self):
+        """Library statistics summed over the shards."""
+        totals = Counter()
+        for stats in self._call_all('get_stats'):
+            totals.update(stats)
+        return dict(totals)
+
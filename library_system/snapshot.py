@@ -0,0 +1,649 @@
+# library_system/snapshot.py
+
+import heapq
+import mmap
+import os
+import struct
+import threading
+import zlib
+from array import array
+from bisect import bisect_left
+from collections.abc import MutableMapping
+from datetime import date
+from .book import Book
+from .member import Member
+from .overdue import DueDateIndex, date_to_ordinal
+
+# File layout (little-endian), version 1:
+#   header | string heap | book table | member table | book index | member index | loans
+# Records are fixed-width and point into the heap with (u32 offset, u16 length) pairs;
+# length NONE_LENGTH stands for None. Each index is an open-addressing table of u32
+# slots (record number + 1, 0 = empty) probed linearly from crc32(key). The loans
+# section holds the due ordinals of every active loan in ascending order, followed
+# by the matching book record numbers. The header also counts the heap bytes no
+# record points to any more (left behind by incremental writes).
+MAGIC = b'LIBSNAP\x00'
+VERSION = 1
+HEADER = struct.Struct('<8sII12Q')
+# ISBN, title, author and borrowed_by references, publication_year, due ordinal, available
+BOOK_RECORD = struct.Struct('<IHIHIHIHiiB3x')
+# member_id, name, and the borrowed ISBNs joined by LOAN_SEPARATOR
+MEMBER_RECORD = struct.Struct('<IHIHIH2x')
+KEY_REFERENCE = struct.Struct('<IH')  # Both record types start with their key
+NONE_LENGTH = 0xFFFF
+NO_YEAR = -2 ** 31
+LOAN_SEPARATOR = '\x1f'
+MAX_HEAP = 2 ** 32 - 1
+ALIGNMENT = 8
+MAX_GARBAGE = 0.5  # Share of dead heap bytes past which the next write starts a fresh heap
+
+
+def _index_slots(count):
+    """Power-of-two slot count keeping the index at most half full."""
+    slots = 8
+    while slots < count * 2:
+        slots *= 2
+    return slots
+
+
+def _insert(slots, key_hash, record):
+    mask = len(slots) - 1
+    slot = key_hash & mask
+    while slots[slot]:
+        slot = (slot + 1) & mask
+    slots[slot] = record + 1
+
+
+class MappedSnapshot:
+    """
+    A binary snapshot opened with mmap: only the header is parsed, so opening
+    takes the same time for any catalog size. A missing file opens as empty.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = self._map = None
+        self.book_count = self.member_count = self.loan_count = 0
+        self.heap = self.heap_size = self.heap_garbage = self.book_table = self.member_table = 0
+        self.book_index = self.member_index = array('I', bytes(4))
+        self.loan_days, self.loan_records = array('i'), array('I')
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.heap_garbage, self.book_count, self.member_count, self.heap, self.heap_size,
+         self.book_table, self.member_table, self.book_index_offset, self.book_slots,
+         self.member_index_offset, self.member_slots, self.loan_count, self.loans) = HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a library snapshot.")
+        if version != VERSION:
+            self.close()
+            raise ValueError(f"{path} has snapshot version {version}; this version reads {VERSION}.")
+        view = memoryview(self._map)
+        self.book_index = view[self.book_index_offset:self.book_index_offset + 4 * self.book_slots].cast('I')
+        self.member_index = view[self.member_index_offset:self.member_index_offset + 4 * self.member_slots].cast('I')
+        self.loan_days = view[self.loans:self.loans + 4 * self.loan_count].cast('i')
+        end = self.loans + 8 * self.loan_count
+        self.loan_records = view[self.loans + 4 * self.loan_count:end].cast('I')
+        self._views = (view, self.book_index, self.member_index, self.loan_days, self.loan_records)
+
+    def close(self):
+        if self._map is not None:
+            for view in getattr(self, '_views', ()):
+                view.release()
+            self._map.close()
+            self._file.close()
+            self._map = None
+
+    def string(self, offset, length):
+        if length == NONE_LENGTH:
+            return None
+        start = self.heap + offset
+        return self._map[start:start + length].decode('utf-8')
+
+    def find(self, key, index, table, width):
+        """Record number of `key` in a table, or -1."""
+        if not self._map:
+            return -1
+        data = key.encode('utf-8')
+        mask = len(index) - 1
+        slot = zlib.crc32(data) & mask
+        mapped, heap = self._map, self.heap
+        while True:
+            entry = index[slot]
+            if not entry:
+                return -1
+            offset, length = KEY_REFERENCE.unpack_from(mapped, table + (entry - 1) * width)
+            if length == len(data) and mapped[heap + offset:heap + offset + length] == data:
+                return entry - 1
+            slot = (slot + 1) & mask
+
+    def key_at(self, table, width, record):
+        return self.string(*KEY_REFERENCE.unpack_from(self._map, table + record * width))
+
+    def key_hashes(self, table, width, count):
+        """crc32 of every key in a table, in record order (for rebuilding an index)."""
+        mapped, heap = self._map, self.heap
+        for record in range(count):
+            offset, length = KEY_REFERENCE.unpack_from(mapped, table + record * width)
+            yield zlib.crc32(mapped[heap + offset:heap + offset + length])
+
+    def book_fields(self, record):
+        (isbn, isbn_length, title, title_length, author, author_length, borrower, borrower_length,
+         year, due, available) = BOOK_RECORD.unpack_from(self._map, self.book_table + record * BOOK_RECORD.size)
+        string = self.string
+        return {
+            'title': string(title, title_length),
+            'author': string(author, author_length),
+            'isbn': string(isbn, isbn_length),
+            'publication_year': None if year == NO_YEAR else year,
+            'available': bool(available),
+            'borrowed_by': string(borrower, borrower_length),
+            'due_date': date.fromordinal(due).isoformat() if due else None,
+        }
+
+    def member_fields(self, record):
+        (member_id, member_id_length, name, name_length,
+         loans, loans_length) = MEMBER_RECORD.unpack_from(self._map, self.member_table + record * MEMBER_RECORD.size)
+        loans = self.string(loans, loans_length)
+        return {
+            'name': self.string(name, name_length),
+            'member_id': self.string(member_id, member_id_length),
+            'borrowed_books': loans.split(LOAN_SEPARATOR) if loans else [],
+        }
+
+    def book_loan_day(self, record):
+        """Due ordinal of a book record that is on loan in this snapshot, else None."""
+        _, due, available = struct.unpack_from('<iiB', self._map, self.book_table + record * BOOK_RECORD.size + 24)
+        return due if due and not available else None
+
+
+class CopyOnWrite:
+    """
+    Mixin for objects decoded from a mapped snapshot. The first change to one moves
+    it into its map's overlay, where every later lookup of the key finds it; objects
+    that are only read never leave the file.
+    """
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        self._promote()
+
+    def _promote(self):
+        mapping = self.__dict__.get('_mapping')
+        if mapping is not None:
+            self.__dict__['_mapping'] = None
+            mapping.promote(self)
+
+
+class MappedBook(CopyOnWrite, Book):
+    pass
+
+
+class MappedMember(CopyOnWrite, Member):
+    # Loans change by mutating the borrowed_books list, which __setattr__ does not see
+
+    def borrow_book(self, isbn):
+        self._promote()
+        return super().borrow_book(isbn)
+
+    def return_book(self, isbn):
+        self._promote()
+        return super().return_book(isbn)
+
+
+class MappedRecordMap(MutableMapping):
+    """
+    One table of a MappedSnapshot seen as a dict of objects. Lookups decode the
+    record from the mapped file; promoted (changed) and newly added objects live in
+    an in-memory overlay until the next snapshot is written.
+    """
+
+    object_class = None
+
+    def __init__(self, snapshot):
+        self.remap(snapshot)
+
+    def remap(self, snapshot):
+        """Switches to a freshly written snapshot, which already holds the overlay."""
+        self.snapshot = snapshot
+        self.overlay = {}   # Key: primary key, Value: promoted or added object
+        self.added = set()  # Keys not in the snapshot
+
+    def promote(self, obj):
+        self.overlay.setdefault(self.key_of(obj), obj)
+
+    def record_number(self, key):
+        raise NotImplementedError
+
+    def decode(self, record):
+        obj = self.object_class.from_dict(self.fields(record))
+        obj.__dict__['_mapping'] = self
+        return obj
+
+    def __getitem__(self, key):
+        obj = self.overlay.get(key)
+        if obj is not None:
+            return obj
+        record = self.record_number(key)
+        if record < 0:
+            raise KeyError(key)
+        return self.decode(record)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        return key in self.overlay or self.record_number(key) >= 0
+
+    def __setitem__(self, key, obj):
+        if key not in self.overlay and self.record_number(key) < 0:
+            self.added.add(key)
+        self.overlay[key] = obj
+
+    def __delitem__(self, key):
+        raise NotImplementedError("Records cannot be deleted from a mapped snapshot.")
+
+    def __len__(self):
+        return self.base_count + len(self.added)
+
+    def __iter__(self):
+        for record in range(self.base_count):
+            yield self.key_at(record)
+        yield from list(self.added)
+
+    def items(self):
+        overlay = self.overlay
+        for record in range(self.base_count):
+            key = self.key_at(record)
+            obj = overlay.get(key)
+            yield key, obj if obj is not None else self.decode(record)
+        for key in list(self.added):
+            yield key, overlay[key]
+
+    def values(self):
+        return (obj for _, obj in self.items())
+
+
+class MappedBookMap(MappedRecordMap):
+    object_class = MappedBook
+
+    @property
+    def base_count(self):
+        return self.snapshot.book_count
+
+    @staticmethod
+    def key_of(book):
+        return book.isbn
+
+    def record_number(self, isbn):
+        return self.snapshot.find(isbn, self.snapshot.book_index, self.snapshot.book_table, BOOK_RECORD.size)
+
+    def key_at(self, record):
+        return self.snapshot.key_at(self.snapshot.book_table, BOOK_RECORD.size, record)
+
+    def fields(self, record):
+        return self.snapshot.book_fields(record)
+
+    def iter_records(self):
+        """Every book as a dict, reading unchanged records without building objects."""
+        overlay = self.overlay
+        for record in range(self.base_count):
+            fields = self.snapshot.book_fields(record)
+            book = overlay.get(fields['isbn'])
+            yield book.to_dict() if book is not None else fields
+        for isbn in list(self.added):
+            yield overlay[isbn].to_dict()
+
+
+class MappedMemberMap(MappedRecordMap):
+    object_class = MappedMember
+
+    @property
+    def base_count(self):
+        return self.snapshot.member_count
+
+    @staticmethod
+    def key_of(member):
+        return member.member_id
+
+    def record_number(self, member_id):
+        return self.snapshot.find(member_id, self.snapshot.member_index, self.snapshot.member_table,
+                                  MEMBER_RECORD.size)
+
+    def key_at(self, record):
+        return self.snapshot.key_at(self.snapshot.member_table, MEMBER_RECORD.size, record)
+
+    def fields(self, record):
+        return self.snapshot.member_fields(record)
+
+    def iter_records(self):
+        """Every member as a dict, reading unchanged records without building objects."""
+        overlay = self.overlay
+        for record in range(self.base_count):
+            fields = self.snapshot.member_fields(record)
+            member = overlay.get(fields['member_id'])
+            yield member.to_dict() if member is not None else fields
+        for member_id in list(self.added):
+            yield overlay[member_id].to_dict()
+
+
+class MappedLoanIndex:
+    """
+    The DueDateIndex interface over the snapshot's sorted loans section. Loans
+    returned or re-dated since the snapshot are masked out, and new ones go to an
+    in-memory DueDateIndex, so opening costs nothing and counting overdue loans is
+    a binary search plus the (few) changes.
+    """
+
+    def __init__(self, books):
+        self.books = books
+        self._lock = threading.RLock()
+        self.remap()
+
+    def remap(self):
+        """Starts over from the books map's current snapshot."""
+        with self._lock:
+            self.days = self.books.snapshot.loan_days        # Sorted due ordinals
+            self.records = self.books.snapshot.loan_records  # Book record numbers, same order
+            self.masked = {}  # Key: ISBN of a snapshot loan since returned or moved, Value: its due ordinal
+            self.extra = DueDateIndex()  # Loans made since the snapshot
+            self._count_day = None
+            self._masked_overdue = 0  # Masked loans due before _count_day
+
+    def _mask(self, isbn):
+        if isbn in self.masked:
+            return
+        record = self.books.record_number(isbn)
+        day = self.books.snapshot.book_loan_day(record) if record >= 0 else None
+        if day is not None:
+            self.masked[isbn] = day
+            if self._count_day is not None and day < self._count_day:
+                self._masked_overdue += 1
+
+    def __len__(self):
+        return len(self.days) - len(self.masked) + len(self.extra)
+
+    def __contains__(self, isbn):
+        if isbn in self.extra:
+            return True
+        if isbn in self.masked:
+            return False
+        record = self.books.record_number(isbn)
+        return record >= 0 and self.books.snapshot.book_loan_day(record) is not None
+
+    def add(self, isbn, due_date):
+        """Records (or moves) a loan. `due_date` is a 'YYYY-MM-DD' string."""
+        with self._lock:
+            self._mask(isbn)
+            self.extra.add(isbn, due_date)
+
+    def remove(self, isbn):
+        """Forgets a loan (no-op if the ISBN is not on loan)."""
+        with self._lock:
+            self._mask(isbn)
+            self.extra.remove(isbn)
+
+    def overdue(self, today=None):
+        """Returns [(ISBN, due ordinal), ...] for loans due before `today`, oldest first."""
+        today = DueDateIndex._today(today)
+        with self._lock:
+            key_at = self.books.key_at
+            end = bisect_left(self.days, today)
+            base = ((key_at(self.records[n]), self.days[n]) for n in range(end))
+            base = ((isbn, day) for isbn, day in base if isbn not in self.masked)
+            return list(heapq.merge(base, self.extra.overdue(today), key=lambda loan: loan[1]))
+
+    def overdue_count(self, today=None):
+        """Number of overdue loans: a binary search over the snapshot, corrected for changes."""
+        today = DueDateIndex._today(today)
+        with self._lock:
+            if today != self._count_day:
+                self._masked_overdue = sum(day < today for day in self.masked.values())
+                self._count_day = today
+            return bisect_left(self.days, today) - self._masked_overdue + self.extra.overdue_count(today)
+
+    def items(self):
+        """(ISBN, due ordinal) for every active loan."""
+        with self._lock:
+            key_at = self.books.key_at
+            loans = [(key_at(record), day) for record, day in zip(self.records, self.days)]
+            loans = [(isbn, day) for isbn, day in loans if isbn not in self.masked]
+            return loans + self.extra.items()
+
+    def clear(self):
+        with self._lock:
+            self.days, self.records = array('i'), array('I')
+            self.masked = {}
+            self.extra = DueDateIndex()
+            self._count_day = None
+
+
+# --- Writing ---
+
+class _Heap:
+    """Appends strings to the heap section of the file being written."""
+
+    def __init__(self, f, size=0, garbage=0):
+        self.f = f
+        self.size = size
+        self.garbage = garbage  # Bytes no record points to
+
+    def replace(self, text, old):
+        """Reference for `text`, reusing `old` ((text, reference) of the previous record) if unchanged."""
+        if old is not None:
+            if old[0] == text:
+                return old[1]
+            if old[1][1] != NONE_LENGTH:
+                self.garbage += old[1][1]
+        return self.add(text)
+
+    def add(self, text):
+        if text is None:
+            return 0, NONE_LENGTH
+        data = text.encode('utf-8')
+        if len(data) >= NONE_LENGTH:
+            raise ValueError(f"String too long for the snapshot format: {text[:40]!r}...")
+        offset = self.size
+        self.f.write(data)
+        self.size += len(data)
+        if self.size > MAX_HEAP:
+            raise ValueError("The snapshot's string heap is limited to 4 GiB.")
+        return offset, len(data)
+
+
+def _previous_strings(snapshot, fields, names):
+    """{name: (text, reference)} for the leading string references of a previous record."""
+    return {name: (snapshot.string(*fields[2 * n:2 * n + 2]), fields[2 * n:2 * n + 2])
+            for n, name in enumerate(names)}
+
+
+def _pack_book(heap, book, references=None):
+    """Book record bytes; `references` reuses unchanged strings of the previous record."""
+    def reference(field, text):
+        return heap.replace(text, references[field] if references else None)
+
+    year = getattr(book, 'publication_year', None)
+    due = date_to_ordinal(book.due_date) if book.due_date else 0
+    return BOOK_RECORD.pack(*reference('isbn', book.isbn), *reference('title', book.title),
+                            *reference('author', book.author), *reference('borrowed_by', book.borrowed_by),
+                            NO_YEAR if year is None else int(year), due, bool(book.available))
+
+
+def _pack_member(heap, member, references=None):
+    """Member record bytes; `references` reuses unchanged strings of the previous record."""
+    def reference(field, text):
+        return heap.replace(text, references[field] if references else None)
+
+    return MEMBER_RECORD.pack(*reference('member_id', member.member_id), *reference('name', member.name),
+                              *reference('loans', LOAN_SEPARATOR.join(member.borrowed_books)))
+
+
+def _align(f):
+    f.write(bytes(-f.tell() % ALIGNMENT))
+    return f.tell()
+
+
+def write_snapshot(path, books, members):
+    """
+    Writes `books` and `members` (mappings of key -> object) as a binary snapshot,
+    atomically replacing `path`. When they are mapped over the existing snapshot,
+    unchanged records, their strings and the indexes are copied as they are and only
+    promoted or added objects are encoded, so the cost follows the changes rather
+    than the catalog size (apart from copying bytes). Strings replaced that way stay
+    in the heap; once they make up more than MAX_GARBAGE of it, every record is
+    encoded afresh instead. Returns (books, members) written.
+    """
+    previous = books.snapshot if isinstance(books, MappedBookMap) else None
+    if previous is not None and (previous._map is None
+                                 or previous.heap_garbage > previous.heap_size * MAX_GARBAGE):
+        previous = None
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w+b') as f:
+        f.write(bytes(HEADER.size))
+        heap_offset = _align(f)
+        heap = _Heap(f)
+        if previous is not None:
+            f.write(memoryview(previous._map)[previous.heap:previous.heap + previous.heap_size])
+            heap.size, heap.garbage = previous.heap_size, previous.heap_garbage
+            book_table, book_keys, loans = _changed_books(heap, books, previous)
+            member_table, member_keys = _changed_members(heap, members, previous)
+        else:
+            book_table, book_keys, loans = _all_books(heap, books)
+            member_table, member_keys = _all_members(heap, members)
+
+        offsets = {'heap': heap_offset, 'heap_size': heap.size}
+        offsets['book_table'] = _align(f)
+        f.write(book_table)
+        offsets['member_table'] = _align(f)
+        f.write(member_table)
+        book_count = len(book_table) // BOOK_RECORD.size
+        member_count = len(member_table) // MEMBER_RECORD.size
+        if previous is not None:
+            indexes = (_build_index(book_keys, book_count, previous.book_index,
+                                    lambda: previous.key_hashes(previous.book_table, BOOK_RECORD.size,
+                                                                previous.book_count)),
+                       _build_index(member_keys, member_count, previous.member_index,
+                                    lambda: previous.key_hashes(previous.member_table, MEMBER_RECORD.size,
+                                                                previous.member_count)))
+        else:
+            indexes = (_build_index(book_keys, book_count), _build_index(member_keys, member_count))
+        for name, index in zip(('book_index', 'member_index'), indexes):
+            offsets[name] = _align(f)
+            index.tofile(f)
+
+        # Loans sorted by due date; stable, so equal days keep record order
+        order = sorted(range(len(loans[0])), key=loans[0].__getitem__)
+        offsets['loans'] = _align(f)
+        array('i', (loans[0][n] for n in order)).tofile(f)
+        array('I', (loans[1][n] for n in order)).tofile(f)
+
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, heap.garbage, book_count, member_count, offsets['heap'], offsets['heap_size'],
+                            offsets['book_table'], offsets['member_table'],
+                            offsets['book_index'], len(indexes[0]), offsets['member_index'], len(indexes[1]),
+                            len(order), offsets['loans']))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return book_count, member_count
+
+
+def _all_books(heap, books):
+    table = bytearray()
+    keys = array('I')   # crc32 of each key, in record order
+    loans = (array('i'), array('I'))
+    for record, book in enumerate(books.values()):
+        table += _pack_book(heap, book)
+        keys.append(zlib.crc32(book.isbn.encode('utf-8')))
+        if not book.available and book.due_date:
+            loans[0].append(date_to_ordinal(book.due_date))
+            loans[1].append(record)
+    return table, keys, loans
+
+
+def _all_members(heap, members):
+    table = bytearray()
+    keys = array('I')
+    for member in members.values():
+        table += _pack_member(heap, member)
+        keys.append(zlib.crc32(member.member_id.encode('utf-8')))
+    return table, keys
+
+
+def _changed_books(heap, books, previous):
+    """
+    The previous book table with promoted records patched and added ones appended.
+    Returns (table, hashes of the added keys, loans), where loans keeps the previous
+    loans of untouched books and takes the current state of changed ones.
+    """
+    width = BOOK_RECORD.size
+    table = bytearray(memoryview(previous._map)[previous.book_table:previous.book_table + previous.book_count * width])
+    changed = set()
+    loan_days, loan_records = array('i'), array('I')
+    for isbn, book in books.overlay.items():
+        if isbn in books.added:
+            continue
+        record = books.record_number(isbn)
+        changed.add(record)
+        fields = BOOK_RECORD.unpack_from(table, record * width)
+        references = _previous_strings(previous, fields, ('isbn', 'title', 'author', 'borrowed_by'))
+        table[record * width:(record + 1) * width] = _pack_book(heap, book, references)
+        if not book.available and book.due_date:
+            loan_days.append(date_to_ordinal(book.due_date))
+            loan_records.append(record)
+    for record, day in zip(previous.loan_records, previous.loan_days):
+        if record not in changed:
+            loan_days.append(day)
+            loan_records.append(record)
+
+    keys = array('I')
+    for isbn in books.added:
+        book = books.overlay[isbn]
+        record = len(table) // width
+        table += _pack_book(heap, book)
+        keys.append(zlib.crc32(isbn.encode('utf-8')))
+        if not book.available and book.due_date:
+            loan_days.append(date_to_ordinal(book.due_date))
+            loan_records.append(record)
+    return table, keys, (loan_days, loan_records)
+
+
+def _changed_members(heap, members, previous):
+    width = MEMBER_RECORD.size
+    table = bytearray(memoryview(previous._map)[previous.member_table:previous.member_table + previous.member_count * width])
+    for member_id, member in members.overlay.items():
+        if member_id not in members.added:
+            record = members.record_number(member_id)
+            fields = MEMBER_RECORD.unpack_from(table, record * width)
+            references = _previous_strings(previous, fields, ('member_id', 'name', 'loans'))
+            table[record * width:(record + 1) * width] = _pack_member(heap, member, references)
+    keys = array('I')
+    for member_id in members.added:
+        table += _pack_member(heap, members.overlay[member_id])
+        keys.append(zlib.crc32(member_id.encode('utf-8')))
+    return table, keys
+
+
+def _build_index(key_hashes, count, previous=None, previous_hashes=None):
+    """
+    Hash index over `count` records. With the previous index, `key_hashes` only
+    covers the records appended after it: they are inserted into a copy of it, or,
+    if that would make it more than half full, all keys are rehashed (the previous
+    ones through `previous_hashes()`).
+    """
+    first = count - len(key_hashes)  # Record number of the first hashed key
+    if previous is not None and count * 2 <= len(previous):
+        slots = array('I', previous)
+    else:
+        slots = array('I', bytes(4 * _index_slots(count)))
+        if first:
+            for record, key_hash in enumerate(previous_hashes()):
+                _insert(slots, key_hash, record)
+    for offset, key_hash in enumerate(key_hashes):
+        _insert(slots, key_hash, first + offset)
+    return slots
@@ -0,0 +1,386 @@
+# library_system/sqlite_store.py
+
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from datetime import date
+from .overdue import DueDateIndex, date_to_ordinal
+
+DEFAULT_CACHE_SIZE = 10000  # Hot rows kept as objects per table
+STATEMENT_CACHE_SIZE = 64   # Compiled statements kept by the connection
+FETCH_SIZE = 10000          # Rows fetched per round trip when scanning a table
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS books (
+    isbn TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    author TEXT NOT NULL,
+    publication_year INTEGER,
+    available INTEGER NOT NULL DEFAULT 1,
+    borrowed_by TEXT,
+    due_date TEXT
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS members (
+    member_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    borrowed_books TEXT NOT NULL DEFAULT '[]'
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS loans (
+    isbn TEXT PRIMARY KEY,
+    due_date TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS loans_by_due_date ON loans (due_date, isbn);
+"""
+
+# Statements are constant strings with parameters, so the connection compiles each one
+# once and reuses it from its statement cache.
+BORROW_SQL = "UPDATE books SET available = 0, borrowed_by = ?, due_date = ? WHERE isbn = ?"
+RETURN_SQL = "UPDATE books SET available = 1, borrowed_by = NULL, due_date = NULL WHERE isbn = ?"
+MEMBER_LOANS_SQL = "SELECT borrowed_books FROM members WHERE member_id = ?"
+SET_MEMBER_LOANS_SQL = "UPDATE members SET borrowed_books = ? WHERE member_id = ?"
+ADD_LOAN_SQL = "INSERT OR REPLACE INTO loans (isbn, due_date) VALUES (?, ?)"
+REMOVE_LOAN_SQL = "DELETE FROM loans WHERE isbn = ?"
+OVERDUE_SQL = "SELECT isbn, due_date FROM loans WHERE due_date < ? ORDER BY due_date, isbn"
+OVERDUE_COUNT_SQL = "SELECT COUNT(*) FROM loans WHERE due_date < ?"
+LOAN_COUNT_SQL = "SELECT COUNT(*) FROM loans"
+HAS_LOAN_SQL = "SELECT 1 FROM loans WHERE isbn = ?"
+LOAN_DUE_SQL = "SELECT due_date FROM loans WHERE isbn = ?"
+OVERDUE_BOOKS_SQL = ("SELECT b.isbn, b.title, b.author, b.publication_year, b.available, b.borrowed_by, "
+                     "b.due_date FROM loans l JOIN books b ON b.isbn = l.isbn "
+                     "WHERE l.due_date < ? ORDER BY l.due_date, l.isbn")
+
+_MISSING = object()
+
+
+class SQLiteStore:
+    """
+    Books, members and active loans kept in one SQLite database (WAL mode), opened
+    without loading anything: rows are read on demand through small object caches.
+
+    The store also takes the journal's place for the Library: record() applies each
+    transaction to the tables inside the open SQLite transaction, flush() commits it,
+    and compaction becomes a WAL checkpoint.
+    """
+
+    def __init__(self, path, book_factory, member_factory, cache_size=DEFAULT_CACHE_SIZE):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.connection = sqlite3.connect(path, check_same_thread=False,
+                                          cached_statements=STATEMENT_CACHE_SIZE)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")  # Durable at checkpoints, safe in WAL mode
+        self.connection.executescript(SCHEMA)
+        self.lock = threading.RLock()  # One connection shared by all transactions
+        self.books = SQLiteBookMap(self, book_factory, cache_size)
+        self.members = SQLiteMemberMap(self, member_factory, cache_size)
+        self.loans = LoanTable(self)
+        self.pending = []  # Ops applied since the last commit
+        self.size = 0      # Ops committed since the last checkpoint
+
+    def execute(self, sql, parameters=()):
+        with self.lock:
+            return self.connection.execute(sql, parameters)
+
+    # --- Journal interface ---
+
+    def record(self, op, **fields):
+        """Applies a borrow or return to the tables. Adds are written when the object is stored."""
+        with self.lock:
+            if op == 'borrow_book':
+                self.connection.execute(BORROW_SQL, (fields['member_id'], fields['due_date'], fields['isbn']))
+                self._update_member_loans(fields['member_id'], lambda isbns: isbns + [fields['isbn']])
+            elif op == 'return_book':
+                self.connection.execute(RETURN_SQL, (fields['isbn'],))
+                self._update_member_loans(fields['member_id'],
+                                          lambda isbns: [isbn for isbn in isbns if isbn != fields['isbn']])
+            elif op == 'borrow_books':
+                self.connection.executemany(BORROW_SQL, ((member_id, due_date, isbn)
+                                                         for isbn, member_id, due_date in fields['loans']))
+                for member_id, isbns in _by_member(fields['loans']).items():
+                    self._update_member_loans(member_id, lambda current: current + isbns)
+            elif op == 'return_books':
+                self.connection.executemany(RETURN_SQL, ((isbn,) for isbn, _ in fields['loans']))
+                for member_id, isbns in _by_member(fields['loans']).items():
+                    returned = set(isbns)
+                    self._update_member_loans(member_id,
+                                              lambda current: [isbn for isbn in current if isbn not in returned])
+            self.pending.append(op)
+
+    def _update_member_loans(self, member_id, change):
+        # Read-modify-write on the row itself: the cached Member may have been evicted
+        row = self.connection.execute(MEMBER_LOANS_SQL, (member_id,)).fetchone()
+        if row is not None:
+            isbns = change(json.loads(row[0]))
+            self.connection.execute(SET_MEMBER_LOANS_SQL, (json.dumps(isbns), member_id))
+
+    def read(self):
+        """Nothing to replay: every recorded change is already in the tables."""
+        return []
+
+    def flush(self):
+        """Commits everything applied since the last commit."""
+        with self.lock:
+            self.connection.commit()
+            count = len(self.pending)
+            self.size += count
+            self.pending = []
+        return count
+
+    def checkpoint(self):
+        """Commits, then folds the write-ahead log back into the main database file."""
+        with self.lock:
+            self.flush()
+            self.connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self.size = 0
+
+    def reset(self):
+        self.checkpoint()
+
+    def close(self):
+        """Closes the connection. Like the JSON backends, changes not yet saved are dropped."""
+        with self.lock:
+            self.connection.close()
+
+    # --- Bulk access ---
+
+    def overdue_books(self, today=None):
+        """
+        Overdue Book objects, oldest due date first, from one join driven by the due-date
+        index. Cached objects are reused; the rest are built without filling the cache.
+        """
+        books = self.books
+        result = []
+        for row in self.iter_rows(OVERDUE_BOOKS_SQL, (self.loans._today(today),)):
+            book = books.cache.get(row[0])
+            result.append(book if book is not None else books.factory(books.from_row(row)))
+        return result
+
+    def iter_rows(self, sql, parameters=()):
+        """Yields rows of a query, fetched in batches so the lock is not held throughout."""
+        with self.lock:
+            cursor = self.connection.execute(sql, parameters)
+            rows = cursor.fetchmany(FETCH_SIZE)
+        while rows:
+            yield from rows
+            with self.lock:
+                rows = cursor.fetchmany(FETCH_SIZE)
+
+    def insert_many(self, books=(), members=()):
+        """Writes Book and Member objects in one pass (used by the JSON migration)."""
+        with self.lock:
+            self.connection.executemany(self.books.INSERT, (self.books.to_row(b) for b in books))
+            self.connection.executemany(self.members.INSERT, (self.members.to_row(m) for m in members))
+            self.connection.execute("INSERT OR REPLACE INTO loans (isbn, due_date) "
+                                    "SELECT isbn, due_date FROM books "
+                                    "WHERE available = 0 AND due_date IS NOT NULL")
+            self.books.recount()
+            self.members.recount()
+            self.loans.recount()
+
+
+def _by_member(loans):
+    """Groups [isbn, member_id, ...] loan entries as {member_id: [isbn, ...]}, keeping their order."""
+    grouped = {}
+    for isbn, member_id, *_ in loans:
+        grouped.setdefault(member_id, []).append(isbn)
+    return grouped
+
+
+class SQLiteRecordMap(MutableMapping):
+    """
+    A table seen as a dict of objects, with a read-through LRU cache of hot rows.
+    Subclasses provide the statements and the row <-> dict conversion.
+    """
+
+    SELECT = INSERT = DELETE = EXISTS = COUNT = KEYS = ALL = None
+
+    def __init__(self, store, factory, cache_size=DEFAULT_CACHE_SIZE):
+        self.store = store
+        self.factory = factory
+        self.cache_size = cache_size
+        self.cache = OrderedDict()  # Key: primary key, Value: object, least recently used first
+        self.hits = 0
+        self.misses = 0
+        self.recount()
+
+    def recount(self):
+        self._count = self.store.execute(self.COUNT).fetchone()[0]
+
+    def _remember(self, key, obj):
+        self.cache[key] = obj
+        self.cache.move_to_end(key)
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def get(self, key, default=None):
+        with self.store.lock:
+            obj = self.cache.get(key)
+            if obj is not None:
+                self.cache.move_to_end(key)
+                self.hits += 1
+                return obj
+            self.misses += 1
+            row = self.store.connection.execute(self.SELECT, (key,)).fetchone()
+            if row is None:
+                return default
+            obj = self.factory(self.from_row(row))
+            self._remember(key, obj)
+            return obj
+
+    def __getitem__(self, key):
+        obj = self.get(key, _MISSING)
+        if obj is _MISSING:
+            raise KeyError(key)
+        return obj
+
+    def __contains__(self, key):
+        with self.store.lock:
+            return key in self.cache or self.store.connection.execute(self.EXISTS, (key,)).fetchone() is not None
+
+    def __setitem__(self, key, obj):
+        with self.store.lock:
+            if key not in self:
+                self._count += 1
+            self.store.connection.execute(self.INSERT, self.to_row(obj))
+            self._remember(key, obj)
+
+    def __delitem__(self, key):
+        with self.store.lock:
+            if key not in self:
+                raise KeyError(key)
+            self.store.connection.execute(self.DELETE, (key,))
+            self.cache.pop(key, None)
+            self._count -= 1
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        return (row[0] for row in self.store.iter_rows(self.KEYS))
+
+    def iter_records(self):
+        """Yields every row as a dict, straight from a table scan (the cache is untouched)."""
+        for row in self.store.iter_rows(self.ALL):
+            yield self.from_row(row)
+
+
+class SQLiteBookMap(SQLiteRecordMap):
+    COLUMNS = "isbn, title, author, publication_year, available, borrowed_by, due_date"
+    SELECT = f"SELECT {COLUMNS} FROM books WHERE isbn = ?"
+    INSERT = f"INSERT OR REPLACE INTO books ({COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)"
+    DELETE = "DELETE FROM books WHERE isbn = ?"
+    EXISTS = "SELECT 1 FROM books WHERE isbn = ?"
+    COUNT = "SELECT COUNT(*) FROM books"
+    KEYS = "SELECT isbn FROM books ORDER BY isbn"
+    ALL = f"SELECT {COLUMNS} FROM books ORDER BY isbn"
+
+    @staticmethod
+    def to_row(book):
+        return (book.isbn, book.title, book.author, getattr(book, 'publication_year', None),
+                1 if book.available else 0, book.borrowed_by, book.due_date)
+
+    @staticmethod
+    def from_row(row):
+        isbn, title, author, year, available, borrowed_by, due_date = row
+        return {'title': title, 'author': author, 'isbn': isbn, 'publication_year': year,
+                'available': bool(available), 'borrowed_by': borrowed_by, 'due_date': due_date}
+
+
+class SQLiteMemberMap(SQLiteRecordMap):
+    SELECT = "SELECT member_id, name, borrowed_books FROM members WHERE member_id = ?"
+    INSERT = "INSERT OR REPLACE INTO members (member_id, name, borrowed_books) VALUES (?, ?, ?)"
+    DELETE = "DELETE FROM members WHERE member_id = ?"
+    EXISTS = "SELECT 1 FROM members WHERE member_id = ?"
+    COUNT = "SELECT COUNT(*) FROM members"
+    KEYS = "SELECT member_id FROM members ORDER BY member_id"
+    ALL = "SELECT member_id, name, borrowed_books FROM members ORDER BY member_id"
+
+    @staticmethod
+    def to_row(member):
+        return (member.member_id, member.name, json.dumps(list(member.borrowed_books)))
+
+    @staticmethod
+    def from_row(row):
+        member_id, name, borrowed_books = row
+        return {'name': name, 'member_id': member_id, 'borrowed_books': json.loads(borrowed_books)}
+
+
+class LoanTable:
+    """
+    The DueDateIndex interface over the indexed `loans` table. Overdue listings are
+    range queries on (due_date, isbn); like DueDateIndex, the loan count and the
+    overdue count (recounted once per day) are kept in memory.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.recount()
+
+    def recount(self):
+        self._count = self.store.execute(LOAN_COUNT_SQL).fetchone()[0]
+        self._count_day = None   # Day the cached overdue count was computed for
+        self._overdue_count = 0  # Loans due before _count_day
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, isbn):
+        return self.store.execute(HAS_LOAN_SQL, (isbn,)).fetchone() is not None
+
+    def add(self, isbn, due_date):
+        """Records (or moves) a loan. `due_date` is a 'YYYY-MM-DD' string."""
+        with self.store.lock:
+            self.remove(isbn)
+            self.store.connection.execute(ADD_LOAN_SQL, (isbn, due_date))
+            self._count += 1
+            if self._count_day is not None and due_date < self._count_day:
+                self._overdue_count += 1
+
+    def remove(self, isbn):
+        """Forgets a loan (no-op if the ISBN is not on loan)."""
+        with self.store.lock:
+            row = self.store.connection.execute(LOAN_DUE_SQL, (isbn,)).fetchone()
+            if row is None:
+                return
+            self.store.connection.execute(REMOVE_LOAN_SQL, (isbn,))
+            self._count -= 1
+            if self._count_day is not None and row[0] < self._count_day:
+                self._overdue_count -= 1
+
+    def overdue(self, today=None):
+        """Returns [(ISBN, due ordinal), ...] for loans due before `today`, oldest first."""
+        rows = self.store.execute(OVERDUE_SQL, (self._today(today),)).fetchall()
+        return [(isbn, date_to_ordinal(due_date)) for isbn, due_date in rows]
+
+    def overdue_count(self, today=None):
+        """Number of overdue loans. Recounted at most once per day, then kept up to date."""
+        today = self._today(today)
+        with self.store.lock:
+            if today != self._count_day:
+                self._overdue_count = self.store.connection.execute(OVERDUE_COUNT_SQL, (today,)).fetchone()[0]
+                self._count_day = today
+            return self._overdue_count
+
+    def clear(self):
+        with self.store.lock:
+            self.store.connection.execute("DELETE FROM loans")
+            self._count = 0
+            self._count_day = None
+
+    @staticmethod
+    def _today(today):
+        # ISO dates sort as strings, so the index compares them directly
+        return date.fromordinal(DueDateIndex._today(today)).isoformat()
+
+
+def migrate_from_json(library, store):
+    """
+    Copies every book and member of a JSON-backed Library (snapshot plus replayed
+    journal) into `store` and commits. Returns (books, members) copied.
+    """
+    store.insert_many(library.books.values(), library.members.values())
+    store.checkpoint()
+    return len(store.books), len(store.members)
@@ -0,0 +1,197 @@
+# library_system/streaming.py
+
+import json
+import threading
+from collections.abc import MutableMapping
+
+CHUNK_SIZE = 1 << 20  # Bytes read from disk at a time
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+
+
+def iter_json_object(path, chunk_size=CHUNK_SIZE):
+    """
+    Incrementally parses a file holding one top-level JSON object.
+    Yields (key, value, start, end) per entry, where start/end are the byte offsets of
+    the value in the file, without ever decoding the whole document at once.
+    """
+    # Latin-1 maps every byte to one character, so string positions are byte offsets.
+    # Values that are not pure ASCII are re-decoded from their bytes as UTF-8.
+    with open(path, 'rb') as f:
+        buffer = ''
+        base = 0  # File offset of buffer[0]
+        pos = 0
+        eof = False
+
+        def fill():
+            nonlocal buffer, base, pos, eof
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+                return False
+            base += pos
+            buffer = buffer[pos:] + chunk.decode('latin-1')
+            pos = 0
+            return True
+
+        def skip_whitespace():
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                    pos += 1
+                if pos < len(buffer) or not fill():
+                    return
+
+        def decode_next():
+            nonlocal pos
+            while True:
+                try:
+                    value, end = _decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if not fill():
+                        raise
+                    continue
+                # A number at the end of the buffer may continue in the next chunk
+                if end == len(buffer) and not eof and fill():
+                    continue
+                start, pos = pos, end
+                return value, start
+
+        def expect(char):
+            nonlocal pos
+            skip_whitespace()
+            if pos >= len(buffer) or buffer[pos] != char:
+                found = buffer[pos] if pos < len(buffer) else 'end of file'
+                raise ValueError(f"Malformed JSON object in {path}: expected '{char}', found {found!r}")
+            pos += 1
+
+        skip_whitespace()
+        if pos >= len(buffer):
+            return  # Empty file
+        expect('{')
+        skip_whitespace()
+        if buffer[pos:pos + 1] == '}':
+            return
+
+        while True:
+            skip_whitespace()
+            key, key_start = decode_next()
+            key_text = buffer[key_start:pos]
+            expect(':')
+            skip_whitespace()
+            value, start = decode_next()
+            end = pos
+            if not key_text.isascii():
+                key = json.loads(key_text.encode('latin-1').decode('utf-8'))
+            text = buffer[start:end]
+            if not text.isascii():
+                value = json.loads(text.encode('latin-1').decode('utf-8'))
+            yield key, value, base + start, base + end
+
+            skip_whitespace()
+            if buffer[pos:pos + 1] == ',':
+                pos += 1
+                continue
+            expect('}')
+            return
+
+
+class LazyRecordMap(MutableMapping):
+    """
+    Dict-like collection whose values are built from their JSON record only on first
+    access. Until then only the record's byte range in the source file is kept, so
+    startup does not pay for creating millions of objects.
+    The source file is held open, which keeps the original contents readable even
+    after a snapshot is atomically replaced on disk.
+    """
+
+    def __init__(self, path, factory):
+        self.path = path
+        self.factory = factory   # Builds an object from a decoded record, e.g. Book.from_dict
+        self._file = open(path, 'rb')
+        self._offsets = {}       # Key: record key, Value: (start << 32) | length in the file
+        self._loaded = {}        # Materialized objects (and every key added after loading)
+        self._deleted = set()    # Keys removed from the map that still have offsets
+        self._added = 0          # Keys present only in _loaded (added after loading)
+        self._file_lock = threading.Lock()  # seek+read on the shared handle must not interleave
+        self._keys_lock = threading.Lock()  # Adds and deletes update _added and _deleted together
+
+    def add_offset(self, key, start, end):
+        """Registers where the record for `key` lives in the source file."""
+        self._offsets[key] = (start << 32) | (end - start)
+
+    def materialized_count(self):
+        return len(self._loaded)
+
+    def _materialize(self, key):
+        packed = self._offsets[key]
+        with self._file_lock:
+            value = self._loaded.get(key)
+            if value is not None:
+                return value  # Another thread materialized it first
+            self._file.seek(packed >> 32)
+            data = json.loads(self._file.read(packed & 0xFFFFFFFF))
+            value = self._loaded[key] = self.factory(data)
+        return value
+
+    def __getitem__(self, key):
+        value = self._loaded.get(key)
+        if value is not None:
+            return value
+        if key in self._offsets and key not in self._deleted:
+            return self._materialize(key)
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        with self._keys_lock:
+            if key in self._offsets:
+                self._deleted.discard(key)
+            elif key not in self._loaded:
+                self._added += 1
+            self._loaded[key] = value
+
+    def __delitem__(self, key):
+        with self._keys_lock:
+            if key not in self:
+                raise KeyError(key)
+            self._loaded.pop(key, None)
+            if key in self._offsets:
+                self._deleted.add(key)
+            else:
+                self._added -= 1
+
+    def __contains__(self, key):
+        if key in self._loaded:
+            return True
+        return key in self._offsets and key not in self._deleted
+
+    def __iter__(self):
+        for key in self._offsets:
+            if key not in self._deleted:
+                yield key
+        for key in self._loaded:
+            if key not in self._offsets:
+                yield key
+
+    def __len__(self):
+        return len(self._offsets) - len(self._deleted) + self._added
+
+    def iter_serialized(self, serialize):
+        """
+        Yields (key, JSON text) for every record. Records that were never materialized
+        are copied from the source file verbatim; the rest go through `serialize`.
+        """
+        for key in self:
+            value = self._loaded.get(key)
+            if value is not None:
+                yield key, serialize(value)
+            else:
+                packed = self._offsets[key]
+                with self._file_lock:
+                    self._file.seek(packed >> 32)
+                    raw = self._file.read(packed & 0xFFFFFFFF)
+                yield key, raw.decode('utf-8')
+
+    def close(self):
+        self._file.close()
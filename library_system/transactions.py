@@ -0,0 +1,73 @@
+# library_system/transactions.py
+
+import threading
+
+DEFAULT_STRIPES = 256
+
+
+class LockStripes:
+    """
+    A fixed pool of re-entrant locks. Each key (e.g. ('book', isbn)) hashes onto one
+    stripe, so unrelated keys rarely share a lock while memory stays constant no matter
+    how many books or members exist. Stripes are always acquired in ascending index
+    order, which makes multi-key transactions deadlock-free.
+    """
+
+    def __init__(self, count=DEFAULT_STRIPES):
+        self.locks = [threading.RLock() for _ in range(count)]
+
+    def stripe(self, key):
+        """Index of the lock guarding `key`."""
+        return hash(key) % len(self.locks)
+
+    def hold(self, keys):
+        """Context manager holding the stripes for all `keys`."""
+        count = len(self.locks)
+        return HeldStripes([self.locks[index] for index in sorted({hash(key) % count for key in keys})])
+
+    def hold_all(self):
+        """Context manager holding every stripe, i.e. waiting out all in-flight transactions."""
+        return HeldStripes(self.locks)
+
+    def hold_stripes(self, stripes):
+        """Context manager holding the given stripe indexes."""
+        return HeldStripes([self.locks[index] for index in sorted(set(stripes))])
+
+
+class HeldStripes:
+    """
+    Acquires a list of locks (already in ascending stripe order) on enter and releases
+    them in reverse on exit. A plain class rather than a generator-based context
+    manager, since it sits on the hot path of every transaction.
+    """
+
+    __slots__ = ('locks', 'acquired')
+
+    def __init__(self, locks):
+        self.locks = locks
+        self.acquired = 0
+
+    def __enter__(self):
+        try:
+            for lock in self.locks:
+                lock.acquire()
+                self.acquired += 1
+        except BaseException:
+            self.__exit__()
+            raise
+        return self
+
+    def __exit__(self, *exc_info):
+        locks = self.locks
+        while self.acquired:
+            self.acquired -= 1
+            locks[self.acquired].release()
+        return False
+
+
+def book_key(isbn):
+    return ('book', isbn)
+
+
+def member_key(member_id):
+    return ('member', member_id)
@@ -0,0 +1,42 @@
+# migrate.py
+# Copies the JSON snapshot files (plus any journaled changes) into the SQLite database
+# used by Library(storage='sqlite'), or with --snapshot into the binary snapshot used by
+# Library(storage='mapped'). Re-running it overwrites the target with the JSON data.
+#   python migrate.py [--database data/library.db]
+#   python migrate.py --snapshot [data/library.snap]
+
+import argparse
+import time
+from library_system.library import Library
+from library_system.book import Book
+from library_system.member import Member
+from library_system.snapshot import write_snapshot
+from library_system.sqlite_store import SQLiteStore, migrate_from_json
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate the library's JSON files to SQLite or a binary snapshot.")
+    parser.add_argument('--database', default=Library.DATABASE_FILE,
+                        help=f"Database to create or update (default: {Library.DATABASE_FILE})")
+    parser.add_argument('--snapshot', nargs='?', const=Library.SNAPSHOT_FILE,
+                        help=f"Write a binary snapshot instead (default path: {Library.SNAPSHOT_FILE})")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    library = Library(load_mode='stream')
+    if args.snapshot:
+        path = library._get_file_path(args.snapshot)
+        books, members = write_snapshot(path, library.books, library.members)
+        print(f"Wrote {books} books and {members} members to {path} "
+              f"in {time.perf_counter() - start:.2f}s.")
+        return
+
+    store = SQLiteStore(library._get_file_path(args.database), Book.from_dict, Member.from_dict)
+    try:
+        books, members = migrate_from_json(library, store)
+    finally:
+        store.close()
+    print(f"Migrated {books} books and {members} members to {store.path} "
+          f"in {time.perf_counter() - start:.2f}s.")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,24 @@
+# rebuild_recommendations.py
+# Recounts the "also borrowed" index from the whole loan history, e.g. after changing
+# recommend.PAIR_WINDOW or NEIGHBOURS. With NumPy the counting runs on a process pool.
+#   python rebuild_recommendations.py [--workers 4]
+
+import argparse
+import time
+from library_system.library import Library
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the 'also borrowed' recommendation index.")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Processes counting in parallel (default: one per CPU)")
+    args = parser.parse_args()
+
+    library = Library(load_mode='stream')
+    start = time.perf_counter()
+    library.rebuild_recommendations(args.workers)
+    index = library.recommendations
+    print(f"Counted {len(library.history)} history rows into {len(index.neighbours)} neighbour entries "
+          f"in {time.perf_counter() - start:.2f}s.")
+
+if __name__ == '__main__':
+    main()
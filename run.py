@@ -1,6 +1,44 @@
 # run.py
 
+import argparse
+import sys
+from library_system.library import Library
 from library_system.main import main
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description="Library Management System")
+    parser.add_argument('--batch', metavar='COMMANDS.jsonl',
+                        help="Run JSONL commands non-interactively instead of showing the menu")
+    parser.add_argument('--output', default='-', help="Where to write batch results (default: stdout)")
+    parser.add_argument('--no-timing', action='store_true', help="Omit per-command timings from batch results")
+    parser.add_argument('--load-mode', choices=Library.LOAD_MODES, default='full',
+                        help="How --batch reads the JSON snapshot")
+    parser.add_argument('--storage', choices=Library.STORAGE_BACKENDS, default='objects',
+                        help="Storage backend for --batch")
+    parser.add_argument('--serve', action='store_true', help="Serve the library to circulation desks over TCP")
+    parser.add_argument('--host', default='127.0.0.1', help="Address to listen on with --serve")
+    parser.add_argument('--port', type=int, default=8765, help="Port to listen on with --serve")
+    parser.add_argument('--save-interval', type=float, default=5.0,
+                        help="Seconds between saves with --serve")
+    parser.add_argument('--metrics', action='store_true',
+                        help="Record operation counts, latency histograms and I/O bytes")
+    parser.add_argument('--shards', type=int, default=0,
+                        help="Split books and members over this many worker processes")
+    args = parser.parse_args()
+    if args.shards and args.serve:
+        parser.error("--shards cannot be combined with --serve")
+    if not args.batch and (args.load_mode != 'full' or args.storage != 'objects'):
+        parser.error("--load-mode and --storage apply to --batch")
+
+    if args.metrics:
+        from library_system.metrics import METRICS
+        METRICS.enable()
+
+    if args.batch:
+        from library_system.batch import batch_main
+        sys.exit(batch_main(args.batch, args.output, timing=not args.no_timing, load_mode=args.load_mode,
+                            shards=args.shards, storage=args.storage))
+    if args.serve:
+        from library_system.server import serve
+        sys.exit(serve(args.host, args.port, args.save_interval))
+    main(shards=args.shards)
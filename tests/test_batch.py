@@ -0,0 +1,108 @@
+# tests/test_batch.py
+
+import unittest
+from unittest import mock
+import contextlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+from library_system.batch import batch_main, execute, run_batch, run_commands
+from library_system.library import Library
+
+TEST_BOOKS_FILE = 'data/test_books.json'
+TEST_MEMBERS_FILE = 'data/test_members.json'
+TEST_JOURNAL_FILE = 'data/test_journal.jsonl'
+TEST_COMMANDS = 'data/test_commands.jsonl'
+TEST_HISTORY_DIRECTORY = 'data/test_history'
+TEST_HOLDS_FILE = 'data/test_holds.json'
+
+COMMANDS = [
+    {"op": "add_book", "title": "Python Intro", "author": "G. Guido", "isbn": "B001", "publication_year": 2000},
+    {"op": "register_member", "name": "John Doe", "member_id": "M001"},
+    {"op": "borrow_book", "isbn": "B001", "member_id": "M001"},
+    {"op": "borrow_book", "isbn": "B001", "member_id": "M001"},
+    {"op": "find_book", "isbn": "B001"},
+    {"op": "search_books", "query": "pyth"},
+    {"op": "get_stats"},
+    {"op": "return_book", "isbn": "B001", "member_id": "M001"},
+]
+
+class TestBatchMode(unittest.TestCase):
+    """Tests scripted command execution against one Library instance."""
+
+    def setUp(self):
+        patcher = mock.patch.multiple(Library, BOOKS_FILE=TEST_BOOKS_FILE, MEMBERS_FILE=TEST_MEMBERS_FILE,
+                                      JOURNAL_FILE=TEST_JOURNAL_FILE,
+                                      HISTORY_DIRECTORY=TEST_HISTORY_DIRECTORY, HOLDS_FILE=TEST_HOLDS_FILE)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.library = Library()
+
+    def tearDown(self):
+        for path in (TEST_BOOKS_FILE, TEST_MEMBERS_FILE, TEST_JOURNAL_FILE, TEST_COMMANDS):
+            if os.path.exists(path):
+                os.remove(path)
+        shutil.rmtree(TEST_HISTORY_DIRECTORY, ignore_errors=True)
+
+    def test_results_are_structured(self):
+        results = list(run_commands(self.library, COMMANDS))
+        self.assertEqual([r['ok'] for r in results], [True, True, True, False, True, True, True, True])
+        self.assertIn("already checked out", results[3]['result'])
+        self.assertEqual(results[4]['result']['borrowed_by'], "M001")
+        self.assertEqual(results[5]['result']['total'], 1)
+        self.assertEqual(results[6]['result']['Books Borrowed'], 1)
+        self.assertTrue(all(r['elapsed_us'] >= 0 for r in results))
+        self.assertTrue(self.library.find_book("B001").available)
+
+    def test_bad_commands(self):
+        self.assertFalse(execute(self.library, {"op": "burn_book"})[0])
+        self.assertFalse(execute(self.library, "not a dict")[0])
+        ok, message = execute(self.library, {"op": "borrow_book", "isbn": "B001"})
+        self.assertFalse(ok)
+        self.assertIn("member_id", message)
+        self.assertFalse(execute(self.library, {"op": ["borrow_book"]})[0])  # Unhashable op
+
+    def test_errors_inside_the_library_are_not_missing_fields(self):
+        with mock.patch.object(self.library, 'borrow_book', side_effect=KeyError('loans')):
+            ok, message = execute(self.library, {"op": "borrow_book", "isbn": "B001", "member_id": "M001"})
+        self.assertFalse(ok)
+        self.assertNotIn("Missing field", message)
+        self.assertIn("loans", message)
+
+    def test_bad_op_does_not_abort_the_batch(self):
+        output = io.StringIO()
+        summary = run_batch(self.library, [{"op": ["x"]}, {"op": {}}] + COMMANDS, output, timing=False)
+        self.assertEqual((summary['commands'], summary['failed']), (10, 3))
+        self.assertEqual(len(output.getvalue().splitlines()), 10)
+
+    def test_run_batch_writes_json_lines(self):
+        output = io.StringIO()
+        summary = run_batch(self.library, COMMANDS, output, timing=False)
+        self.assertEqual((summary['commands'], summary['failed']), (8, 1))
+        lines = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(len(lines), 8)
+        self.assertNotIn('elapsed_us', lines[0])
+
+    def test_command_line(self):
+        env = dict(os.environ, PYTHONPATH=os.getcwd())
+        # The child uses the default data files, so only send commands that read
+        with open(TEST_COMMANDS, 'w') as f:
+            f.write('{"op": "get_stats"}\n{"op": "nope"}\n')
+        result = subprocess.run([sys.executable, 'run.py', '--batch', TEST_COMMANDS, '--no-timing'],
+                                capture_output=True, text=True, env=env, check=True)
+        lines = [json.loads(line) for line in result.stdout.splitlines()]
+        self.assertEqual([line['ok'] for line in lines], [True, False])
+        self.assertIn("Processed 2 commands", result.stderr)
+
+    def test_changes_are_saved_after_the_last_command(self):
+        with open(TEST_COMMANDS, 'w') as f:
+            f.writelines(json.dumps(command) + '\n' for command in COMMANDS[:3])
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stderr(devnull):
+            batch_main(TEST_COMMANDS, os.devnull, load_mode='stream', storage='slots')
+        self.assertEqual(Library().find_book("B001").borrowed_by, "M001")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+# tests/test_bulk.py
+
+import unittest
+from unittest import mock
+import csv
+import json
+import os
+import shutil
+from library_system.bulk import export_catalog, import_catalog, validate_row
+from library_system.library import Library
+from library_system.book import Book
+from library_system.member import Member
+
+TEST_BOOKS_FILE = 'data/test_books.json'
+TEST_MEMBERS_FILE = 'data/test_members.json'
+TEST_JOURNAL_FILE = 'data/test_journal.jsonl'
+TEST_CSV = 'data/test_catalog.csv'
+TEST_JSONL = 'data/test_catalog.jsonl'
+TEST_REJECTS = 'data/test_rejects.csv'
+TEST_HISTORY_DIRECTORY = 'data/test_history'
+TEST_HOLDS_FILE = 'data/test_holds.json'
+
+class TestBulkImportExport(unittest.TestCase):
+    """Tests chunked catalog import with rejects, and streaming export."""
+
+    def setUp(self):
+        patcher = mock.patch.multiple(Library, BOOKS_FILE=TEST_BOOKS_FILE, MEMBERS_FILE=TEST_MEMBERS_FILE,
+                                      JOURNAL_FILE=TEST_JOURNAL_FILE,
+                                      HISTORY_DIRECTORY=TEST_HISTORY_DIRECTORY, HOLDS_FILE=TEST_HOLDS_FILE)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.library = Library()
+        self.library.add_book(Book("Python Intro", "G. Guido", "B001", 2000))
+
+        with open(TEST_CSV, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["title", "author", "isbn", "publication_year"])
+            writer.writerow(["Web Dev", "H. Harvey", "B002", "2020"])
+            writer.writerow(["Python Intro", "G. Guido", "B001", "2000"])   # Already in catalog
+            writer.writerow(["Gardening", "A. Green", "B003", ""])
+            writer.writerow(["Web Dev Again", "H. Harvey", "B002", "2021"])  # Duplicate in file
+            writer.writerow(["", "No Title", "B004", "2001"])                # Missing title
+            writer.writerow(["Cooking", "C. Cook", "B005", "soon"])          # Bad year
+
+    def tearDown(self):
+        for path in (TEST_BOOKS_FILE, TEST_MEMBERS_FILE, TEST_JOURNAL_FILE,
+                     TEST_CSV, TEST_JSONL, TEST_REJECTS):
+            if os.path.exists(path):
+                os.remove(path)
+        shutil.rmtree(TEST_HISTORY_DIRECTORY, ignore_errors=True)
+
+    def test_validate_row(self):
+        self.assertEqual(validate_row({"title": " T ", "author": "A", "isbn": "1"}),
+                         ({"title": "T", "author": "A", "isbn": "1", "publication_year": None}, None))
+        self.assertEqual(validate_row(None), (None, "Malformed record"))
+        self.assertEqual(validate_row({"title": "T", "author": "A"}), (None, "Missing isbn"))
+
+    def test_import_with_rejects(self):
+        summary = import_catalog(self.library, TEST_CSV, TEST_REJECTS, chunk_size=2)
+        self.assertEqual((summary['rows'], summary['added'], summary['rejected']), (6, 2, 4))
+        self.assertEqual(self.library.find_book("B002").title, "Web Dev")
+        self.assertIsNone(self.library.find_book("B003").publication_year)
+        self.assertEqual(self.library.search_books("gardening")[0], 1)
+
+        with open(TEST_REJECTS, newline='') as f:
+            rejects = list(csv.DictReader(f))
+        self.assertEqual([r['line'] for r in rejects], ["3", "5", "6", "7"])
+        self.assertIn("already exists", rejects[0]['error'])
+        # The first B002 was added by an earlier chunk
+        self.assertIn("already exists", rejects[1]['error'])
+        self.assertEqual(rejects[2]['error'], "Missing title")
+        self.assertIn("publication_year", rejects[3]['error'])
+
+    def test_duplicates_within_a_batch(self):
+        rows = [{"title": "One", "author": "A", "isbn": "B010"},
+                {"title": "Two", "author": "A", "isbn": "B010"}]
+        added, rejected = self.library.add_books_bulk(rows)
+        self.assertEqual(added, 1)
+        self.assertEqual(rejected, [(1, "Duplicate ISBN in file")])
+        self.assertEqual(self.library.find_book("B010").title, "One")
+
+    def test_bulk_add_is_journaled(self):
+        import_catalog(self.library, TEST_CSV)
+        self.library.save_data()
+        reloaded = Library()
+        self.assertEqual(sorted(reloaded.books), ["B001", "B002", "B003"])
+
+    def test_jsonl_round_trip(self):
+        import_catalog(self.library, TEST_CSV)
+        self.library.register_member(Member("John Doe", "M001"))
+        self.library.borrow_book("B002", "M001")  # Loan state is exported as well
+        summary = export_catalog(self.library, TEST_JSONL)
+        self.assertEqual(summary['rows'], 3)
+
+        with open(TEST_JSONL) as f:
+            exported = [json.loads(line) for line in f]
+        self.assertEqual([row['isbn'] for row in exported], ["B001", "B002", "B003"])
+        self.assertEqual([row['available'] for row in exported], [True, False, True])
+        self.assertEqual(exported[1]['borrowed_by'], "M001")
+
+        # Importing the export into an empty library recreates the catalog
+        fresh = Library()
+        fresh.books = {}
+        added, rejected = fresh.add_books_bulk(exported)
+        self.assertEqual((added, rejected), (3, []))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+# tests/test_compact.py
+
+import unittest
+from unittest import mock
+import os
+import shutil
+from datetime import date, timedelta
+from library_system.compact import BookView, ColumnarBookStore, CompactBook, CompactMember
+from library_system.library import Library
+from library_system.book import Book
+from library_system.member import Member
+
+TEST_BOOKS_FILE = 'data/test_books.json'
+TEST_MEMBERS_FILE = 'data/test_members.json'
+TEST_JOURNAL_FILE = 'data/test_journal.jsonl'
+TEST_HISTORY_DIRECTORY = 'data/test_history'
+TEST_HOLDS_FILE = 'data/test_holds.json'
+
+class TestCompactBook(unittest.TestCase):
+    """Tests that the compact representations keep the Book API."""
+
+    def check_book_behaviour(self, book):
+        self.assertTrue(book.available)
+        success, msg = book.check_out("MEM001", loan_period=1)
+        self.assertTrue(success)
+        self.assertEqual(book.borrowed_by, "MEM001")
+        self.assertEqual(book.due_date, (date.today() + timedelta(days=1)).isoformat())
+        self.assertIn("already checked out", book.check_out("MEM002")[1])
+
+        book.due_date = (date.today() - timedelta(days=5)).isoformat()
+        self.assertTrue(book.is_overdue())
+        self.assertEqual(book.days_overdue(), 5)
+
+        success, msg = book.return_book()
+        self.assertTrue(success)
+        self.assertIn("returned successfully", msg)
+        self.assertIn("was overdue", msg)
+        self.assertIsNone(book.due_date)
+        self.assertIn("already available", book.return_book()[1])
+
+    def test_compact_book(self):
+        book = CompactBook("The Test Book", "A. Tester", "1234567890", 2023)
+        self.assertFalse(hasattr(book, '__dict__'))
+        self.check_book_behaviour(book)
+
+    def test_book_view(self):
+        store = ColumnarBookStore()
+        store["1234567890"] = Book("The Test Book", "A. Tester", "1234567890", 2023)
+        book = store["1234567890"]
+        self.assertIsInstance(book, BookView)
+        self.assertEqual(book.publication_year, 2023)
+        self.check_book_behaviour(book)
+        self.assertEqual(store["1234567890"], book)
+
+    def test_round_trip(self):
+        original = Book("The Test Book", "A. Tester", "1234567890", 2023)
+        original.check_out("MEM001")
+        compact = CompactBook.from_dict(original.to_dict())
+        self.assertEqual(compact.to_dict(), original.to_dict())
+
+    def test_authors_are_interned(self):
+        first = CompactBook("One", "".join(["A. ", "Tester"]), "1")
+        second = CompactBook("Two", "".join(["A. ", "Tester"]), "2")
+        self.assertIs(first.author, second.author)
+
+
+class TestCompactMember(unittest.TestCase):
+
+    def test_member_behaviour(self):
+        member = CompactMember("John Doe", "M001")
+        self.assertFalse(hasattr(member, '__dict__'))
+        for isbn in ["1", "2", "3", "4", "5"]:
+            self.assertTrue(member.borrow_book(isbn)[0])
+        success, msg = member.borrow_book("6")
+        self.assertFalse(success)
+        self.assertIn("Maximum book limit", msg)
+
+        self.assertTrue(member.return_book("3")[0])
+        self.assertFalse(member.return_book("3")[0])
+        self.assertEqual(member.to_dict(), Member.from_dict(member.to_dict()).to_dict())
+        self.assertEqual(member.borrowed_books, ("1", "2", "4", "5"))
+
+
+class TestColumnarBookStore(unittest.TestCase):
+
+    def test_rows_are_reused(self):
+        store = ColumnarBookStore()
+        store["B001"] = Book("Python Intro", "G. Guido", "B001", 2000)
+        store["B002"] = Book("Web Dev", "G. Guido", "B002")
+        self.assertEqual(len(store.author_names), 1)
+        self.assertIsNone(store["B002"].publication_year)
+
+        del store["B001"]
+        self.assertNotIn("B001", store)
+        store["B003"] = Book("Gardening", "A. Green", "B003", 1999)
+        self.assertEqual(len(store.isbns), 2)
+        self.assertEqual(sorted(store), ["B002", "B003"])
+        self.assertEqual(store["B003"].title, "Gardening")
+
+    def test_stored_book_is_copied(self):
+        store = ColumnarBookStore()
+        book = Book("Far Future", "A. Green", "B001", 40000)
+        store["B001"] = book
+        book.title = "Changed"  # The columns hold a copy
+        self.assertEqual(store["B001"].title, "Far Future")
+        self.assertEqual(store["B001"].publication_year, 40000)
+        store["B001"].publication_year = -50000
+        self.assertEqual(store["B001"].publication_year, -50000)
+
+
+class TestLibraryStorage(unittest.TestCase):
+    """Runs the same transactions against every storage backend."""
+
+    def setUp(self):
+        patcher = mock.patch.multiple(Library, BOOKS_FILE=TEST_BOOKS_FILE, MEMBERS_FILE=TEST_MEMBERS_FILE,
+                                      JOURNAL_FILE=TEST_JOURNAL_FILE,
+                                      HISTORY_DIRECTORY=TEST_HISTORY_DIRECTORY, HOLDS_FILE=TEST_HOLDS_FILE)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        for path in (TEST_BOOKS_FILE, TEST_MEMBERS_FILE, TEST_JOURNAL_FILE):
+            if os.path.exists(path):
+                os.remove(path)
+        shutil.rmtree(TEST_HISTORY_DIRECTORY, ignore_errors=True)
+
+    def test_backends_agree(self):
+        for storage in Library.SNAPSHOT_BACKENDS:
+            self.tearDown()
+            library = Library(storage=storage)
+            library.add_book(Book("Python Intro", "G. Guido", "B001", 2000))
+            library.add_book(Book("Web Dev", "H. Harvey", "B002", 2020))
+            library.register_member(library.member_class("John Doe", "M001"))
+            self.assertTrue(library.borrow_book("B001", "M001")[0])
+            self.assertTrue(library.borrow_book("B002", "M001")[0])
+            self.assertTrue(library.return_book("B002", "M001")[0])
+            library.save_data()
+
+            for reload_storage in Library.SNAPSHOT_BACKENDS:
+                reloaded = Library(storage=reload_storage)
+                self.assertEqual(reloaded.get_stats()["Books Borrowed"], 1, storage)
+                self.assertEqual(reloaded.find_book("B001").borrowed_by, "M001")
+                self.assertEqual(list(reloaded.find_member("M001").borrowed_books), ["B001"])
+                self.assertEqual(reloaded.search_books("web")[1][0].title, "Web Dev")
+
+    def test_invalid_combinations(self):
+        with self.assertRaises(ValueError):
+            Library(storage='sqlite-ish')
+        with self.assertRaises(ValueError):
+            Library(load_mode='lazy', storage='columnar')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+# tests/test_directory.py
+
+import unittest
+import os
+import shutil
+from unittest import mock
+from library_system import directory
+from library_system.directory import MemberDirectory, normalize, edit_distance
+from library_system.library import Library
+from library_system.member import Member
+
+TEST_BOOKS_FILE = 'data/test_books.json'
+TEST_MEMBERS_FILE = 'data/test_members.json'
+TEST_JOURNAL_FILE = 'data/test_journal.jsonl'
+TEST_HISTORY_DIRECTORY = 'data/test_history'
+TEST_HOLDS_FILE = 'data/test_holds.json'
+
+class TestMemberDirectory(unittest.TestCase):
+    """Tests name normalization and ranking in the member directory."""
+
+    def setUp(self):
+        self.directory = MemberDirectory()
+        for member_id, name in (("M001", "John Smith"), ("M002", "Jon Smyth"), ("M003", "Johanna Smithers"),
+                                ("M004", "José Álvarez"), ("M005", "Jane Smith"), ("M006", "John Smith")):
+            self.directory.add(member_id, name)
+
+    def test_normalize_and_edit_distance(self):
+        self.assertEqual(normalize("  José  ÁLVAREZ-Núñez "), ["jose", "alvarez", "nunez"])
+        self.assertEqual(normalize(None), [])
+        self.assertEqual(edit_distance("jonh", "john", 2), 1)  # Swapped letters count once
+        self.assertEqual(edit_distance("smith", "smyth", 2), 1)
+        self.assertEqual(edit_distance("smith", "jones", 2), 3)  # Gives up past the limit
+
+    def test_exact_matches_rank_before_typos_and_prefixes(self):
+        self.assertEqual(self.directory.search("john smith"), ["M001", "M006", "M002"])
+        self.assertEqual(self.directory.search("smith"), ["M001", "M005", "M006", "M002", "M003"])
+        self.assertEqual(self.directory.search("Jonh Smtih", 2), ["M001", "M006"])
+        self.assertEqual(self.directory.search("jose alvarez"), ["M004"])
+        self.assertEqual(self.directory.search("jo"), ["M001", "M002", "M003", "M004", "M006"])
+        self.assertEqual(self.directory.search("smith nobody"), [])
+        self.assertEqual(self.directory.search(""), [])
+
+    def test_cache_is_bounded_and_cleared_by_new_members(self):
+        with mock.patch.object(self.directory, 'cache_size', 2):
+            for query in ("john", "jane", "smith"):
+                self.directory.search(query)
+            self.assertEqual(len(self.directory.cache), 2)
+            self.assertEqual(self.directory.search("jane"), ["M005"])
+        self.directory.add("M007", "Jane Smith")  # No new tokens: term matches stay valid
+        self.assertEqual(len(self.directory.cache), 0)
+        self.assertTrue(self.directory.term_cache)
+        self.directory.add("M008", "Jane Doe")
+        self.assertEqual(len(self.directory.term_cache), 0)
+        self.assertEqual(self.directory.search("jane"), ["M005", "M007", "M008"])
+
+    def test_prefix_expansions_are_capped(self):
+        with mock.patch.object(directory, 'MAX_PREFIX_EXPANSIONS', 1):
+            self.assertEqual(len(self.directory._expand("j", prefix=True)), 1)
+
+
+class TestLibraryMemberSearch(unittest.TestCase):
+    """Tests that the directory follows registrations, loads and replays."""
+
+    def setUp(self):
+        patcher = mock.patch.multiple(Library, BOOKS_FILE=TEST_BOOKS_FILE, MEMBERS_FILE=TEST_MEMBERS_FILE,
+                                      JOURNAL_FILE=TEST_JOURNAL_FILE,
+                                      HISTORY_DIRECTORY=TEST_HISTORY_DIRECTORY, HOLDS_FILE=TEST_HOLDS_FILE)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.library = Library()
+        self.library.register_member(Member("John Doe", "M001"))
+        self.library.register_member(Member("Jane Roe", "M002"))
+
+    def tearDown(self):
+        for path in (TEST_BOOKS_FILE, TEST_MEMBERS_FILE, TEST_JOURNAL_FILE):
+            if os.path.exists(path):
+                os.remove(path)
+        shutil.rmtree(TEST_HISTORY_DIRECTORY, ignore_errors=True)
+
+    def names(self, library, query):
+        return [member.member_id for member in library.search_members(query)]
+
+    def test_registered_members_are_found_after_reload(self):
+        self.assertEqual(self.names(self.library, "jon doe"), ["M001"])
+        self.library.compact()
+        self.library.register_member(Member("Jonas Doerr", "M003"))
+        self.library.save_data()
+
+        for load_mode in Library.LOAD_MODES:
+            reloaded = Library(load_mode=load_mode)
+            # Jane Roe is one typo away, which outranks the prefix match
+            self.assertEqual(self.names(reloaded, "doe"), ["M001", "M002", "M003"], load_mode)
+            self.assertEqual(self.names(reloaded, "Jane"), ["M002"], load_mode)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+# tests/test_fines.py
+
+import unittest
+from unittest import mock
+import os
+import shutil
+from datetime import date, timedelta
+from library_system import fines
+from library_system.fines import FinePolicy, extract_loans
+from library_system.library import Library
+from library_system.book import Book
+from library_system.member import Member
+
+TEST_BOOKS_FILE = 'data/test_books.json'
+TEST_MEMBERS_FILE = 'data/test_members.json'
+TEST_JOURNAL_FILE = 'data/test_journal.jsonl'
+TEST_DATABASE_FILE = 'data/test_library.db'
+TEST_HISTORY_DIRECTORY = 'data/test_history'
+TEST_HOLDS_FILE = 'data/test_holds.json'
+
+class TestFinePolicy(unittest.TestCase):
+    """Tests the per-loan fine rules."""
+
+    def test_grace_days_and_cap(self):
+        policy = FinePolicy(daily_rate=0.25, grace_days=2, max_fine=5.0)
+        self.assertEqual([policy.fine(days) for days in (0, 2, 3, 10, 100)], [0, 0, 0.25, 2.0, 5.0])
+
+    def test_rejects_negative_values(self):
+        with self.assertRaises(ValueError):
+            FinePolicy(daily_rate=-1)
+
+
+class TestFineReport(unittest.TestCase):
+    """Tests the fine and aging report over a library's active loans."""
+
+    def setUp(self):
+        patcher = mock.patch.multiple(Library, BOOKS_FILE=TEST_BOOKS_FILE, MEMBERS_FILE=TEST_MEMBERS_FILE,
+                                      JOURNAL_FILE=TEST_JOURNAL_FILE, DATABASE_FILE=TEST_DATABASE_FILE,
+                                      HISTORY_DIRECTORY=TEST_HISTORY_DIRECTORY, HOLDS_FILE=TEST_HOLDS_FILE)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.today = date.today()
+
+    def tearDown(self):
+        for path in (TEST_BOOKS_FILE, TEST_MEMBERS_FILE, TEST_JOURNAL_FILE, TEST_DATABASE_FILE,
+                     TEST_DATABASE_FILE + '-wal', TEST_DATABASE_FILE + '-shm'):
+            if os.path.exists(path):
+                os.remove(path)
+        shutil.rmtree(TEST_HISTORY_DIRECTORY, ignore_errors=True)
+
+    def make_library(self, storage='objects'):
+        """Two members, loans overdue by 3, 10, 45 and 200 days plus one not yet due."""
+        library = Library(storage=storage)
+        library.register_member(Member("John Doe", "M001"))
+        library.register_member(Member("Jane Roe", "M002"))
+        for n, (member_id, days) in enumerate((("M001", 3), ("M001", 200), ("M002", 10),
+                                               ("M002", 45), ("M002", -5))):
+            isbn = f"B00{n}"
+            library.add_book(Book(f"Book {n}", "Author", isbn, 2000))
+            library.borrow_book(isbn, member_id)
+            due_date = (self.today - timedelta(days=days)).isoformat()
+            library.find_book(isbn).due_date = due_date
+            library.loans.add(isbn, due_date)
+        return library
+
+    def check_report(self, report):
+        self.assertEqual((report['loans'], report['overdue']), (5, 4))
+        self.assertEqual(report['total_fines'], 129.0)
+        self.assertEqual(report['aging'], {
+            '1-7': {'loans': 1, 'fines': 1.5},
+            '8-30': {'loans': 1, 'fines': 5.0},
+            '31-90': {'loans': 1, 'fines': 22.5},
+            '90+': {'loans': 1, 'fines': 100.0},
+        })
+        self.assertEqual(report['member_fines'], {'M001': 101.5, 'M002': 27.5})
+
+    def test_report(self):
+        self.check_report(self.make_library().get_fine_report(self.today))
+
+    def test_loop_fallback_matches(self):
+        library = self.make_library()
+        self.check_report(fines._report_loop(FinePolicy(), self.today.toordinal(), *extract_loans(library)))
+
+    def test_sqlite_backend(self):
+        library = self.make_library('sqlite')
+        try:
+            self.check_report(library.get_fine_report(self.today))
+        finally:
+            library.close()
+
+    def test_policy_applies_to_report_and_returns(self):
+        library = self.make_library()
+        library.FINE_POLICY = FinePolicy(daily_rate=1.0, max_fine=20.0)
+        report = library.get_fine_report(self.today)
+        self.assertEqual(report['member_fines'], {'M001': 23.0, 'M002': 30.0})
+
+        success, message = library.return_book("B001", "M001")
+        self.assertTrue(success)
+        self.assertIn("overdue by 200 days. Fine: $20.00", message)
+        self.assertEqual(library.get_fine_report(self.today)['member_fines']['M001'], 3.0)
+
+if __name__ == '__main__':
+    unittest.main()
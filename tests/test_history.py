@@ -0,0 +1,158 @@
+# tests/test_history.py
+
+import unittest
+import os
+import random
+import shutil
+from datetime import date, timedelta
+from unittest import mock
+from library_system import history
+from library_system.history import LoanHistory, RankedCounter, BORROW, RETURN
+from library_system.library import Library
+from library_system.book import Book
+from library_system.member import Member
+
+TEST_BOOKS_FILE = 'data/test_books.json'
+TEST_MEMBERS_FILE = 'data/test_members.json'
+TEST_JOURNAL_FILE = 'data/test_journal.jsonl'
+TEST_HISTORY_DIRECTORY = 'data/test_history'
+TEST_HOLDS_FILE = 'data/test_holds.json'
+
+class TestRankedCounter(unittest.TestCase):
+    """Tests that the count order stays sorted through increments and bulk updates."""
+
+    def check(self, counter):
+        counts = [counter.counts[code] for code in counter.order]
+        self.assertEqual(counts, sorted(counts, reverse=True))
+        self.assertTrue(all(counter.order[counter.position[code]] == code for code in range(len(counter))))
+        self.assertEqual(counter.starts, {count: counts.index(count) for count in set(counts)})
+
+    def test_increments_keep_order(self):
+        counter, rng = RankedCounter(), random.Random(1)
+        counter.grow(20)
+        for _ in range(500):
+            counter.increment(rng.randrange(len(counter)))
+            if rng.random() < 0.05:
+                counter.add()
+        self.check(counter)
+        self.assertEqual(counter.top(3), sorted(((code, count) for code, count in enumerate(counter.counts)),
+                                                key=lambda item: -item[1])[:3])
+
+    def test_bulk_update_with_and_without_numpy(self):
+        for numpy in (history.np, None):
+            with mock.patch.object(history, 'np', numpy):
+                counter = RankedCounter()
+                counter.grow(6)
+                counter.increment(5)
+                counter.update([3, 0, 1, 0, 3, 0])
+                self.check(counter)
+                self.assertEqual(counter.top(4), [(0, 3), (4, 3), (2, 1), (5, 1)])
+                counter.increment(2)
+                self.check(counter)
+
+
+class TestLoanHistory(unittest.TestCase):
+    """Tests recording loans through the Library, persistence and the rollup queries."""
+
+    def setUp(self):
+        patcher = mock.patch.multiple(Library, BOOKS_FILE=TEST_BOOKS_FILE, MEMBERS_FILE=TEST_MEMBERS_FILE,
+                                      JOURNAL_FILE=TEST_JOURNAL_FILE,
+                                      HISTORY_DIRECTORY=TEST_HISTORY_DIRECTORY, HOLDS_FILE=TEST_HOLDS_FILE)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.library = Library()
+        self.library.add_book(Book("Python Intro", "G. Guido", "B001", 2000))
+        self.library.add_book(Book("Python Data", "G. Guido", "B002", 2010))
+        self.library.add_book(Book("Web Dev", "H. Harvey", "B003", 2020))
+        self.library.register_member(Member("John Doe", "M001"))
+        self.library.register_member(Member("Jane Roe", "M002"))
+
+    def tearDown(self):
+        for path in (TEST_BOOKS_FILE, TEST_MEMBERS_FILE, TEST_JOURNAL_FILE):
+            if os.path.exists(path):
+                os.remove(path)
+        shutil.rmtree(TEST_HISTORY_DIRECTORY, ignore_errors=True)
+
+    def circulate(self):
+        """B001 three times, B003 twice, B002 once; M001 makes four of the six loans."""
+        for isbn, member_id in (("B001", "M001"), ("B003", "M001"), ("B001", "M002"),
+                                ("B002", "M001"), ("B003", "M002"), ("B001", "M001")):
+            self.assertTrue(self.library.borrow_book(isbn, member_id)[0])
+            self.assertTrue(self.library.return_book(isbn, member_id)[0])
+
+    def check_rollups(self, library):
+        self.assertEqual([(entry['isbn'], entry['title'], entry['loans']) for entry in library.get_top_books(2)],
+                         [("B001", "Python Intro", 3), ("B003", "Web Dev", 2)])
+        self.assertEqual(library.get_top_authors(), [{'author': "G. Guido", 'loans': 4},
+                                                     {'author': "H. Harvey", 'loans': 2}])
+        self.assertEqual([(entry['name'], entry['loans']) for entry in library.get_top_members()],
+                         [("John Doe", 4), ("Jane Roe", 2)])
+        today = library.get_daily_circulation(days=2)
+        self.assertEqual([(entry['borrows'], entry['returns']) for entry in today], [(0, 0), (6, 6)])
+        self.assertEqual(today[-1]['date'], date.today().isoformat())
+
+    def test_borrows_and_returns_are_rolled_up(self):
+        self.circulate()
+        self.assertFalse(self.library.borrow_book("B404", "M001")[0])  # Failures are not logged
+        self.assertEqual(len(self.library.history), 12)
+        self.check_rollups(self.library)
+
+    def test_reopen_folds_the_log_after_the_checkpoint(self):
+        self.circulate()
+        self.library.compact()
+        self.library.borrow_book("B002", "M002")
+        self.library.save_data()
+
+        reloaded = Library()
+        self.assertEqual(len(reloaded.history), 13)
+        self.assertEqual(reloaded.history.loans_of("B002"), 2)
+        self.assertEqual(reloaded.history.top_members(1), [("M001", 4)])
+        # Replaying the journal must not log the borrow a second time
+        self.assertEqual(reloaded.get_daily_circulation(days=1)[0]['borrows'], 7)
+
+    def test_full_fold_without_checkpoint(self):
+        self.circulate()
+        self.library.save_data()
+        for numpy in (history.np, None):
+            with mock.patch.object(history, 'np', numpy):
+                self.check_rollups(Library())
+
+    def test_rollups_catch_up_with_rows_on_disk_and_staged(self):
+        for numpy in (history.np, None):
+            with mock.patch.object(history, 'np', numpy):
+                shutil.rmtree(TEST_HISTORY_DIRECTORY, ignore_errors=True)
+                log = LoanHistory(TEST_HISTORY_DIRECTORY)
+                log.record(BORROW, "B001", "G. Guido", "M001")
+                self.assertEqual(log.loans_of("B001"), 1)  # One row: counted row by row
+                for n in range(5):
+                    log.record(BORROW, f"B00{n % 2 + 1}", "G. Guido", "M002")
+                log.flush(sync=False)
+                log.record(BORROW, "B002", "G. Guido", "M001")
+                # Six rows since the last query, more than the books: tallied in bulk
+                self.assertEqual(log.top_books(), [("B001", 4), ("B002", 3)])
+                self.assertEqual(log.top_members(), [("M002", 5), ("M001", 2)])
+                self.assertEqual(log.daily(date.today().toordinal(), date.today().toordinal())[0][1], 7)
+                log.close()
+
+    def test_torn_append_is_cut_back(self):
+        self.circulate()
+        self.library.save_data()
+        with open(os.path.join(TEST_HISTORY_DIRECTORY, 'book'), 'ab') as f:
+            f.write(b'\x00\x00\x00\x00')  # One column got ahead of the others
+        reloaded = LoanHistory(TEST_HISTORY_DIRECTORY)
+        self.assertEqual(len(reloaded), 12)
+        self.assertEqual(os.path.getsize(os.path.join(TEST_HISTORY_DIRECTORY, 'book')), 12 * 4)
+
+    def test_days_before_the_first_are_prepended(self):
+        log = LoanHistory(TEST_HISTORY_DIRECTORY)
+        today = date.today().toordinal()
+        log.record(BORROW, "B001", "G. Guido", "M001", today)
+        log.record(RETURN, "B001", "G. Guido", "M001", today - 3)
+        self.assertEqual(log.daily(today - 3, today), [(today - 3, 0, 1), (today - 2, 0, 0),
+                                                       (today - 1, 0, 0), (today, 1, 0)])
+        self.assertEqual(self.library.get_daily_circulation(days=3, today=date.today() - timedelta(days=400)),
+                         [{'date': (date.today() - timedelta(days=days)).isoformat(), 'borrows': 0, 'returns': 0}
+                          for days in (402, 401, 400)])
+
+if __name__ == '__main__':
+    unittest.main()
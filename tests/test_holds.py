@@ -0,0 +1,167 @@
+# tests/test_holds.py
+
+import unittest
+from unittest import mock
+import os
+import shutil
+from datetime import date, timedelta
+from library_system.holds import HoldQueues
+from library_system.library import Library
+from library_system.book import Book
+from library_system.member import Member
+
+TEST_BOOKS_FILE = 'data/test_books.json'
+TEST_MEMBERS_FILE = 'data/test_members.json'
+TEST_JOURNAL_FILE = 'data/test_journal.jsonl'
+TEST_HISTORY_DIRECTORY = 'data/test_history'
+TEST_HOLDS_FILE = 'data/test_holds.json'
+
+class TestHolds(unittest.TestCase):
+    """Tests hold queues as books go out and come back through the Library."""
+
+    def setUp(self):
+        patcher = mock.patch.multiple(Library, BOOKS_FILE=TEST_BOOKS_FILE, MEMBERS_FILE=TEST_MEMBERS_FILE,
+                                      JOURNAL_FILE=TEST_JOURNAL_FILE,
+                                      HISTORY_DIRECTORY=TEST_HISTORY_DIRECTORY, HOLDS_FILE=TEST_HOLDS_FILE)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.library = Library()
+        self.library.add_book(Book("Python Intro", "G. Guido", "B001", 2000))
+        self.library.add_book(Book("Web Dev", "T. Berners", "B002", 2001))
+        for name, member_id in (("John Doe", "M001"), ("Jane Roe", "M002"), ("Sam Poe", "M003")):
+            self.library.register_member(Member(name, member_id))
+        self.library.borrow_book("B001", "M001")
+
+    def tearDown(self):
+        for path in (TEST_BOOKS_FILE, TEST_MEMBERS_FILE, TEST_JOURNAL_FILE, TEST_HOLDS_FILE, TEST_HOLDS_FILE + 'l'):
+            if os.path.exists(path):
+                os.remove(path)
+        shutil.rmtree(TEST_HISTORY_DIRECTORY, ignore_errors=True)
+
+    def test_returned_book_goes_to_first_in_queue(self):
+        self.assertIn("number 1", self.library.place_hold("B001", "M002")[1])
+        self.assertIn("number 2", self.library.place_hold("B001", "M003")[1])
+        self.assertFalse(self.library.place_hold("B001", "M002")[0])  # Already queued
+        self.assertFalse(self.library.place_hold("B001", "M001")[0])  # Has it
+        self.assertFalse(self.library.place_hold("B002", "M002")[0])  # Available
+
+        success, message = self.library.return_book("B001", "M001")
+        self.assertTrue(success)
+        self.assertIn("On hold for member M002", message)
+        self.assertEqual(self.library.get_hold_queue_length("B001"), 1)
+
+        success, message = self.library.borrow_book("B001", "M003")
+        self.assertFalse(success)
+        self.assertIn("on hold for another member", message)
+        self.assertFalse(self.library.borrow_books("M003", ["B001", "B002"])[0])
+        self.assertTrue(self.library.find_book("B002").available)  # Batch left nothing behind
+
+        self.assertTrue(self.library.borrow_book("B001", "M002")[0])
+        self.assertFalse(self.library.holds.has_hold("B001", "M002"))
+        self.assertTrue(self.library.return_book("B001", "M002")[0])
+        self.assertEqual(self.library.holds.holder("B001", date.today().toordinal()), "M003")
+
+    def test_cancelled_holds_are_skipped(self):
+        self.library.place_hold("B001", "M002")
+        self.library.place_hold("B001", "M003")
+        self.assertTrue(self.library.cancel_hold("B001", "M002")[0])
+        self.assertFalse(self.library.cancel_hold("B001", "M002")[0])
+        self.library.place_hold("B001", "M002")  # Back of the queue with a new ticket
+        self.assertIn("M003", self.library.return_book("B001", "M001")[1])
+
+        # Cancelling a book set aside passes it straight on
+        self.assertIn("On hold for member M002", self.library.cancel_hold("B001", "M003")[1])
+        self.assertNotIn("On hold", self.library.cancel_hold("B001", "M002")[1])
+        self.assertTrue(self.library.borrow_book("B001", "M003")[0])
+
+    def test_members_at_the_limit_are_passed_over(self):
+        self.library.place_hold("B001", "M002")
+        self.library.place_hold("B001", "M003")
+        with mock.patch.object(Member, 'MAX_BOOKS', 1):
+            self.assertTrue(self.library.borrow_book("B002", "M002")[0])
+            self.assertIn("On hold for member M003", self.library.return_book("B001", "M001")[1])
+            self.assertTrue(self.library.holds.has_hold("B001", "M002"))  # Keeps their place
+            self.library.save_data()
+            reloaded = Library()  # Replay sets it aside for the same member
+            self.assertEqual(reloaded.holds.holder("B001", date.today().toordinal()), "M003")
+            self.assertEqual(reloaded.get_hold_queue_length("B001"), 1)
+
+            # Nobody else can take it: back on the shelf, still queued
+            self.assertTrue(self.library.borrow_book("B001", "M003")[0])
+            self.assertNotIn("On hold", self.library.return_book("B001", "M003")[1])
+            self.assertTrue(self.library.find_book("B001").available)
+            self.assertEqual(self.library.get_hold_queue_length("B001"), 1)
+        self.library.return_book("B002", "M002")
+        self.library.borrow_book("B001", "M001")
+        self.assertIn("On hold for member M002", self.library.return_book("B001", "M001")[1])
+
+    def test_loans_without_holds_skip_the_queues(self):
+        self.library.place_hold("B001", "M002")
+        with mock.patch.object(self.library.holds, 'fulfil') as fulfil, \
+                mock.patch.object(self.library.holds, 'promote') as promote, \
+                mock.patch.object(self.library.holds, 'expire') as expire:
+            self.assertTrue(self.library.borrow_book("B002", "M003")[0])
+            self.assertTrue(self.library.return_book("B002", "M003")[0])
+            self.library.save_data()
+            fulfil.assert_not_called()
+            promote.assert_not_called()
+            expire.assert_not_called()  # Nothing set aside yet
+            self.library.return_book("B001", "M001")
+            promote.assert_called_once()
+
+    def test_lapsed_holds_expire_in_bulk(self):
+        self.library.borrow_book("B002", "M001")
+        self.library.place_hold("B001", "M002")
+        self.library.place_hold("B001", "M003")
+        self.library.place_hold("B002", "M002")
+        self.library.return_books("M001", ["B001", "B002"])
+
+        later = date.today() + timedelta(days=Library.HOLD_DAYS + 1)
+        self.assertEqual(self.library.holds.holder("B001", later.toordinal()), None)  # Lapsed holds are ignored
+        self.assertEqual(self.library.expire_holds(later), 2)
+        self.assertEqual(self.library.holds.holder("B001", later.toordinal()), "M003")
+        self.assertNotIn("B002", self.library.holds.ready)
+        self.assertEqual(self.library.expire_holds(later), 0)
+
+    def test_holds_survive_reload_and_compact(self):
+        self.library.place_hold("B001", "M002")
+        self.library.place_hold("B001", "M003")
+        self.library.cancel_hold("B001", "M002")
+        self.library.place_hold("B001", "M002")
+        self.library.return_book("B001", "M001")
+        self.library.save_data()
+
+        reloaded = Library()
+        today = date.today().toordinal()
+        self.assertEqual(reloaded.holds.holder("B001", today), "M003")
+        self.assertEqual(reloaded.get_hold_queue_length("B001"), 1)
+        self.assertFalse(reloaded.borrow_book("B001", "M002")[0])
+
+        reloaded.compact()
+        self.assertEqual(os.path.getsize(reloaded._get_file_path(TEST_HOLDS_FILE + 'l')), 0)
+        again = Library()
+        self.assertEqual(again.holds.holder("B001", today), "M003")
+        self.assertTrue(again.borrow_book("B001", "M003")[0])
+        self.assertIn("On hold for member M002", again.return_book("B001", "M003")[1])
+
+    def test_queue_replay_matches_live_state(self):
+        path = os.path.abspath(TEST_HOLDS_FILE)
+        holds = HoldQueues(path)
+        for n in range(50):
+            holds.place(f"B{n % 5}", f"M{n}")
+        for n in range(0, 50, 3):
+            holds.cancel(f"B{n % 5}", f"M{n}")
+        for n in range(5):
+            holds.promote(f"B{n}", 100 + n, lambda member_id: int(member_id[1:]) > 10)
+        holds.fulfil("B0", holds.ready["B0"][0])
+        holds.expire(102)
+        holds.flush()
+
+        replayed = HoldQueues(path)
+        self.assertEqual((replayed.tickets, replayed.waiting, replayed.ready, replayed.next_ticket),
+                         (holds.tickets, holds.waiting, holds.ready, holds.next_ticket))
+        self.assertEqual(replayed.queues, holds.queues)
+        self.assertEqual(len(replayed), len(holds))
+
+if __name__ == '__main__':
+    unittest.main()
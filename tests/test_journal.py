@@ -0,0 +1,166 @@
+# tests/test_journal.py
+
+import unittest
+import os
+import shutil
+from unittest import mock
+from library_system.journal import TransactionJournal
+from library_system.library import Library
+from library_system.book import Book
+from library_system.member import Member
+
+TEST_BOOKS_FILE = 'data/test_books.json'
+TEST_MEMBERS_FILE = 'data/test_members.json'
+TEST_JOURNAL_FILE = 'data/test_journal.jsonl'
+TEST_HISTORY_DIRECTORY = 'data/test_history'
+TEST_HOLDS_FILE = 'data/test_holds.json'
+
+def remove_test_files():
+    for path in (TEST_BOOKS_FILE, TEST_MEMBERS_FILE, TEST_JOURNAL_FILE, TEST_BOOKS_FILE + '.new',
+                 TEST_MEMBERS_FILE + '.new', TEST_BOOKS_FILE + '.commit'):
+        if os.path.exists(path):
+            os.remove(path)
+    shutil.rmtree(TEST_HISTORY_DIRECTORY, ignore_errors=True)
+
+class TestTransactionJournal(unittest.TestCase):
+    """Tests appending, reading and crash recovery of the journal file."""
+
+    def setUp(self):
+        remove_test_files()
+        self.journal = TransactionJournal(TEST_JOURNAL_FILE)
+
+    def tearDown(self):
+        remove_test_files()
+
+    def test_flush_appends_pending_records(self):
+        self.journal.record('return_book', isbn="B001", member_id="M001")
+        self.assertEqual(self.journal.read(), [])  # Nothing on disk until flush
+
+        self.assertEqual(self.journal.flush(), 1)
+        self.journal.record('return_book', isbn="B002", member_id="M001")
+        self.journal.flush()
+
+        records = TransactionJournal(TEST_JOURNAL_FILE).read()
+        self.assertEqual([r['isbn'] for r in records], ["B001", "B002"])
+        self.assertEqual(records[0]['op'], 'return_book')
+
+    def test_torn_tail_is_discarded(self):
+        self.journal.record('return_book', isbn="B001", member_id="M001")
+        self.journal.flush()
+        with open(TEST_JOURNAL_FILE, 'a') as f:
+            f.write('{"op":"return_book","isbn":"B0')  # Simulated crash mid-append
+
+        journal = TransactionJournal(TEST_JOURNAL_FILE)
+        self.assertEqual(len(journal.read()), 1)
+
+        # The next append must start on a clean line
+        journal.record('return_book', isbn="B003", member_id="M001")
+        journal.flush()
+        self.assertEqual([r['isbn'] for r in journal.read()], ["B001", "B003"])
+
+    def test_reset(self):
+        self.journal.record('return_book', isbn="B001", member_id="M001")
+        self.journal.flush()
+        self.journal.reset()
+        self.assertEqual(self.journal.read(), [])
+        self.assertEqual(self.journal.size, 0)
+
+
+class TestLibraryJournal(unittest.TestCase):
+    """Tests that Library saves incrementally and recovers state by replay."""
+
+    def setUp(self):
+        patcher = mock.patch.multiple(Library, BOOKS_FILE=TEST_BOOKS_FILE, MEMBERS_FILE=TEST_MEMBERS_FILE,
+                                      JOURNAL_FILE=TEST_JOURNAL_FILE,
+                                      HISTORY_DIRECTORY=TEST_HISTORY_DIRECTORY, HOLDS_FILE=TEST_HOLDS_FILE,
+                                      COMPACT_THRESHOLD=Library.COMPACT_THRESHOLD)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        remove_test_files()
+        self.library = Library()
+        self.library.add_book(Book("Python Intro", "G. Guido", "B001", 2000))
+        self.library.register_member(Member("John Doe", "M001"))
+        self.library.borrow_book("B001", "M001")
+
+    def tearDown(self):
+        remove_test_files()
+
+    def test_save_appends_without_snapshot(self):
+        self.library.save_data()
+        self.assertFalse(os.path.exists(TEST_BOOKS_FILE))
+        self.assertEqual(self.library.journal.size, 3)
+
+        new_library = Library()
+        book = new_library.find_book("B001")
+        self.assertEqual(book.borrowed_by, "M001")
+        self.assertEqual(book.due_date, self.library.find_book("B001").due_date)
+        self.assertIn("B001", new_library.find_member("M001").borrowed_books)
+
+    def test_unsaved_changes_are_discarded(self):
+        self.library.save_data()
+        self.library.return_book("B001", "M001")  # Never saved
+
+        new_library = Library()
+        self.assertFalse(new_library.find_book("B001").available)
+
+    def test_compaction_writes_snapshot(self):
+        Library.COMPACT_THRESHOLD = 3
+        self.library.save_data()
+        self.assertTrue(os.path.exists(TEST_BOOKS_FILE))
+        self.assertEqual(self.library.journal.read(), [])
+
+        new_library = Library()
+        self.assertEqual(new_library.find_book("B001").borrowed_by, "M001")
+
+    def test_replay_over_snapshot_is_idempotent(self):
+        # Simulate a crash after the snapshot was written but before the journal was emptied
+        self.library.compact()
+        self.library.journal.record('add_book', book=self.library.find_book("B001").to_dict())
+        self.library.journal.record('borrow_book', isbn="B001", member_id="M001", due_date="2000-01-01")
+        self.library.journal.flush()
+
+        new_library = Library()
+        self.assertEqual(len(new_library.books), 1)
+        self.assertEqual(new_library.find_member("M001").borrowed_books, ["B001"])
+        self.assertNotEqual(new_library.find_book("B001").due_date, "2000-01-01")
+
+    def test_crash_while_writing_members_keeps_old_snapshot(self):
+        self.library.compact()
+        self.library.return_book("B001", "M001")
+        self.library.save_data()
+        original = Library._write_snapshot_file
+
+        def write(path, records):
+            if path.endswith('members.json.new'):
+                raise OSError("disk full")
+            return original(path, records)
+
+        with mock.patch.object(Library, '_write_snapshot_file', staticmethod(write)):
+            self.assertRaises(OSError, self.library.compact)
+
+        new_library = Library()  # Old snapshot + journal
+        self.assertTrue(new_library.find_book("B001").available)
+        self.assertEqual(new_library.find_member("M001").borrowed_books, [])
+
+    def test_crash_between_renames_is_completed_on_load(self):
+        self.library.compact()
+        self.library.return_book("B001", "M001")
+        original = os.replace
+
+        def replace(source, target):
+            if source.endswith('members.json.new'):
+                raise OSError("crash")
+            return original(source, target)
+
+        with mock.patch('os.replace', replace):
+            self.assertRaises(OSError, self.library.compact)
+        self.assertTrue(os.path.exists(TEST_BOOKS_FILE + '.commit'))
+
+        new_library = Library()  # Finishes the commit; the journal was never emptied
+        self.assertFalse(os.path.exists(TEST_BOOKS_FILE + '.commit'))
+        self.assertTrue(new_library.find_book("B001").available)
+        self.assertEqual(new_library.find_member("M001").borrowed_books, [])
+        self.assertTrue(new_library.borrow_book("B001", "M001")[0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,9 @@
 # tests/test_library.py
 
 import unittest
+from unittest import mock
 import os
+import shutil
 # Adjust the imports based on your actual structure
 from library_system.library import Library
 from library_system.book import Book
@@ -10,6 +12,9 @@ from library_system.member import Member
 # Define test file paths (must match paths in library.py)
 TEST_BOOKS_FILE = 'data/test_books.json'
 TEST_MEMBERS_FILE = 'data/test_members.json'
+TEST_JOURNAL_FILE = 'data/test_journal.jsonl'
+TEST_HISTORY_DIRECTORY = 'data/test_history'
+TEST_HOLDS_FILE = 'data/test_holds.json'
 
 class TestLibrary(unittest.TestCase):
     """Tests the Library class methods, focusing on transactions and data management."""
@@ -20,8 +25,11 @@ class TestLibrary(unittest.TestCase):
         Uses temporary file paths to avoid corrupting real data.
         """
         # Temporarily override file paths for testing isolation
-        Library.BOOKS_FILE = TEST_BOOKS_FILE
-        Library.MEMBERS_FILE = TEST_MEMBERS_FILE
+        patcher = mock.patch.multiple(Library, BOOKS_FILE=TEST_BOOKS_FILE, MEMBERS_FILE=TEST_MEMBERS_FILE,
+                                      JOURNAL_FILE=TEST_JOURNAL_FILE,
+                                      HISTORY_DIRECTORY=TEST_HISTORY_DIRECTORY, HOLDS_FILE=TEST_HOLDS_FILE)
+        patcher.start()
+        self.addCleanup(patcher.stop)
         
         self.library = Library()
         
@@ -30,6 +38,8 @@ class TestLibrary(unittest.TestCase):
             os.remove(TEST_BOOKS_FILE)
         if os.path.exists(TEST_MEMBERS_FILE):
             os.remove(TEST_MEMBERS_FILE)
+        if os.path.exists(TEST_JOURNAL_FILE):
+            os.remove(TEST_JOURNAL_FILE)
             
         self.library.books = {}
         self.library.members = {}
@@ -49,6 +59,9 @@ class TestLibrary(unittest.TestCase):
             os.remove(TEST_BOOKS_FILE)
         if os.path.exists(TEST_MEMBERS_FILE):
             os.remove(TEST_MEMBERS_FILE)
+        if os.path.exists(TEST_JOURNAL_FILE):
+            os.remove(TEST_JOURNAL_FILE)
+        shutil.rmtree(TEST_HISTORY_DIRECTORY, ignore_errors=True)
 
     def test_add_and_find(self):
         """Test adding and finding books and members."""
@@ -112,5 +125,53 @@ class TestLibrary(unittest.TestCase):
         self.assertFalse(loaded_book1.available) # State must be borrowed
         self.assertIn("B001", loaded_member1.borrowed_books) # Member list must be correct
 
+    def test_borrow_books_all_or_nothing(self):
+        """Test that a stack of books is borrowed completely or not at all."""
+        self.library.add_book(self.book2)
+        self.library.add_book(Book("Data Science", "I. Ivy", "B003", 2021))
+        self.member1.borrowed_books = ["1", "2", "3"]
+
+        success, msg = self.library.borrow_books("M001", ["B001", "B002", "B003"])
+        self.assertFalse(success)
+        self.assertEqual(msg, "B003: Maximum book limit (5) reached.")
+        self.assertTrue(self.book1.available and self.book2.available) # Nothing applied
+        self.assertEqual(len(self.library.loans), 0)
+        self.assertEqual(self.library.borrow_books("M001", ["B002", "B404"]), (False, "B404: Book not found."))
+        self.assertEqual(self.library.borrow_books("M001", ["B002", "B002"]), (False, "B002: Listed more than once."))
+
+        success, msg = self.library.borrow_books("M001", ["B002", "B003"])
+        self.assertTrue(success)
+        self.assertIn("2 books borrowed by John Doe", msg)
+        self.assertEqual(self.member1.borrowed_books, ["1", "2", "3", "B002", "B003"])
+        self.assertEqual(len(self.library.loans), 2)
+        self.assertIn("already checked out", self.library.borrow_books("M001", ["B003"])[1])
+
+    def test_batches_across_members(self):
+        """Test the cross-member batch variants, including the journal replay."""
+        self.library.add_book(self.book2)
+        self.library.register_member(self.member2)
+        success, msg = self.library.borrow_batch([("B001", "M001"), ("B002", "M002")])
+        self.assertTrue(success)
+        self.assertIn("borrowed by 2 members", msg)
+        self.assertEqual(self.book2.borrowed_by, "M002")
+
+        # A wrong pair fails the whole return
+        success, msg = self.library.return_batch([("B001", "M001"), ("B002", "M001")])
+        self.assertFalse(success)
+        self.assertIn("B002: Borrow records are inconsistent", msg)
+        self.assertFalse(self.book1.available)
+
+        self.library.save_data()
+        reloaded = Library()
+        self.assertEqual(reloaded.find_book("B002").borrowed_by, "M002")
+        self.assertEqual(len(reloaded.loans), 2)
+
+        success, msg = reloaded.return_books("M001", ["B001"])
+        self.assertEqual((success, msg), (True, "SUCCESS: 1 books returned."))
+        self.assertTrue(reloaded.return_batch([("B002", "M002")])[0])
+        self.assertEqual(len(reloaded.loans), 0)
+        self.assertEqual(reloaded.find_member("M002").borrowed_books, [])
+        self.assertEqual(reloaded.history.top_members(), [("M001", 1), ("M002", 1)])
+
 if __name__ == '__main__':
     unittest.main()
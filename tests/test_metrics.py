@@ -0,0 +1,108 @@
+# tests/test_metrics.py
+
+import unittest
+from unittest import mock
+import os
+import shutil
+from library_system.metrics import METRICS, LatencyHistogram
+from library_system.library import Library
+from library_system.main import handle_view_metrics
+from library_system.book import Book
+from library_system.member import Member
+
+TEST_BOOKS_FILE = 'data/test_books.json'
+TEST_MEMBERS_FILE = 'data/test_members.json'
+TEST_JOURNAL_FILE = 'data/test_journal.jsonl'
+TEST_HISTORY_DIRECTORY = 'data/test_history'
+TEST_HOLDS_FILE = 'data/test_holds.json'
+
+class TestLatencyHistogram(unittest.TestCase):
+    """Tests bucketing precision and percentiles."""
+
+    def test_percentiles_within_bucket_precision(self):
+        histogram = LatencyHistogram()
+        for value in range(1, 100001):
+            histogram.record(value * 1000)
+        for percent, expected in ((50, 50_000_000), (99, 99_000_000)):
+            self.assertAlmostEqual(histogram.percentile(percent), expected, delta=expected / 64)
+        self.assertEqual(histogram.percentile(100), 100_000_000)
+        self.assertEqual(histogram.summary()['calls'], 100000)
+
+    def test_small_values_are_exact(self):
+        histogram = LatencyHistogram()
+        for value in (3, 3, 7, 100):
+            histogram.record(value)
+        self.assertEqual([histogram.percentile(p) for p in (50, 75, 100)], [3, 7, 100])
+
+
+class TestMetrics(unittest.TestCase):
+    """Tests switching instrumentation on and off and the snapshot contents."""
+
+    def setUp(self):
+        patcher = mock.patch.multiple(Library, BOOKS_FILE=TEST_BOOKS_FILE, MEMBERS_FILE=TEST_MEMBERS_FILE,
+                                      JOURNAL_FILE=TEST_JOURNAL_FILE,
+                                      HISTORY_DIRECTORY=TEST_HISTORY_DIRECTORY, HOLDS_FILE=TEST_HOLDS_FILE)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.original_borrow = Library.__dict__['borrow_book']
+        METRICS.reset()
+        METRICS.enable()
+
+    def tearDown(self):
+        METRICS.disable()
+        METRICS.reset()
+        for path in (TEST_BOOKS_FILE, TEST_MEMBERS_FILE, TEST_JOURNAL_FILE):
+            if os.path.exists(path):
+                os.remove(path)
+        shutil.rmtree(TEST_HISTORY_DIRECTORY, ignore_errors=True)
+
+    def test_disable_restores_original_methods(self):
+        self.assertIsNot(Library.__dict__['borrow_book'], self.original_borrow)
+        METRICS.disable()
+        self.assertIs(Library.__dict__['borrow_book'], self.original_borrow)
+        self.assertFalse(METRICS.snapshot()['enabled'])
+
+    def test_snapshot_counts_calls_failures_and_io(self):
+        library = Library()
+        library.add_book(Book("Python Intro", "G. Guido", "B001", 2000))
+        library.register_member(Member("John Doe", "M001"))
+        library.borrow_book("B001", "M001")
+        library.borrow_book("B001", "M001")  # Already checked out
+        library.get_stats()
+        library.save_data()
+        library.compact()
+        Library()
+
+        snapshot = METRICS.snapshot()
+        borrow = snapshot['operations']['borrow_book']
+        self.assertEqual((borrow['calls'], borrow['failed']), (2, 1))
+        self.assertLessEqual(borrow['p50_us'], borrow['max_us'])
+        self.assertEqual(snapshot['operations']['get_stats']['calls'], 1)
+        self.assertEqual(snapshot['operations']['load_data']['calls'], 2)
+        self.assertNotIn('return_book', snapshot['operations'])
+
+        io = snapshot['io']
+        snapshot_size = os.path.getsize(TEST_BOOKS_FILE) + os.path.getsize(TEST_MEMBERS_FILE)
+        self.assertEqual(io['files_written'], 3)  # Journal flush, then both snapshot files
+        self.assertEqual(io['bytes_read'], snapshot_size)
+        self.assertGreater(io['bytes_written'], snapshot_size)
+
+    def test_cheap_operations_are_counted_but_sampled(self):
+        library = Library()
+        for _ in range(20):
+            library.get_stats()
+        library.save_data()
+        stats = METRICS.snapshot()['operations']['get_stats']
+        self.assertEqual((stats['calls'], stats['timed']), (20, 3))  # Calls 1, 9 and 17
+        self.assertIn('p99_us', stats)
+        save = METRICS.snapshot()['operations']['save_data']
+        self.assertEqual((save['calls'], save['timed']), (1, 1))
+        METRICS.reset()
+        library.get_stats()  # The 21st call: counted, not timed
+        self.assertEqual(METRICS.snapshot()['operations']['get_stats'], {'calls': 1, 'timed': 0, 'failed': 0})
+        with mock.patch('builtins.print') as printed:
+            handle_view_metrics(library)
+        self.assertIn(mock.call("- get_stats: 1 calls"), printed.call_args_list)
+
+if __name__ == '__main__':
+    unittest.main()
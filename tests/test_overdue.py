@@ -0,0 +1,111 @@
+# tests/test_overdue.py
+
+import unittest
+from unittest import mock
+import os
+import shutil
+from datetime import date, timedelta
+from library_system.overdue import DueDateIndex, date_to_ordinal
+from library_system.library import Library
+from library_system.book import Book
+from library_system.member import Member
+
+TEST_BOOKS_FILE = 'data/test_books.json'
+TEST_MEMBERS_FILE = 'data/test_members.json'
+TEST_JOURNAL_FILE = 'data/test_journal.jsonl'
+TEST_HISTORY_DIRECTORY = 'data/test_history'
+TEST_HOLDS_FILE = 'data/test_holds.json'
+
+class TestDueDateIndex(unittest.TestCase):
+    """Tests the due-date calendar and its cached overdue counter."""
+
+    def setUp(self):
+        self.index = DueDateIndex()
+        self.today = date_to_ordinal("2024-03-10")
+        self.index.add("B001", "2024-03-01")
+        self.index.add("B002", "2024-03-09")
+        self.index.add("B003", "2024-03-10")  # Due today: not overdue yet
+        self.index.add("B004", "2024-04-01")
+
+    def test_overdue_listing_is_ordered(self):
+        overdue = [isbn for isbn, _ in self.index.overdue(self.today)]
+        self.assertEqual(overdue, ["B001", "B002"])
+
+    def test_counter_tracks_changes(self):
+        self.assertEqual(self.index.overdue_count(self.today), 2)
+        self.index.add("B005", "2024-02-01")
+        self.assertEqual(self.index.overdue_count(self.today), 3)
+        self.index.remove("B001")
+        self.index.remove("B004")
+        self.assertEqual(self.index.overdue_count(self.today), 2)
+        self.assertEqual(len(self.index), 3)
+
+    def test_counter_rolls_over_to_next_day(self):
+        self.assertEqual(self.index.overdue_count(self.today), 2)
+        self.assertEqual(self.index.overdue_count(self.today + 1), 3)
+
+    def test_re_adding_moves_the_loan(self):
+        self.index.add("B001", "2024-05-01")
+        self.assertEqual(len(self.index), 4)
+        self.assertNotIn(date_to_ordinal("2024-03-01"), self.index.buckets)
+        self.assertEqual(self.index.overdue_count(self.today), 1)
+
+    def test_remove_unknown_isbn(self):
+        self.index.remove("B999")
+        self.assertEqual(len(self.index), 4)
+
+
+class TestLibraryOverdue(unittest.TestCase):
+    """Tests that Library keeps the loan index in step with transactions."""
+
+    def setUp(self):
+        patcher = mock.patch.multiple(Library, BOOKS_FILE=TEST_BOOKS_FILE, MEMBERS_FILE=TEST_MEMBERS_FILE,
+                                      JOURNAL_FILE=TEST_JOURNAL_FILE,
+                                      HISTORY_DIRECTORY=TEST_HISTORY_DIRECTORY, HOLDS_FILE=TEST_HOLDS_FILE)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.library = Library()
+        self.library.add_book(Book("Python Intro", "G. Guido", "B001", 2000))
+        self.library.add_book(Book("Web Dev", "H. Harvey", "B002", 2020))
+        self.library.register_member(Member("John Doe", "M001"))
+
+    def tearDown(self):
+        for path in (TEST_BOOKS_FILE, TEST_MEMBERS_FILE, TEST_JOURNAL_FILE):
+            if os.path.exists(path):
+                os.remove(path)
+        shutil.rmtree(TEST_HISTORY_DIRECTORY, ignore_errors=True)
+
+    def make_overdue(self, isbn, days):
+        past_due_date = (date.today() - timedelta(days=days)).isoformat()
+        self.library.find_book(isbn).due_date = past_due_date
+        self.library.loans.add(isbn, past_due_date)
+
+    def test_stats_follow_borrow_and_return(self):
+        self.library.borrow_book("B001", "M001")
+        stats = self.library.get_stats()
+        self.assertEqual(stats["Books Borrowed"], 1)
+        self.assertEqual(stats["Available Books"], 1)
+        self.assertEqual(stats["Overdue Books"], 0)
+
+        self.make_overdue("B001", 3)
+        self.assertEqual(self.library.get_stats()["Overdue Books"], 1)
+        self.assertEqual(self.library.get_overdue_books(), [self.library.find_book("B001")])
+
+        self.library.return_book("B001", "M001")
+        stats = self.library.get_stats()
+        self.assertEqual(stats["Books Borrowed"], 0)
+        self.assertEqual(stats["Overdue Books"], 0)
+        self.assertEqual(self.library.get_overdue_books(), [])
+
+    def test_loans_rebuilt_on_load(self):
+        self.library.borrow_book("B001", "M001")
+        self.library.borrow_book("B002", "M001")
+        self.make_overdue("B002", 10)
+        self.library.compact()
+
+        new_library = Library()
+        self.assertEqual(new_library.get_stats()["Books Borrowed"], 2)
+        self.assertEqual([b.isbn for b in new_library.get_overdue_books()], ["B002"])
+
+if __name__ == '__main__':
+    unittest.main()
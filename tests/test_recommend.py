@@ -0,0 +1,153 @@
+# tests/test_recommend.py
+
+import unittest
+import os
+import random
+import shutil
+from unittest import mock
+from library_system import recommend
+from library_system.history import LoanHistory, BORROW, RETURN
+from library_system.recommend import CoBorrowIndex
+from library_system.library import Library
+from library_system.book import Book
+from library_system.member import Member
+
+TEST_BOOKS_FILE = 'data/test_books.json'
+TEST_MEMBERS_FILE = 'data/test_members.json'
+TEST_JOURNAL_FILE = 'data/test_journal.jsonl'
+TEST_HISTORY_DIRECTORY = 'data/test_history'
+TEST_HOLDS_FILE = 'data/test_holds.json'
+
+class TestAlsoBorrowed(unittest.TestCase):
+    """Tests the "also borrowed" index as loans go through the Library."""
+
+    def setUp(self):
+        patcher = mock.patch.multiple(Library, BOOKS_FILE=TEST_BOOKS_FILE, MEMBERS_FILE=TEST_MEMBERS_FILE,
+                                      JOURNAL_FILE=TEST_JOURNAL_FILE,
+                                      HISTORY_DIRECTORY=TEST_HISTORY_DIRECTORY, HOLDS_FILE=TEST_HOLDS_FILE)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.library = Library()
+        for isbn, title in (("B001", "Python Intro"), ("B002", "Python Data"), ("B003", "Web Dev"),
+                            ("B004", "Data Science")):
+            self.library.add_book(Book(title, "G. Guido", isbn, 2000))
+        self.library.register_member(Member("John Doe", "M001"))
+        self.library.register_member(Member("Jane Roe", "M002"))
+
+    def tearDown(self):
+        for path in (TEST_BOOKS_FILE, TEST_MEMBERS_FILE, TEST_JOURNAL_FILE):
+            if os.path.exists(path):
+                os.remove(path)
+        shutil.rmtree(TEST_HISTORY_DIRECTORY, ignore_errors=True)
+
+    def circulate(self, loans):
+        for isbn, member_id in loans:
+            self.assertTrue(self.library.borrow_book(isbn, member_id)[0])
+            self.assertTrue(self.library.return_book(isbn, member_id)[0])
+
+    def also(self, library, isbn):
+        return [(entry['isbn'], entry['together']) for entry in library.get_also_borrowed(isbn)]
+
+    def test_borrows_pair_with_the_members_earlier_borrows(self):
+        self.circulate([("B001", "M001"), ("B002", "M001"), ("B003", "M001"), ("B001", "M002"), ("B003", "M002")])
+        self.assertEqual(self.also(self.library, "B001"), [("B003", 2), ("B002", 1)])
+        self.assertEqual(self.library.get_also_borrowed("B003", 1)[0]['title'], "Python Intro")
+        self.assertEqual(self.also(self.library, "B404"), [])
+
+        # A cached row is dropped when one of its counts changes
+        self.assertTrue(self.library.borrow_books("M002", ["B002", "B004"])[0])
+        self.assertEqual(self.also(self.library, "B001"), [("B002", 2), ("B003", 2), ("B004", 1)])
+
+    def test_window_only_reaches_recent_borrows(self):
+        self.library.save_data()
+        with mock.patch.object(recommend, 'PAIR_WINDOW', 2):
+            library = Library()
+            self.library = library
+            self.circulate([("B001", "M001"), ("B002", "M001"), ("B003", "M001"), ("B004", "M001")])
+            self.assertEqual(self.also(library, "B004"), [("B002", 1), ("B003", 1)])
+            self.assertEqual(self.also(library, "B001"), [("B002", 1), ("B003", 1)])
+
+    def test_checkpoint_and_reopen(self):
+        self.circulate([("B001", "M001"), ("B002", "M001"), ("B001", "M002"), ("B002", "M002")])
+        self.library.compact()
+        self.circulate([("B003", "M001")])
+        self.library.save_data()
+
+        reloaded = Library()
+        self.assertEqual(self.also(reloaded, "B002"), [("B001", 2), ("B003", 1)])
+        # The members' windows were saved too, so new borrows keep pairing
+        self.assertTrue(reloaded.borrow_book("B004", "M002")[0])
+        self.assertEqual(self.also(reloaded, "B004"), [("B001", 1), ("B002", 1)])
+
+    def test_index_is_read_on_the_first_lookup(self):
+        self.circulate([("B001", "M001"), ("B002", "M001")])
+        self.library.compact()
+        # More rows than books after the checkpoint: counting them means a rebuild
+        self.circulate([("B003", "M001"), ("B001", "M002"), ("B003", "M002")])
+        self.library.save_data()
+
+        with mock.patch.object(CoBorrowIndex, '_rebuild') as rebuild:
+            reloaded = Library()
+        rebuild.assert_not_called()
+        self.assertFalse(reloaded.recommendations.loaded)
+        # Borrows before the first lookup, across a compaction, count after the log
+        self.assertTrue(reloaded.borrow_book("B004", "M002")[0])
+        reloaded.compact()
+        self.assertTrue(reloaded.borrow_book("B002", "M002")[0])
+        self.assertEqual(self.also(reloaded, "B003"), [("B001", 2), ("B002", 2), ("B004", 1)])
+        self.assertEqual(self.also(reloaded, "B004"), [("B001", 1), ("B002", 1), ("B003", 1)])
+
+    def test_lookup_cache_is_bounded(self):
+        self.circulate([("B001", "M001"), ("B002", "M001"), ("B003", "M001")])
+        with mock.patch.object(recommend, 'CACHE_SIZE', 2):
+            for isbn in ("B001", "B002", "B003"):
+                self.library.get_also_borrowed(isbn)
+        self.assertEqual(len(self.library.recommendations.cache), 2)
+
+
+class TestRebuild(unittest.TestCase):
+    """Tests that a rebuild from the log matches counting the same loans as they happen."""
+
+    def tearDown(self):
+        shutil.rmtree(TEST_HISTORY_DIRECTORY, ignore_errors=True)
+
+    def record_loans(self, history, index, count, seed):
+        rng = random.Random(seed)
+        for _ in range(count):
+            isbn, member_id = f"B{int(40 * rng.random() ** 2):03d}", f"M{rng.randrange(12):03d}"
+            history.record(BORROW, isbn, "G. Guido", member_id)
+            index.record(isbn, member_id)
+            history.record(RETURN, isbn, "G. Guido", member_id)
+
+    def check_rebuilds(self, history, expected):
+        runs = [(recommend.np, 1), (None, 1)] + ([(recommend.np, 2)] if recommend.np else [])
+        for numpy, workers in runs:
+            with mock.patch.object(recommend, 'np', numpy):
+                rebuilt = CoBorrowIndex(history)
+                rebuilt.rebuild(workers)
+                self.assertEqual((rebuilt.indptr, rebuilt.neighbours, rebuilt.counts, rebuilt.recent),
+                                 expected, (numpy, workers))
+                self.assertEqual(rebuilt.rows, len(history))
+
+    def test_rebuild_matches_incremental_counts(self):
+        history = LoanHistory(TEST_HISTORY_DIRECTORY)
+        index = CoBorrowIndex(history)
+        index.load()  # Count as the loans happen
+        self.record_loans(history, index, 200, seed=3)
+        index.checkpoint()
+        self.record_loans(history, index, 200, seed=4)
+        index.checkpoint()  # Folds into an existing base; no row is long enough to be cut
+        self.check_rebuilds(history, (index.indptr, index.neighbours, index.counts, index.recent))
+
+    def test_rows_are_cut_to_the_top_neighbours(self):
+        history = LoanHistory(TEST_HISTORY_DIRECTORY)
+        index = CoBorrowIndex(history)
+        index.load()  # Count as the loans happen
+        self.record_loans(history, index, 400, seed=3)
+        with mock.patch.object(recommend, 'NEIGHBOURS', 5):
+            index.checkpoint()
+            self.assertEqual(max(b - a for a, b in zip(index.indptr, index.indptr[1:])), 5)
+            self.check_rebuilds(history, (index.indptr, index.neighbours, index.counts, index.recent))
+
+if __name__ == '__main__':
+    unittest.main()
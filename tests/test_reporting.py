@@ -0,0 +1,98 @@
+# tests/test_reporting.py
+
+import unittest
+from unittest import mock
+import os
+import shutil
+import time
+from datetime import date, timedelta
+from library_system import reporting
+from library_system.library import Library
+from library_system.book import Book
+from library_system.member import Member
+
+TEST_BOOKS_FILE = 'data/test_books.json'
+TEST_MEMBERS_FILE = 'data/test_members.json'
+TEST_JOURNAL_FILE = 'data/test_journal.jsonl'
+TEST_HISTORY_DIRECTORY = 'data/test_history'
+TEST_HOLDS_FILE = 'data/test_holds.json'
+
+def slow_report(library, count):
+    """Holds the report process for a moment, then yields more rows than fit one chunk."""
+    time.sleep(0.5)
+    for n in range(count):
+        yield {'n': n, 'books': len(library.books)}
+
+
+def failing_report(library):
+    yield {'ok': True}
+    raise KeyError('B404')
+
+
+@unittest.skipUnless(reporting.CAN_FORK, "forked reports need os.fork")
+class TestForkedReports(unittest.TestCase):
+    """Tests reports on a forked point-in-time copy of the library."""
+
+    def setUp(self):
+        patcher = mock.patch.multiple(Library, BOOKS_FILE=TEST_BOOKS_FILE, MEMBERS_FILE=TEST_MEMBERS_FILE,
+                                      JOURNAL_FILE=TEST_JOURNAL_FILE,
+                                      HISTORY_DIRECTORY=TEST_HISTORY_DIRECTORY, HOLDS_FILE=TEST_HOLDS_FILE)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.library = Library()
+        self.library.add_book(Book("Python Intro", "G. Guido", "B001", 2000))
+        self.library.add_book(Book("Web Dev", "H. Harvey", "B002", 2020))
+        self.library.register_member(Member("John Doe", "M001"))
+        self.library.register_member(Member("Jane Roe", "M002"))
+        for isbn, member_id, days in (("B001", "M001", 10), ("B002", "M002", 3)):
+            self.library.borrow_book(isbn, member_id)
+            past_due = (date.today() - timedelta(days=days)).isoformat()
+            self.library.find_book(isbn).due_date = past_due
+            self.library.loans.add(isbn, past_due)
+
+    def tearDown(self):
+        for path in (TEST_BOOKS_FILE, TEST_MEMBERS_FILE, TEST_JOURNAL_FILE):
+            if os.path.exists(path):
+                os.remove(path)
+        shutil.rmtree(TEST_HISTORY_DIRECTORY, ignore_errors=True)
+
+    def test_report_sees_the_moment_it_started(self):
+        report = self.library.start_report('overdue')
+        self.assertTrue(self.library.return_book("B001", "M001")[0])  # After the fork
+        rows = list(report)
+        self.assertEqual([(row['isbn'], row['member_name'], row['days_overdue'], row['fine']) for row in rows],
+                         [("B001", "John Doe", 10, 5.0), ("B002", "Jane Roe", 3, 1.5)])
+        self.assertEqual(self.library.get_stats()["Overdue Books"], 1)
+
+    def test_transactions_continue_while_a_report_runs(self):
+        report = reporting.start_report(self.library, slow_report, reporting.REPORT_CHUNK * 2 + 1)
+        start = time.perf_counter()
+        self.assertTrue(self.library.return_book("B002", "M002")[0])
+        self.assertTrue(self.library.add_book(Book("Data Science", "I. Ivy", "B003", 2021))[0])
+        self.assertLess(time.perf_counter() - start, 0.25)
+        rows = list(report)
+        self.assertEqual(len(rows), reporting.REPORT_CHUNK * 2 + 1)
+        self.assertEqual(rows[-1], {'n': reporting.REPORT_CHUNK * 2, 'books': 2})
+        self.assertFalse(report.process.is_alive())
+
+    def test_reports_match_running_in_place(self):
+        for name in ('stats', 'overdue', 'members', 'circulation'):
+            self.assertEqual(list(self.library.start_report(name)),
+                             list(self.library.start_report(name, background=False)), name)
+        (stats,) = self.library.start_report('stats')
+        self.assertEqual((stats['stats']['Overdue Books'], stats['fines']['total_fines']), (2, 6.5))
+        self.assertEqual([(row['member_id'], row['books']) for row in self.library.start_report('members')],
+                         [("M001", ["B001"]), ("M002", ["B002"])])
+        months = list(self.library.start_report('circulation', 1))
+        self.assertEqual((months[-1]['month'], months[-1]['borrows']), (date.today().isoformat()[:7], 2))
+        self.assertEqual(sum(month['borrows'] for month in months), 2)
+
+    def test_errors_and_unknown_reports(self):
+        with self.assertRaises(RuntimeError) as raised:
+            list(reporting.start_report(self.library, failing_report))
+        self.assertIn("KeyError", str(raised.exception))
+        with self.assertRaises(ValueError):
+            self.library.start_report('nonsense')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+# tests/test_search.py
+
+import unittest
+from unittest import mock
+import os
+import shutil
+from library_system.search import BookSearchIndex, PrefixTrie, tokenize
+from library_system.library import Library
+from library_system.book import Book
+
+TEST_BOOKS_FILE = 'data/test_books.json'
+TEST_MEMBERS_FILE = 'data/test_members.json'
+TEST_JOURNAL_FILE = 'data/test_journal.jsonl'
+TEST_HISTORY_DIRECTORY = 'data/test_history'
+TEST_HOLDS_FILE = 'data/test_holds.json'
+
+class TestBookSearchIndex(unittest.TestCase):
+    """Tests the inverted indexes, prefix expansion, ranking and pagination."""
+
+    def setUp(self):
+        self.index = BookSearchIndex()
+        self.index.add("B001", "Python Intro", "G. Guido", 2000)
+        self.index.add("B002", "Web Dev with Python", "H. Harvey", 2020)
+        self.index.add("B003", "Cooking for Pythonistas", "P. Python", 2020)
+        self.index.add("B004", "Gardening", "A. Green", 1999)
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize("Web Dev: Part-2!"), ["web", "dev", "part", "2"])
+        self.assertEqual(tokenize(None), [])
+
+    def test_prefix_trie(self):
+        trie = PrefixTrie()
+        for word in ["python", "pythonistas", "py", "java"]:
+            trie.insert(word)
+        self.assertEqual(trie.complete("py"), ["py", "python", "pythonistas"])
+        self.assertEqual(trie.complete("py", limit=2), ["py", "python"])
+        self.assertEqual(trie.complete("rust"), [])
+
+    def test_exact_term_ranks_title_above_author(self):
+        total, isbns = self.index.search("python", prefix=False)
+        self.assertEqual(total, 3)
+        # B003 matches only through the author, so it ranks last
+        self.assertEqual(isbns, ["B001", "B002", "B003"])
+
+    def test_all_terms_must_match(self):
+        total, isbns = self.index.search("python web", prefix=False)
+        self.assertEqual((total, isbns), (1, ["B002"]))
+        self.assertEqual(self.index.search("python gardening", prefix=False), (0, []))
+
+    def test_type_ahead_prefix(self):
+        total, isbns = self.index.search("garden")
+        self.assertEqual(isbns, ["B004"])
+        total, isbns = self.index.search("pyth")
+        self.assertEqual(total, 3)
+
+    def test_prefix_matches_more_than_fifty_words(self):
+        for n in range(120):
+            self.index.add(f"Z{n:03d}", f"Zebra{n:03d} Field Guide", "Z. Zed", 2001)
+        total, isbns = self.index.search("guide zeb", page_size=200)
+        self.assertEqual(total, 120)
+        self.assertIn("Z119", isbns)  # Its word went into the trie last
+        self.assertEqual(self.index.search("zebra119")[0], 1)
+        capped = BookSearchIndex(max_prefix_expansions=50)
+        for n in range(120):
+            capped.add(f"Z{n:03d}", f"Zebra{n:03d}", "Z. Zed", 2001)
+        self.assertEqual(capped.search("zeb")[0], 50)
+
+    def test_year_filter(self):
+        self.assertEqual(self.index.search("python", year=2020)[0], 2)
+        self.assertEqual(self.index.search("python", year="2000"), (1, ["B001"]))
+        self.assertEqual(self.index.search(year=1999), (1, ["B004"]))
+        self.assertEqual(self.index.search(""), (0, []))
+
+    def test_pagination(self):
+        total, first_page = self.index.search("python", page=1, page_size=2)
+        total, second_page = self.index.search("python", page=2, page_size=2)
+        self.assertEqual(total, 3)
+        # "python" is a prefix of "pythonistas", so B003 matches in both fields
+        self.assertEqual(first_page + second_page, ["B003", "B001", "B002"])
+        self.assertEqual(self.index.search("python", page=3, page_size=2), (3, []))
+
+
+class TestLibrarySearch(unittest.TestCase):
+    """Tests that Library keeps the search index up to date."""
+
+    def setUp(self):
+        patcher = mock.patch.multiple(Library, BOOKS_FILE=TEST_BOOKS_FILE, MEMBERS_FILE=TEST_MEMBERS_FILE,
+                                      JOURNAL_FILE=TEST_JOURNAL_FILE,
+                                      HISTORY_DIRECTORY=TEST_HISTORY_DIRECTORY, HOLDS_FILE=TEST_HOLDS_FILE)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.library = Library()
+
+    def tearDown(self):
+        if os.path.exists(TEST_BOOKS_FILE):
+            os.remove(TEST_BOOKS_FILE)
+        if os.path.exists(TEST_MEMBERS_FILE):
+            os.remove(TEST_MEMBERS_FILE)
+        if os.path.exists(TEST_JOURNAL_FILE):
+            os.remove(TEST_JOURNAL_FILE)
+        shutil.rmtree(TEST_HISTORY_DIRECTORY, ignore_errors=True)
+
+    def test_add_book_is_searchable(self):
+        self.library.add_book(Book("Python Intro", "G. Guido", "B001", 2000))
+        total, books = self.library.search_books("intro")
+        self.assertEqual(total, 1)
+        self.assertEqual(books[0].isbn, "B001")
+
+    def test_loaded_books_are_searchable(self):
+        self.library.add_book(Book("Python Intro", "G. Guido", "B001", 2000))
+        self.library.save_data()
+
+        new_library = Library()
+        total, books = new_library.search_books("guido", year=2000)
+        self.assertEqual(total, 1)
+        self.assertEqual(books[0].title, "Python Intro")
+
+if __name__ == '__main__':
+    unittest.main()
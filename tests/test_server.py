@@ -0,0 +1,93 @@
+# tests/test_server.py
+
+import unittest
+from unittest import mock
+import asyncio
+import json
+import os
+import shutil
+from library_system.server import LibraryServer
+from library_system.library import Library
+from library_system.book import Book
+from library_system.member import Member
+
+TEST_BOOKS_FILE = 'data/test_books.json'
+TEST_MEMBERS_FILE = 'data/test_members.json'
+TEST_JOURNAL_FILE = 'data/test_journal.jsonl'
+TEST_HISTORY_DIRECTORY = 'data/test_history'
+TEST_HOLDS_FILE = 'data/test_holds.json'
+
+class TestLibraryServer(unittest.IsolatedAsyncioTestCase):
+    """Tests the JSON-lines service: pipelining, command filtering and timed saves."""
+
+    async def asyncSetUp(self):
+        patcher = mock.patch.multiple(Library, BOOKS_FILE=TEST_BOOKS_FILE, MEMBERS_FILE=TEST_MEMBERS_FILE,
+                                      JOURNAL_FILE=TEST_JOURNAL_FILE,
+                                      HISTORY_DIRECTORY=TEST_HISTORY_DIRECTORY, HOLDS_FILE=TEST_HOLDS_FILE)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.library = Library()
+        self.library.add_book(Book("Python Intro", "G. Guido", "B001", 2000))
+        self.library.register_member(Member("John Doe", "M001"))
+        self.server = LibraryServer(self.library, port=0, save_interval=0.05)
+        await self.server.start()
+        self.reader, self.writer = await asyncio.open_connection('127.0.0.1', self.server.port)
+
+    async def asyncTearDown(self):
+        self.writer.close()
+        await self.server.stop()
+        for path in (TEST_BOOKS_FILE, TEST_MEMBERS_FILE, TEST_JOURNAL_FILE, TEST_HOLDS_FILE, TEST_HOLDS_FILE + 'l'):
+            if os.path.exists(path):
+                os.remove(path)
+        shutil.rmtree(TEST_HISTORY_DIRECTORY, ignore_errors=True)
+
+    async def request(self, *requests):
+        self.writer.write(b''.join(json.dumps(r).encode() + b'\n' for r in requests))
+        await self.writer.drain()
+        return [json.loads(await self.reader.readline()) for _ in requests]
+
+    async def test_pipelined_requests_answer_in_order(self):
+        responses = await self.request(
+            {"id": 1, "op": "borrow_book", "isbn": "B001", "member_id": "M001"},
+            {"id": 2, "op": "borrow_book", "isbn": "B001", "member_id": "M001"},
+            {"id": 3, "op": "find_book", "isbn": "B001"},
+            {"id": 4, "op": "get_stats"},
+        )
+        self.assertEqual([r['id'] for r in responses], [1, 2, 3, 4])
+        self.assertEqual([r['ok'] for r in responses], [True, False, True, True])
+        self.assertEqual(responses[2]['result']['borrowed_by'], "M001")
+        self.assertEqual(responses[3]['result']['Books Borrowed'], 1)
+
+    async def test_rejects_bad_and_unexposed_requests(self):
+        self.writer.write(b'not json\n')
+        responses = [json.loads(await self.reader.readline())]
+        responses += await self.request({"id": 9, "op": "add_book", "title": "T", "author": "A", "isbn": "X"})
+        responses += await self.request({"id": 10, "op": ["get_stats"]}, {"id": 11, "op": "get_stats"})
+        self.assertEqual(responses[0], {"id": None, "ok": False, "result": "Malformed request"})
+        self.assertFalse(responses[1]['ok'])
+        self.assertIsNone(self.library.find_book("X"))
+        self.assertEqual([(r['id'], r['ok']) for r in responses[2:]], [(10, False), (11, True)])  # Still connected
+
+    async def test_changes_are_saved_on_a_timer(self):
+        await self.request({"op": "borrow_book", "isbn": "B001", "member_id": "M001"})
+        for _ in range(100):
+            if self.library.journal.size:  # Set once the flush hit the disk
+                break
+            await asyncio.sleep(0.01)
+        reloaded = Library()
+        self.assertEqual(reloaded.find_book("B001").borrowed_by, "M001")
+
+    async def test_timer_saves_hold_changes_alone(self):
+        self.library.register_member(Member("Jane Roe", "M002"))
+        self.library.borrow_book("B001", "M001")
+        self.library.save_data()
+        await self.request({"op": "place_hold", "isbn": "B001", "member_id": "M002"})
+        self.assertEqual(self.library.journal.pending, [])  # Only the holds journal has the change
+        for _ in range(100):
+            if not self.library.has_unsaved_changes():
+                break
+            await asyncio.sleep(0.01)
+        self.assertEqual(Library().get_hold_queue_length("B001"), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,194 @@
+# tests/test_sharding.py
+
+import unittest
+from unittest import mock
+import os
+import shutil
+from datetime import date, timedelta
+from library_system.sharding import ShardLibrary, ShardWorker, ShardedLibrary, shard_of
+from library_system.library import Library
+from library_system.book import Book
+from library_system.member import Member
+
+TEST_BOOKS_FILE = 'data/test_books.json'
+TEST_MEMBERS_FILE = 'data/test_members.json'
+TEST_JOURNAL_FILE = 'data/test_journal.jsonl'
+TEST_HISTORY_DIRECTORY = 'data/test_history'
+TEST_SHARD_DIRECTORY = 'data/test_shards'
+TEST_HOLDS_FILE = 'data/test_holds.json'
+
+def remove_test_files():
+    for path in (TEST_BOOKS_FILE, TEST_MEMBERS_FILE, TEST_JOURNAL_FILE, TEST_HOLDS_FILE, TEST_HOLDS_FILE + 'l'):
+        if os.path.exists(path):
+            os.remove(path)
+    shutil.rmtree(TEST_HISTORY_DIRECTORY, ignore_errors=True)
+    shutil.rmtree(TEST_SHARD_DIRECTORY, ignore_errors=True)
+
+
+class TestShardWorker(unittest.TestCase):
+    """Tests the prepare/commit participant side within one process."""
+
+    def setUp(self):
+        patcher = mock.patch.multiple(ShardLibrary, BOOKS_FILE=TEST_BOOKS_FILE,
+                                      MEMBERS_FILE=TEST_MEMBERS_FILE, JOURNAL_FILE=TEST_JOURNAL_FILE,
+                                      HISTORY_DIRECTORY=TEST_HISTORY_DIRECTORY, HOLDS_FILE=TEST_HOLDS_FILE)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.worker = ShardWorker(ShardLibrary())
+        self.worker.library.add_book(Book("Python Intro", "G. Guido", "B001", 2000))
+        self.worker.library.register_member(Member("John Doe", "M001"))
+
+    def tearDown(self):
+        remove_test_files()
+
+    def test_reservation_blocks_conflicts_until_abort(self):
+        self.assertEqual(self.worker.prepare("T1", 'check_out_book', "B001", "M009"), (True, "Python Intro"))
+        success, msg = self.worker.prepare("T2", 'check_out_book', "B001", "M008")
+        self.assertFalse(success)
+        self.assertIn("another transaction", msg)
+        self.assertFalse(self.worker.borrow_book("B001", "M001")[0])
+
+        self.worker.abort("T1")
+        self.assertTrue(self.worker.borrow_book("B001", "M001")[0])
+
+    def test_prepared_borrows_count_toward_member_limit(self):
+        for n in range(Member.MAX_BOOKS):
+            self.assertTrue(self.worker.prepare(f"T{n}", 'add_member_loan', "M001", f"X{n}")[0])
+        success, msg = self.worker.prepare("T9", 'add_member_loan', "M001", "X9")
+        self.assertFalse(success)
+        self.assertIn("Maximum book limit", msg)
+
+        self.worker.commit("T0")
+        self.assertEqual(self.worker.library.find_member("M001").borrowed_books, ["X0"])
+        self.assertEqual(self.worker.pending_loans["M001"], Member.MAX_BOOKS - 1)
+
+    def test_halves_are_journaled_and_replayed(self):
+        self.worker.prepare("T1", 'check_out_book', "B001", "M009")
+        self.worker.commit("T1")
+        self.worker.prepare("T2", 'add_member_loan', "M001", "X1")
+        self.worker.commit("T2")
+        due_date = self.worker.library.find_book("B001").due_date
+        self.worker.library.save_data()
+
+        reloaded = ShardLibrary()
+        self.assertEqual(reloaded.find_book("B001").borrowed_by, "M009")
+        self.assertEqual(reloaded.find_book("B001").due_date, due_date)
+        self.assertEqual(reloaded.find_member("M001").borrowed_books, ["X1"])
+        self.assertEqual(len(reloaded.loans), 1)
+
+
+class TestShardedLibrary(unittest.TestCase):
+    """Tests the router against two shard processes."""
+
+    def setUp(self):
+        remove_test_files()
+        patcher = mock.patch.multiple(Library, BOOKS_FILE=TEST_BOOKS_FILE, MEMBERS_FILE=TEST_MEMBERS_FILE,
+                                      JOURNAL_FILE=TEST_JOURNAL_FILE,
+                                      HISTORY_DIRECTORY=TEST_HISTORY_DIRECTORY, HOLDS_FILE=TEST_HOLDS_FILE)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # The regular snapshot is split into the shards on first start
+        library = Library()
+        for isbn, title in (("B001", "Python Intro"), ("B002", "Web Dev"), ("B004", "Python Data")):
+            library.add_book(Book(title, "G. Guido", isbn, 2000))
+        library.register_member(Member("John Doe", "M001"))
+        library.register_member(Member("Jane Roe", "M004"))
+        library.compact()
+        self.library = ShardedLibrary(shards=2, directory=TEST_SHARD_DIRECTORY)
+
+    def tearDown(self):
+        self.library.close()
+        remove_test_files()
+
+    def test_cross_shard_borrow_and_return(self):
+        self.assertNotEqual(shard_of("B004", 2), shard_of("M001", 2))
+        success, msg = self.library.borrow_book("B004", "M001")
+        self.assertTrue(success, msg)
+        self.assertIn("borrowed by John Doe", msg)
+        self.assertEqual(self.library.find_book("B004").borrowed_by, "M001")
+        self.assertEqual(self.library.find_member("M001").borrowed_books, ["B004"])
+        self.assertFalse(self.library.borrow_book("B004", "M004")[0])
+        self.assertEqual(self.library.borrow_book("B404", "M404"), (False, "Book not found."))
+        self.assertEqual(self.library.borrow_book("B002", "M404"), (False, "Member not found."))
+
+        success, msg = self.library.return_book("B004", "M001")
+        self.assertTrue(success, msg)
+        self.assertTrue(self.library.find_book("B004").available)
+        self.assertEqual(self.library.find_member("M001").borrowed_books, [])
+        self.assertFalse(self.library.return_book("B004", "M001")[0])
+
+    def test_batch_borrow_spans_shards_all_or_nothing(self):
+        success, msg = self.library.borrow_books("M001", ["B001", "B004", "B404"])
+        self.assertEqual((success, msg), (False, "B404: Book not found."))
+        self.assertTrue(self.library.find_book("B001").available)  # Reservations were aborted
+        self.assertEqual(self.library.find_member("M001").borrowed_books, [])
+
+        success, msg = self.library.borrow_batch([("B001", "M001"), ("B004", "M004"), ("B002", "M001")])
+        self.assertTrue(success, msg)
+        self.assertIn("3 books borrowed by 2 members", msg)
+        self.assertEqual(self.library.find_member("M001").borrowed_books, ["B001", "B002"])
+        self.assertEqual(self.library.find_book("B004").borrowed_by, "M004")
+
+        self.assertFalse(self.library.return_books("M001", ["B001", "B004"])[0])
+        self.assertEqual(self.library.return_books("M001", ["B001", "B002"]), (True, "SUCCESS: 2 books returned."))
+        self.assertEqual(self.library.find_member("M001").borrowed_books, [])
+        self.assertFalse(self.library.find_book("B004").available)
+
+    def test_holds_live_on_the_books_shard(self):
+        self.library.borrow_book("B004", "M004")
+        self.assertEqual(self.library.place_hold("B004", "M404"), (False, "Member not found."))
+        success, msg = self.library.place_hold("B004", "M001")
+        self.assertTrue(success, msg)
+        self.assertEqual(self.library.get_hold_queue_length("B004"), 1)
+        self.assertIn("On hold for member M001", self.library.return_book("B004", "M004")[1])
+
+        # The other member is refused by the single-shard path and in a cross-shard batch
+        self.assertIn("on hold for another member", self.library.borrow_book("B004", "M004")[1])
+        self.assertEqual(self.library.borrow_books("M004", ["B001", "B004"]),
+                         (False, "B004: Book 'Python Data' is on hold for another member."))
+        self.assertTrue(self.library.borrow_book("B004", "M001")[0])
+        self.assertEqual(self.library.expire_holds(), 0)
+
+    def test_reports_merge_all_shards(self):
+        self.library.borrow_book("B001", "M001")
+        self.library.borrow_book("B004", "M004")
+        self.assertEqual(self.library.get_stats(), {
+            "Total Books": 3, "Available Books": 1, "Total Members": 2,
+            "Books Borrowed": 2, "Overdue Books": 0,
+        })
+        self.assertEqual(self.library.get_overdue_books(), [])
+        report = self.library.get_fine_report(date.today() + timedelta(days=20))
+        self.assertEqual((report['overdue'], report['member_fines']), (2, {'M001': 3.0, 'M004': 3.0}))
+        self.assertEqual([entry['isbn'] for entry in self.library.get_top_books()], ["B001", "B004"])
+        self.assertEqual(self.library.get_daily_circulation(days=1)[0]['borrows'], 2)
+
+        total, books = self.library.search_books("python")
+        self.assertEqual((total, [book.isbn for book in books]), (2, ["B001", "B004"]))
+        total, books = self.library.search_books("python", page=2, page_size=1)
+        self.assertEqual((total, [book.isbn for book in books]), (2, ["B004"]))
+
+    def test_member_search_merges_shards(self):
+        self.assertEqual([member.member_id for member in self.library.search_members("jane")], ["M004"])
+        self.assertEqual([member.member_id for member in self.library.search_members("doe")], ["M001", "M004"])
+        self.assertEqual(self.library.search_members("doe", 1)[0].name, "John Doe")
+
+    def test_bulk_add_keeps_row_indexes(self):
+        rows = [{'title': "A", 'author': "X", 'isbn': "B010"}, {'title': "", 'author': "X", 'isbn': "B011"},
+                {'title': "C", 'author': "X", 'isbn': "B001"}, {'title': "D", 'author': "X", 'isbn': "B013"}]
+        added, rejected = self.library.add_books_bulk(rows)
+        self.assertEqual(added, 2)
+        self.assertEqual([index for index, _ in rejected], [1, 2])
+
+    def test_changes_persist_per_shard(self):
+        self.library.borrow_book("B004", "M001")
+        self.library.save_data()
+        self.library.close()
+
+        self.library = ShardedLibrary(shards=2, directory=TEST_SHARD_DIRECTORY)
+        self.assertEqual(self.library.find_book("B004").borrowed_by, "M001")
+        self.assertEqual(self.library.find_member("M001").borrowed_books, ["B004"])
+        with self.assertRaises(ValueError):
+            ShardedLibrary(shards=3, directory=TEST_SHARD_DIRECTORY)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+# tests/test_snapshot.py
+
+import unittest
+import os
+import shutil
+from datetime import date, timedelta
+from unittest import mock
+from library_system import snapshot
+from library_system.library import Library
+from library_system.book import Book
+from library_system.member import Member
+from library_system.snapshot import MappedSnapshot, write_snapshot, HEADER
+
+TEST_BOOKS_FILE = 'data/test_books.json'
+TEST_MEMBERS_FILE = 'data/test_members.json'
+TEST_JOURNAL_FILE = 'data/test_journal.jsonl'
+TEST_HISTORY_DIRECTORY = 'data/test_history'
+TEST_SNAPSHOT_FILE = 'data/test_library.snap'
+TEST_HOLDS_FILE = 'data/test_holds.json'
+
+class TestMappedStorage(unittest.TestCase):
+    """Tests the binary snapshot: lookups from the mapped file, copy-on-write and compaction."""
+
+    def setUp(self):
+        patcher = mock.patch.multiple(Library, BOOKS_FILE=TEST_BOOKS_FILE, MEMBERS_FILE=TEST_MEMBERS_FILE,
+                                      JOURNAL_FILE=TEST_JOURNAL_FILE, SNAPSHOT_FILE=TEST_SNAPSHOT_FILE,
+                                      HISTORY_DIRECTORY=TEST_HISTORY_DIRECTORY, HOLDS_FILE=TEST_HOLDS_FILE)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.library = Library(storage='mapped')
+        self.library.add_book(Book("Python Intro", "G. Guido", "B001", 2000))
+        self.library.add_book(Book("Web Dev", "H. Harvey", "B002", None))
+        self.library.register_member(Member("John Doe", "M001"))
+        self.library.compact()
+
+    def tearDown(self):
+        self.library.close()
+        for path in (TEST_BOOKS_FILE, TEST_MEMBERS_FILE, TEST_JOURNAL_FILE,
+                     TEST_SNAPSHOT_FILE, TEST_SNAPSHOT_FILE + '.jsonl'):
+            if os.path.exists(path):
+                os.remove(path)
+        shutil.rmtree(TEST_HISTORY_DIRECTORY, ignore_errors=True)
+
+    def reopen(self):
+        self.library.close()
+        self.library = Library(storage='mapped')
+
+    def test_records_are_read_from_the_file(self):
+        self.assertEqual(self.library.books.overlay, {})
+        book = self.library.find_book("B002")
+        self.assertEqual((book.title, book.publication_year, book.available), ("Web Dev", None, True))
+        self.assertEqual(self.library.find_member("M001").name, "John Doe")
+        self.assertIsNone(self.library.find_book("B404"))
+        self.assertEqual(sorted(self.library.books), ["B001", "B002"])
+        self.assertEqual(self.library.books.overlay, {})  # Reading promotes nothing
+
+    def test_changes_promote_and_survive_compaction(self):
+        self.library.borrow_book("B001", "M001")
+        self.assertEqual(set(self.library.books.overlay), {"B001"})
+        self.assertEqual(set(self.library.members.overlay), {"M001"})
+        self.assertEqual(self.library.find_book("B001").borrowed_by, "M001")
+
+        self.library.compact()
+        self.assertEqual(self.library.books.overlay, {})
+        self.reopen()
+        self.assertEqual(self.library.find_book("B001").borrowed_by, "M001")
+        self.assertEqual(self.library.find_member("M001").borrowed_books, ["B001"])
+        self.assertEqual(self.library.get_stats()["Books Borrowed"], 1)
+
+    def test_journal_replays_on_top_of_the_snapshot(self):
+        self.library.borrow_book("B002", "M001")
+        self.library.add_book(Book("Data Science", "I. Ivy", "B003", 2021))
+        self.library.save_data()
+        self.reopen()
+        self.assertEqual(self.library.find_book("B002").borrowed_by, "M001")
+        self.assertEqual(len(self.library.books), 3)
+        self.assertEqual(self.library.search_books("data")[0], 1)
+
+    def test_member_directory_reads_names_from_the_file(self):
+        self.library.register_member(Member("Jane Doe", "M002"))  # In the overlay only
+        self.assertEqual([m.member_id for m in self.library.search_members("doe")], ["M001", "M002"])
+
+    def test_loan_index_masks_returned_and_adds_new_loans(self):
+        self.library.borrow_book("B001", "M001")
+        past_due = (date.today() - timedelta(days=5)).isoformat()
+        self.library.find_book("B001").due_date = past_due
+        self.library.loans.add("B001", past_due)
+        self.library.compact()
+        self.assertEqual(self.library.get_stats()["Overdue Books"], 1)
+        self.assertEqual([book.isbn for book in self.library.get_overdue_books()], ["B001"])
+
+        self.library.return_book("B001", "M001")
+        self.library.borrow_book("B002", "M001")
+        self.assertEqual(len(self.library.loans), 1)
+        self.assertEqual(self.library.get_stats()["Overdue Books"], 0)
+        self.assertEqual(self.library.get_overdue_books(), [])
+
+    def test_index_grows_past_half_full(self):
+        for n in range(100):
+            self.library.add_book(Book(f"Book {n}", "Author", f"X{n:03d}", 2000))
+        self.library.compact()
+        self.reopen()
+        self.assertEqual(len(self.library.books), 102)
+        self.assertTrue(all(self.library.find_book(f"X{n:03d}").title == f"Book {n}" for n in range(100)))
+        self.assertEqual(self.library.find_book("B001").title, "Python Intro")
+
+    def test_heap_is_rewritten_once_mostly_garbage(self):
+        self.library.find_member("M001").name = "John Doe"  # Unchanged strings are reused
+        self.library.compact()
+        self.assertEqual(self.library.books.snapshot.heap_garbage, 0)
+
+        garbage = []
+        with mock.patch.object(snapshot, 'MAX_GARBAGE', 0.05):
+            for _ in range(6):
+                for change in (self.library.borrow_book, self.library.return_book):
+                    change("B001", "M001")
+                    self.library.compact()
+                    garbage.append(self.library.books.snapshot.heap_garbage)
+        self.assertGreater(garbage[1], 0)  # Returning drops the borrower and the loan strings
+        self.assertIn(0, garbage[2:])  # The heap was started afresh
+        self.reopen()
+        self.assertTrue(self.library.find_book("B001").available)
+        self.assertEqual(self.library.find_member("M001").borrowed_books, [])
+        self.assertEqual(self.library.find_book("B002").title, "Web Dev")
+
+    def test_rejects_other_files_and_versions(self):
+        with open(TEST_BOOKS_FILE, 'wb') as f:
+            f.write(b'{"not": "a snapshot"}'.ljust(HEADER.size))
+        with self.assertRaises(ValueError):
+            MappedSnapshot(TEST_BOOKS_FILE)
+
+    def test_writes_from_plain_objects(self):
+        book = Book("Python Intro", "G. Guido", "B001", 2000)
+        book.check_out("M001")
+        member = Member("John Doe", "M001")
+        member.borrow_book("B001")
+        write_snapshot(TEST_SNAPSHOT_FILE, {"B001": book}, {"M001": member})
+        self.reopen()
+        self.assertEqual(self.library.find_book("B001").due_date, book.due_date)
+        self.assertEqual(len(self.library.loans), 1)
+        self.assertEqual(len(self.library.members), 1)
+
+if __name__ == '__main__':
+    unittest.main()
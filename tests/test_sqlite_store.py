@@ -0,0 +1,131 @@
+# tests/test_sqlite_store.py
+
+import unittest
+from unittest import mock
+import os
+import shutil
+from datetime import date, timedelta
+from library_system.library import Library
+from library_system.book import Book
+from library_system.member import Member
+from library_system.sqlite_store import SQLiteStore, migrate_from_json
+
+TEST_BOOKS_FILE = 'data/test_books.json'
+TEST_MEMBERS_FILE = 'data/test_members.json'
+TEST_JOURNAL_FILE = 'data/test_journal.jsonl'
+TEST_HISTORY_DIRECTORY = 'data/test_history'
+TEST_DATABASE_FILE = 'data/test_library.db'
+TEST_HOLDS_FILE = 'data/test_holds.json'
+
+class TestSQLiteStorage(unittest.TestCase):
+    """Tests the SQLite backend: persistence, the loans table, caching and migration."""
+
+    def setUp(self):
+        patcher = mock.patch.multiple(Library, BOOKS_FILE=TEST_BOOKS_FILE, MEMBERS_FILE=TEST_MEMBERS_FILE,
+                                      JOURNAL_FILE=TEST_JOURNAL_FILE, DATABASE_FILE=TEST_DATABASE_FILE,
+                                      HISTORY_DIRECTORY=TEST_HISTORY_DIRECTORY, HOLDS_FILE=TEST_HOLDS_FILE)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.library = Library(storage='sqlite')
+        self.library.add_book(Book("Python Intro", "G. Guido", "B001", 2000))
+        self.library.add_book(Book("Web Dev", "H. Harvey", "B002", 2020))
+        self.library.register_member(Member("John Doe", "M001"))
+        self.library.save_data()
+
+    def tearDown(self):
+        self.library.close()
+        for path in (TEST_BOOKS_FILE, TEST_MEMBERS_FILE, TEST_JOURNAL_FILE, TEST_DATABASE_FILE,
+                     TEST_DATABASE_FILE + '-wal', TEST_DATABASE_FILE + '-shm'):
+            if os.path.exists(path):
+                os.remove(path)
+        shutil.rmtree(TEST_HISTORY_DIRECTORY, ignore_errors=True)
+
+    def reopen(self):
+        self.library.close()
+        self.library = Library(storage='sqlite')
+
+    def test_saved_transactions_survive_reopen(self):
+        self.library.borrow_book("B001", "M001")
+        self.library.save_data()
+        self.reopen()
+        book = self.library.find_book("B001")
+        self.assertEqual(book.borrowed_by, "M001")
+        self.assertEqual(self.library.find_member("M001").borrowed_books, ["B001"])
+        self.assertEqual(self.library.get_stats()["Books Borrowed"], 1)
+
+        self.library.return_book("B001", "M001")
+        self.library.save_data()
+        self.reopen()
+        self.assertTrue(self.library.find_book("B001").available)
+        self.assertEqual(self.library.find_member("M001").borrowed_books, [])
+
+    def test_batches_are_written_in_one_transaction(self):
+        self.assertTrue(self.library.borrow_books("M001", ["B001", "B002"])[0])
+        self.library.save_data()
+        self.reopen()
+        self.assertEqual(self.library.find_member("M001").borrowed_books, ["B001", "B002"])
+        self.assertEqual(self.library.get_stats()["Books Borrowed"], 2)
+
+        self.assertTrue(self.library.return_batch([("B002", "M001")])[0])
+        self.library.save_data()
+        self.reopen()
+        self.assertTrue(self.library.find_book("B002").available)
+        self.assertEqual(self.library.find_member("M001").borrowed_books, ["B001"])
+
+    def test_member_directory_is_built_from_the_table(self):
+        self.reopen()
+        self.assertIsNone(self.library.member_directory)
+        self.library.register_member(Member("Jane Roe", "M002"))  # Not indexed until the first search
+        self.assertEqual([m.member_id for m in self.library.search_members("jon do")], ["M001"])
+        self.library.register_member(Member("Jane Doe", "M003"))
+        self.assertEqual([m.member_id for m in self.library.search_members("jane")], ["M002", "M003"])
+
+    def test_unsaved_changes_are_rolled_back(self):
+        self.library.borrow_book("B001", "M001")
+        self.reopen()
+        self.assertTrue(self.library.find_book("B001").available)
+
+    def test_overdue_and_stats_come_from_the_loans_table(self):
+        self.library.borrow_book("B001", "M001")
+        self.library.borrow_book("B002", "M001")
+        self.library.loans.add("B002", (date.today() - timedelta(days=3)).isoformat())
+        self.assertEqual([book.isbn for book in self.library.get_overdue_books()], ["B002"])
+        stats = self.library.get_stats()
+        self.assertEqual((stats["Total Books"], stats["Books Borrowed"], stats["Overdue Books"]), (2, 2, 1))
+
+    def test_read_through_cache(self):
+        self.reopen()
+        books = self.library.books
+        self.assertIs(self.library.find_book("B001"), self.library.find_book("B001"))
+        self.assertEqual((books.misses, books.hits), (1, 1))
+        self.assertIsNone(self.library.find_book("B999"))
+        books.cache_size = 1
+        self.library.find_book("B002")
+        self.assertEqual(list(books.cache), ["B002"])
+
+    def test_search_builds_index_on_demand(self):
+        self.reopen()
+        self.assertIsNone(self.library.search_index)
+        total, books = self.library.search_books("web")
+        self.assertEqual((total, [book.isbn for book in books]), (1, ["B002"]))
+        self.library.add_book(Book("Web Design", "A. Author", "B003", 2021))
+        self.assertEqual(self.library.search_books("web")[0], 2)
+
+    def test_migration_from_json(self):
+        source = Library()
+        source.add_book(Book("Gardening", "A. Green", "B010", 1999))
+        source.register_member(Member("Jane Roe", "M010"))
+        source.borrow_book("B010", "M010")
+        store = SQLiteStore(self.library.store.path, Book.from_dict, Member.from_dict)
+        try:
+            self.assertEqual(migrate_from_json(source, store), (3, 2))
+        finally:
+            store.close()
+
+        self.reopen()
+        self.assertEqual(self.library.find_book("B010").borrowed_by, "M010")
+        self.assertEqual(self.library.find_member("M010").borrowed_books, ["B010"])
+        self.assertEqual(len(self.library.loans), 1)
+
+if __name__ == '__main__':
+    unittest.main()
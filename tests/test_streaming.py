@@ -0,0 +1,147 @@
+# tests/test_streaming.py
+
+import unittest
+from unittest import mock
+import json
+import os
+import shutil
+from library_system.streaming import LazyRecordMap, iter_json_object
+from library_system.library import Library
+from library_system.book import Book
+from library_system.member import Member
+
+TEST_BOOKS_FILE = 'data/test_books.json'
+TEST_MEMBERS_FILE = 'data/test_members.json'
+TEST_JOURNAL_FILE = 'data/test_journal.jsonl'
+TEST_HISTORY_DIRECTORY = 'data/test_history'
+TEST_HOLDS_FILE = 'data/test_holds.json'
+
+def remove_test_files():
+    for path in (TEST_BOOKS_FILE, TEST_MEMBERS_FILE, TEST_JOURNAL_FILE):
+        if os.path.exists(path):
+            os.remove(path)
+    shutil.rmtree(TEST_HISTORY_DIRECTORY, ignore_errors=True)
+
+class TestIterJsonObject(unittest.TestCase):
+    """Tests the incremental parser against json.load, including chunk boundaries."""
+
+    def setUp(self):
+        os.makedirs('data', exist_ok=True)
+        self.data = {
+            "B001": {"title": "Python Intro", "year": 2000, "tags": ["a", "b"]},
+            "B002": {"title": "Ünïcödé Títle ✓", "year": 123456789, "available": False},
+            "Ключ": {"title": None, "nested": {"x": [1.5, -2e3, True]}},
+            "B004": 42,
+        }
+
+    def tearDown(self):
+        remove_test_files()
+
+    def check_file(self, text):
+        with open(TEST_BOOKS_FILE, 'w', encoding='utf-8') as f:
+            f.write(text)
+        with open(TEST_BOOKS_FILE, 'rb') as f:
+            raw = f.read()
+        for chunk_size in (1, 3, 7, 64, 1 << 20):
+            parsed = {}
+            for key, value, start, end in iter_json_object(TEST_BOOKS_FILE, chunk_size):
+                parsed[key] = value
+                self.assertEqual(json.loads(raw[start:end]), value)
+            self.assertEqual(parsed, self.data)
+
+    def test_compact_and_indented_files(self):
+        self.check_file(json.dumps(self.data, ensure_ascii=False, separators=(',', ':')))
+        self.check_file(json.dumps(self.data, indent=4))
+        self.check_file(json.dumps(self.data, ensure_ascii=False, indent=4))
+
+    def test_empty_inputs(self):
+        for text in ('', '{}', '  {  }\n'):
+            with open(TEST_BOOKS_FILE, 'w') as f:
+                f.write(text)
+            self.assertEqual(list(iter_json_object(TEST_BOOKS_FILE, 2)), [])
+
+    def test_malformed_file(self):
+        with open(TEST_BOOKS_FILE, 'w') as f:
+            f.write('{"B001": 1 "B002": 2}')
+        with self.assertRaises(ValueError):
+            list(iter_json_object(TEST_BOOKS_FILE))
+
+
+class TestLazyRecordMap(unittest.TestCase):
+    """Tests that records are only materialized on access."""
+
+    def setUp(self):
+        os.makedirs('data', exist_ok=True)
+        with open(TEST_BOOKS_FILE, 'w') as f:
+            json.dump({"B001": {"n": 1}, "B002": {"n": 2}}, f)
+        self.map = LazyRecordMap(TEST_BOOKS_FILE, lambda data: data["n"])
+        for key, _, start, end in iter_json_object(TEST_BOOKS_FILE):
+            self.map.add_offset(key, start, end)
+
+    def tearDown(self):
+        self.map.close()
+        remove_test_files()
+
+    def test_mapping_behaviour(self):
+        self.assertEqual(len(self.map), 2)
+        self.assertIn("B001", self.map)
+        self.assertEqual(self.map.materialized_count(), 0)
+        self.assertEqual(self.map["B002"], 2)
+        self.assertEqual(self.map.materialized_count(), 1)
+
+        self.map["B003"] = 3
+        del self.map["B001"]
+        self.assertNotIn("B001", self.map)
+        self.assertEqual(self.map.get("B001"), None)
+        self.assertEqual(sorted(self.map.items()), [("B002", 2), ("B003", 3)])
+        self.assertEqual(len(self.map), 2)
+
+
+class TestLibraryLoadModes(unittest.TestCase):
+    """Tests that every load mode yields the same library."""
+
+    def setUp(self):
+        patcher = mock.patch.multiple(Library, BOOKS_FILE=TEST_BOOKS_FILE, MEMBERS_FILE=TEST_MEMBERS_FILE,
+                                      JOURNAL_FILE=TEST_JOURNAL_FILE,
+                                      HISTORY_DIRECTORY=TEST_HISTORY_DIRECTORY, HOLDS_FILE=TEST_HOLDS_FILE)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        remove_test_files()
+        library = Library()
+        library.add_book(Book("Python Intro", "G. Guido", "B001", 2000))
+        library.add_book(Book("Web Dev", "H. Harvey", "B002", 2020))
+        library.register_member(Member("John Doe", "M001"))
+        library.borrow_book("B002", "M001")
+        library.compact()
+
+    def tearDown(self):
+        remove_test_files()
+
+    def test_modes_agree(self):
+        expected = Library()
+        for mode in ('stream', 'lazy'):
+            library = Library(load_mode=mode)
+            self.assertEqual(library.get_stats(), expected.get_stats())
+            self.assertEqual({isbn: book.to_dict() for isbn, book in library.books.items()},
+                             {isbn: book.to_dict() for isbn, book in expected.books.items()})
+            self.assertEqual(library.search_books("web")[0], 1)
+
+    def test_lazy_materializes_on_access(self):
+        library = Library(load_mode='lazy')
+        self.assertEqual(library.books.materialized_count(), 0)
+        success, _ = library.return_book("B002", "M001")
+        self.assertTrue(success)
+        self.assertEqual(library.books.materialized_count(), 1)
+
+        # Compaction copies untouched records and serializes changed ones
+        library.compact()
+        reloaded = Library()
+        self.assertTrue(reloaded.find_book("B002").available)
+        self.assertEqual(reloaded.find_book("B001").title, "Python Intro")
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            Library(load_mode='eager')
+
+if __name__ == '__main__':
+    unittest.main()
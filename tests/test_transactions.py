@@ -0,0 +1,157 @@
+# tests/test_transactions.py
+
+import unittest
+from unittest import mock
+import os
+import shutil
+import random
+import sys
+import threading
+from library_system.transactions import LockStripes
+from library_system.library import Library
+from library_system.book import Book
+from library_system.member import Member
+
+TEST_BOOKS_FILE = 'data/test_books.json'
+TEST_MEMBERS_FILE = 'data/test_members.json'
+TEST_JOURNAL_FILE = 'data/test_journal.jsonl'
+TEST_HISTORY_DIRECTORY = 'data/test_history'
+TEST_HOLDS_FILE = 'data/test_holds.json'
+
+class TestLockStripes(unittest.TestCase):
+
+    def test_stripes_are_released(self):
+        stripes = LockStripes(count=8)
+        with stripes.hold([('book', 'B001'), ('member', 'M001')]):
+            with stripes.hold([('book', 'B001')]):  # Re-entrant
+                pass
+        for lock in stripes.locks:
+            self.assertTrue(lock.acquire(blocking=False))
+            lock.release()
+
+    def test_opposite_order_does_not_deadlock(self):
+        stripes = LockStripes(count=2)
+        keys = [('book', n) for n in range(10)]
+
+        def worker(ordered_keys):
+            for _ in range(2000):
+                with stripes.hold(ordered_keys):
+                    pass
+
+        threads = [threading.Thread(target=worker, args=(keys,)),
+                   threading.Thread(target=worker, args=(keys[::-1],))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=10)
+            self.assertFalse(thread.is_alive())
+
+
+class TestConcurrentTransactions(unittest.TestCase):
+    """Hammers borrow/return from many threads and checks the library stays consistent."""
+
+    def setUp(self):
+        patcher = mock.patch.multiple(Library, BOOKS_FILE=TEST_BOOKS_FILE, MEMBERS_FILE=TEST_MEMBERS_FILE,
+                                      JOURNAL_FILE=TEST_JOURNAL_FILE,
+                                      HISTORY_DIRECTORY=TEST_HISTORY_DIRECTORY, HOLDS_FILE=TEST_HOLDS_FILE)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.library = Library()
+        for n in range(40):
+            self.library.add_book(Book(f"Book {n}", "Author", f"B{n:03d}", 2000))
+        for n in range(10):
+            self.library.register_member(Member(f"Member {n}", f"M{n:03d}"))
+        self.switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)  # Force frequent thread switches
+
+    def tearDown(self):
+        sys.setswitchinterval(self.switch_interval)
+        for path in (TEST_BOOKS_FILE, TEST_MEMBERS_FILE, TEST_JOURNAL_FILE):
+            if os.path.exists(path):
+                os.remove(path)
+        shutil.rmtree(TEST_HISTORY_DIRECTORY, ignore_errors=True)
+
+    def assert_consistent(self, library):
+        on_loan = 0
+        for isbn, book in library.books.items():
+            if book.available:
+                self.assertIsNone(book.borrowed_by)
+                self.assertNotIn(isbn, library.loans)
+            else:
+                on_loan += 1
+                self.assertIn(isbn, library.find_member(book.borrowed_by).borrowed_books)
+                self.assertIn(isbn, library.loans)
+        borrowed = 0
+        for member_id, member in library.members.items():
+            self.assertLessEqual(len(member.borrowed_books), Member.MAX_BOOKS)
+            self.assertEqual(len(set(member.borrowed_books)), len(member.borrowed_books))
+            for isbn in member.borrowed_books:
+                self.assertEqual(library.find_book(isbn).borrowed_by, member_id)
+            borrowed += len(member.borrowed_books)
+        self.assertEqual(on_loan, borrowed)
+        self.assertEqual(library.get_stats()["Books Borrowed"], on_loan)
+
+    def test_stress_invariants(self):
+        isbns = list(self.library.books)
+        member_ids = list(self.library.members)
+        errors = []
+
+        def desk(seed):
+            rng = random.Random(seed)
+            try:
+                for _ in range(1500):
+                    isbn, member_id = rng.choice(isbns), rng.choice(member_ids)
+                    if rng.random() < 0.5:
+                        self.library.borrow_book(isbn, member_id)
+                    else:
+                        self.library.return_book(isbn, member_id)
+            except Exception as e:  # Surface worker failures in the main thread
+                errors.append(e)
+
+        threads = [threading.Thread(target=desk, args=(seed,)) for seed in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assert_consistent(self.library)
+
+        # The journal must replay to the same state
+        self.library.save_data()
+        reloaded = Library()
+        self.assert_consistent(reloaded)
+        self.assertEqual({isbn: book.borrowed_by for isbn, book in reloaded.books.items()},
+                         {isbn: book.borrowed_by for isbn, book in self.library.books.items()})
+
+    def test_concurrent_adds_to_columnar_storage(self):
+        library = Library(storage='columnar')
+        errors = []
+
+        def desk(desk_number):
+            try:
+                for n in range(3000):
+                    isbn = f"C{desk_number}-{n:03d}"
+                    self.assertTrue(library.add_book(Book(f"Book {n}", f"Author {n % 7}", isbn, 2000))[0])
+                    library.find_book(isbn).available = n % 2 == 0  # Row must be this book's own
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=desk, args=(number,)) for number in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(library.books), 8 * 3000)
+        store = library.books
+        self.assertEqual(len({store.rows[isbn] for isbn in store}), len(store))
+        self.assertTrue(all(len(column) == len(store.isbns) for column in
+                            (store.titles, store.author_codes, store.years, store.available, store.due)))
+        for isbn in store:
+            self.assertEqual(store.isbns[store.rows[isbn]], isbn)
+        self.assertEqual(len(store.author_names), len(set(store.author_names)))
+
+if __name__ == '__main__':
+    unittest.main()